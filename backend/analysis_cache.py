@@ -0,0 +1,191 @@
+"""
+Analysis Cache - Analiz Sonuçları için Sınırlı LRU Önbellek
+==========================================================
+Deterministik, durumsuz analizörlerin (duygu, tema/mood, Türkçe NLP,
+içerik filtresi) sonuçlarını normalize edilmiş metnin özetine göre saklar.
+
+Önbellekten dönen nesneler paylaşılır: çağıranlar sonucu DEĞİŞTİRMEMELİ.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from document import source_text
+
+DEFAULT_MAXSIZE = 256
+
+
+def identity(text: str) -> str:
+    return text
+
+
+def lowercase(text: str) -> str:
+    return text.lower()
+
+
+def lowercase_strip(text: str) -> str:
+    return text.lower().strip()
+
+
+class AnalysisCache:
+    """Thread-safe LRU önbellek (isabet/kaçırma istatistikli)"""
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_MAXSIZE,
+                 normalizer: Callable[[str], str] = identity, key_digest: bool = True):
+        self.name = name
+        self.maxsize = maxsize
+        self.normalizer = normalizer
+        # Uzun metinlerde anahtar olarak özet tutulur; kısa girdilerde metnin kendisi daha ucuzdur
+        self.key_digest = key_digest
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, text: str) -> Hashable:
+        normalized = self.normalizer(text)
+        if self.key_digest:
+            return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+        return normalized
+
+    def get_or_compute(self, text: str, compute: Callable[[], Any], scope: Hashable = None) -> Any:
+        """Önbellekte varsa döndür, yoksa hesapla ve sakla"""
+        if not self.enabled or self.maxsize <= 0:
+            return compute()
+
+        found, value = self.lookup(text, scope)
+        if found:
+            return value
+
+        # Hesaplama kilit dışında; eşzamanlı aynı anahtar iki kez hesaplanabilir (sonuç aynı)
+        value = compute()
+        self.store(text, value, scope)
+        return value
+
+    def lookup(self, text: str, scope: Hashable = None) -> Tuple[bool, Any]:
+        """(bulundu, değer); toplu hesaplamalarda kaçırılanları ayırmak için"""
+        if not self.enabled or self.maxsize <= 0:
+            return False, None
+        key = (scope, self.make_key(text))
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+        return False, None
+
+    def store(self, text: str, value: Any, scope: Hashable = None):
+        if not self.enabled or self.maxsize <= 0:
+            return
+        key = (scope, self.make_key(text))
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Tüm kayıtları sil (sözlük değişikliklerinde)"""
+        with self._lock:
+            self._data.clear()
+
+    def configure(self, maxsize: Optional[int] = None, enabled: Optional[bool] = None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+                while len(self._data) > max(maxsize, 0):
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+            if enabled is not None:
+                self.enabled = enabled
+                if not enabled:
+                    self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# ============== Kayıt ==============
+
+_caches: Dict[str, AnalysisCache] = {}
+_registry_lock = threading.Lock()
+_default_enabled = True  # configure_all sonrası oluşturulan önbellekler için
+
+
+def get_cache(name: str, maxsize: int = DEFAULT_MAXSIZE,
+              normalizer: Callable[[str], str] = identity, key_digest: bool = True) -> AnalysisCache:
+    """İsimli önbelleği getir, yoksa oluştur"""
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = AnalysisCache(name, maxsize, normalizer, key_digest)
+            cache.enabled = _default_enabled
+            _caches[name] = cache
+        return cache
+
+
+def cached_analysis(name: str, maxsize: int = DEFAULT_MAXSIZE,
+                    normalizer: Callable[[str], str] = identity, key_digest: bool = True):
+    """(cls, text) imzalı classmethod gövdeleri için önbellek dekoratörü.
+
+    normalizer sonucu değiştirmeyen bir dönüşüm olmalı: analizör metni zaten
+    küçük harfe çeviriyorsa `lowercase`, orijinal metni sonuca koyuyorsa `identity`.
+    text bir Document da olabilir; anahtar ham metinden üretilir, gövdeye Document geçer.
+    """
+    cache = get_cache(name, maxsize, normalizer, key_digest)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(owner, text):
+            # Alt sınıflar farklı sözlük kullanabilir: sınıf da anahtarın parçası
+            return cache.get_or_compute(source_text(text), lambda: fn(owner, text), scope=owner)
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def configure(name: str, maxsize: Optional[int] = None, enabled: Optional[bool] = None):
+    cache = _caches.get(name)
+    if cache is None:
+        raise KeyError(f"Bilinmeyen önbellek: {name}")
+    cache.configure(maxsize=maxsize, enabled=enabled)
+
+
+def configure_all(maxsize: Optional[int] = None, enabled: Optional[bool] = None):
+    """Tüm önbellekler; enabled sonradan oluşturulanlara da uygulanır"""
+    global _default_enabled
+    if enabled is not None:
+        _default_enabled = enabled
+    for cache in list(_caches.values()):
+        cache.configure(maxsize=maxsize, enabled=enabled)
+
+
+def invalidate(name: Optional[str] = None):
+    """Belirli önbelleği veya hepsini temizle"""
+    if name is None:
+        for cache in list(_caches.values()):
+            cache.invalidate()
+    elif name in _caches:
+        _caches[name].invalidate()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
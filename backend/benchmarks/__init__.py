@@ -0,0 +1,21 @@
+"""
+Benchmark Paketi - Analiz ve Sunucu Performans Ölçümleri
+========================================================
+Backend dizininden çalıştırılır:
+
+    python -m benchmarks.bench_analyzers --output results.json
+
+Tüm benchmark'lar aynı JSON şemasını (benchmarks.harness.SCHEMA) üretir.
+"""
+
+import sys
+from pathlib import Path
+
+# Backend modülleri (emotion_analyzer, turkish_nlp, ...) düz import edilir
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Benchmark'lar hesaplama maliyetini ölçer: analiz önbellekleri varsayılan kapalı
+import analysis_cache  # noqa: E402
+analysis_cache.configure_all(enabled=False)
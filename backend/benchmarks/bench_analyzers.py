@@ -0,0 +1,131 @@
+"""
+Analiz Modülleri Benchmark'ı
+============================
+TurkishTextAnalyzer.analyze, EmotionAnalyzer.analyze,
+ContextTracker.process_scene ve DynamicPromptBuilder.build için
+gecikme dağılımı, bellek ayırma ve metin uzunluğuna göre ölçekleme.
+
+Kullanım:
+    python -m benchmarks.bench_analyzers [--quick] [--output sonuc.json]
+"""
+
+import argparse
+from typing import Any, Callable, Dict, List
+
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case, scaling_exponent
+
+from turkish_nlp import TurkishTextAnalyzer
+from emotion_analyzer import EmotionAnalyzer
+from context_analyzer import ContextTracker
+from prompt_weighting import DynamicPromptBuilder
+
+SCALING_MULTIPLIERS = (1, 2, 4, 8, 16)
+
+
+def _prompt_builder_args(text: str) -> Dict[str, Any]:
+    """SmartAnalyzer'ın yaptığı gibi analizden build() argümanları türet"""
+    analysis = TurkishTextAnalyzer.analyze(text)
+    subject = "a scene"
+    if analysis.characters:
+        subject = analysis.characters[0].get('name') or analysis.characters[0].get('type') or subject
+    return {
+        'subject': subject,
+        'action': analysis.actions[0]['verb'] if analysis.actions else "",
+        'environment': analysis.location_setting or "",
+        'mood': analysis.mood,
+        'theme': analysis.themes[0] if analysis.themes else None,
+        'emotion_intensity': analysis.mood_intensity * 10,
+        'character_count': len(analysis.characters),
+    }
+
+
+def analyzer_cases() -> Dict[str, Callable[[str], Callable[[], Any]]]:
+    """Analizör adı -> (metin -> ölçülecek çağrı) fabrikası"""
+
+    def turkish(text: str):
+        return lambda: TurkishTextAnalyzer.analyze(text)
+
+    def emotion(text: str):
+        return lambda: EmotionAnalyzer.analyze(text)
+
+    def context(text: str):
+        tracker = ContextTracker()
+        return lambda: tracker.process_scene(text)
+
+    def prompt(text: str):
+        kwargs = _prompt_builder_args(text)
+        return lambda: DynamicPromptBuilder.build(**kwargs)
+
+    return {
+        'turkish_nlp.analyze': turkish,
+        'emotion.analyze': emotion,
+        'context.process_scene': context,
+        'prompt.build': prompt,
+    }
+
+
+def run(repeat: int, warmup: int, quick: bool) -> Dict[str, Any]:
+    cases = analyzer_cases()
+    results: List[Dict[str, Any]] = []
+
+    for size in corpus.SIZES:
+        for lang in corpus.LANGUAGES:
+            text = corpus.generate_text(size, lang)
+            # Uzun metinlerde tekrar sayısını düşür, toplam süre makul kalsın
+            case_repeat = max(5, repeat // 10) if size == 'chapter' else repeat
+            for analyzer, factory in cases.items():
+                results.append(run_case(
+                    f"{analyzer}/{size}/{lang}",
+                    factory(text),
+                    repeat=case_repeat,
+                    warmup=warmup,
+                    alloc_calls=0 if quick else 3,
+                    extra={
+                        'analyzer': analyzer,
+                        'corpus': size,
+                        'language': lang,
+                        'chars': len(text),
+                        'words': len(text.split()),
+                    },
+                ))
+
+    scaling = []
+    multipliers = SCALING_MULTIPLIERS[:3] if quick else SCALING_MULTIPLIERS
+    for analyzer, factory in cases.items():
+        points = []
+        for multiplier in multipliers:
+            text = corpus.scaled_text(multiplier, 'tr')
+            record = run_case(
+                f"{analyzer}/scale/x{multiplier}",
+                factory(text),
+                repeat=max(5, repeat // (2 * multiplier)),
+                warmup=1,
+                alloc_calls=0,
+            )
+            points.append({
+                'multiplier': multiplier,
+                'chars': len(text),
+                'p50_ms': record['latency_ms']['p50'],
+            })
+        scaling.append({
+            'analyzer': analyzer,
+            'points': points,
+            'exponent': scaling_exponent(points),
+        })
+
+    return {'results': results, 'scaling': scaling}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    data = run(repeat=repeat, warmup=1 if args.quick else args.warmup, quick=args.quick)
+    emit('analyzers', data['results'], args.output, scaling=data['scaling'])
+
+
+if __name__ == "__main__":
+    main()
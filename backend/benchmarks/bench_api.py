@@ -0,0 +1,301 @@
+"""
+API Yanıt Benchmark'ı
+=====================
+İstek başına CPU: standart json (Starlette JSONResponse) ile responses.dumps
+(orjson varsa) serileştirmesi; /api/job yoklamasında her seferinde
+asdict + serileştirme ile SnapshotCache isabeti (iş değişmedikçe hazır bayt).
+
+Sıkıştırma: /api/status, /api/images (200 görsel) ve /api/learning/stats
+boyutundaki gövdeler için gzip/brotli süresi ve oranı; CompressionMiddleware
+uçtan uca (sahte ASGI uygulamasıyla) kimlik ve sıkıştırılmış yanıt maliyeti.
+
+Kontroller: iki serileştirmenin aynı JSON'u verdiği, Accept-Encoding
+müzakeresi, eşik altı/görsel/304 yanıtların sıkıştırılmadığı, sıkıştırılmış
+gövdenin açılınca aynı olduğu ve Content-Length/Vary başlıkları.
+
+Kullanım:
+    python -m benchmarks.bench_api [--quick] [--output sonuc.json]
+
+Herhangi bir kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import legacy_job_response, legacy_json_render
+
+import responses
+from responses import CompressionMiddleware, SnapshotCache, negotiate
+from tracing import Timeline
+
+
+@dataclass
+class Job:
+    """server.GenerationJob ile aynı alanlar (sunucu modülü torch/fastapi ister)"""
+    job_id: str
+    prompt: str
+    negative_prompt: str = ""
+    width: int = 512
+    height: int = 512
+    steps: int = 25
+    guidance_scale: float = 7.5
+    seed: Optional[int] = None
+    model_type: Optional[str] = None
+    quality_mode: str = "balanced"
+    style: str = "cinematic"
+    scene_type: str = ""
+    mood: str = ""
+    genre: str = ""
+    lighting: str = ""
+    remove_background: bool = False
+    status: str = "pending"
+    progress: int = 0
+    progress_message: str = ""
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: str = ""
+    completed_at: Optional[str] = None
+    retry_count: int = 0
+    cancelled: bool = False
+
+
+def job_response(job: Job, timeline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """server.JobQueue._render_job gövdesi: asdict yerine sığ kopya"""
+    response = dict(vars(job))
+    response["timeline"] = timeline
+    response["can_rate"] = response["status"] == "completed" and not response["cancelled"]
+    result = response["result"]
+    if response["status"] == "completed" and result:
+        response["image_url"] = f"/api/image/{result['filename']}"
+        response["generation_info"] = {
+            "model": result.get("model"),
+            "seed": result.get("seed"),
+            "enhanced_prompt": result.get("enhanced_prompt"),
+            "generation_time": result.get("generation_time"),
+            "emotion": result.get("emotion"),
+            "optimization_applied": result.get("optimization_applied")
+        }
+    return response
+
+
+def job_fixture() -> Tuple[Job, Timeline]:
+    timeline = Timeline(origin=0.0)
+    cursor = 0.0
+    for name, seconds in (('queue_wait', 0.4), ('prompt_analysis', 0.02), ('emotion', 0.01),
+                          ('optimization', 0.005), ('model_load', 3.2), ('denoise', 14.5),
+                          ('vae_decode', 0.8), ('encode_png', 0.12), ('save', 0.01), ('db', 0.004)):
+        timeline.add(name, cursor, cursor + seconds, **({'steps': 25} if name == 'denoise' else {}))
+        cursor += seconds
+    job = Job(
+        job_id="a1b2c3d4e5f6a7b8c9d0e1f2", prompt="Karanlık ormanda fenerli yaşlı bir adam, sisli gece",
+        negative_prompt="blurry, low quality", seed=123456789, model_type="sd15", scene_type="forest",
+        mood="mysterious", genre="fantasy", lighting="moonlight", status="completed", progress=100,
+        progress_message="Tamamlandı!", created_at="2026-10-19T10:00:00", completed_at="2026-10-19T10:00:19",
+        result={
+            'filename': "scene_a1b2c3d4_123456789.png", 'model': "Stable Diffusion 1.5", 'seed': 123456789,
+            'enhanced_prompt': "Karanlık ormanda fenerli yaşlı bir adam, sisli gece, cinematic lighting",
+            'generation_time': 19.06, 'emotion': {'primary': 'fear', 'intensity': 0.62},
+            'optimization_applied': True,
+        },
+    )
+    return job, timeline
+
+
+def payload_fixtures() -> Dict[str, Any]:
+    images = {
+        'images': [{
+            'filename': f"scene_{i:08x}_{i * 7919}.png",
+            'url': f"/api/image/scene_{i:08x}_{i * 7919}.png",
+            'size': 400_000 + i * 37,
+            'created': f"2026-10-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00",
+            'job_id': f"{i:024x}",
+            'model': ('sd15', 'sdxl', 'sd21')[i % 3],
+            'scene_type': ('forest', 'city', 'sea', 'castle')[i % 4],
+        } for i in range(200)],
+        'next_cursor': "MTc2MDg2NDAwMC4wOnNjZW5lXzAwMDAwMGM3XzE1NzU4MS5wbmc",
+    }
+    learning = {
+        'total_generations': 12840, 'total_feedback': 3310, 'avg_score': 3.71,
+        'learned_patterns': 48, 'success_rate': 0.68,
+        'top_patterns': [{'scene_type': s, 'mood': m, 'avg_score': 3.5 + (i % 10) / 10, 'sample_count': 20 + i,
+                          'optimal_steps': 25 + i % 10, 'optimal_cfg': 7.0 + (i % 4) * 0.5,
+                          'best_negative_additions': "bad hands, extra fingers, blurry"}
+                         for i, (s, m) in enumerate((s, m) for s in ('forest', 'city', 'sea', 'castle', 'desert')
+                                                    for m in ('happy', 'sad', 'tense', 'calm'))],
+        'common_issues': {'hands': 412, 'faces': 188, 'blur': 97, 'text': 41, 'composition': 150, 'anatomy': 203},
+        'score_distribution': {str(i): 300 * i for i in range(1, 6)},
+    }
+    status = {
+        'device': {'mode': 'gpu', 'device': 'cuda', 'gpu_info': 'NVIDIA RTX 3060', 'vram_gb': 12.0,
+                   'vram_free_gb': 7.4},
+        'model': {'loaded': True, 'loading': False, 'name': 'Stable Diffusion 1.5',
+                  'available_models': [{'id': m, 'name': m.upper(), 'vram_gb': 4 + i * 2, 'available': True}
+                                       for i, m in enumerate(('sd15', 'sd21', 'sdxl'))],
+                  'recommended': 'sd15'},
+        'queue': {'queue_size': 2, 'pending': 2, 'processing': 1, 'max_size': 10},
+        'learning': learning,
+        'quality_modes': [{'id': q, 'desc': f"{q} kalite açıklaması (~{i * 15}s GPU)"}
+                          for i, q in enumerate(('fast', 'balanced', 'high', 'ultra'))],
+        'recommended_settings': {'steps': 25, 'width': 512, 'height': 512, 'estimated_time': "15-30 saniye"},
+    }
+    return {'status': status, 'images': images, 'learning': learning}
+
+
+# ============== ASGI ==============
+
+def fake_app(body: bytes, content_type: bytes = b'application/json', status: int = 200):
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+    return app
+
+
+async def call(app, accept_encoding: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+    headers = [(b'accept-encoding', accept_encoding.encode())] if accept_encoding is not None else []
+    messages: List[Dict[str, Any]] = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers}, receive, send)
+    start = messages[0]
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, body
+
+
+def decode(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        return responses.brotli.decompress(body)
+    return body
+
+
+def check_semantics(payloads: Dict[str, Any]) -> Dict[str, Any]:
+    failures = []
+
+    def expect(label: str, ok: bool):
+        if not ok:
+            failures.append(label)
+
+    # Serileştirme: aynı JSON (bayt bayt aynı olması beklenir, değer eşitliği zorunlu)
+    job, timeline = job_fixture()
+    documents = {**payloads, 'job': legacy_job_response(job, timeline.to_dict())}
+    identical = 0
+    for name, document in documents.items():
+        legacy, current = legacy_json_render(document), responses.dumps(document)
+        expect(f"json/{name}", json.loads(legacy) == json.loads(current))
+        identical += legacy == current
+    expect("json/job_response", responses.dumps(job_response(job, timeline.to_dict())) == legacy_json_render(documents['job']))
+
+    # Müzakere
+    best = responses.ENCODINGS[0]
+    for header, expected in (
+        ('gzip', 'gzip'), ('gzip, deflate, br', best), ('identity', None), ('', None),
+        ('gzip;q=0', None), ('*', best), ('*;q=0.5, gzip;q=0', 'br' if best == 'br' else None),
+        ('br;q=0.1, gzip;q=0.9', 'gzip'), ('GZIP;Q=1.0', 'gzip'), ('deflate', None),
+    ):
+        expect(f"negotiate/{header!r}", negotiate(header) == expected)
+
+    middleware = lambda app: CompressionMiddleware(app, minimum_size=1024)
+    big = responses.dumps(payloads['images'])
+    for encoding in responses.ENCODINGS:
+        status, headers, body = asyncio.run(call(middleware(fake_app(big)), encoding))
+        expect(f"compress/{encoding}/encoding", headers.get('content-encoding') == encoding)
+        expect(f"compress/{encoding}/roundtrip", decode(body, encoding) == big)
+        expect(f"compress/{encoding}/length", headers.get('content-length') == str(len(body)))
+        expect(f"compress/{encoding}/vary", headers.get('vary') == 'Accept-Encoding')
+
+    for label, app, accept in (
+        ('small', fake_app(b'{"ok":true}'), 'gzip'),
+        ('image', fake_app(b'\x89PNG' + bytes(4096), b'image/png'), 'gzip'),
+        ('not_modified', fake_app(big, status=304), 'gzip'),
+        ('no_accept', fake_app(big), None),
+    ):
+        status, headers, body = asyncio.run(call(middleware(app), accept))
+        expect(f"passthrough/{label}", 'content-encoding' not in headers)
+
+    return {'checks': len(documents) + 11 + 4 * len(responses.ENCODINGS) + 4,
+            'byte_identical_json': identical, 'failures': failures, 'mismatches': len(failures)}
+
+
+def run(payloads: Dict[str, Any], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+    backend = 'orjson' if responses.orjson is not None else 'json'
+
+    # /api/job yoklaması: tamamlanmış iş her 1-2 saniyede bir sorgulanır
+    job, timeline = job_fixture()
+    base = run_case("job_status.legacy/poll", lambda: legacy_json_render(legacy_job_response(job, timeline.to_dict())),
+                    repeat=repeat, warmup=warmup, alloc_calls=0, extra={'implementation': 'legacy'})
+    rebuild = run_case("job_status.current/poll_changed",
+                       lambda: responses.dumps(job_response(job, timeline.to_dict())),
+                       repeat=repeat, warmup=warmup, alloc_calls=0, extra={'implementation': backend})
+    snapshots = SnapshotCache()
+    render = lambda: responses.dumps(job_response(job, timeline.to_dict()))
+    hit = run_case("job_status.current/poll_unchanged",
+                   lambda: snapshots.get(job.job_id, (3, len(timeline.spans)), render),
+                   repeat=repeat, warmup=warmup, alloc_calls=0, extra={'implementation': 'snapshot'})
+    rebuild['speedup_p50'] = round(base['latency_ms']['p50'] / rebuild['latency_ms']['p50'], 2)
+    hit['speedup_p50'] = round(base['latency_ms']['p50'] / hit['latency_ms']['p50'], 2)
+    results.extend([base, rebuild, hit])
+
+    for name, document in payloads.items():
+        raw = legacy_json_render(document)
+        base = run_case(f"json.legacy/{name}", lambda d=document: legacy_json_render(d),
+                        repeat=repeat, warmup=warmup, alloc_calls=0,
+                        extra={'implementation': 'json', 'bytes': len(raw)})
+        fast = run_case(f"json.current/{name}", lambda d=document: responses.dumps(d),
+                        repeat=repeat, warmup=warmup, alloc_calls=0,
+                        extra={'implementation': backend, 'bytes': len(raw)})
+        fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+        results.extend([base, fast])
+
+        for encoding in responses.ENCODINGS:
+            compressed = responses.compress(raw, encoding)
+            results.append(run_case(f"compress.{encoding}/{name}", lambda r=raw, e=encoding: responses.compress(r, e),
+                                    repeat=repeat, warmup=warmup, alloc_calls=0,
+                                    extra={'bytes': len(raw), 'compressed_bytes': len(compressed),
+                                           'ratio': round(len(compressed) / len(raw), 3)}))
+
+    # Uçtan uca ara katman: /api/images gövdesi, sıkıştırmasız ve sıkıştırılmış
+    big = legacy_json_render(payloads['images'])
+    middleware = CompressionMiddleware(fake_app(big), minimum_size=1024)
+    loop = asyncio.new_event_loop()
+    try:
+        for accept in (None,) + responses.ENCODINGS:
+            results.append(run_case(f"middleware/images/{accept or 'identity'}",
+                                    lambda a=accept: loop.run_until_complete(call(middleware, a)),
+                                    repeat=repeat, warmup=warmup, alloc_calls=0,
+                                    extra={'wire_bytes': len(loop.run_until_complete(call(middleware, accept))[2])}))
+    finally:
+        loop.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    payloads = payload_fixtures()
+    semantics = check_semantics(payloads)
+    results = run(payloads, repeat=20 if args.quick else args.repeat * 4, warmup=2 if args.quick else args.warmup)
+    emit('api', results, args.output, semantics=semantics,
+         config={'json_backend': 'orjson' if responses.orjson is not None else 'json',
+                 'encodings': list(responses.ENCODINGS)})
+    if semantics['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+İçerik Filtresi Benchmark'ı
+===========================
+ContentFilter.check_prompt: referans (eski) terim başına alt dize testi +
+yasaklı terim başına re.sub ile tek geçişlik derlenmiş eşleyicinin hız
+karşılaştırması (kısa/uzun prompt, temiz/isabetli) ve birebir çıktı kontrolü.
+
+Eski filtre `str.lower()` kullandığı için 'İŞKENCE' gibi büyük Türkçe
+yazımları kaçırıyordu; bu durumlar düzeltme olarak ayrıca sayılır.
+
+Kullanım:
+    python -m benchmarks.bench_content_filter [--quick] [--output sonuc.json]
+
+Çıktılar farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import random
+import sys
+from typing import Any, Dict, List
+
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyContentFilter
+
+from security import ContentFilter
+
+PROMPT_WORDS = {'short': 30, 'long': 300}  # /api/generate en fazla 2000 karakter kabul eder
+_DOTTED_I = set('Iİı')
+
+
+def _terms() -> List[str]:
+    return sorted(ContentFilter.BLOCKED_TERMS | ContentFilter.WARNING_TERMS | ContentFilter.SAFE_CONTEXTS)
+
+
+def _turkish_upper(text: str) -> str:
+    return text.replace('i', 'İ').replace('ı', 'I').upper()
+
+
+def generate_prompts(count: int, words: int, hit_rate: float, lang: str = 'en',
+                     seed: int = corpus.DEFAULT_SEED) -> List[str]:
+    """Hikaye cümlelerinden prompt'lar; hit_rate oranında rastgele terim eklenir"""
+    rng = random.Random(seed)
+    terms = _terms()
+    pool = ' '.join(corpus.generate_sentences(count * words // 8 + 10, lang, seed=seed)).split()
+    prompts = []
+    for _ in range(count):
+        start = rng.randrange(0, max(1, len(pool) - words))
+        tokens = pool[start:start + words]
+        for i in range(len(tokens)):
+            if rng.random() < hit_rate:
+                term = rng.choice(terms)
+                tokens[i] = rng.choice([term, term.capitalize(), term.upper()])
+        prompts.append(' '.join(tokens))
+    return prompts
+
+
+def _nested_blocked(result) -> bool:
+    """Bir yasaklı terim diğerini içeriyorsa eski sanitize sırası küme sırasına bağlıdır"""
+    terms = result.blocked_categories
+    return any(a != b and a in b for a in terms for b in terms)
+
+
+def _same(expected, actual, compare_sanitized: bool) -> bool:
+    return (expected.is_safe == actual.is_safe
+            and sorted(expected.blocked_categories) == sorted(actual.blocked_categories)
+            and sorted(expected.warning_categories) == sorted(actual.warning_categories)
+            and expected.confidence == actual.confidence
+            and (not compare_sanitized or expected.sanitized_prompt == actual.sanitized_prompt))
+
+
+def check_equivalence(prompts: List[str]) -> Dict[str, Any]:
+    """I/İ/ı içermeyen prompt'larda eski ile aynı sonuç; içerenlerde eski engeller korunmalı
+    (katlama yalnızca ekler); büyük Türkçe yazımlarda yeni filtre yakalamalı"""
+    mismatches = []
+    compared = nested = folded = folded_extra = 0
+    for i, prompt in enumerate(prompts):
+        expected = LegacyContentFilter.check_prompt(prompt)
+        actual = ContentFilter.check_prompt(prompt)
+        if _DOTTED_I & set(prompt):
+            folded += 1
+            if not set(expected.blocked_categories) <= set(actual.blocked_categories):
+                mismatches.append({'index': i, 'prompt': prompt[:120], 'stage': 'casefold_superset',
+                                   'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+            folded_extra += len(actual.blocked_categories) > len(expected.blocked_categories)
+            continue
+        compare_sanitized = not _nested_blocked(expected)
+        nested += not compare_sanitized
+        compared += 1
+        if not _same(expected, actual, compare_sanitized):
+            mismatches.append({'index': i, 'prompt': prompt[:120],
+                               'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+
+    # Her yasaklı terimin Türkçe büyük harf yazımı engellenmeli
+    fold_fixes = 0
+    for term in sorted(ContentFilter.BLOCKED_TERMS):
+        prompt = f"a {_turkish_upper(term)} scene"
+        actual = ContentFilter.check_prompt(prompt)
+        if term not in actual.blocked_categories or '[BLOCKED]' not in actual.sanitized_prompt:
+            mismatches.append({'prompt': prompt, 'stage': 'turkish_casefold', 'actual': repr(actual)[:300]})
+        elif term not in LegacyContentFilter.check_prompt(prompt).blocked_categories:
+            fold_fixes += 1
+
+    return {
+        'prompts': len(prompts),
+        'compared': compared,
+        'nested_blocked_terms': nested,
+        'casefold_compared': folded,
+        'casefold_extra_blocks': folded_extra,
+        'turkish_casefold_fixed': fold_fixes,
+        'mismatches': len(mismatches),
+        'examples': mismatches[:5],
+    }
+
+
+def run(repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+    for size, words in PROMPT_WORDS.items():
+        for lang in corpus.LANGUAGES:
+            for label, hit_rate in (('clean', 0.0), ('hits', 0.02)):
+                results.extend(_compare(size, words, lang, label, hit_rate, repeat, warmup))
+    return results
+
+
+def _compare(size: str, words: int, lang: str, label: str, hit_rate: float,
+             repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    prompts = generate_prompts(100, words, hit_rate, lang)
+    extra = {'prompt_words': words, 'language': lang, 'hit_rate': hit_rate, 'prompts': len(prompts)}
+    legacy = run_case(f"content_filter.legacy/{size}/{lang}/{label}",
+                      lambda: [LegacyContentFilter.check_prompt(p) for p in prompts],
+                      repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=len(prompts),
+                      extra={**extra, 'implementation': 'legacy'})
+    current = run_case(f"content_filter.current/{size}/{lang}/{label}",
+                       lambda: [ContentFilter.check_prompt(p) for p in prompts],
+                       repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=len(prompts),
+                       extra={**extra, 'implementation': 'current'})
+    current['speedup_p50'] = round(legacy['latency_ms']['p50'] / current['latency_ms']['p50'], 2)
+    return [legacy, current]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    count = 200 if args.quick else 1000
+    prompts = [prompt for lang in corpus.LANGUAGES
+               for prompt in (generate_prompts(count, PROMPT_WORDS['short'], 0.05, lang)
+                              + generate_prompts(count // 4, PROMPT_WORDS['long'], 0.01, lang))]
+    prompts += corpus.regression_texts(sentences_per_lang=50 if args.quick else 200)
+    equivalence = check_equivalence(prompts)
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup)
+    emit('content_filter', results, args.output, equivalence=equivalence)
+    if equivalence['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
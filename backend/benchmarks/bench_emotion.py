@@ -0,0 +1,121 @@
+"""
+Duygu Analizi Benchmark'ı
+=========================
+EmotionAnalyzer.analyze: referans (eski) uygulama ile güncel uygulamanın
+hız karşılaştırması ve regresyon korpusu üzerinde birebir çıktı kontrolü
+(sonuçlar ve kelime başına yoğunluk değiştiricileri). analyze_batch için
+metin başına döngüye karşı toplu skorlama ve aynı çıktı kontrolü.
+
+Kullanım:
+    python -m benchmarks.bench_emotion [--quick] [--output sonuc.json]
+
+Çıktılar farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List
+
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyEmotionAnalyzer
+
+from emotion_analyzer import EmotionAnalyzer
+
+BATCH_SIZES = (10, 40, 200)
+SENTENCES_PER_PARAGRAPH = 4
+
+
+def check_equivalence(texts: List[str]) -> Dict[str, Any]:
+    """Her metin için eski ve yeni sonucu karşılaştır"""
+    mismatches = []
+    for i, text in enumerate(texts):
+        if legacy_lexicon_scan(text.lower()) != current_lexicon_scan(text.lower()):
+            mismatches.append({'index': i, 'text': text[:120], 'stage': 'lexicon_scan'})
+            continue
+        expected = LegacyEmotionAnalyzer.analyze(text)
+        actual = EmotionAnalyzer.analyze(text)
+        if expected != actual:
+            mismatches.append({'index': i, 'text': text[:120],
+                               'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+
+    # Toplu analiz metin başına analiz ile aynı sırada aynı sonucu vermeli
+    for i, (expected, actual) in enumerate(zip([EmotionAnalyzer.analyze(t) for t in texts],
+                                               EmotionAnalyzer.analyze_batch(texts))):
+        if expected != actual:
+            mismatches.append({'index': i, 'text': texts[i][:120], 'stage': 'batch',
+                               'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+    return {'texts': len(texts), 'mismatches': len(mismatches), 'examples': mismatches[:5]}
+
+
+def legacy_lexicon_scan(lower_text: str) -> Dict[str, int]:
+    """Eski yol: kelime başına alt dize taraması + pencere içinde değiştirici taraması"""
+    return {
+        keyword: LegacyEmotionAnalyzer._get_intensity_modifier(lower_text, keyword)
+        for data in EmotionAnalyzer.EMOTION_PATTERNS.values()
+        for keyword in data['keywords']
+        if keyword in lower_text
+    }
+
+
+def current_lexicon_scan(lower_text: str) -> Dict[str, int]:
+    """Yeni yol: tek ön geçiş (otomat + negasyon kapsamı) + pencere araması"""
+    index = EmotionAnalyzer._index_text(lower_text)
+    return {
+        keyword: EmotionAnalyzer._window_modifier(index, index.hits[keyword][0], len(keyword))
+        for data in EmotionAnalyzer.EMOTION_PATTERNS.values()
+        for keyword in data['keywords']
+        if keyword in index.hits
+    }
+
+
+def run(repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in corpus.SIZES:
+        for lang in corpus.LANGUAGES:
+            text = corpus.generate_text(size, lang)
+            case_repeat = max(5, repeat // 10) if size == 'chapter' else repeat
+            extra = {'corpus': size, 'language': lang, 'chars': len(text)}
+
+            # Uçtan uca analyze()
+            legacy = run_case(f"emotion.legacy/{size}/{lang}", lambda: LegacyEmotionAnalyzer.analyze(text),
+                              repeat=case_repeat, warmup=warmup, alloc_calls=0,
+                              extra={**extra, 'implementation': 'legacy'})
+            current = run_case(f"emotion.current/{size}/{lang}", lambda: EmotionAnalyzer.analyze(text),
+                               repeat=case_repeat, warmup=warmup, alloc_calls=0,
+                               extra={**extra, 'implementation': 'current'})
+            current['speedup_p50'] = round(legacy['latency_ms']['p50'] / current['latency_ms']['p50'], 2)
+            results.extend([legacy, current])
+
+    # Hikaye başına paragraf listesi: tek tek analyze() ve analyze_batch()
+    for paragraphs in BATCH_SIZES:
+        for lang in corpus.LANGUAGES:
+            sentences = corpus.generate_sentences(paragraphs * SENTENCES_PER_PARAGRAPH, lang)
+            texts = [' '.join(sentences[i:i + SENTENCES_PER_PARAGRAPH])
+                     for i in range(0, len(sentences), SENTENCES_PER_PARAGRAPH)]
+            extra = {'paragraphs': paragraphs, 'language': lang}
+            loop = run_case(f"emotion.loop/{paragraphs}/{lang}",
+                            lambda: [EmotionAnalyzer.analyze(t) for t in texts],
+                            repeat=repeat, warmup=warmup, alloc_calls=0, extra=extra)
+            batch = run_case(f"emotion.batch/{paragraphs}/{lang}", lambda: EmotionAnalyzer.analyze_batch(texts),
+                             repeat=repeat, warmup=warmup, alloc_calls=0, extra=extra)
+            batch['speedup_p50'] = round(loop['latency_ms']['p50'] / batch['latency_ms']['p50'], 2)
+            results.extend([loop, batch])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    equivalence = check_equivalence(corpus.regression_texts(sentences_per_lang=50 if args.quick else 200))
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup)
+    emit('emotion', results, args.output, equivalence=equivalence)
+    if equivalence['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
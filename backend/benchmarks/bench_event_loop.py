@@ -0,0 +1,188 @@
+"""
+Event Loop Gecikmesi Benchmark'ı
+================================
+Feedback patlaması altında event loop'un tepki süresi: bloklayan işi
+(db.get_generation + learning_manager.record_feedback, get_learning_stats)
+doğrudan async handler içinde çalıştırmak ile executors "db" havuzuna
+göndermek karşılaştırılır.
+
+Bir yoklama coroutine'i 1 ms uyuyup uyanma gecikmesini (lag) ölçer; loop
+bloklandıkça lag büyür. Aynı anda bağlantı sayısı kadar eşzamanlı istek
+(feedback + istatistik karışımı) gönderilir. Beklenen: havuzlu modda lag
+p99/max düşük ve sabit kalır, istek gecikmesi havuz boyutuyla ölçeklenir.
+
+Doygunluk: max_pending küçük bir havuza sınırsız patlama gönderilir;
+fazlası ExecutorSaturated ile reddedilmeli, tamamlanan + reddedilen toplam
+isteğe eşit olmalı ve havuzda sızan bekleyen iş kalmamalıdır.
+
+Kullanım:
+    python -m benchmarks.bench_event_loop [--quick] [--output sonuc.json]
+
+Kaydedilen feedback sayısı gönderilenden farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.harness import add_common_args, emit, latency_stats
+
+import executors
+from executors import ExecutorSaturated
+
+SCENES = ('forest', 'city', 'sea', 'castle', 'desert')
+MOODS = ('happy', 'sad', 'tense', 'calm')
+
+
+def seed(db, Generation, Feedback, generations: int) -> List[str]:
+    """Sahte üretimler + geçmiş feedback (öğrenme güncellemesi eşiği aşılsın)"""
+    job_ids = []
+    for i in range(generations):
+        job_id = f"job_{i:06d}"
+        gen_id = db.save_generation(Generation(
+            job_id=job_id, prompt=f"sahne {i}", scene_type=SCENES[i % len(SCENES)],
+            mood=MOODS[i % len(MOODS)], genre='fantasy', steps=20 + i % 15,
+            cfg_scale=6.0 + (i % 5) * 0.5, model='sd15', image_path=f"scene_{i}.png"))
+        db.save_feedback(Feedback(generation_id=gen_id, overall_score=1 + i % 5,
+                                  has_hand_issues=i % 3 == 0, has_blur_issues=i % 7 == 0))
+        job_ids.append(job_id)
+    return job_ids
+
+
+def feedback_count(db) -> int:
+    return db._get_conn().execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+
+async def probe(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    """interval kadar uyu, fazladan geçen süreyi (ms) kaydet"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def burst(mode: str, handlers: Dict[str, Any], job_ids: List[str], requests: int,
+                connections: int, stats_every: int) -> Dict[str, Any]:
+    record, learning_stats = handlers['record'], handlers['stats']
+
+    async def handle(i: int):
+        if i % stats_every == 0:
+            fn, args = learning_stats, ()
+        else:
+            fn, args = record, (job_ids[i % len(job_ids)],)
+        if mode == 'inline':
+            return fn(*args)
+        return await executors.run('db', fn, *args)
+
+    gate = asyncio.Semaphore(connections)
+    latencies: List[float] = []
+
+    async def client(i: int):
+        async with gate:
+            started = time.perf_counter()
+            await handle(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop, 0.001, lags))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    return {
+        'name': f"event_loop.{mode}/feedback_burst/{connections}",
+        'implementation': mode,
+        'requests': requests,
+        'connections': connections,
+        'loop_lag_ms': latency_stats(lags or [0.0]),
+        'request_latency_ms': latency_stats(latencies),
+        'throughput_rps': round(requests / elapsed, 1),
+    }
+
+
+async def saturation(handlers: Dict[str, Any], job_ids: List[str], requests: int) -> Dict[str, Any]:
+    pool = executors.configure('db', workers=2, max_pending=8)
+    record = handlers['record']
+
+    async def handle(i: int):
+        try:
+            await executors.run('db', record, job_ids[i % len(job_ids)])
+            return True
+        except ExecutorSaturated:
+            return False
+
+    outcomes = await asyncio.gather(*(handle(i) for i in range(requests)))
+    stats = pool.stats()
+    completed = sum(outcomes)
+    return {
+        'requests': requests,
+        'completed': completed,
+        'rejected': requests - completed,
+        'pool': stats,
+        'mismatches': int(stats['rejected'] != requests - completed) + int(stats['active'] or stats['queued'])
+                      + int(completed == requests),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument('--workers', type=int, default=2, help='"db" havuzu thread sayısı')
+    args = parser.parse_args(argv)
+
+    generations = 500 if args.quick else 2_000
+    requests = 200 if args.quick else 400
+    connection_counts = [16] if args.quick else [8, 32]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.DB_PATH göreli (./data/learning.db): içe aktarmadan önce geçici dizine geç
+        os.chdir(tmp)
+        try:
+            from database import db, Generation, Feedback
+            from learning_manager import learning_manager
+
+            def record(job_id: str) -> int:
+                gen = db.get_generation(job_id)
+                return learning_manager.record_feedback(generation_id=gen.id, overall_score=4,
+                                                        issues={'hands': True})
+
+            handlers = {'record': record, 'stats': learning_manager.get_learning_stats}
+            job_ids = seed(db, Generation, Feedback, generations)
+
+            results = []
+            expected = feedback_count(db)
+            for connections in connection_counts:
+                for mode in ('inline', 'pooled'):
+                    executors.configure('db', workers=args.workers, max_pending=max(64, connections))
+                    result = asyncio.run(burst(mode, handlers, job_ids, requests, connections, stats_every=10))
+                    expected += requests - len(range(0, requests, 10))
+                    results.append(result)
+                inline, pooled = results[-2], results[-1]
+                pooled['lag_p99_reduction'] = round(
+                    inline['loop_lag_ms']['p99'] / max(pooled['loop_lag_ms']['p99'], 1e-3), 2)
+
+            saturated = asyncio.run(saturation(handlers, job_ids, requests))
+            expected += saturated['completed']
+            consistency = {'expected_feedback': expected, 'recorded_feedback': feedback_count(db)}
+            consistency['mismatches'] = int(expected != consistency['recorded_feedback'])
+            executors.shutdown()
+        finally:
+            os.chdir(cwd)
+
+    emit('event_loop', results, args.output, saturation=saturated, consistency=consistency,
+         config={'generations': generations, 'db_workers': args.workers})
+    if saturated['mismatches'] or consistency['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
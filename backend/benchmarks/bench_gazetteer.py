@@ -0,0 +1,126 @@
+"""
+Gazetteer Benchmark'ı
+=====================
+EntityRecognizer.extract_entities: referans (eski) sabit küme + kelime
+başına LOCATION_INDICATORS döngüsü ile gazetteer tabanlı uygulamanın hız
+karşılaştırması ve birebir çıktı kontrolü. Sentetik gazetteer'larla
+(1 bin - 50 bin girdi, 1-3 kelimelik) yükleme süresi, bellek ve token
+başına arama maliyetinin sözlük boyutuyla değişimi.
+
+Kullanım:
+    python -m benchmarks.bench_gazetteer [--quick] [--output sonuc.json]
+
+Çıktılar farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyEntityRecognizer
+
+from gazetteer import Gazetteer, normalize_token
+from turkish_nlp import EntityRecognizer
+
+GAZETTEER_SIZES = (1_000, 10_000, 50_000)
+SYLLABLES = ['ka', 'de', 'mir', 'su', 'lu', 'ba', 'yır', 'tep', 'e', 'köy', 'gön', 'ül', 'can',
+             'ar', 'sel', 'taş', 'oğ', 'lu', 'han', 'pı', 'nar', 'ye', 'şil', 'ova', 'dağ']
+SUFFIX_WORDS = ['mahallesi', 'caddesi', 'sokağı', 'köyü', 'parkı', 'camii', 'meydanı', 'kalesi']
+LABELS = ['LOCATION', 'PERSON', 'ORGANIZATION']
+
+
+def _name(rng: random.Random) -> str:
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def write_gazetteer(path: Path, size: int, seed: int = 7) -> int:
+    """Deterministik sentetik girdiler: %50 tek, %35 iki, %15 üç kelimelik"""
+    rng = random.Random(seed)
+    lines = set()
+    while len(lines) < size:
+        roll = rng.random()
+        if roll < 0.5:
+            phrase = _name(rng)
+        elif roll < 0.85:
+            phrase = f"{_name(rng)} {rng.choice(SUFFIX_WORDS)}"
+        else:
+            phrase = f"{_name(rng)} {_name(rng)} {rng.choice(SUFFIX_WORDS)}"
+        lines.add(f"{phrase}\t{rng.choice(LABELS)}")
+    path.write_text('\n'.join(sorted(lines)) + '\n', encoding='utf-8')
+    return len(lines)
+
+
+def _sorted_entities(entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    return {key: sorted(values) for key, values in entities.items()}
+
+
+def check_equivalence(texts: List[str]) -> Dict[str, Any]:
+    """Yerleşik gazetteer ile eski ve yeni varlık listelerini karşılaştır (sıra bağımsız)"""
+    mismatches = []
+    for i, text in enumerate(texts):
+        expected = _sorted_entities(LegacyEntityRecognizer.extract_entities(text))
+        actual = _sorted_entities(EntityRecognizer.extract_entities(text))
+        if expected != actual:
+            mismatches.append({'index': i, 'text': text[:120],
+                               'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+    return {'texts': len(texts), 'mismatches': len(mismatches), 'examples': mismatches[:5]}
+
+
+def run(repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+
+    # Yerleşik sözlükle uçtan uca extract_entities
+    for size in corpus.SIZES:
+        text = corpus.generate_text(size, 'tr')
+        case_repeat = max(5, repeat // 10) if size == 'chapter' else repeat
+        extra = {'corpus': size, 'chars': len(text)}
+        legacy = run_case(f"entities.legacy/{size}", lambda: LegacyEntityRecognizer.extract_entities(text),
+                          repeat=case_repeat, warmup=warmup, alloc_calls=0,
+                          extra={**extra, 'implementation': 'legacy'})
+        current = run_case(f"entities.current/{size}", lambda: EntityRecognizer.extract_entities(text),
+                           repeat=case_repeat, warmup=warmup, alloc_calls=0,
+                           extra={**extra, 'implementation': 'current'})
+        current['speedup_p50'] = round(legacy['latency_ms']['p50'] / current['latency_ms']['p50'], 2)
+        results.extend([legacy, current])
+
+    # Sözlük boyutu: yükleme süresi/bellek ve token başına arama maliyeti
+    tokens = [normalize_token(w) for w in corpus.generate_text('chapter', 'tr').split()]
+    with tempfile.TemporaryDirectory() as tmp:
+        for entries in GAZETTEER_SIZES:
+            path = Path(tmp) / f"gazetteer_{entries}.tsv"
+            write_gazetteer(path, entries)
+            extra = {'entries': entries, 'file_bytes': path.stat().st_size}
+
+            load = run_case(f"gazetteer.load/{entries}", lambda: Gazetteer().load(path),
+                            repeat=max(3, repeat // 5), warmup=1, alloc_calls=1, extra=extra)
+            gazetteer = Gazetteer()
+            gazetteer.load(path)
+            find = run_case(f"gazetteer.find/{entries}", lambda: gazetteer.find(tokens),
+                            repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=len(tokens),
+                            extra={**extra, 'tokens': len(tokens)})
+            find['ns_per_token'] = round(find['latency_ms']['p50'] * 1e6 / len(tokens), 1)
+            results.extend([load, find])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    texts = corpus.regression_texts(sentences_per_lang=50 if args.quick else 200) + list(corpus.EDGE_CASES)
+    equivalence = check_equivalence(texts)
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup)
+    emit('gazetteer', results, args.output, equivalence=equivalence)
+    if equivalence['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
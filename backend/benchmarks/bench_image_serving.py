@@ -0,0 +1,265 @@
+"""
+Görsel Sunumu Benchmark'ı
+=========================
+/api/image isteği başına sunucu işi: referans (eski) her istekte sanitize +
+Path.resolve() doğrulaması + exists() ile önbellekli ImageCatalog.resolve +
+yanıt planı (200 / 304 / 206). Koşullu istek ve Range semantiği de kontrol
+edilir (304 eşleşmeleri, 206 gövdesi, 416, If-Range, değişen/silinen dosya).
+
+Ters vekil devri (X-Accel-Redirect / X-Sendfile) benchmarks.offload_proxy
+taklidiyle uçtan uca kontrol edilir: vekilin istemciye verdiği baytlar
+doğrudan sunumla aynı olmalı, location dışına yönlendirme reddedilmeli.
+
+ImageByteCache: üretimde yazılan baytların bellekten sunumu (disk okuması ile
+karşılaştırma), bayt sınırı/LRU, değişen dosyada ETag uyuşmazlığı ve saklama
+servisi dosyayı sildiğinde geçersizleştirme kontrol edilir.
+
+Kullanım:
+    python -m benchmarks.bench_image_serving [--quick] [--output sonuc.json]
+
+Kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.offload_proxy import EmulatedProxy
+from benchmarks.reference import legacy_resolve_image
+
+import image_serving
+from image_serving import ImageByteCache, ImageCatalog
+from retention import OutputRetention
+
+IMAGE_BYTES = 256 * 1024
+
+
+def populate(directory: Path, count: int) -> List[str]:
+    rng = random.Random(5)
+    names = []
+    for i in range(count):
+        name = f"scene_{1700000000 + i}_{rng.getrandbits(48):012x}.png"
+        (directory / name).write_bytes(rng.randbytes(IMAGE_BYTES))
+        names.append(name)
+    return names
+
+
+def check_semantics(directory: Path, name: str) -> Dict[str, Any]:
+    catalog = ImageCatalog(directory, maxsize=8)
+    entry = catalog.resolve(name)
+    data = (directory / name).read_bytes()
+    failures = []
+
+    def expect(label, headers, status, body=None):
+        plan = image_serving.plan(entry, headers)
+        if plan.status != status:
+            failures.append({'case': label, 'expected': status, 'actual': plan.status})
+        elif body is not None and image_serving.read_range(entry.path, plan.start, plan.end) != body:
+            failures.append({'case': label, 'stage': 'body'})
+        return plan
+
+    full = expect('plain', {}, 200, data)
+    if full.headers.get('Cache-Control') != image_serving.CACHE_CONTROL or not entry.etag.startswith('"'):
+        failures.append({'case': 'headers', 'headers': full.headers})
+    expect('if_none_match', {'if-none-match': entry.etag}, 304)
+    expect('if_none_match_list', {'if-none-match': f'"x", W/{entry.etag}'}, 304)
+    expect('if_none_match_other', {'if-none-match': '"other"'}, 200)
+    expect('if_none_match_star', {'if-none-match': '*'}, 304)
+    expect('if_modified_since', {'if-modified-since': entry.last_modified}, 304)
+    expect('if_modified_since_old', {'if-modified-since': formatdate(0, usegmt=True)}, 200)
+    # If-None-Match varsa If-Modified-Since yok sayılır
+    expect('inm_precedence', {'if-none-match': '"other"', 'if-modified-since': entry.last_modified}, 200)
+    expect('range', {'range': 'bytes=100-199'}, 206, data[100:200])
+    expect('range_open', {'range': 'bytes=1000-'}, 206, data[1000:])
+    expect('range_suffix', {'range': 'bytes=-500'}, 206, data[-500:])
+    expect('range_clamped', {'range': f'bytes=10-{IMAGE_BYTES * 2}'}, 206, data[10:])
+    expect('range_unsatisfiable', {'range': f'bytes={IMAGE_BYTES}-'}, 416)
+    expect('range_multi', {'range': 'bytes=0-1,5-6'}, 200)
+    expect('range_garbage', {'range': 'bytes=abc'}, 200)
+    expect('if_range_match', {'range': 'bytes=0-9', 'if-range': entry.etag}, 206, data[:10])
+    expect('if_range_stale', {'range': 'bytes=0-9', 'if-range': '"old"'}, 200)
+
+    # Değişen dosya yeni ETag almalı, silinen dosya None dönmeli
+    path = directory / name
+    path.write_bytes(data[::-1])
+    os.utime(path, ns=(entry.mtime_ns + 10**9, entry.mtime_ns + 10**9))
+    changed = catalog.resolve(name)
+    if changed is None or changed.etag == entry.etag:
+        failures.append({'case': 'changed_file'})
+    path.unlink()
+    if catalog.resolve(name) is not None or len(catalog):
+        failures.append({'case': 'deleted_file'})
+    try:
+        catalog.resolve('../../etc/passwd.txt')
+        failures.append({'case': 'traversal'})
+    except ValueError:
+        pass
+    return {'cases': 20, 'mismatches': len(failures), 'examples': failures[:5]}
+
+
+LOCATION = '/_protected_images'
+
+
+def check_byte_cache(directory: Path) -> Dict[str, Any]:
+    failures = []
+    catalog = ImageCatalog(directory)
+    cache = ImageByteCache(max_bytes=3 * IMAGE_BYTES)
+    rng = random.Random(9)
+    written = []
+    for i in range(4):
+        # Üretim aşamasının yaptığı gibi: kodlanmış baytları yaz, kataloğu ve önbelleği doldur
+        data = rng.randbytes(IMAGE_BYTES)
+        path = directory / f"cached_{i}.png"
+        path.write_bytes(data)
+        entry = catalog.prime(path, data)
+        if entry.etag != image_serving.content_etag(path):
+            failures.append({'case': 'prime_etag', 'file': path.name})
+        cache.put(path.name, entry.etag, data)
+        written.append((path, data))
+
+    if len(cache) != 3 or cache.bytes > cache.max_bytes or cache.evictions != 1:
+        failures.append({'case': 'bound', 'stats': cache.stats()})
+    if cache.get(written[0][0].name, catalog.resolve(written[0][0].name).etag) is not None:
+        failures.append({'case': 'lru_evicted_oldest'})
+    path, data = written[1]
+    if cache.get(path.name, catalog.resolve(path.name).etag) != data:
+        failures.append({'case': 'hit'})
+    if cache.put('huge.png', '"x"', bytes(cache.max_bytes + 1)):
+        failures.append({'case': 'oversize'})
+
+    # Değişen dosya: katalog yeni ETag verir, eski baytlar sunulmaz
+    path, data = written[2]
+    path.write_bytes(data[::-1])
+    os.utime(path, ns=(10**18, 10**18))
+    if cache.get(path.name, catalog.resolve(path.name).etag) is not None:
+        failures.append({'case': 'stale_bytes'})
+
+    # Saklama servisi silince önbellekten düşmeli
+    path, _ = written[3]
+    retention = OutputRetention(directory, directory / 'cache_index.db', max_files=0, max_age_hours=0,
+                                pattern='cached_*.png', on_remove=lambda name: (cache.discard(name),
+                                                                                catalog.forget(name)))
+    retention.record(path)
+    retention.max_files = 1
+    retention.record(written[1][0])
+    retention.enforce_all()
+    removed = [p.name for p in (path, written[1][0]) if not p.exists()]
+    if len(removed) != 1 or any(name in cache._items or name in catalog._entries for name in removed):
+        failures.append({'case': 'retention_invalidate', 'removed': removed})
+    if cache.bytes != sum(len(data) for _, data in cache._items.values()):
+        failures.append({'case': 'byte_accounting'})
+    return {'cases': 8, 'mismatches': len(failures), 'examples': failures[:5], 'stats': cache.stats()}
+
+
+def _offload_response(catalog: ImageCatalog, name: str, request_headers: Dict[str, str], mode: str):
+    """/api/image işleyicisinin offload dalı: (durum, başlıklar, gövde)"""
+    entry = catalog.resolve(name)
+    served = image_serving.plan(entry, request_headers)
+    served = image_serving.offload(entry, served, mode, LOCATION)
+    return served.status, served.headers, b''
+
+
+def check_offload(directory: Path, names: List[str]) -> Dict[str, Any]:
+    catalog = ImageCatalog(directory)
+    proxy = EmulatedProxy({LOCATION: str(directory)}, [str(directory)])
+    failures = []
+    checked = 0
+    for mode in image_serving.OFFLOAD_MODES:
+        for name in names:
+            data = (directory / name).read_bytes()
+            etag = catalog.resolve(name).etag
+            for label, request_headers, status, body in (
+                    ('full', {}, 200, data),
+                    ('range', {'range': 'bytes=10-99'}, 206, data[10:100]),
+                    ('not_modified', {'if-none-match': etag}, 304, b'')):
+                backend = _offload_response(catalog, name, request_headers, mode)
+                if status != 304 and backend[2]:
+                    failures.append({'mode': mode, 'case': label, 'stage': 'backend_sent_body'})
+                result = proxy.finalize(*backend, request_headers)
+                checked += 1
+                if (result.status, result.body) != (status, body) or result.headers.get('ETag') != etag:
+                    failures.append({'mode': mode, 'case': label, 'status': result.status})
+                if status != 304 and 'Cache-Control' not in result.headers:
+                    failures.append({'mode': mode, 'case': label, 'stage': 'cache_control'})
+
+    # Vekil location/kök dışına yönlendirmeyi reddetmeli
+    for headers in ({'X-Accel-Redirect': f"{LOCATION}/../../etc/passwd"},
+                    {'X-Accel-Redirect': '/other/location/x.png'},
+                    {'X-Sendfile': '/etc/passwd'}):
+        checked += 1
+        if proxy.finalize(200, headers, b'', {}).status != 404:
+            failures.append({'case': 'escape', 'headers': headers})
+    return {'checked': checked, 'mismatches': len(failures), 'examples': failures[:5]}
+
+
+def run(directory: Path, names: List[str], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+    calls = len(names)
+    catalog = ImageCatalog(directory)
+    for name in names:
+        catalog.resolve(name)  # Isınmış önbellek: tekrar eden görüntülemeler
+    etags = {name: catalog.resolve(name).etag for name in names}
+
+    base = run_case("image.legacy/resolve", lambda: [legacy_resolve_image(str(directory), n) for n in names],
+                    repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                    extra={'implementation': 'legacy', 'images': calls})
+    fast = run_case("image.current/resolve_plan",
+                    lambda: [image_serving.plan(catalog.resolve(n), {}) for n in names],
+                    repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                    extra={'implementation': 'catalog', 'images': calls})
+    fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+    revalidate = run_case("image.current/not_modified",
+                          lambda: [image_serving.plan(catalog.resolve(n), {'if-none-match': etags[n]})
+                                   for n in names],
+                          repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                          extra={'implementation': 'catalog', 'images': calls, 'bytes_sent': 0})
+    cold = run_case("image.current/first_view", lambda: [ImageCatalog(directory).resolve(n) for n in names[:20]],
+                    repeat=max(3, repeat // 5), warmup=1, alloc_calls=0, units_per_call=20,
+                    extra={'implementation': 'catalog', 'image_bytes': IMAGE_BYTES})
+    offload = run_case("image.current/offload_x_accel",
+                       lambda: [image_serving.offload(entry, image_serving.plan(entry, {}), 'x-accel-redirect', LOCATION)
+                                for entry in map(catalog.resolve, names)],
+                       repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                       extra={'implementation': 'catalog+offload', 'images': calls, 'bytes_from_app': 0})
+    inline = run_case("image.current/inline_body", lambda: [(directory / n).read_bytes() for n in names],
+                      repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                      extra={'implementation': 'app_reads_body', 'images': calls,
+                             'bytes_from_app': calls * IMAGE_BYTES})
+    byte_cache = ImageByteCache(max_bytes=calls * IMAGE_BYTES)
+    for name in names:
+        byte_cache.put(name, etags[name], (directory / name).read_bytes())
+    memory = run_case("image.current/byte_cache",
+                      lambda: [byte_cache.get(n, catalog.resolve(n).etag) for n in names],
+                      repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                      extra={'implementation': 'catalog+byte_cache', 'images': calls, 'disk_reads': 0})
+    memory['speedup_vs_disk_p50'] = round(inline['latency_ms']['p50'] / memory['latency_ms']['p50'], 2)
+    results.extend([base, fast, revalidate, cold, offload, inline, memory])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        names = populate(directory, 100 if args.quick else 500)
+        semantics = check_semantics(directory, names[-1])
+        offload = check_offload(directory, names[:10])
+        results = run(directory, names[:-1], repeat=repeat, warmup=1 if args.quick else args.warmup)
+        byte_cache = check_byte_cache(directory)
+    emit('image_serving', results, args.output, semantics=semantics, offload=offload, byte_cache=byte_cache)
+    if semantics['mismatches'] or offload['mismatches'] or byte_cache['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
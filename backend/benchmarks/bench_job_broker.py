@@ -0,0 +1,307 @@
+"""
+Paylaşılan İş Kuyruğu Benchmark'ı
+=================================
+job_broker.SQLiteJobBroker'ın doğruluğu ve maliyeti (yalnızca yerel SQLite
+dosyası; GPU/model gerekmez):
+
+- Anlamsal kontroller: FIFO claim; kira dolunca yeniden kuyruğa alma ve eski
+  (zombi) token'ın heartbeat/complete'inin reddedilmesi; heartbeat'in kirayı
+  uzatması; max_attempts sonrası failed; ilerlemenin sürümle görünmesi;
+  bekleyen/çalışan işin iptali; bekleyen iş sınırı; retry'lı fail; purge.
+- BrokerWorker uçtan uca: uzun iş heartbeat ile kirasını korur, çöken
+  işçinin işi devralınır, çalışırken iptal edilen işin sonucu yazılmaz,
+  handler hatası failed olur.
+- Dışlayıcılık: aynı dosyaya bağlı N thread ve N süreç aynı anda claim eder;
+  her iş tam bir kez alınmalı.
+- Maliyet: submit, claim+complete, heartbeat ve API yoklaması (version)
+  gecikmesi; sabit süreli işlerde 1/2/4 işçi süreciyle verim ölçeklemesi.
+
+Kullanım:
+    python -m benchmarks.bench_job_broker [--quick] [--output sonuc.json]
+
+Herhangi bir kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.harness import add_common_args, emit, run_case
+
+from job_broker import LEASE_EXPIRED_ERROR, BrokerWorker, SQLiteJobBroker
+
+
+def check_semantics(tmp: Path) -> Dict[str, Any]:
+    failures: List[str] = []
+
+    def expect(label: str, condition: bool):
+        if not condition:
+            failures.append(label)
+
+    broker = SQLiteJobBroker(tmp / 'semantics.db', lease_seconds=30)
+    for job_id in ('a', 'b', 'c'):
+        broker.submit(job_id, {'prompt': job_id})
+    order = [broker.claim('w1')['job_id'] for _ in range(3)]
+    expect(f"fifo: {order}", order == ['a', 'b', 'c'])
+    expect("boş kuyruk", broker.claim('w1') is None)
+
+    # Kira doldu: iş başka işçiye geçer, eski token geçersiz
+    broker.submit('lease', {})
+    first = broker.claim('w1', lease_seconds=0.05)
+    time.sleep(0.1)
+    second = broker.claim('w2', lease_seconds=30)
+    expect("kira: devralınmadı", second is not None and second['job_id'] == 'lease' and second['attempts'] == 2)
+    expect("zombi heartbeat kabul edildi", not broker.heartbeat('lease', first['lease_token']))
+    expect("zombi complete kabul edildi", not broker.complete('lease', first['lease_token'], {'by': 'w1'}))
+    expect("sahip complete reddedildi", broker.complete('lease', second['lease_token'], {'by': 'w2'}))
+    expect("kira: sonuç", broker.get('lease')['result'] == {'by': 'w2'})
+
+    # Heartbeat kirayı uzatır
+    broker.submit('alive', {})
+    record = broker.claim('w1', lease_seconds=0.15)
+    stolen = False
+    for _ in range(5):
+        time.sleep(0.06)
+        broker.heartbeat('alive', record['lease_token'], lease_seconds=0.15)
+        stolen = stolen or broker.claim('w2') is not None
+    expect("heartbeat: iş çalındı", not stolen)
+    broker.complete('alive', record['lease_token'], {'ok': True})
+
+    # Deneme hakkı biter
+    broker.submit('doomed', {}, max_attempts=2)
+    for _ in range(2):
+        broker.claim('w1', lease_seconds=0.01)
+        time.sleep(0.03)
+    expect("max_attempts: yeniden alındı", broker.claim('w1') is None)
+    doomed = broker.get('doomed')
+    expect(f"max_attempts: {doomed['status']}", doomed['status'] == 'failed' and doomed['error'] == LEASE_EXPIRED_ERROR)
+
+    # İlerleme sürüm artırır, yalın heartbeat artırmaz
+    broker.submit('progress', {})
+    record = broker.claim('w1')
+    version = broker.version('progress')
+    broker.heartbeat('progress', record['lease_token'])
+    expect("yalın heartbeat sürüm artırdı", broker.version('progress') == version)
+    broker.heartbeat('progress', record['lease_token'], progress=40, message='Model yükleniyor',
+                     timeline={'spans': [{'name': 'model_load'}]})
+    current = broker.get('progress')
+    expect("ilerleme görünmüyor", current['version'] > version and current['progress'] == 40
+           and current['progress_message'] == 'Model yükleniyor' and current['timeline']['spans'])
+
+    # İptal: bekleyen iş alınmaz, çalışan işin sonucu yazılmaz
+    broker.submit('cancel_pending', {})
+    expect("iptal: bekleyen", broker.cancel('cancel_pending') and broker.claim('w1') is None)
+    broker.submit('cancel_running', {})
+    running = broker.claim('w1')
+    expect("iptal: çalışan", broker.cancel('cancel_running'))
+    expect("iptal: heartbeat", not broker.heartbeat('cancel_running', running['lease_token']))
+    expect("iptal: complete", not broker.complete('cancel_running', running['lease_token'], {'x': 1}))
+    expect("iptal: durum", broker.get('cancel_running')['status'] == 'cancelled')
+    expect("iptal: bitmiş iş", not broker.cancel('lease'))
+
+    # Retry'lı fail
+    broker.submit('retry', {})
+    record = broker.claim('w1')
+    broker.fail('retry', record['lease_token'], 'CUDA OOM', retry=True)
+    expect("retry: pending değil", broker.get('retry')['status'] == 'pending')
+    record = broker.claim('w1')
+    broker.fail('retry', record['lease_token'], 'CUDA OOM')
+    failed = broker.get('retry')
+    expect("retry: failed değil", failed['status'] == 'failed' and failed['progress_message'] == 'Hata: CUDA OOM')
+
+    # Bekleyen iş sınırı
+    limited = SQLiteJobBroker(tmp / 'limited.db', max_pending=2)
+    accepted = [limited.submit(f"l{i}", {}) for i in range(3)]
+    expect(f"max_pending: {accepted}", accepted == [True, True, False])
+    limited.claim('w1')
+    expect("max_pending: yer açılmadı", limited.submit('l3', {}))
+
+    # Purge yalnızca bitmiş ve eski işleri siler
+    conn = broker._get_conn()
+    conn.execute("UPDATE jobs SET completed_at = 1 WHERE job_id IN ('lease', 'cancel_pending')")
+    removed = sorted(broker.purge(3600))
+    expect(f"purge: {removed}", removed == ['cancel_pending', 'lease'] and broker.get('alive') is not None)
+
+    counts = broker.counts()
+    expect(f"counts: {counts}", sum(counts.values()) == conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0])
+    return {'failures': failures, 'mismatches': len(failures)}
+
+
+def check_worker(tmp: Path) -> Dict[str, Any]:
+    failures: List[str] = []
+    broker = SQLiteJobBroker(tmp / 'worker.db')
+
+    def handler(record, context):
+        if record['payload'].get('boom'):
+            raise RuntimeError('patladı')
+        for step in range(6):
+            time.sleep(0.05)
+            context.progress(step * 20, f"Adım {step}")
+        return {'filename': f"{record['job_id']}.png"}
+
+    worker = BrokerWorker(broker, handler, worker_id='w', lease_seconds=0.1, progress_interval=0.02)
+
+    # Kiradan (0.1 s) uzun iş: heartbeat'ler kirayı korur
+    broker.submit('long', {})
+    status = worker.run_once()
+    record = broker.get('long')
+    if status != 'completed' or record['status'] != 'completed' or record['attempts'] != 1:
+        failures.append(f"uzun iş: {status}/{record['status']}/{record['attempts']}")
+
+    # Çöken işçi: kira dolunca iş devralınır
+    broker.submit('orphan', {})
+    broker.claim('dead', lease_seconds=0.05)
+    time.sleep(0.1)
+    status = worker.run_once()
+    record = broker.get('orphan')
+    if status != 'completed' or record['attempts'] != 2 or record['worker_id'] != 'w':
+        failures.append(f"devralma: {status}/{record['attempts']}/{record['worker_id']}")
+
+    # Çalışırken iptal
+    broker.submit('cancel', {})
+    threading.Timer(0.12, broker.cancel, args=('cancel',)).start()
+    status = worker.run_once()
+    record = broker.get('cancel')
+    if status != 'cancelled' or record['status'] != 'cancelled' or record['result'] is not None:
+        failures.append(f"iptal: {status}/{record['status']}")
+
+    broker.submit('boom', {'boom': True})
+    status = worker.run_once()
+    record = broker.get('boom')
+    if status != 'failed' or record['error'] != 'patladı':
+        failures.append(f"hata: {status}/{record['error']}")
+
+    if worker.run_once() is not None:
+        failures.append("boş kuyrukta iş alındı")
+    return {'processed': worker.processed, 'failures': failures, 'mismatches': len(failures)}
+
+
+def _drain(path: str, worker_id: str, job_seconds: float, out) -> None:
+    """Kuyruk boşalana kadar claim + complete (ayrı süreçte)"""
+    broker = SQLiteJobBroker(path)
+    claimed = []
+    started = time.time()  # Süreç başlatma maliyeti verime katılmasın
+    while True:
+        record = broker.claim(worker_id, lease_seconds=30)
+        if record is None:
+            break
+        if job_seconds:
+            time.sleep(job_seconds)
+        broker.complete(record['job_id'], record['lease_token'], {'by': worker_id})
+        claimed.append(record['job_id'])
+    out.put((claimed, started, time.time()))
+
+
+def drain_processes(path: Path, workers: int, jobs: int, job_seconds: float) -> Dict[str, Any]:
+    broker = SQLiteJobBroker(path)
+    for i in range(jobs):
+        broker.submit(f"job_{i:06d}", {'i': i})
+    ctx = multiprocessing.get_context('spawn')
+    out = ctx.Queue()
+    processes = [ctx.Process(target=_drain, args=(str(path), f"p{n}", job_seconds, out)) for n in range(workers)]
+    for process in processes:
+        process.start()
+    outputs = [out.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+    claimed = [job_id for ids, _, _ in outputs for job_id in ids]
+    elapsed = max(end for _, _, end in outputs) - min(start for _, start, _ in outputs)
+    return {'claimed': claimed, 'seconds': elapsed, 'counts': broker.counts()}
+
+
+def check_exclusive(tmp: Path, jobs: int, workers: int) -> Dict[str, Any]:
+    failures: List[str] = []
+    expected = {f"job_{i:06d}" for i in range(jobs)}
+
+    broker = SQLiteJobBroker(tmp / 'threads.db')
+    for job_id in sorted(expected):
+        broker.submit(job_id, {})
+    claimed: List[str] = []
+    lock = threading.Lock()
+
+    def drain(worker_id: str):
+        while True:
+            record = broker.claim(worker_id)
+            if record is None:
+                return
+            broker.complete(record['job_id'], record['lease_token'], {})
+            with lock:
+                claimed.append(record['job_id'])
+
+    threads = [threading.Thread(target=drain, args=(f"t{n}",)) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if len(claimed) != jobs or set(claimed) != expected:
+        failures.append(f"thread: {len(claimed)} claim, {len(set(claimed))} tekil")
+
+    result = drain_processes(tmp / 'processes.db', workers, jobs, 0.0)
+    if len(result['claimed']) != jobs or set(result['claimed']) != expected:
+        failures.append(f"süreç: {len(result['claimed'])} claim, {len(set(result['claimed']))} tekil")
+    if result['counts']['completed'] != jobs:
+        failures.append(f"süreç: {result['counts']}")
+    return {'jobs': jobs, 'workers': workers, 'failures': failures, 'mismatches': len(failures)}
+
+
+def run(tmp: Path, repeat: int, warmup: int, jobs: int, job_seconds: float) -> List[Dict[str, Any]]:
+    broker = SQLiteJobBroker(tmp / 'latency.db', lease_seconds=30)
+    ids = itertools.count()
+    payload = {'prompt': 'orman kenarında eski bir kale', 'width': 512, 'height': 512, 'steps': 25}
+    results = [run_case('broker.submit', lambda: broker.submit(f"s{next(ids)}", payload),
+                        repeat=repeat, warmup=warmup, alloc_calls=0)]
+
+    def claim_complete():
+        record = broker.claim('bench')
+        broker.complete(record['job_id'], record['lease_token'], {'filename': 'x.png'})
+
+    results.append(run_case('broker.claim_complete', claim_complete, repeat=repeat, warmup=warmup, alloc_calls=0))
+    broker.submit('hb', payload)
+    record = broker.claim('bench')
+    results.append(run_case('broker.heartbeat', lambda: broker.heartbeat('hb', record['lease_token'], progress=50),
+                            repeat=repeat, warmup=warmup, alloc_calls=0))
+    results.append(run_case('broker.poll.version', lambda: broker.version('hb'),
+                            repeat=repeat, warmup=warmup, alloc_calls=0))
+    results.append(run_case('broker.poll.get', lambda: broker.get('hb'),
+                            repeat=repeat, warmup=warmup, alloc_calls=0))
+
+    # Yatay ölçekleme: sabit süreli işler, artan işçi süreci sayısı
+    base = None
+    for workers in (1, 2, 4):
+        drained = drain_processes(tmp / f"scale_{workers}.db", workers, jobs, job_seconds)
+        throughput = jobs / drained['seconds']
+        base = base or throughput
+        results.append({'name': f"broker.workers/{workers}", 'workers': workers, 'jobs': jobs,
+                        'job_ms': job_seconds * 1000, 'seconds': round(drained['seconds'], 3),
+                        'jobs_per_s': round(throughput, 1), 'speedup': round(throughput / base, 2)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 50 if args.quick else args.repeat
+    jobs = 100 if args.quick else 400
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        semantics = check_semantics(tmp)
+        worker = check_worker(tmp)
+        exclusive = check_exclusive(tmp, jobs=jobs, workers=4)
+        results = run(tmp, repeat=repeat, warmup=1 if args.quick else args.warmup,
+                      jobs=jobs, job_seconds=0.02)
+
+    emit('job_broker', results, args.output, semantics=semantics, worker=worker, exclusive=exclusive)
+    if semantics['mismatches'] or worker['mismatches'] or exclusive['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
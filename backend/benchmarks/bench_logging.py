@@ -0,0 +1,133 @@
+"""
+Loglama Hattı Benchmark'ı
+=========================
+Üretim başına log bloğunun çağıran thread'deki maliyeti:
+eski senkron FileHandler ile kuyruk tabanlı hat (tam prompt / örneklenmiş prompt).
+Toplam süre, kuyruğun diske boşaltılmasını da içerir.
+
+Kullanım:
+    python -m benchmarks.bench_logging [--quick] [--output sonuc.json]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.harness import add_common_args, emit, latency_stats
+
+import log_setup
+from log_setup import PromptSampler
+
+PROMPT = ("a lonely lighthouse keeper watching the storm, cinematic lighting, "
+          "dramatic clouds, crashing waves, volumetric fog, ") * 8
+BLOCKS_PER_SAMPLE = 20
+
+
+def legacy_block(logger: logging.Logger):
+    """server.py'nin eski generate() log bloğu"""
+    logger.info(f"Görsel üretiliyor: SDXL 1024x1024 steps=25")
+    logger.info(f"===== PROMPT (ilk 500 karakter) =====")
+    logger.info(f"{PROMPT[:500]}...")
+    logger.info(f"=====================================")
+
+
+def sampled_block_factory(sampler: PromptSampler) -> Callable[[logging.Logger], None]:
+    def block(logger: logging.Logger):
+        logger.info("Görsel üretiliyor: %s %dx%d steps=%d", "SDXL", 1024, 1024, 25)
+        logged_prompt = sampler.sample(PROMPT)
+        if logged_prompt is not None:
+            logger.info("[PROMPT] %s", logged_prompt)
+    return block
+
+
+def _measure(logger: logging.Logger, block: Callable[[logging.Logger], None],
+             repeat: int, drain: Callable[[], None]) -> Dict[str, Any]:
+    for _ in range(3):
+        block(logger)
+    drain()
+
+    samples: List[float] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(BLOCKS_PER_SAMPLE):
+            block(logger)
+        samples.append((time.perf_counter() - t0) * 1000.0 / BLOCKS_PER_SAMPLE)
+    caller_s = time.perf_counter() - started
+    drain()
+    total_s = time.perf_counter() - started
+    blocks = repeat * BLOCKS_PER_SAMPLE
+    return {
+        'samples': len(samples),
+        'latency_ms': latency_stats(samples),
+        'blocks': blocks,
+        'caller_total_s': round(caller_s, 4),
+        'drained_total_s': round(total_s, 4),
+        'throughput_per_s': round(blocks / total_s, 2) if total_s > 0 else None,
+    }
+
+
+def run_legacy(log_file: str, repeat: int) -> Dict[str, Any]:
+    logger = logging.getLogger('bench.legacy')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(log_file, encoding='utf-8')
+    handler.setFormatter(logging.Formatter(log_setup.DEFAULT_FORMAT))
+    logger.addHandler(handler)
+    try:
+        return _measure(logger, legacy_block, repeat, handler.flush)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def run_queued(log_file: str, repeat: int, block: Callable[[logging.Logger], None]) -> Dict[str, Any]:
+    logger = logging.getLogger('bench.queued')
+    logger.propagate = False
+    handler = log_setup.setup_logging(log_file=log_file, console=False, queue_size=1_000_000, target=logger)
+
+    def drain():
+        # Kuyruk boşalana kadar bekle (listener thread'i yazıyor)
+        while not handler.queue.empty():
+            time.sleep(0.001)
+
+    try:
+        record = _measure(logger, block, repeat, drain)
+        record['dropped'] = handler.dropped
+        return record
+    finally:
+        log_setup.shutdown_logging()
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [
+            ('logging.sync_file/legacy_block', lambda path: run_legacy(path, repeat)),
+            ('logging.queued/legacy_block', lambda path: run_queued(path, repeat, legacy_block)),
+            ('logging.queued/sampled_prompt', lambda path: run_queued(
+                path, repeat, sampled_block_factory(PromptSampler(sample_rate=0.1, max_chars=200)))),
+        ]
+        for name, fn in cases:
+            path = os.path.join(tmp, name.replace('/', '_') + '.log')
+            record = fn(path)
+            record['name'] = name
+            record['log_bytes'] = os.path.getsize(path) if os.path.exists(path) else 0
+            results.append(record)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 20 if args.quick else args.repeat * 10
+    emit('logging', run(repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Morfoloji Benchmark'ı
+=====================
+TurkishMorphology.analyze_word ve SentenceAnalyzer.analyze: referans (eski)
+endswith döngüsü ile ters ek trie'si karşılaştırması, kelime önbelleği
+açıkken Zipf dağılımlı hikaye metni, ve sentetik kelime listesi üzerinde
+birebir çıktı kontrolü.
+
+Kullanım:
+    python -m benchmarks.bench_morphology [--quick] [--output sonuc.json]
+
+Çıktılar farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List
+
+import analysis_cache
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacySentenceAnalyzer, LegacyTurkishMorphology
+
+from turkish_nlp import SentenceAnalyzer, TenseType, TurkishMorphology
+
+# Sentetik kelimeler için kökler (ünlü uyumu karışık, kısa/uzun)
+ROOTS = ['gel', 'git', 'ev', 'kitap', 'çocuk', 'göz', 'yol', 'kal', 'kalk', 'iste',
+         'düşün', 'orman', 'deniz', 'a', 'r', 'ıl', 'sev', 'bak', 'ağaç', 'gün']
+
+PAST_PERFECT_ENDINGS = tuple(s.replace('-', '') for s in TurkishMorphology.VERB_SUFFIXES['past_perfect'])
+
+
+def synthetic_words() -> List[str]:
+    """Kök + tek ek ve kök + iki ek kombinasyonları; tüm ek tablolarını kapsar"""
+    suffixes = set(TurkishMorphology.PLURAL_SUFFIXES) | set(TurkishMorphology.ADJECTIVE_SUFFIXES)
+    suffixes |= set(TurkishMorphology.ADVERB_SUFFIXES)
+    for table in (TurkishMorphology.VERB_SUFFIXES, TurkishMorphology.NOUN_CASES):
+        for group in table.values():
+            suffixes.update(group)
+    clean = sorted(s.replace('-', '') for s in suffixes)
+
+    words = set(ROOTS) | set(clean)
+    for root in ROOTS:
+        for first in clean:
+            words.add(root + first)
+            for second in clean[::3]:
+                words.add(root + first + second)
+    return sorted(words)
+
+
+def _legacy_supported(word: str) -> bool:
+    """Eski kodun hata vermeden analiz edebildiği kelime ('-mış' ile bitmeyen)"""
+    return not word.lower().strip().endswith(PAST_PERFECT_ENDINGS)
+
+
+def corpus_words() -> List[str]:
+    words = set()
+    for text in corpus.regression_texts(sentences_per_lang=100):
+        words.update(SentenceAnalyzer._tokenize(text))
+    return sorted(words)
+
+
+def check_equivalence(words: List[str], texts: List[str]) -> Dict[str, Any]:
+    """Eski ve yeni kelime/cümle analizlerini karşılaştır.
+
+    Eski kod '-mış' ekli kelimelerde TenseType('past_perfect') ile hata veriyordu;
+    bu kelimeler düzeltme olarak ayrıca sayılır.
+    """
+    mismatches = []
+    fixed = 0
+    for word in words:
+        try:
+            expected = LegacyTurkishMorphology.analyze_word(word)
+        except ValueError:
+            if TurkishMorphology.analyze_word(word).tense != TenseType.PAST_PERFECT:
+                mismatches.append({'word': word, 'stage': 'past_perfect_fix'})
+            fixed += 1
+            continue
+        actual = TurkishMorphology.analyze_word(word)
+        if expected != actual:
+            mismatches.append({'word': word, 'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+
+    sentence_mismatches = 0
+    for text in texts:
+        try:
+            expected = LegacySentenceAnalyzer.analyze(text)
+        except ValueError:
+            continue
+        if expected != SentenceAnalyzer.analyze(text):
+            sentence_mismatches += 1
+
+    return {
+        'words': len(words),
+        'sentences': len(texts),
+        'mismatches': len(mismatches) + sentence_mismatches,
+        'sentence_mismatches': sentence_mismatches,
+        'past_perfect_fixed': fixed,
+        'examples': mismatches[:5],
+    }
+
+
+def run(repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+
+    # Kelime başına maliyet: tüm korpus kelime dağarcığı tek çağrıda
+    words = [w for w in corpus_words() if _legacy_supported(w)]
+    extra = {'words': len(words)}
+    legacy = run_case("morphology.word.legacy", lambda: [LegacyTurkishMorphology.analyze_word(w) for w in words],
+                      repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=len(words),
+                      extra={**extra, 'implementation': 'legacy'})
+    current = run_case("morphology.word.current", lambda: [TurkishMorphology.analyze_word(w) for w in words],
+                       repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=len(words),
+                       extra={**extra, 'implementation': 'current'})
+    current['speedup_p50'] = round(legacy['latency_ms']['p50'] / current['latency_ms']['p50'], 2)
+    results.extend([legacy, current])
+
+    # Cümle analizi: hikaye metninin tüm cümleleri (Zipf dağılımlı kelimeler)
+    for size in ('short_story', 'chapter'):
+        for lang in corpus.LANGUAGES:
+            sentences = [s for s in corpus.generate_text(size, lang).replace('\n\n', ' ').split('. ')
+                         if all(_legacy_supported(w) for w in SentenceAnalyzer._tokenize(s))]
+            tokens = sum(len(SentenceAnalyzer._tokenize(s)) for s in sentences)
+            case_repeat = max(5, repeat // 10) if size == 'chapter' else repeat
+            extra = {'corpus': size, 'language': lang, 'sentences': len(sentences), 'tokens': tokens}
+
+            legacy = run_case(f"sentence.legacy/{size}/{lang}",
+                              lambda: [LegacySentenceAnalyzer.analyze(s) for s in sentences],
+                              repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=tokens,
+                              extra={**extra, 'implementation': 'legacy'})
+            current = run_case(f"sentence.current/{size}/{lang}",
+                               lambda: [SentenceAnalyzer.analyze(s) for s in sentences],
+                               repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=tokens,
+                               extra={**extra, 'implementation': 'current'})
+            current['speedup_p50'] = round(legacy['latency_ms']['p50'] / current['latency_ms']['p50'], 2)
+
+            # Kelime önbelleği açık (sunucudaki varsayılan)
+            analysis_cache.configure('morphology.word', enabled=True)
+            try:
+                cached = run_case(f"sentence.cached/{size}/{lang}",
+                                  lambda: [SentenceAnalyzer.analyze(s) for s in sentences],
+                                  repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=tokens,
+                                  extra={**extra, 'implementation': 'current+word_cache'})
+                cached['cache'] = analysis_cache.cache_stats()['morphology.word']
+            finally:
+                analysis_cache.configure('morphology.word', enabled=False)
+            cached['speedup_p50'] = round(legacy['latency_ms']['p50'] / cached['latency_ms']['p50'], 2)
+            results.extend([legacy, current, cached])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    words = sorted(set(synthetic_words()) | set(corpus_words()))
+    texts = corpus.regression_texts(sentences_per_lang=50 if args.quick else 200)
+    equivalence = check_equivalence(words, texts)
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup)
+    emit('morphology', results, args.output, equivalence=equivalence)
+    if equivalence['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
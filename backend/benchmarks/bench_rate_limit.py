@@ -0,0 +1,146 @@
+"""
+Rate Limiter Benchmark'ı
+========================
+RateLimiter.is_allowed: referans (eski) IP başına zaman damgası listesi ile
+kayan pencere sayacının (bellek ve SQLite arka uçları) karşılaştırması:
+limitteki sıcak istemci, çok sayıda farklı istemcide tutulan bellek ve
+boşta kalan istemcilerin silinmesi. Retry-After doğruluğu da kontrol edilir
+(bekleme sonrası istek kabul edilmeli, bir saniye önce reddedilmeli).
+
+Kullanım:
+    python -m benchmarks.bench_rate_limit [--quick] [--output sonuc.json]
+
+Kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyRateLimiter
+
+from security import RateLimiter, SQLiteRateLimitBackend, _sliding_window
+
+LIMIT = 30
+WINDOW = 60.0
+
+
+def check_retry_after(trials: int) -> Dict[str, Any]:
+    """Rastgele istek dizilerinde Retry-After'ın en küçük doğru bekleme olduğunu doğrula"""
+    rng = random.Random(11)
+    failures = []
+    rejected = 0
+    for trial in range(trials):
+        limit = rng.randint(1, 40)
+        state = None
+        now = rng.uniform(0, 1e6)
+        allowed = True
+        for _ in range(rng.randint(1, 120)):
+            now += rng.expovariate(2.0)
+            allowed, retry_after, state = _sliding_window(state, now, WINDOW, limit)
+        if allowed:
+            continue
+        rejected += 1
+        after, _, _ = _sliding_window(state, now + retry_after, WINDOW, limit)
+        before = retry_after > 1 and _sliding_window(state, now + retry_after - 1.001, WINDOW, limit)[0]
+        if not after or before:
+            failures.append({'trial': trial, 'limit': limit, 'retry_after': retry_after})
+    return {'trials': trials, 'rejected': rejected, 'mismatches': len(failures), 'examples': failures[:5]}
+
+
+def _clients(count: int) -> List[str]:
+    return [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(count)]
+
+
+def _held_bytes(build) -> int:
+    """build()'in döndürdüğü limiter'ın tuttuğu bellek (tracemalloc)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        limiter = build()
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del limiter
+    return held
+
+
+def run(repeat: int, warmup: int, clients: int) -> List[Dict[str, Any]]:
+    results = []
+
+    # Limitteki sıcak istemci: eski yol her istekte limit uzunluğundaki listeyi yeniden kurar
+    calls = 1000
+    for limit in (LIMIT, 600):
+        legacy = LegacyRateLimiter(requests_per_minute=limit)
+        current = RateLimiter(requests_per_minute=limit, window_seconds=WINDOW)
+        base = run_case(f"rate_limit.legacy/hot_client/{limit}",
+                        lambda: [legacy.is_allowed('1.1.1.1') for _ in range(calls)],
+                        repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                        extra={'implementation': 'legacy', 'limit': limit})
+        fast = run_case(f"rate_limit.memory/hot_client/{limit}",
+                        lambda: [current.is_allowed('1.1.1.1') for _ in range(calls)],
+                        repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                        extra={'implementation': 'sliding_window', 'limit': limit})
+        fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+        results.extend([base, fast])
+
+    # Çok sayıda farklı istemci: istemci başına tutulan bellek ve boşta kalanların silinmesi
+    addresses = _clients(clients)
+    burst = 10  # İstemci başına istek; eski yol her biri için bir zaman damgası tutar
+    for name, make in (('legacy', lambda: LegacyRateLimiter(requests_per_minute=LIMIT)),
+                       ('memory', lambda: RateLimiter(requests_per_minute=LIMIT, window_seconds=WINDOW))):
+        def fill(make=make):
+            limiter = make()
+            for address in addresses:
+                for _ in range(burst):
+                    limiter.is_allowed(address)
+            return limiter
+
+        case = run_case(f"rate_limit.{name}/distinct_clients", fill, repeat=max(3, repeat // 5), warmup=1,
+                        alloc_calls=0, units_per_call=clients * burst,
+                        extra={'clients': clients, 'requests_per_client': burst})
+        case['bytes_per_client'] = round(_held_bytes(fill) / clients, 1)
+        limiter = fill()
+        if isinstance(limiter, RateLimiter):
+            case['evicted_after_idle'] = limiter.evict_idle(limiter._next_eviction + 3 * WINDOW)
+            case['tracked_after_eviction'] = limiter.tracked_clients()
+        else:
+            case['tracked_after_eviction'] = len(limiter.requests)
+        results.append(case)
+
+    # Paylaşılan SQLite arka ucu (işçiler arası tek limit)
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = RateLimiter(requests_per_minute=LIMIT, window_seconds=WINDOW,
+                             backend=SQLiteRateLimitBackend(str(Path(tmp) / 'rate_limits.db')))
+        calls = 200
+        results.append(run_case("rate_limit.sqlite/hot_client",
+                                lambda: [shared.is_allowed('1.1.1.1') for _ in range(calls)],
+                                repeat=repeat, warmup=warmup, alloc_calls=0, units_per_call=calls,
+                                extra={'implementation': 'sliding_window+sqlite'}))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    retry_after = check_retry_after(2000 if args.quick else 20000)
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup,
+                  clients=10_000 if args.quick else 100_000)
+    emit('rate_limit', results, args.output, retry_after=retry_after)
+    if retry_after['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
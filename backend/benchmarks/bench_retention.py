@@ -0,0 +1,167 @@
+"""
+Çıktı Saklama Benchmark'ı
+=========================
+Referans (eski) OutputCleaner.cleanup (her çağrıda iki dizin taraması,
+dosya başına birden çok stat) ile indeksli OutputRetention karşılaştırması:
+kota aşılmamışken periyodik kontrolün maliyeti, kota aşıldığında bir dilim,
+yazma başına indeks güncellemesi ve ilk indeksleme (reconcile) süresi.
+Aynı yaş/sayı kotalarıyla iki uygulamanın aynı dosyaları bıraktığı kontrol edilir.
+
+/api/images listelemesi: eski glob + sıralama ile indeks üzerinde keyset
+sayfalama (ilk sayfa ve imleçle derin sayfa); ilk sayfanın aynı olduğu ve
+imleçle yürünen sayfaların tüm dosyaları bir kez verdiği kontrol edilir.
+
+Kullanım:
+    python -m benchmarks.bench_retention [--quick] [--output sonuc.json]
+
+Kalan dosyalar veya listeler farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyOutputCleaner, legacy_list_images
+
+from retention import OutputRetention
+
+MAX_FILES = 500
+MAX_AGE_HOURS = 24
+
+
+def populate(directory: Path, count: int, now: float) -> None:
+    """count adet küçük PNG; mtime'lar son 48 saate eşit aralıklarla dağıtılır"""
+    directory.mkdir(parents=True, exist_ok=True)
+    span = 48 * 3600
+    for i in range(count):
+        path = directory / f"scene_{i:06d}.png"
+        path.write_bytes(b'\x89PNG' + bytes(i % 251 for _ in range(64)))
+        mtime = now - span + (span * i) // count
+        os.utime(path, (mtime, mtime))
+
+
+def check_equivalence(tmp: Path, count: int) -> Dict[str, Any]:
+    now = time.time()
+    legacy_dir, current_dir = tmp / 'eq_legacy', tmp / 'eq_current'
+    populate(legacy_dir, count, now)
+    populate(current_dir, count, now)
+
+    legacy_removed = LegacyOutputCleaner(str(legacy_dir), max_files=MAX_FILES,
+                                         max_age_hours=MAX_AGE_HOURS).cleanup()
+    retention = OutputRetention(current_dir, tmp / 'eq_index.db', max_files=MAX_FILES,
+                                max_age_hours=MAX_AGE_HOURS, slice_size=50)
+    retention.reconcile()
+    current_removed = retention.enforce_all()
+
+    expected = sorted(p.name for p in legacy_dir.iterdir())
+    actual = sorted(p.name for p in current_dir.iterdir())
+    return {
+        'files': count,
+        'legacy_removed': legacy_removed,
+        'current_removed': current_removed,
+        'remaining': len(actual),
+        'indexed': retention.totals()[0],
+        'mismatches': int(expected != actual) + int(retention.totals()[0] != len(actual)),
+    }
+
+
+def check_listing(tmp: Path, count: int, page_size: int = 50) -> Dict[str, Any]:
+    directory = tmp / 'list_eq'
+    populate(directory, count, time.time())
+    retention = OutputRetention(directory, tmp / 'list_index.db', max_files=0, max_age_hours=0)
+    retention.reconcile()
+
+    expected = [image['filename'] for image in legacy_list_images(str(directory), page_size)['images']]
+    first, cursor = retention.page(limit=page_size)
+    walked = [row['filename'] for row in first]
+    pages = 1
+    while cursor:
+        rows, cursor = retention.page(limit=page_size, cursor=cursor)
+        walked.extend(row['filename'] for row in rows)
+        pages += 1
+
+    everything = sorted(p.name for p in directory.iterdir())
+    mismatches = int(walked[:page_size] != expected) + int(sorted(walked) != everything)
+    return {'files': count, 'pages': pages, 'mismatches': mismatches}
+
+
+def run(tmp: Path, repeat: int, warmup: int, sizes: List[int]) -> List[Dict[str, Any]]:
+    results = []
+    for count in sizes:
+        directory = tmp / f"out_{count}"
+        now = time.time()
+        populate(directory, count, now)
+        extra = {'files': count}
+
+        # Kota aşılmamış periyodik kontrol: eski yol yine de tüm dizini tarar
+        legacy = LegacyOutputCleaner(str(directory), max_files=count + 1, max_age_hours=72)
+        retention = OutputRetention(directory, tmp / f"index_{count}.db", max_files=count + 1,
+                                    max_age_hours=72)
+        reconcile = run_case(f"retention.reconcile/{count}", retention.reconcile,
+                             repeat=max(3, repeat // 5), warmup=1, alloc_calls=0, extra=extra)
+        base = run_case(f"retention.legacy/idle_check/{count}", legacy.cleanup,
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'legacy'})
+        fast = run_case(f"retention.current/idle_check/{count}", retention.enforce,
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'indexed'})
+        fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+        results.extend([reconcile, base, fast])
+
+        # Yazma başına indeks güncellemesi (aynı dosyanın yeniden kaydı; toplamlar değişmez)
+        sample = directory / f"scene_{0:06d}.png"
+        results.append(run_case(f"retention.record/{count}", lambda: retention.record(sample),
+                                repeat=repeat, warmup=warmup, alloc_calls=0, extra=extra))
+
+        # /api/images: ilk sayfa ve arşivin ortasındaki bir sayfa (imleçle)
+        base = run_case(f"images.legacy/first_page/{count}", lambda: legacy_list_images(str(directory), 50),
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'legacy'})
+        fast = run_case(f"images.current/first_page/{count}", lambda: retention.page(limit=50),
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'keyset'})
+        fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+        middle = retention.page(limit=count // 2)[1]
+        deep = run_case(f"images.current/middle_page/{count}", lambda: retention.page(limit=50, cursor=middle),
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'keyset'})
+        results.extend([base, fast, deep])
+
+        # Kota aşıldığında tek dilim (100 dosya silme + indeks güncellemesi), kopya dizinde bir kez
+        work = tmp / f"slice_{count}"
+        shutil.rmtree(work, ignore_errors=True)
+        shutil.copytree(directory, work, copy_function=shutil.copy2)
+        sliced = OutputRetention(work, tmp / f"slice_index_{count}.db", max_files=count // 2,
+                                 max_age_hours=0, slice_size=100)
+        sliced.reconcile()
+        started = time.perf_counter()
+        removed = sliced.enforce()
+        results.append({
+            'name': f"retention.current/slice/{count}",
+            'removed': removed,
+            'ms': round((time.perf_counter() - started) * 1000, 3),
+            'files': count,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    sizes = [1_000, 5_000] if args.quick else [1_000, 10_000, 50_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        equivalence = check_equivalence(tmp, 2_000)
+        listing = check_listing(tmp, 1_234)
+        results = run(tmp, repeat=repeat, warmup=1 if args.quick else args.warmup, sizes=sizes)
+    emit('retention', results, args.output, equivalence=equivalence, listing=listing)
+    if equivalence['mismatches'] or listing['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
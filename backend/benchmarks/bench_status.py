@@ -0,0 +1,201 @@
+"""
+Durum Uç Noktası Benchmark'ı
+============================
+/api/status ve /api/learning/stats maliyeti:
+
+- Öğrenme istatistikleri: eski altı sorgu (feedback üzerinde COUNT/AVG/SUM ve
+  JOIN + GROUP BY) ile tetikleyicilerle tutulan sayaç tablolarından okuma;
+  feedback sayısı büyüdükçe ölçekleme.
+- Eşzamanlı yoklama: N istemci aynı anda durum isterken her istekte hesaplama
+  ile CoalescedSnapshot (TTL + birleştirme) karşılaştırılır.
+
+Kontroller: eski ve yeni istatistikler aynı (yeni feedback, aynı job_id ile
+yeniden kaydedilen üretim, silinen feedback/üretim ve eski bir veritabanının
+ilk açılışta doldurulması sonrasında da); N
+eşzamanlı çağrı tek hesaplama yapar; hata tüm bekleyenlere iletilir ve
+önbelleğe alınmaz.
+
+Kullanım:
+    python -m benchmarks.bench_status [--quick] [--output sonuc.json]
+
+Herhangi bir kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_event_loop import seed
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import legacy_learning_stats
+
+import executors
+from responses import CoalescedSnapshot
+
+
+def check_coalescing(compute_stats, concurrent: int) -> Dict[str, Any]:
+    failures = []
+
+    async def scenario():
+        snapshot = CoalescedSnapshot(lambda: executors.run('db', compute_stats), ttl=0.2)
+        first = await asyncio.gather(*(snapshot.get() for _ in range(concurrent)))
+        if snapshot.computes != 1 or snapshot.coalesced != concurrent - 1:
+            failures.append(f"coalesce: computes={snapshot.computes} coalesced={snapshot.coalesced}")
+        if any(result is not first[0] for result in first):
+            failures.append("coalesce: farklı sonuç nesneleri")
+        await asyncio.gather(*(snapshot.get() for _ in range(concurrent)))
+        if snapshot.computes != 1 or snapshot.hits != concurrent:
+            failures.append(f"ttl: computes={snapshot.computes} hits={snapshot.hits}")
+        await asyncio.sleep(0.25)
+        await asyncio.gather(*(snapshot.get() for _ in range(concurrent)))
+        if snapshot.computes != 2:
+            failures.append(f"expire: computes={snapshot.computes}")
+        snapshot.invalidate()
+        await snapshot.get()
+        if snapshot.computes != 3:
+            failures.append(f"invalidate: computes={snapshot.computes}")
+
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        broken = CoalescedSnapshot(failing, ttl=10)
+        outcomes = await asyncio.gather(*(broken.get() for _ in range(concurrent)), return_exceptions=True)
+        if calls != 1 or not all(isinstance(o, RuntimeError) for o in outcomes):
+            failures.append(f"error: calls={calls}")
+        await asyncio.gather(broken.get(), return_exceptions=True)
+        if calls != 2:
+            failures.append("error: hata önbelleğe alındı")
+
+    asyncio.run(scenario())
+    return {'concurrent': concurrent, 'failures': failures, 'mismatches': len(failures)}
+
+
+def check_equivalence(db, Generation, Feedback, learning_manager) -> Dict[str, Any]:
+    failures = []
+
+    def compare(label: str):
+        legacy = legacy_learning_stats(db, learning_manager.min_samples_for_learning)
+        current = learning_manager.get_learning_stats()
+        if legacy != current:
+            failures.append({'step': label, 'legacy': legacy, 'current': current})
+
+    compare('seeded')
+    gen_id = db.get_generation('job_000001').id
+    db.save_feedback(Feedback(generation_id=gen_id, overall_score=5, has_face_issues=True))
+    compare('feedback_insert')
+    # Aynı job_id ile yeniden kayıt: INSERT OR REPLACE eski satırı siler (feedback'i yetim kalır)
+    db.save_generation(Generation(job_id='job_000002', prompt='yeniden', scene_type='city'))
+    compare('generation_replace')
+    conn = db._get_conn()
+    conn.execute('DELETE FROM feedback WHERE id = (SELECT MAX(id) FROM feedback)')
+    conn.commit()
+    compare('feedback_delete')
+    conn.execute("DELETE FROM generations WHERE job_id = 'job_000003'")
+    conn.commit()
+    compare('generation_delete')
+    # Sayaçlar öncesi veritabanı: tablolar ilk açılışta mevcut verilerden doldurulur
+    for trigger in ('generations_insert', 'generations_delete', 'feedback_insert', 'feedback_delete'):
+        conn.execute(f'DROP TRIGGER trg_{trigger}')
+    conn.execute('DROP TABLE learning_totals')
+    conn.execute('DROP TABLE scene_scores')
+    conn.commit()
+    db._init_db()
+    compare('backfill')
+    return {'steps': 6, 'failures': failures, 'mismatches': len(failures)}
+
+
+def run(db, learning_manager, sizes: List[int], repeat: int, warmup: int,
+        concurrent: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        _extend(db, db.get_learning_totals()['feedback'], size)
+        extra = {'feedback': size}
+        base = run_case(f"learning_stats.legacy/{size}",
+                        lambda: legacy_learning_stats(db, learning_manager.min_samples_for_learning),
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'legacy'})
+        fast = run_case(f"learning_stats.current/{size}", learning_manager.get_learning_stats,
+                        repeat=repeat, warmup=warmup, alloc_calls=0, extra={**extra, 'implementation': 'counters'})
+        fast['speedup_p50'] = round(base['latency_ms']['p50'] / fast['latency_ms']['p50'], 2)
+        results.extend([base, fast])
+
+    # N sekme aynı anda yokluyor: her istek hesaplar vs. tek hesaplama + TTL
+    async def burst(get) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(get() for _ in range(concurrent)))
+        return (time.perf_counter() - started) * 1000
+
+    legacy_stats = lambda: legacy_learning_stats(db, learning_manager.min_samples_for_learning)
+    per_request = asyncio.run(burst(lambda: executors.run('db', legacy_stats)))
+
+    async def coalesced_burst() -> Dict[str, Any]:
+        snapshot = CoalescedSnapshot(lambda: executors.run('db', learning_manager.get_learning_stats), ttl=2.0)
+        elapsed = await burst(snapshot.get)
+        return {'ms': elapsed, 'computes': snapshot.computes}
+
+    coalesced = asyncio.run(coalesced_burst())
+    results.append({'name': f"status.legacy/concurrent/{concurrent}", 'implementation': 'per_request',
+                    'ms': round(per_request, 3), 'computes': concurrent, 'feedback': sizes[-1]})
+    results.append({'name': f"status.current/concurrent/{concurrent}", 'implementation': 'coalesced',
+                    'ms': round(coalesced['ms'], 3), 'computes': coalesced['computes'], 'feedback': sizes[-1],
+                    'speedup': round(per_request / max(coalesced['ms'], 1e-3), 2)})
+    return results
+
+
+def _extend(db, start: int, end: int) -> None:
+    """Feedback sayısı end olana kadar üretim + feedback ekle (tek işlem)"""
+    scenes = ('forest', 'city', 'sea', 'castle', 'desert')
+    conn = db._get_conn()
+    for i in range(start, end):
+        cursor = conn.execute(
+            "INSERT INTO generations (job_id, prompt, scene_type, mood, genre, model) VALUES (?, ?, ?, ?, ?, ?)",
+            (f"bulk_{i:07d}", f"sahne {i}", scenes[i % len(scenes)], 'calm', 'fantasy', 'sd15'))
+        conn.execute("INSERT INTO feedback (generation_id, overall_score, has_hand_issues) VALUES (?, ?, ?)",
+                     (cursor.lastrowid, 1 + i % 5, int(i % 3 == 0)))
+    conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    sizes = [200, 5_000] if args.quick else [1_000, 20_000, 100_000]
+    repeat = 10 if args.quick else args.repeat
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.DB_PATH göreli (./data/learning.db): içe aktarmadan önce geçici dizine geç
+        os.chdir(tmp)
+        try:
+            from database import db, Generation, Feedback
+            from learning_manager import learning_manager
+
+            executors.configure('db', workers=2, max_pending=256)
+            seed(db, Generation, Feedback, 50)
+            equivalence = check_equivalence(db, Generation, Feedback, learning_manager)
+            coalescing = check_coalescing(learning_manager.get_learning_stats, concurrent=50)
+            results = run(db, learning_manager, sizes,
+                          repeat=repeat, warmup=1 if args.quick else args.warmup, concurrent=50)
+            final = legacy_learning_stats(db, learning_manager.min_samples_for_learning)
+            if final != learning_manager.get_learning_stats():
+                equivalence['failures'].append({'step': 'final'})
+                equivalence['mismatches'] += 1
+            executors.shutdown()
+        finally:
+            os.chdir(cwd)
+
+    emit('status', results, args.output, equivalence=equivalence, coalescing=coalescing)
+    if equivalence['mismatches'] or coalescing['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tema/Mood Analizi Benchmark'ı
+=============================
+ThemeAnalyzer: kelime başına `text.count` döngüsü (eski) ile güncel tekil
+analiz ve tek geçişlik toplu matris skorlaması (analyze_batch) karşılaştırması;
+regresyon korpusu üzerinde üç yolun birebir çıktı kontrolü.
+
+Kullanım:
+    python -m benchmarks.bench_theme [--quick] [--output sonuc.json]
+
+Çıktılar farklıysa çıkış kodu 1'dir.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List
+
+from benchmarks import corpus
+from benchmarks.harness import add_common_args, emit, run_case
+from benchmarks.reference import LegacyThemeAnalyzer
+
+from turkish_nlp import ThemeAnalyzer
+
+SCENE_COUNTS = (10, 100, 500)
+SENTENCES_PER_SCENE = 4
+
+
+def check_equivalence(texts: List[str]) -> Dict[str, Any]:
+    """Eski, tekil ve toplu sonuçları karşılaştır"""
+    mismatches = []
+    batch = ThemeAnalyzer.analyze_batch(texts)
+    for i, text in enumerate(texts):
+        expected = (LegacyThemeAnalyzer.analyze_themes(text), LegacyThemeAnalyzer.analyze_mood(text))
+        single = (ThemeAnalyzer.analyze_themes(text), ThemeAnalyzer.analyze_mood(text))
+        for stage, actual in (('single', single), ('batch', batch[i])):
+            if expected != actual:
+                mismatches.append({'index': i, 'text': text[:120], 'stage': stage,
+                                   'expected': repr(expected)[:300], 'actual': repr(actual)[:300]})
+    return {'texts': len(texts), 'mismatches': len(mismatches), 'examples': mismatches[:5]}
+
+
+def _scenes(count: int, lang: str) -> List[str]:
+    sentences = corpus.generate_sentences(count * SENTENCES_PER_SCENE, lang)
+    return [' '.join(sentences[i:i + SENTENCES_PER_SCENE])
+            for i in range(0, len(sentences), SENTENCES_PER_SCENE)]
+
+
+def run(repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    results = []
+    # Hikaye başına sahne listesi: eski döngü, güncel döngü ve toplu skorlama
+    for scenes in SCENE_COUNTS:
+        for lang in corpus.LANGUAGES:
+            texts = _scenes(scenes, lang)
+            case_repeat = max(5, repeat // 10) if scenes >= 500 else repeat
+            extra = {'scenes': scenes, 'language': lang}
+
+            legacy = run_case(f"theme.legacy/{scenes}/{lang}",
+                              lambda: [(LegacyThemeAnalyzer.analyze_themes(t), LegacyThemeAnalyzer.analyze_mood(t))
+                                       for t in texts],
+                              repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=scenes,
+                              extra={**extra, 'implementation': 'legacy'})
+            loop = run_case(f"theme.loop/{scenes}/{lang}",
+                            lambda: [(ThemeAnalyzer.analyze_themes(t), ThemeAnalyzer.analyze_mood(t)) for t in texts],
+                            repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=scenes,
+                            extra={**extra, 'implementation': 'current'})
+            batch = run_case(f"theme.batch/{scenes}/{lang}", lambda: ThemeAnalyzer.analyze_batch(texts),
+                             repeat=case_repeat, warmup=warmup, alloc_calls=0, units_per_call=scenes,
+                             extra={**extra, 'implementation': 'batch'})
+            for case in (loop, batch):
+                case['speedup_p50'] = round(legacy['latency_ms']['p50'] / case['latency_ms']['p50'], 2)
+            results.extend([legacy, loop, batch])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    args = parser.parse_args(argv)
+
+    repeat = 5 if args.quick else args.repeat
+    texts = corpus.regression_texts(sentences_per_lang=50 if args.quick else 200) + list(corpus.EDGE_CASES)
+    equivalence = check_equivalence(texts)
+    results = run(repeat=repeat, warmup=1 if args.quick else args.warmup)
+    emit('theme', results, args.output, equivalence=equivalence)
+    if equivalence['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
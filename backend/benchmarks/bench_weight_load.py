@@ -0,0 +1,309 @@
+"""
+Ağırlık Yükleme Benchmark'ı
+===========================
+Model başlatma maliyeti: mevcut yol (from_pretrained eşdeğeri: fp32
+checkpoint'i oku, dtype dönüştür, LoRA birleştir, sürecin özel belleğine
+kopyala) ile weight_store (işlenmiş fp16 safetensors'ı mmap'le, kopyasız
+görünümler) karşılaştırılır. torch/diffusers gerekmez: sentetik ağırlıklar
+numpy dizileridir, biçim ve eşleme üretimdekiyle aynıdır.
+
+Her ölçüm taze bir süreçte yapılır:
+- Soğuk başlatma: dosyalar page cache'ten atılmış (posix_fadvise DONTNEED)
+  ve ısınmış halde yükleme süresi; depo için ilk erişim (tüm sayfalara
+  dokunma, .to("cuda") / ilk çıkarım karşılığı) ayrıca ölçülür.
+- Bellek: yükleme ve dokunma sonrası RSS (anonim / dosya) ve PSS.
+- Paylaşım: N süreç aynı anda yükleyip dokunur; süreç başına PSS, depoda
+  sayfalar paylaşıldığı için yaklaşık boyut / N olmalıdır.
+
+Kontroller: depodaki tensörler mevcut yolun ürettiğiyle bit düzeyinde aynı;
+görünümler salt-okunur; aynı girişi eşzamanlı aktaran işçiler geçerli tek
+giriş bırakır; parmak izi değişen giriş yenilenir.
+
+Kullanım:
+    python -m benchmarks.bench_weight_load [--quick] [--output sonuc.json]
+
+Herhangi bir kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import add_common_args, emit
+
+from weight_store import MappedSafetensors, WeightStore, read_header, save_file
+
+COMPONENTS = {'unet': 0.7, 'text_encoder': 0.2, 'vae': 0.1}  # Boyut payları
+LORA_RANK = 8
+LORA_SCALE = 1.0
+FINGERPRINT = {'format': 1, 'model_id': 'sentetik/sdxl', 'base': None, 'lora': 'sentetik_lora', 'dtype': 'float16'}
+
+
+def build_checkpoint(tmp: Path, total_mb: int) -> Dict[str, Any]:
+    """Hub önbelleği yerine: bileşen başına fp32 checkpoint + LoRA dosyası"""
+    rng = np.random.default_rng(7)
+    hub = tmp / 'hub'
+    side = 512  # 512x512 fp32 = 1 MB
+    files, lora = {}, {}
+    for component, share in COMPONENTS.items():
+        count = max(1, int(total_mb * share))
+        tensors = {f"{component}.block{i}.weight": rng.standard_normal((side, side), dtype=np.float32) * 0.02
+                   for i in range(count)}
+        tensors[f"{component}.position_ids"] = np.arange(77, dtype=np.int64)
+        (hub / component).mkdir(parents=True)
+        save_file(tensors, hub / component / 'model.safetensors')
+        files[component] = hub / component / 'model.safetensors'
+        # Katmanların dörtte birine LoRA (A: r x in, B: out x r)
+        for i in range(0, count, 4):
+            name = f"{component}.block{i}.weight"
+            lora[f"{name}.lora_A"] = rng.standard_normal((LORA_RANK, side), dtype=np.float32) * 0.01
+            lora[f"{name}.lora_B"] = rng.standard_normal((side, LORA_RANK), dtype=np.float32) * 0.01
+    save_file(lora, hub / 'lora.safetensors')
+    return {'files': files, 'lora': hub / 'lora.safetensors'}
+
+
+def legacy_load(checkpoint: Dict[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Mevcut yol: oku + kopyala, fp16'ya dönüştür, LoRA'yı birleştir (özel bellek)"""
+    lora = _read_all(checkpoint['lora'])
+    components = {}
+    for component, path in checkpoint['files'].items():
+        tensors = {}
+        for name, array in _read_all(path).items():
+            if array.dtype == np.float32:
+                if f"{name}.lora_A" in lora:
+                    delta = lora[f"{name}.lora_B"] @ lora[f"{name}.lora_A"]
+                    array = array + LORA_SCALE * delta
+                array = array.astype(np.float16)
+            tensors[name] = array
+        components[component] = tensors
+    return components
+
+
+def _read_all(path: Path) -> Dict[str, np.ndarray]:
+    """safetensors.load_file gibi: dosyayı okuyup tensör başına özel kopya"""
+    header, data_start = read_header(path)
+    header.pop('__metadata__', None)
+    dtypes = {'F32': np.float32, 'F16': np.float16, 'I64': np.int64}
+    with open(path, 'rb') as f:
+        f.seek(data_start)
+        data = f.read()
+    return {name: np.frombuffer(data[start:end], dtype=dtypes[info['dtype']]).reshape(info['shape']).copy()
+            for name, info in header.items() for start, end in [info['data_offsets']]}
+
+
+def store_load(store: WeightStore, key: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """Depo yolu: bileşen dosyalarını eşle, kopyasız görünümler"""
+    return {name.split('/')[0]: mapped.state_dict('np') for name, mapped in store.open_tensors(key).items()}
+
+
+def touch(components: Dict[str, Dict[str, np.ndarray]]) -> float:
+    """Tüm sayfaları oku (cihaza taşıma / ilk çıkarım karşılığı)"""
+    total = 0.0
+    for tensors in components.values():
+        for array in tensors.values():
+            total += float(array.sum(dtype=np.float64))
+    return total
+
+
+def memory_mb() -> Dict[str, float]:
+    """/proc'tan RSS (anonim/dosya) ve PSS"""
+    values: Dict[str, float] = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                values[key] = int(rest.split()[0]) / 1024
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    values['Pss'] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return {key: round(value, 1) for key, value in values.items()}
+
+
+def evict(paths: List[Path]) -> None:
+    """Dosyaların temiz sayfalarını page cache'ten at (soğuk başlatma)"""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def _child(mode: str, checkpoint: Dict[str, Any], store_root: str, key: str, barrier, out) -> None:
+    """Taze süreçte yükle, dokun, ölç; barrier ile diğer süreçler de yüklüyken PSS oku"""
+    baseline = memory_mb()
+    started = time.perf_counter()
+    if mode == 'legacy':
+        components = legacy_load(checkpoint)
+    else:
+        components = store_load(WeightStore(store_root), key)
+    loaded = time.perf_counter()
+    after_load = memory_mb()
+    touch(components)
+    touched = time.perf_counter()
+    after_touch = memory_mb()
+    if barrier is not None:
+        barrier.wait(timeout=120)
+    shared = memory_mb()
+    if barrier is not None:
+        barrier.wait(timeout=120)  # Herkes ölçene kadar eşlemeler açık kalsın
+    out.put({
+        'load_ms': round((loaded - started) * 1000, 2),
+        'touch_ms': round((touched - loaded) * 1000, 2),
+        'ready_ms': round((touched - started) * 1000, 2),
+        'baseline_mb': baseline, 'after_load_mb': after_load, 'after_touch_mb': after_touch, 'shared_mb': shared,
+    })
+
+
+def spawn(mode: str, checkpoint: Dict[str, Any], store: WeightStore, key: str, processes: int = 1) -> List[Dict[str, Any]]:
+    ctx = multiprocessing.get_context('spawn')
+    out = ctx.Queue()
+    barrier = ctx.Barrier(processes) if processes > 1 else None
+    workers = [ctx.Process(target=_child, args=(mode, checkpoint, str(store.root), key, barrier, out))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    results = [out.get(timeout=300) for _ in workers]
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def check_equivalence(checkpoint: Dict[str, Any], store: WeightStore, key: str) -> Dict[str, Any]:
+    failures: List[str] = []
+    legacy = legacy_load(checkpoint)
+    stored = store_load(store, key)
+    if sorted(legacy) != sorted(stored):
+        failures.append(f"bileşenler: {sorted(legacy)} != {sorted(stored)}")
+    for component, tensors in legacy.items():
+        mapped = stored.get(component, {})
+        if sorted(tensors) != sorted(mapped):
+            failures.append(f"{component}: anahtarlar farklı")
+            continue
+        for name, array in tensors.items():
+            if array.dtype != mapped[name].dtype or not np.array_equal(array, mapped[name]):
+                failures.append(f"{component}/{name}: değerler farklı")
+
+    view = next(iter(stored['unet'].values()))
+    try:
+        view[0] = 0
+        failures.append("görünüm yazılabilir")
+    except ValueError:
+        pass
+    mapped = MappedSafetensors(store.files(key)[0])
+    if not np.shares_memory(mapped.array(mapped.keys()[0]), np.frombuffer(mapped._mmap, dtype=np.uint8)):
+        failures.append("görünüm eşlemeye bağlı değil (kopya)")
+    return {'tensors': sum(len(t) for t in legacy.values()), 'failures': failures, 'mismatches': len(failures)}
+
+
+def check_publish(tmp: Path, components: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Any]:
+    failures: List[str] = []
+    store = WeightStore(tmp / 'publish')
+    small = {name: dict(list(tensors.items())[:2]) for name, tensors in components.items()}
+    errors: List[Exception] = []
+
+    def export():
+        try:
+            WeightStore(store.root).save_tensors('race', FINGERPRINT, small)
+        except Exception as e:  # noqa: BLE001 - yarış hatası kontrol sonucu
+            errors.append(e)
+
+    threads = [threading.Thread(target=export) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors or not store.has('race', FINGERPRINT):
+        failures.append(f"eşzamanlı aktarım: {errors[:1]}")
+    if any(path.name.startswith('.') for path in store.root.iterdir()):
+        failures.append("geçici dizin kaldı")
+
+    stale = dict(FINGERPRINT, dtype='float32')
+    if store.has('race', stale):
+        failures.append("farklı parmak izi kabul edildi")
+    old = store.open_tensors('race')  # Eski girişi eşlemiş süreç
+    store.save_tensors('race', stale, small)
+    if not store.has('race', stale):
+        failures.append("eski giriş yenilenmedi")
+    try:
+        touch({'old': next(iter(old.values())).state_dict('np')})
+    except Exception as e:  # noqa: BLE001
+        failures.append(f"eski eşleme okunamadı: {e}")
+    return {'failures': failures, 'mismatches': len(failures)}
+
+
+def run(checkpoint: Dict[str, Any], store: WeightStore, key: str, processes: int) -> List[Dict[str, Any]]:
+    source_files = list(checkpoint['files'].values()) + [checkpoint['lora']]
+    store_files = store.files(key)
+    source_mb = round(sum(p.stat().st_size for p in source_files) / 2**20, 1)
+    store_mb = round(sum(p.stat().st_size for p in store_files) / 2**20, 1)
+    results = []
+    for cache in ('cold', 'warm'):
+        for mode in ('legacy', 'store'):
+            if cache == 'cold':
+                evict(source_files + store_files)
+            else:
+                spawn(mode, checkpoint, store, key)  # Sayfaları ısıt
+            sample = spawn(mode, checkpoint, store, key)[0]
+            results.append({'name': f"weights.{mode}/{cache}", 'implementation': mode, 'page_cache': cache,
+                            'source_mb': source_mb, 'store_mb': store_mb, **sample})
+        legacy, stored = results[-2], results[-1]
+        stored['load_speedup'] = round(legacy['load_ms'] / max(stored['load_ms'], 1e-3), 1)
+        stored['ready_speedup'] = round(legacy['ready_ms'] / max(stored['ready_ms'], 1e-3), 2)
+
+    # Aynı makinede N işçi: süreç başına PSS
+    for mode in ('legacy', 'store'):
+        samples = spawn(mode, checkpoint, store, key, processes=processes)
+        pss = [sample['shared_mb'].get('Pss', 0.0) - sample['baseline_mb'].get('Pss', 0.0) for sample in samples]
+        anon = [sample['shared_mb']['RssAnon'] - sample['baseline_mb']['RssAnon'] for sample in samples]
+        results.append({'name': f"weights.{mode}/processes/{processes}", 'implementation': mode,
+                        'processes': processes, 'store_mb': store_mb,
+                        'pss_delta_mb_per_process': round(sum(pss) / len(pss), 1),
+                        'pss_delta_mb_total': round(sum(pss), 1),
+                        'anon_delta_mb_per_process': round(sum(anon) / len(anon), 1)})
+    legacy, stored = results[-2], results[-1]
+    stored['pss_total_reduction'] = round(legacy['pss_delta_mb_total'] / max(stored['pss_delta_mb_total'], 1e-3), 2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument('--processes', type=int, default=3, help='Paylaşım ölçümündeki işçi süreci sayısı')
+    args = parser.parse_args(argv)
+
+    total_mb = 64 if args.quick else 384
+    with tempfile.TemporaryDirectory(dir=os.environ.get('VSG_BENCH_TMP')) as tmp:
+        tmp = Path(tmp)
+        checkpoint = build_checkpoint(tmp, total_mb)
+        store = WeightStore(tmp / 'store')
+        key = 'sentetik-fp16'
+        started = time.perf_counter()
+        store.save_tensors(key, FINGERPRINT, legacy_load(checkpoint))
+        export_seconds = round(time.perf_counter() - started, 3)
+
+        equivalence = check_equivalence(checkpoint, store, key)
+        publish = check_publish(tmp, store_load(store, key))
+        results = run(checkpoint, store, key, args.processes)
+
+    emit('weight_load', results, args.output, equivalence=equivalence, publish=publish,
+         config={'source_fp32_mb': total_mb, 'export_seconds': export_seconds, 'lora_rank': LORA_RANK})
+    if equivalence['mismatches'] or publish['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
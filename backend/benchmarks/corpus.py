@@ -0,0 +1,172 @@
+"""
+Sentetik Hikaye Korpusu
+=======================
+Benchmark'lar için deterministik Türkçe/İngilizce hikaye metinleri.
+Aynı seed her zaman aynı metni üretir, böylece sonuçlar karşılaştırılabilir.
+"""
+
+import random
+from typing import Dict, List
+
+DEFAULT_SEED = 1923
+
+# Korpus boyutları: (cümle sayısı, paragraf başına cümle)
+SIZES = {
+    'sentence': (1, 1),
+    'short_story': (12, 4),
+    'chapter': (240, 6),
+}
+
+LANGUAGES = ('tr', 'en')
+
+_VOCAB = {
+    'tr': {
+        'names': ['Ayşe', 'Mehmet', 'Zeynep', 'Ali', 'Elif', 'Murat', 'Deniz', 'Kaan'],
+        'places': ['ormanda', 'evde', 'sahilde', 'sokakta', 'sarayda', 'dağın tepesinde',
+                   'bahçede', 'mağarada', 'İstanbul sokaklarında', 'eski kalede'],
+        'times': ['sabah', 'gece', 'akşam', 'gece yarısı', 'şafak vakti', 'öğle'],
+        'emotions': ['mutlu', 'korku', 'hüzün', 'öfke', 'umut', 'gizem', 'huzur',
+                     'özlem', 'gerilim', 'sevinç', 'dehşet', 'aşk'],
+        'modifiers': ['çok', 'biraz', 'aşırı', 'hafif', 'inanılmaz', ''],
+        'verbs': ['geldi', 'gitti', 'baktı', 'koştu', 'gülümsedi', 'ağladı', 'bekledi',
+                  'konuştu', 'düşündü', 'kaçtı', 'buldu', 'hatırladı'],
+        'objects': ['eski mektubu', 'kırık aynayı', 'paslı anahtarı', 'yıldızları',
+                    'kapıyı', 'denizi', 'annesini', 'saati'],
+        'colors': ['kırmızı', 'mavi', 'altın', 'siyah', 'beyaz', 'gri'],
+        'weather': ['yağmur', 'sis', 'rüzgar', 'kar', 'fırtına', 'güneş'],
+        'templates': [
+            '{time} {place} {name} {mod} {emotion} içinde {verb}.',
+            '{name} {object} görünce {mod} {emotion} duydu ve {verb}.',
+            '{weather} başlamıştı, {color} gökyüzünün altında {name} {verb}.',
+            '{name} {emotion} değil, sadece yorgundu ama yine de {verb}.',
+            'Sanki {emotion} her yeri sarmıştı; {name} {place} {verb}.',
+            '{name} ile {name2} {place} {object} aradılar, sonra {verb}.',
+            'Neden {name} {mod} {emotion} hissediyordu?',
+            '{time} olduğunda {name} {object} {verb}!',
+        ],
+    },
+    'en': {
+        'names': ['Anna', 'John', 'Maya', 'Leo', 'Clara', 'Sam', 'Nora', 'Ethan'],
+        'places': ['in the forest', 'at home', 'on the shore', 'in the street',
+                   'in the palace', 'on the mountain', 'in the garden', 'in the cave'],
+        'times': ['In the morning', 'At night', 'In the evening', 'At midnight', 'At dawn'],
+        'emotions': ['happy', 'fear', 'sorrow', 'rage', 'hope', 'mystery', 'calm',
+                     'love', 'tense', 'joy', 'terror', 'nostalgic'],
+        'modifiers': ['very', 'slightly', 'extremely', 'a little', 'incredibly', ''],
+        'verbs': ['arrived', 'left', 'looked away', 'ran', 'smiled', 'cried', 'waited',
+                  'spoke', 'wondered', 'escaped', 'found it', 'remembered'],
+        'objects': ['the old letter', 'the broken mirror', 'the rusty key', 'the stars',
+                    'the door', 'the sea', 'her mother', 'the clock'],
+        'colors': ['red', 'blue', 'golden', 'black', 'white', 'gray'],
+        'weather': ['Rain', 'Fog', 'Wind', 'Snow', 'A storm', 'Sunlight'],
+        'templates': [
+            '{time} {name} felt {mod} {emotion} {place} and {verb}.',
+            '{name} saw {object} and felt {mod} {emotion}, then {verb}.',
+            '{weather} came under a {color} sky while {name} {verb}.',
+            '{name} was not {emotion}, only tired, but still {verb}.',
+            'As if {emotion} filled the air, {name} {verb} {place}.',
+            '{name} and {name2} searched for {object} {place}, then {verb}.',
+            'Why did {name} feel so {emotion}?',
+            '{time} {name} {verb} with {object}!',
+        ],
+    },
+}
+
+
+def _sentence(rng: random.Random, lang: str) -> str:
+    """Şablondan tek bir cümle üret"""
+    vocab = _VOCAB[lang]
+    template = rng.choice(vocab['templates'])
+    name, name2 = rng.sample(vocab['names'], 2)
+    sentence = template.format(
+        name=name,
+        name2=name2,
+        time=rng.choice(vocab['times']),
+        place=rng.choice(vocab['places']),
+        emotion=rng.choice(vocab['emotions']),
+        mod=rng.choice(vocab['modifiers']),
+        verb=rng.choice(vocab['verbs']),
+        object=rng.choice(vocab['objects']),
+        color=rng.choice(vocab['colors']),
+        weather=rng.choice(vocab['weather']),
+    )
+    return ' '.join(sentence.split())
+
+
+def generate_text(size: str, lang: str = 'tr', seed: int = DEFAULT_SEED) -> str:
+    """Belirtilen boyut ve dilde deterministik metin üret"""
+    if size not in SIZES:
+        raise ValueError(f"Bilinmeyen korpus boyutu: {size}")
+    if lang not in _VOCAB:
+        raise ValueError(f"Bilinmeyen dil: {lang}")
+
+    sentence_count, per_paragraph = SIZES[size]
+    rng = random.Random(f"{seed}:{size}:{lang}")
+
+    paragraphs = []
+    for start in range(0, sentence_count, per_paragraph):
+        count = min(per_paragraph, sentence_count - start)
+        paragraphs.append(' '.join(_sentence(rng, lang) for _ in range(count)))
+
+    return '\n\n'.join(paragraphs)
+
+
+def generate_sentences(count: int, lang: str = 'tr', seed: int = DEFAULT_SEED) -> List[str]:
+    """Bağımsız cümle listesi üret (toplu işlem benchmark'ları için)"""
+    rng = random.Random(f"{seed}:sentences:{lang}")
+    return [_sentence(rng, lang) for _ in range(count)]
+
+
+def scaled_text(multiplier: int, lang: str = 'tr', seed: int = DEFAULT_SEED) -> str:
+    """Kısa hikayeyi N kez büyüterek ölçekleme eğrisi için metin üret"""
+    rng = random.Random(f"{seed}:scaled:{lang}")
+    sentence_count = SIZES['short_story'][0] * multiplier
+    return ' '.join(_sentence(rng, lang) for _ in range(sentence_count))
+
+
+# Sınır durumları: negasyon, pencere kenarındaki değiştiriciler, önek çakışmaları,
+# Türkçe büyük harf dönüşümü, boş/kısa girdiler
+EDGE_CASES = [
+    "",
+    "az",
+    "Mutlu değil.",
+    "Hiç mutlu olmadı, asla korkmadı ama çok üzgündü.",
+    "İnanılmaz bir sevinçle koştu; sevinç gözyaşları döktü.",
+    "Mutluluk ve mutlu anlar, sevinç ve sevinmek.",
+    "çok                            mutlu",
+    "çok                             mutlu",
+    "mutlu                              biraz",
+    "mutlu                             biraz",
+    "Sanki korkmuş gibi davrandı, güya hiç korkmamıştı.",
+    "ISPARTA'DA İNANILMAZ KORKU, İçi DEHŞETLE doldu.",
+    "She was not happy, but she was extremely afraid and a little sad.",
+    "As if he were calm. Yeah right, of course he was terrified.",
+    "a bit a little slightly somewhat barely hardly very deeply",
+    "Yazın azıcık hafif bir huzur vardı, birazcık da özlem.",
+    "Gizemli sır, bilinmeyen esrar; karanlık gece yarısı belirsiz bir şüphe.",
+    "nostalji nostalgic özlem anı hatıra geçmiş çocukluk",
+]
+
+
+def regression_texts(seed: int = DEFAULT_SEED, sentences_per_lang: int = 200) -> List[str]:
+    """Eşdeğerlik kontrolleri için metin listesi (cümleler, tüm boyutlar, sınır durumları)"""
+    texts: List[str] = list(EDGE_CASES)
+    for lang in LANGUAGES:
+        texts.extend(generate_sentences(sentences_per_lang, lang, seed))
+        for size in SIZES:
+            texts.append(generate_text(size, lang, seed))
+        texts.append(scaled_text(4, lang, seed))
+    return texts
+
+
+def build_corpus(seed: int = DEFAULT_SEED) -> Dict[str, Dict[str, str]]:
+    """Tüm boyut/dil kombinasyonlarını içeren korpus"""
+    return {
+        size: {lang: generate_text(size, lang, seed) for lang in LANGUAGES}
+        for size in SIZES
+    }
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(build_corpus(), ensure_ascii=False, indent=2))
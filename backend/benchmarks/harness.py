@@ -0,0 +1,168 @@
+"""
+Benchmark Altyapısı
+===================
+Gecikme dağılımı, tracemalloc bellek ölçümü, ölçekleme eğrisi
+ve kararlı JSON çıktısı.
+"""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Çıktı şeması - alan eklemek geriye uyumludur, değiştirmek sürüm artırır
+SCHEMA = "vsg-bench/1"
+
+
+def _percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Doğrusal interpolasyonlu yüzdelik"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def latency_stats(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Milisaniye örneklerinden dağılım özeti"""
+    ordered = sorted(samples_ms)
+    return {
+        'min': round(ordered[0], 4),
+        'p50': round(_percentile(ordered, 50), 4),
+        'p90': round(_percentile(ordered, 90), 4),
+        'p99': round(_percentile(ordered, 99), 4),
+        'max': round(ordered[-1], 4),
+        'mean': round(statistics.fmean(ordered), 4),
+        'stdev': round(statistics.pstdev(ordered), 4),
+    }
+
+
+def measure_latency(fn: Callable[[], Any], repeat: int = 50, warmup: int = 3,
+                    min_time_s: float = 0.0) -> List[float]:
+    """Fonksiyonu tekrar tekrar çalıştırıp ms cinsinden süreleri döndür"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        while len(samples) < repeat or (time.perf_counter() - started) < min_time_s:
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000.0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def measure_allocations(fn: Callable[[], Any], calls: int = 5) -> Dict[str, float]:
+    """tracemalloc ile çağrı başına ayrılan bellek ve tepe kullanım"""
+    fn()  # Tembel başlatmaları ölçüm dışında tut
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            fn()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    allocated = sum(s.size_diff for s in stats if s.size_diff > 0)
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    return {
+        'peak_bytes': peak,
+        'retained_bytes_per_call': round(allocated / calls, 1),
+        'retained_blocks_per_call': round(blocks / calls, 1),
+    }
+
+
+def scaling_exponent(points: Sequence[Dict[str, float]], x_key: str = 'chars',
+                     y_key: str = 'p50_ms') -> Optional[float]:
+    """log-log en küçük kareler eğimi (1.0 ~ doğrusal, 2.0 ~ karesel)"""
+    pairs = [(math.log(p[x_key]), math.log(p[y_key]))
+             for p in points if p[x_key] > 0 and p[y_key] > 0]
+    if len(pairs) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in pairs)
+    mean_y = statistics.fmean(y for _, y in pairs)
+    denom = sum((x - mean_x) ** 2 for x, _ in pairs)
+    if denom == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in pairs) / denom
+    return round(slope, 3)
+
+
+def run_case(name: str, fn: Callable[[], Any], repeat: int = 50, warmup: int = 3,
+             alloc_calls: int = 5, units_per_call: int = 1,
+             extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Tek bir benchmark vakasını çalıştır ve sonuç kaydı üret"""
+    samples = measure_latency(fn, repeat=repeat, warmup=warmup)
+    latency = latency_stats(samples)
+    record: Dict[str, Any] = {
+        'name': name,
+        'samples': len(samples),
+        'latency_ms': latency,
+        'throughput_per_s': round(units_per_call * 1000.0 / latency['mean'], 2) if latency['mean'] > 0 else None,
+    }
+    if alloc_calls > 0:
+        record['alloc'] = measure_allocations(fn, calls=alloc_calls)
+    if extra:
+        record.update(extra)
+    return record
+
+
+def environment() -> Dict[str, str]:
+    """Sonuçları yorumlamak için çalışma ortamı bilgisi"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def emit(suite: str, results: List[Dict[str, Any]], output: Optional[str] = None,
+         **sections: Any) -> Dict[str, Any]:
+    """Sonuçları kararlı JSON formatında yaz (dosya veya stdout)"""
+    document = {
+        'schema': SCHEMA,
+        'suite': suite,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': results,
+    }
+    document.update(sections)
+
+    text = json.dumps(document, ensure_ascii=False, indent=2, sort_keys=True)
+    if output and output != '-':
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+    return document
+
+
+def add_common_args(parser) -> None:
+    """Tüm benchmark CLI'larında ortak argümanlar"""
+    parser.add_argument('--repeat', type=int, default=50, help='Vaka başına ölçüm sayısı')
+    parser.add_argument('--warmup', type=int, default=3, help='Isınma çağrısı sayısı')
+    parser.add_argument('--output', '-o', default='-', help='JSON çıktı dosyası (- = stdout)')
+    parser.add_argument('--quick', action='store_true', help='Hızlı duman testi (az tekrar)')
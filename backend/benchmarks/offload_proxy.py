@@ -0,0 +1,165 @@
+"""
+Ters Vekil Taklidi (X-Accel-Redirect / X-Sendfile)
+==================================================
+nginx veya mod_xsendfile olmadan görsel devrini doğrulamak için yerel
+fikstür. Arka uç yanıtındaki dahili yönlendirme başlığını çözer, dosyayı
+diskten okur, Range'i uygular ve istemciye gidecek son yanıtı üretir.
+Davranış nginx'in `internal` location'ı ile aynıdır:
+
+- X-Accel-Redirect yolu yalnızca tanımlı location önekleri altında çözülür
+  (önek -> dizin); dışarıdaki yollar 404.
+- X-Sendfile mutlak yolu yalnızca izin verilen kök dizinler altında sunulur.
+- Yönlendirme başlığı istemciye iletilmez; Content-Type, Cache-Control,
+  ETag, Last-Modified ve Accept-Ranges korunur.
+
+İki kullanım:
+    EmulatedProxy(...).finalize(status, headers, body, request_headers)   # süreç içi
+    python -m benchmarks.offload_proxy --backend http://127.0.0.1:8765 \\
+        --location /_protected_images=./generated_images --port 8080     # çalışan sunucunun önünde
+"""
+
+import argparse
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional
+from urllib.parse import unquote, urlsplit
+
+import image_serving
+
+PASSED_HEADERS = ('content-type', 'cache-control', 'etag', 'last-modified', 'accept-ranges')
+
+
+class ProxyResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    offloaded: bool
+
+
+class EmulatedProxy:
+    """nginx internal location / mod_xsendfile taklidi"""
+
+    def __init__(self, locations: Optional[Mapping[str, str]] = None, sendfile_roots: Iterable[str] = ()):
+        self.locations = {prefix.rstrip('/') + '/': Path(root).resolve()
+                          for prefix, root in (locations or {}).items()}
+        self.sendfile_roots = [Path(root).resolve() for root in sendfile_roots]
+
+    def _target(self, headers: Mapping[str, str]) -> Optional[Path]:
+        """Yönlendirme başlığından dosya; başlık yoksa None, çözülemezse FileNotFoundError"""
+        lower = {key.lower(): value for key, value in headers.items()}
+        accel = lower.get('x-accel-redirect')
+        if accel is not None:
+            path = unquote(urlsplit(accel).path)
+            for prefix, root in self.locations.items():
+                if path.startswith(prefix):
+                    target = (root / path[len(prefix):]).resolve()
+                    if target.parent == root or root in target.parents:
+                        return target
+            raise FileNotFoundError(accel)
+        sendfile = lower.get('x-sendfile')
+        if sendfile is not None:
+            target = Path(sendfile).resolve()
+            if any(root in target.parents for root in self.sendfile_roots):
+                return target
+            raise FileNotFoundError(sendfile)
+        return None
+
+    def finalize(self, status: int, headers: Mapping[str, str], body: bytes,
+                 request_headers: Mapping[str, str]) -> ProxyResponse:
+        """Arka uç yanıtından istemciye gidecek yanıt"""
+        try:
+            target = self._target(headers)
+        except FileNotFoundError:
+            return ProxyResponse(404, {}, b'', True)
+        if target is None:
+            return ProxyResponse(status, dict(headers), body, False)
+
+        passed = {key: value for key, value in headers.items() if key.lower() in PASSED_HEADERS}
+        try:
+            size = target.stat().st_size
+        except OSError:
+            return ProxyResponse(404, {}, b'', True)
+
+        range_header = {key.lower(): value for key, value in request_headers.items()}.get('range')
+        if range_header:
+            try:
+                byte_range = image_serving.parse_range(range_header, size)
+            except image_serving.RangeNotSatisfiable:
+                return ProxyResponse(416, {**passed, 'Content-Range': f"bytes */{size}"}, b'', True)
+            if byte_range is not None:
+                start, end = byte_range
+                data = image_serving.read_range(target, start, end)
+                return ProxyResponse(206, {**passed, 'Content-Range': f"bytes {start}-{end}/{size}",
+                                           'Content-Length': str(len(data))}, data, True)
+        data = target.read_bytes()
+        return ProxyResponse(200, {**passed, 'Content-Length': str(len(data))}, data, True)
+
+
+def _parse_locations(values: Iterable[str]) -> Dict[str, str]:
+    locations = {}
+    for value in values:
+        prefix, sep, root = value.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"önek=dizin bekleniyor: {value}")
+        locations[prefix] = root
+    return locations
+
+
+def serve(backend: str, port: int, proxy: EmulatedProxy) -> None:
+    """Çalışan sunucunun önünde basit HTTP vekili (yalnızca GET/HEAD)"""
+    target = urlsplit(backend)
+
+    class Handler(BaseHTTPRequestHandler):
+        def _forward(self, send_body: bool):
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+            try:
+                headers = {key: value for key, value in self.headers.items() if key.lower() != 'host'}
+                conn.request(self.command, self.path, headers=headers)
+                upstream = conn.getresponse()
+                body = upstream.read()
+                result = proxy.finalize(upstream.status, dict(upstream.getheaders()), body, self.headers)
+            finally:
+                conn.close()
+
+            self.send_response(result.status)
+            for key, value in result.headers.items():
+                if key.lower() not in ('transfer-encoding', 'connection', 'content-length'):
+                    self.send_header(key, value)
+            self.send_header('Content-Length', str(len(result.body)))
+            if result.offloaded:
+                self.send_header('X-Offload-Emulated', '1')
+            self.end_headers()
+            if send_body:
+                self.wfile.write(result.body)
+
+        def do_GET(self):
+            self._forward(True)
+
+        def do_HEAD(self):
+            self._forward(False)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f"Vekil taklidi: http://127.0.0.1:{port} -> {backend}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default='http://127.0.0.1:8765')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--location', action='append', default=[],
+                        help='X-Accel-Redirect öneki=dizin (ör. /_protected_images=./generated_images)')
+    parser.add_argument('--sendfile-root', action='append', default=[], help='X-Sendfile için izinli kök dizin')
+    args = parser.parse_args(argv)
+    locations = _parse_locations(args.location) or {'/_protected_images': './generated_images'}
+    serve(args.backend, args.port, EmulatedProxy(locations, args.sendfile_root or list(locations.values())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+"""
+Referans (Eski) Uygulamalar
+===========================
+Optimize edilen kod yollarının değişiklik öncesi birebir kopyaları.
+Benchmark'lar hem hız karşılaştırması hem de çıktı eşdeğerliği için kullanır.
+Bu dosyadaki kod bilerek dondurulmuştur; güncellemeyin.
+"""
+
+import json
+import logging
+import re
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from emotion_analyzer import EmotionAnalyzer, EmotionClass, EmotionResult
+from security import ContentCheckResult, ContentFilter, PathSecurity
+from turkish_nlp import (
+    EntityRecognizer, Sentence, SentenceAnalyzer, TenseType, ThemeAnalyzer, TurkishMorphology, VoiceType, Word, WordType,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LegacyEmotionAnalyzer(EmotionAnalyzer):
+    """Kelime başına alt dize taraması yapan ilk EmotionAnalyzer"""
+
+    @classmethod
+    def analyze(cls, text: str) -> EmotionResult:
+        lower_text = text.lower()
+
+        emotion_scores: Dict[EmotionClass, Tuple[int, int]] = {}
+
+        for emotion, data in cls.EMOTION_PATTERNS.items():
+            total_score = 0
+            count = 0
+
+            for keyword, base_intensity in data['keywords'].items():
+                if keyword in lower_text:
+                    if cls._is_negated(lower_text, keyword):
+                        continue
+
+                    intensity = base_intensity
+                    intensity += cls._get_intensity_modifier(lower_text, keyword)
+                    intensity = max(1, min(10, intensity))
+
+                    total_score += intensity
+                    count += 1
+
+            if count > 0:
+                emotion_scores[emotion] = (total_score, count)
+
+        if not emotion_scores:
+            return EmotionResult(
+                primary_emotion=EmotionClass.NEUTRAL,
+                intensity=5,
+                secondary_emotions=[],
+                confidence=0.5,
+                context_notes=["Belirgin duygu tespit edilemedi"],
+                visual_cues={
+                    'colors': 'neutral tones, balanced palette',
+                    'lighting': 'natural, even lighting',
+                    'atmosphere': 'neutral, observational'
+                }
+            )
+
+        sorted_emotions = sorted(
+            emotion_scores.items(),
+            key=lambda x: x[1][0] / x[1][1],
+            reverse=True
+        )
+
+        primary = sorted_emotions[0][0]
+        primary_avg = sorted_emotions[0][1][0] / sorted_emotions[0][1][1]
+        primary_intensity = round(primary_avg)
+
+        secondary = [
+            (e, round(s[0] / s[1]))
+            for e, s in sorted_emotions[1:4]
+        ]
+
+        total_keywords = sum(s[1] for s in emotion_scores.values())
+        confidence = min(1.0, total_keywords / 5)
+
+        context_notes = []
+        if cls._has_negation(lower_text):
+            context_notes.append("Negasyon tespit edildi - duygu yorumu dikkatli yapıldı")
+        if cls._has_irony_markers(lower_text):
+            context_notes.append("Olası ironi/alay işaretleri tespit edildi")
+        if len(secondary) > 1:
+            context_notes.append("Karmaşık/çoklu duygu durumu")
+
+        visual_cues = cls.EMOTION_PATTERNS[primary]['visual']
+
+        return EmotionResult(
+            primary_emotion=primary,
+            intensity=primary_intensity,
+            secondary_emotions=secondary,
+            confidence=round(confidence, 2),
+            context_notes=context_notes,
+            visual_cues=visual_cues
+        )
+
+    @classmethod
+    def _is_negated(cls, text: str, keyword: str) -> bool:
+        for pattern in cls.NEGATION_PATTERNS:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match and keyword in match.group(0):
+                return True
+        return False
+
+    @classmethod
+    def _has_negation(cls, text: str) -> bool:
+        negation_words = ['değil', 'yok', 'olmayan', 'hiç', 'asla', 'not', 'never', "n't"]
+        return any(w in text for w in negation_words)
+
+    @classmethod
+    def _has_irony_markers(cls, text: str) -> bool:
+        irony_markers = ['sanki', 'güya', 'sözde', 'tabii ki', 'evet evet',
+                         'as if', 'yeah right', 'sure', 'of course']
+        return any(m in text for m in irony_markers)
+
+    @classmethod
+    def _get_intensity_modifier(cls, text: str, keyword: str) -> int:
+        modifier = 0
+
+        keyword_idx = text.find(keyword)
+        if keyword_idx == -1:
+            return 0
+
+        context = text[max(0, keyword_idx-30):keyword_idx+len(keyword)+30]
+
+        for booster, value in cls.INTENSITY_BOOSTERS.items():
+            if booster in context:
+                modifier += value
+
+        for reducer, value in cls.INTENSITY_REDUCERS.items():
+            if reducer in context:
+                modifier += value
+
+        return modifier
+
+
+class LegacyTurkishMorphology(TurkishMorphology):
+    """Her ek için endswith + replace döngüsü yapan ilk TurkishMorphology (önbelleksiz)"""
+
+    @classmethod
+    def analyze_word(cls, word: str) -> Word:
+        """Kelimeyi morfolojik olarak analiz et"""
+        text = word.lower().strip()
+
+        # Başlangıç değerleri
+        result = Word(
+            text=text,
+            lemma=text,
+            word_type=WordType.UNKNOWN,
+            suffixes=[],
+            confidence=0.5
+        )
+
+        # Fiil mi kontrol et
+        verb_info = cls._analyze_verb(text)
+        if verb_info:
+            result.word_type = WordType.VERB
+            result.lemma = verb_info['lemma']
+            result.tense = verb_info.get('tense')
+            result.is_negated = verb_info.get('negated', False)
+            result.voice = verb_info.get('voice')
+            result.person = verb_info.get('person')
+            result.plural = verb_info.get('plural', False)
+            result.suffixes = verb_info.get('suffixes', [])
+            result.confidence = 0.8
+            return result
+
+        # İsim mi kontrol et
+        noun_info = cls._analyze_noun(text)
+        if noun_info:
+            result.word_type = WordType.NOUN
+            result.lemma = noun_info['lemma']
+            result.case = noun_info.get('case')
+            result.plural = noun_info.get('plural', False)
+            result.suffixes = noun_info.get('suffixes', [])
+            result.confidence = 0.7
+            return result
+
+        # Sıfat mı
+        if cls._is_adjective(text):
+            result.word_type = WordType.ADJECTIVE
+            result.confidence = 0.6
+
+        return result
+
+    @classmethod
+    def _analyze_verb(cls, word: str) -> Optional[Dict]:
+        """Fiil analizi"""
+        result = {'lemma': word, 'suffixes': []}
+
+        # Zaman eki kontrolü
+        for tense, suffixes in cls.VERB_SUFFIXES.items():
+            if tense in ['past', 'present', 'future', 'past_perfect', 'aorist']:
+                for suffix in suffixes:
+                    if word.endswith(suffix.replace('-', '')):
+                        result['tense'] = TenseType(tense)
+                        result['lemma'] = word[:-len(suffix.replace('-', ''))]
+                        result['suffixes'].append(suffix)
+                        break
+
+        # Tense bulunamadıysa fiil değil
+        if 'tense' not in result:
+            # Yaygın fiil kökleri kontrolü
+            common_verb_roots = ['gel', 'git', 'bak', 'gör', 'al', 'ver', 'yap', 'et', 'ol', 'kal',
+                                'bil', 'iste', 'sev', 'düşün', 'anla', 'konuş', 'yürü', 'koş', 'otur', 'kalk']
+            for root in common_verb_roots:
+                if word.startswith(root):
+                    result['lemma'] = root
+                    result['tense'] = TenseType.UNKNOWN
+                    break
+            else:
+                return None
+
+        # Olumsuzluk kontrolü
+        for neg in cls.VERB_SUFFIXES['negative']:
+            neg_clean = neg.replace('-', '')
+            if neg_clean in word:
+                result['negated'] = True
+                result['suffixes'].append(neg)
+                break
+
+        # Edilgenlik kontrolü
+        for passive in cls.VERB_SUFFIXES['passive']:
+            passive_clean = passive.replace('-', '')
+            if passive_clean in word and word.index(passive_clean) < len(word) - 3:
+                result['voice'] = VoiceType.PASSIVE
+                result['suffixes'].append(passive)
+                break
+
+        # Kişi eki
+        if word.endswith('m'):
+            result['person'] = 1
+        elif word.endswith('n') or word.endswith('sın') or word.endswith('sin'):
+            result['person'] = 2
+        elif word.endswith('lar') or word.endswith('ler'):
+            result['person'] = 3
+            result['plural'] = True
+        else:
+            result['person'] = 3
+
+        return result
+
+    @classmethod
+    def _analyze_noun(cls, word: str) -> Optional[Dict]:
+        """İsim analizi"""
+        result = {'lemma': word, 'suffixes': []}
+
+        # Çoğul kontrolü
+        for plural in cls.PLURAL_SUFFIXES:
+            plural_clean = plural.replace('-', '')
+            if word.endswith(plural_clean):
+                result['plural'] = True
+                result['lemma'] = word[:-len(plural_clean)]
+                result['suffixes'].append(plural)
+                break
+
+        # Hal eki kontrolü
+        lemma = result['lemma']
+        for case, suffixes in cls.NOUN_CASES.items():
+            for suffix in suffixes:
+                suffix_clean = suffix.replace('-', '')
+                if lemma.endswith(suffix_clean):
+                    result['case'] = case
+                    result['lemma'] = lemma[:-len(suffix_clean)]
+                    result['suffixes'].append(suffix)
+                    return result
+
+        # En az bir özellik varsa isim kabul et
+        if result.get('plural') or len(word) > 2:
+            return result
+
+        return None
+
+    @classmethod
+    def _is_adjective(cls, word: str) -> bool:
+        """Sıfat kontrolü"""
+        for suffix in cls.ADJECTIVE_SUFFIXES:
+            if word.endswith(suffix.replace('-', '')):
+                return True
+        return False
+
+
+class LegacySentenceAnalyzer(SentenceAnalyzer):
+    """Kelimeleri LegacyTurkishMorphology ile analiz eden SentenceAnalyzer"""
+
+    @classmethod
+    def analyze(cls, text: str) -> Sentence:
+        """Cümleyi analiz et"""
+        text = text.strip()
+
+        result = Sentence(
+            text=text,
+            sentence_type=cls._detect_sentence_type(text),
+            words=[],
+            phrases=[],
+            complexity_score=0.0
+        )
+
+        # Kelimeleri analiz et
+        words = cls._tokenize(text)
+        for word in words:
+            result.words.append(LegacyTurkishMorphology.analyze_word(word))
+
+        # Özne, yüklem, nesne bul
+        result.subject = cls._find_subject(result.words)
+        result.predicate = cls._find_predicate(result.words)
+        result.objects = cls._find_objects(result.words)
+        result.adverbials = cls._find_adverbials(text)
+
+        # Zaman ve olumsuzluk
+        result.tense = cls._determine_tense(result.words, text)
+        result.is_negative = cls._is_negative(result.words, text)
+        result.is_passive = cls._is_passive(result.words)
+
+        # Karmaşıklık skoru
+        result.complexity_score = cls._calculate_complexity(result)
+
+        return result
+
+
+class LegacyThemeAnalyzer(ThemeAnalyzer):
+    """Her tema/mood kelimesi için text_lower.count yapan ilk ThemeAnalyzer"""
+
+    @classmethod
+    def analyze_themes(cls, text: str) -> List[Tuple[str, float]]:
+        """Temaları analiz et ve skorla"""
+        text_lower = text.lower()
+        theme_scores = {}
+
+        for theme, data in cls.THEMES.items():
+            score = 0.0
+            for keyword in data['keywords']:
+                count = text_lower.count(keyword)
+                if count > 0:
+                    score += count * data['weight']
+
+            if score > 0:
+                theme_scores[theme] = min(score / 3.0, 1.0)  # Normalize
+
+        # Sırala ve döndür
+        sorted_themes = sorted(theme_scores.items(), key=lambda x: x[1], reverse=True)
+        return sorted_themes[:5]  # Top 5 tema
+
+    @classmethod
+    def analyze_mood(cls, text: str) -> Tuple[str, float, Dict]:
+        """Mood analizi yap"""
+        text_lower = text.lower()
+        mood_scores = {}
+
+        for mood, data in cls.MOODS.items():
+            score = 0.0
+            for keyword in data['keywords']:
+                count = text_lower.count(keyword)
+                if count > 0:
+                    score += count
+
+            if score > 0:
+                mood_scores[mood] = score
+
+        if not mood_scores:
+            return 'neutral', 0.5, {'visual': 'balanced natural lighting, normal colors', 'color_palette': []}
+
+        # En yüksek skorlu mood
+        best_mood = max(mood_scores, key=mood_scores.get)
+        intensity = min(mood_scores[best_mood] / 5.0, 1.0)
+
+        return best_mood, intensity, {
+            'visual': cls.MOODS[best_mood]['visual'],
+            'color_palette': cls.MOODS[best_mood]['color_palette']
+        }
+
+
+class LegacyEntityRecognizer(EntityRecognizer):
+    """Sabit kümeler ve LOCATION_INDICATORS üzerinde kelime başına döngü yapan ilk EntityRecognizer"""
+
+    @classmethod
+    def extract_entities(cls, text: str) -> Dict[str, List[str]]:
+        """Metinden varlıkları çıkar"""
+        entities = {
+            'PERSON': [],
+            'LOCATION': [],
+            'TIME': [],
+            'ORGANIZATION': [],
+            'OBJECT': []
+        }
+
+        words = text.split()
+        text_lower = text.lower()
+
+        for i, word in enumerate(words):
+            word_lower = word.lower().strip('.,!?;:')
+
+            # Kişi isimleri
+            if word_lower in cls.TURKISH_NAMES:
+                entities['PERSON'].append(word)
+            elif word[0].isupper() and i > 0:  # Cümle başı değil ve büyük harfle başlıyor
+                # Kişi belirteci kontrolü
+                if i + 1 < len(words) and words[i + 1].lower() in cls.PERSON_INDICATORS:
+                    entities['PERSON'].append(word)
+                elif i > 0 and words[i - 1].lower() in cls.PERSON_INDICATORS:
+                    entities['PERSON'].append(word)
+
+            # Şehirler
+            if word_lower in cls.TURKISH_CITIES:
+                entities['LOCATION'].append(word)
+
+            # Yer belirteçleri
+            for loc_ind in cls.LOCATION_INDICATORS:
+                if loc_ind in word_lower:
+                    # Önceki kelimeyi de al
+                    if i > 0:
+                        entities['LOCATION'].append(f"{words[i-1]} {word}")
+                    else:
+                        entities['LOCATION'].append(word)
+                    break
+
+        # Zaman ifadeleri
+        time_patterns = [
+            r'\d{1,2}:\d{2}',                    # 14:30
+            r'\d{1,2}\s*(?:ocak|şubat|mart|nisan|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık)',
+            r'(?:pazartesi|salı|çarşamba|perşembe|cuma|cumartesi|pazar)',
+            r'(?:sabah|öğle|akşam|gece)\s*(?:saatlerinde|vakti)?',
+            r'\d{4}\s*yılı?'                     # 2024 yılı
+        ]
+
+        for pattern in time_patterns:
+            matches = re.findall(pattern, text_lower)
+            entities['TIME'].extend(matches)
+
+        # Tekrarları kaldır
+        for key in entities:
+            entities[key] = list(set(entities[key]))
+
+        return entities
+
+
+class LegacyContentFilter(ContentFilter):
+    """Terim başına alt dize testi ve yasaklı terim başına re.sub yapan ilk ContentFilter"""
+
+    @classmethod
+    def check_prompt(cls, prompt: str) -> ContentCheckResult:
+        """Prompt'u güvenlik açısından kontrol et"""
+        lower_prompt = prompt.lower()
+        blocked = []
+        warnings = []
+
+        # Yasaklı terimleri kontrol et
+        for term in cls.BLOCKED_TERMS:
+            if term in lower_prompt:
+                blocked.append(term)
+
+        # Uyarı terimlerini kontrol et
+        for term in cls.WARNING_TERMS:
+            if term in lower_prompt:
+                # Güvenli bağlam var mı kontrol et
+                has_safe_context = any(ctx in lower_prompt for ctx in cls.SAFE_CONTEXTS)
+                if not has_safe_context:
+                    warnings.append(term)
+
+        # Sonuç
+        is_safe = len(blocked) == 0
+        confidence = 1.0 - (len(warnings) * 0.1)  # Her uyarı %10 güven düşürür
+
+        # Sanitize: yasaklı terimleri kaldır
+        sanitized = prompt
+        for term in blocked:
+            sanitized = re.sub(re.escape(term), '[BLOCKED]', sanitized, flags=re.IGNORECASE)
+
+        return ContentCheckResult(
+            is_safe=is_safe,
+            blocked_categories=blocked,
+            warning_categories=warnings,
+            confidence=max(0.0, confidence),
+            sanitized_prompt=sanitized
+        )
+
+
+class LegacyRateLimiter:
+    """IP başına zaman damgası listesi tutan ilk RateLimiter (istemciler hiç silinmez)"""
+
+    def __init__(self, requests_per_minute: int = 30):
+        self.requests_per_minute = requests_per_minute
+        self.requests: dict = {}  # ip -> [(timestamp, ...)]
+
+    def is_allowed(self, client_ip: str) -> Tuple[bool, int]:
+        """İstek izni kontrolü"""
+        now = time.time()
+        minute_ago = now - 60
+
+        # Eski istekleri temizle
+        if client_ip in self.requests:
+            self.requests[client_ip] = [
+                ts for ts in self.requests[client_ip]
+                if ts > minute_ago
+            ]
+        else:
+            self.requests[client_ip] = []
+
+        # Limit kontrolü
+        if len(self.requests[client_ip]) >= self.requests_per_minute:
+            wait_time = int(60 - (now - self.requests[client_ip][0]))
+            return False, wait_time
+
+        # İsteği kaydet
+        self.requests[client_ip].append(now)
+        return True, 0
+
+
+class LegacyOutputCleaner:
+    """Her çağrıda dizini iki kez tarayan ilk OutputCleaner (dosya başına birden çok stat)"""
+
+    def __init__(self, output_dir: str, max_files: int = 500, max_age_hours: int = 24):
+        self.output_dir = Path(output_dir)
+        self.max_files = max_files
+        self.max_age_hours = max_age_hours
+
+    def cleanup(self) -> int:
+        """Eski dosyaları temizle"""
+        if not self.output_dir.exists():
+            return 0
+
+        files = list(self.output_dir.glob('*.png'))
+        removed = 0
+
+        # Yaşa göre sil
+        now = time.time()
+        max_age_seconds = self.max_age_hours * 3600
+
+        for f in files:
+            try:
+                age = now - f.stat().st_mtime
+                if age > max_age_seconds:
+                    f.unlink()
+                    removed += 1
+            except Exception as e:
+                logger.warning(f"Dosya silinirken hata: {f} - {e}")
+
+        # Sayıya göre sil (en eskiler)
+        files = sorted(self.output_dir.glob('*.png'), key=lambda x: x.stat().st_mtime)
+        while len(files) > self.max_files:
+            try:
+                files[0].unlink()
+                files.pop(0)
+                removed += 1
+            except Exception as e:
+                logger.warning(f"Dosya silinirken hata: {e}")
+                break
+
+        if removed > 0:
+            logger.info(f"Temizlik: {removed} dosya silindi")
+
+        return removed
+
+
+def legacy_list_images(output_dir: str, limit: int = 50) -> Dict[str, List[Dict]]:
+    """İlk /api/images: tüm dizini mtime'a göre sıralar, dosya başına ek stat çağrıları"""
+    output_dir = Path(output_dir)
+    if not output_dir.exists():
+        return {"images": []}
+
+    images = []
+    for f in sorted(output_dir.glob("*.png"), key=lambda x: x.stat().st_mtime, reverse=True)[:limit]:
+        images.append({
+            "filename": f.name,
+            "url": f"/api/image/{f.name}",
+            "size": f.stat().st_size,
+            "created": datetime.fromtimestamp(f.stat().st_mtime).isoformat()
+        })
+
+    return {"images": images}
+
+
+def legacy_resolve_image(output_dir: str, filename: str) -> Optional[Path]:
+    """İlk /api/image: her istekte sanitize + resolve() ile doğrulama + exists()"""
+    # Güvenlik: path sanitization
+    safe_filename = PathSecurity.sanitize_filename(filename)
+    filepath = Path(output_dir) / safe_filename
+
+    # Path traversal kontrolü
+    is_valid, error = PathSecurity.validate_path(str(filepath), output_dir)
+    if not is_valid:
+        raise ValueError(error)
+
+    if not filepath.exists():
+        return None
+
+    return filepath
+
+
+def legacy_json_render(content: Any) -> bytes:
+    """Starlette JSONResponse.render: her yanıtta standart json ile serileştirme"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def legacy_job_response(job, timeline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """İlk /api/job/{job_id}: her yoklamada asdict(job) + alan ekleme"""
+    response = asdict(job)
+    response["timeline"] = timeline
+
+    # Progress bilgisi ekle
+    response["progress"] = job.progress
+    response["progress_message"] = job.progress_message
+    response["can_rate"] = job.status == "completed" and not job.cancelled
+
+    if job.status == "completed" and job.result:
+        response["image_url"] = f"/api/image/{job.result['filename']}"
+        response["generation_info"] = {
+            "model": job.result.get("model"),
+            "seed": job.result.get("seed"),
+            "enhanced_prompt": job.result.get("enhanced_prompt"),
+            "generation_time": job.result.get("generation_time"),
+            "emotion": job.result.get("emotion"),
+            "optimization_applied": job.result.get("optimization_applied")
+        }
+
+    return response
+
+
+def legacy_learning_stats(db, min_samples_for_learning: int = 5) -> Dict[str, Any]:
+    """İlk LearningManager.get_learning_stats: her çağrıda altı sorgu (feedback üzerinde JOIN + GROUP BY)"""
+    conn = db._get_conn()
+    cursor = conn.cursor()
+
+    # Toplam üretim sayısı
+    cursor.execute('SELECT COUNT(*) FROM generations')
+    total_generations = cursor.fetchone()[0]
+
+    # Toplam feedback sayısı
+    cursor.execute('SELECT COUNT(*) FROM feedback')
+    total_feedback = cursor.fetchone()[0]
+
+    # Öğrenilmiş pattern sayısı
+    cursor.execute('SELECT COUNT(*) FROM learned_patterns WHERE sample_count >= ?',
+                  (min_samples_for_learning,))
+    learned_patterns = cursor.fetchone()[0]
+
+    # Ortalama puan
+    cursor.execute('SELECT AVG(overall_score) FROM feedback')
+    avg_score = cursor.fetchone()[0] or 0
+
+    # En yaygın hatalar
+    issues = db.get_common_issues()
+
+    # En başarılı scene types
+    cursor.execute('''
+        SELECT g.scene_type, AVG(f.overall_score) as avg, COUNT(*) as cnt
+        FROM feedback f
+        JOIN generations g ON f.generation_id = g.id
+        GROUP BY g.scene_type
+        HAVING cnt >= 3
+        ORDER BY avg DESC
+        LIMIT 5
+    ''')
+    top_scene_types = [{'type': row[0], 'avg_score': round(row[1], 2), 'count': row[2]}
+                      for row in cursor.fetchall()]
+
+    return {
+        'total_generations': total_generations,
+        'total_feedback': total_feedback,
+        'learned_patterns': learned_patterns,
+        'average_score': round(avg_score, 2),
+        'common_issues': issues,
+        'top_scene_types': top_scene_types,
+        'learning_threshold': min_samples_for_learning
+    }
@@ -8,11 +8,13 @@ Bağlam Farkındalığı (Context-Aware) Modülü
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Set, Union
 from enum import Enum
 import re
 from collections import defaultdict
 
+from document import Document, as_document, register_lexicon
+
 
 class ReferenceType(str, Enum):
     """Gönderim türleri"""
@@ -248,6 +250,24 @@ class ContextTracker:
         ]
     }
 
+    # Sahne mood anahtar kelimeleri
+    MOOD_KEYWORDS = {
+        'tense': ['gerilim', 'tehlike', 'korku', 'endişe', 'panik'],
+        'romantic': ['aşk', 'romantik', 'sevgi', 'tutku', 'öpücük'],
+        'sad': ['üzgün', 'hüzün', 'gözyaşı', 'ağla', 'keder'],
+        'happy': ['mutlu', 'sevinç', 'neşe', 'gül', 'kahkaha'],
+        'mysterious': ['gizemli', 'sır', 'karanlık', 'belirsiz'],
+        'action': ['koş', 'kaç', 'savaş', 'vur', 'patlama'],
+    }
+
+    # Anahtar olay fiilleri
+    EVENT_VERBS = [
+        'öldü', 'doğdu', 'evlendi', 'ayrıldı', 'kavuştu',
+        'buldu', 'kaybetti', 'kazandı', 'yendi', 'yenildi',
+        'geldi', 'gitti', 'döndü', 'kaçtı', 'yakalandı',
+        'söyledi', 'itiraf etti', 'keşfetti', 'anladı'
+    ]
+
     def __init__(self):
         self.story_context = StoryContext()
         self.current_scene_id = 0
@@ -261,25 +281,26 @@ class ContextTracker:
 
         return self.story_context
 
-    def process_scene(self, scene_text: str) -> SceneContext:
-        """Yeni bir sahneyi işle"""
+    def process_scene(self, scene_text: Union[str, Document]) -> SceneContext:
+        """Yeni bir sahneyi işle (metin veya paylaşılan Document)"""
+        doc = as_document(scene_text, indexed=False)
         self.current_scene_id += 1
 
         scene = SceneContext(
             scene_id=self.current_scene_id,
-            text=scene_text
+            text=doc.text
         )
 
         # Sahne önceki sahneyle bağlantılı mı?
-        if self._is_continuation(scene_text):
+        if self._is_continuation(doc):
             scene.continuation_from = self.current_scene_id - 1
 
         # Sahne öğelerini çıkar
-        scene.location = self._extract_location(scene_text)
-        scene.time = self._extract_time(scene_text)
-        scene.mood = self._extract_mood(scene_text)
-        scene.characters_present = self._extract_characters(scene_text)
-        scene.key_events = self._extract_events(scene_text)
+        scene.location = self._extract_location(doc)
+        scene.time = self._extract_time(doc)
+        scene.mood = self._extract_mood(doc)
+        scene.characters_present = self._extract_characters(doc)
+        scene.key_events = self._extract_events(doc)
 
         # Global bağlamı güncelle
         if scene.location:
@@ -340,9 +361,9 @@ class ContextTracker:
         elif 'yor' in sentence_lower:
             self.story_context.narrative_tense = 'present'
 
-    def _is_continuation(self, text: str) -> bool:
+    def _is_continuation(self, doc: Document) -> bool:
         """Metnin önceki sahnenin devamı olup olmadığını kontrol et"""
-        text_lower = text.lower()
+        text_lower = doc.lower
 
         # Bağlaç kontrolü
         continuation_markers = ['ve', 'sonra', 'ardından', 'bunun üzerine', 'derken']
@@ -352,13 +373,13 @@ class ContextTracker:
         # Aynı karakterler
         if self.story_context.scenes:
             last_scene = self.story_context.scenes[-1]
-            current_chars = self._extract_characters(text)
+            current_chars = self._extract_characters(doc)
             if set(current_chars) & set(last_scene.characters_present):
                 return True
 
         return False
 
-    def _extract_location(self, text: str) -> Optional[str]:
+    def _extract_location(self, doc: Document) -> Optional[str]:
         """Konumu çıkar"""
         location_patterns = [
             (r'(?:evde|evinde|eve)', 'home'),
@@ -376,14 +397,14 @@ class ContextTracker:
             (r'(?:parkta|parkın)', 'park'),
         ]
 
-        text_lower = text.lower()
+        text_lower = doc.lower
         for pattern, location in location_patterns:
             if re.search(pattern, text_lower):
                 return location
 
         return self.story_context.current_location  # Değişmediyse mevcut konum
 
-    def _extract_time(self, text: str) -> Optional[str]:
+    def _extract_time(self, doc: Document) -> Optional[str]:
         """Zamanı çıkar"""
         time_patterns = [
             (r'sabah(?:leyin)?', 'morning'),
@@ -395,37 +416,27 @@ class ContextTracker:
             (r'gece yarısı', 'midnight'),
         ]
 
-        text_lower = text.lower()
+        text_lower = doc.lower
         for pattern, time in time_patterns:
             if re.search(pattern, text_lower):
                 return time
 
         return self.story_context.current_time
 
-    def _extract_mood(self, text: str) -> Optional[str]:
+    def _extract_mood(self, doc: Document) -> Optional[str]:
         """Mood'u çıkar"""
-        mood_keywords = {
-            'tense': ['gerilim', 'tehlike', 'korku', 'endişe', 'panik'],
-            'romantic': ['aşk', 'romantik', 'sevgi', 'tutku', 'öpücük'],
-            'sad': ['üzgün', 'hüzün', 'gözyaşı', 'ağla', 'keder'],
-            'happy': ['mutlu', 'sevinç', 'neşe', 'gül', 'kahkaha'],
-            'mysterious': ['gizemli', 'sır', 'karanlık', 'belirsiz'],
-            'action': ['koş', 'kaç', 'savaş', 'vur', 'patlama'],
-        }
-
-        text_lower = text.lower()
-        for mood, keywords in mood_keywords.items():
-            if any(kw in text_lower for kw in keywords):
+        for mood, keywords in self.MOOD_KEYWORDS.items():
+            if doc.contains_any(keywords):
                 return mood
 
         return None
 
-    def _extract_characters(self, text: str) -> List[str]:
+    def _extract_characters(self, doc: Document) -> List[str]:
         """Karakterleri çıkar"""
         characters = []
 
         # Büyük harfle başlayan kelimeler (isimler)
-        words = text.split()
+        words = doc.words
         for i, word in enumerate(words):
             if word[0].isupper() and i > 0:  # Cümle başı değil
                 clean_word = re.sub(r'[^\w]', '', word)
@@ -433,30 +444,21 @@ class ContextTracker:
                     characters.append(clean_word)
 
         # Mevcut karakterleri kontrol et
-        text_lower = text.lower()
         for char_name in self.story_context.characters.keys():
-            if char_name in text_lower:
+            if doc.contains(char_name):
                 characters.append(self.story_context.characters[char_name].name)
 
         return list(set(characters))
 
-    def _extract_events(self, text: str) -> List[str]:
+    def _extract_events(self, doc: Document) -> List[str]:
         """Anahtar olayları çıkar"""
         events = []
 
         # Fiil tabanlı olay tespiti
-        event_verbs = [
-            'öldü', 'doğdu', 'evlendi', 'ayrıldı', 'kavuştu',
-            'buldu', 'kaybetti', 'kazandı', 'yendi', 'yenildi',
-            'geldi', 'gitti', 'döndü', 'kaçtı', 'yakalandı',
-            'söyledi', 'itiraf etti', 'keşfetti', 'anladı'
-        ]
-
-        text_lower = text.lower()
-        for verb in event_verbs:
-            if verb in text_lower:
+        for verb in self.EVENT_VERBS:
+            if doc.contains(verb):
                 # Fiili içeren cümleyi bul
-                sentences = text.split('.')
+                sentences = doc.text.split('.')
                 for sent in sentences:
                     if verb in sent.lower():
                         events.append(sent.strip())
@@ -465,6 +467,10 @@ class ContextTracker:
         return events[:3]  # Max 3 olay
 
 
+# Sahne Document'larının ortak indeksine alt dize olarak aranan kelimeleri ekle
+register_lexicon(*ContextTracker.MOOD_KEYWORDS.values(), ContextTracker.EVENT_VERBS)
+
+
 class SceneConsistencyChecker:
     """Sahne tutarlılık kontrolcüsü"""
 
@@ -34,6 +34,7 @@ class Generation:
     generation_time: float = 0.0
     image_path: str = ""
     created_at: str = ""
+    timeline: Optional[str] = None  # JSON: aşama zaman çizelgesi
 
 @dataclass
 class Feedback:
@@ -96,8 +97,13 @@ class DatabaseManager:
     def _get_conn(self) -> sqlite3.Connection:
         if not hasattr(self._local, 'conn') or self._local.conn is None:
             DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-            self._local.conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+            self._local.conn = sqlite3.connect(str(DB_PATH), timeout=5.0, check_same_thread=False)
             self._local.conn.row_factory = sqlite3.Row
+            # "db" havuzundaki thread'ler eşzamanlı okur; yazarken okuyucular bloklanmasın
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+            # INSERT OR REPLACE'ın sildiği satırlar için de DELETE tetikleyicileri çalışsın (sayaçlar)
+            self._local.conn.execute("PRAGMA recursive_triggers=ON")
         return self._local.conn
 
     def _init_db(self):
@@ -124,9 +130,11 @@ class DatabaseManager:
                 model TEXT,
                 generation_time REAL,
                 image_path TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                timeline TEXT
             )
         ''')
+        self._ensure_columns(cursor, 'generations', {'timeline': 'TEXT'})
 
         # Feedback tablosu
         cursor.execute('''
@@ -172,9 +180,127 @@ class DatabaseManager:
         # İndeksler
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_gen_scene ON generations(scene_type, mood, genre)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_score ON feedback(overall_score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_generation ON feedback(generation_id)')
+
+        self._ensure_totals(cursor)
 
         conn.commit()
 
+    @staticmethod
+    def _ensure_totals(cursor: sqlite3.Cursor):
+        """Öğrenme istatistikleri için tetikleyicilerle güncellenen sayaçlar.
+
+        learning_totals tek satırdır (üretim/feedback sayısı, puan ve hata toplamları);
+        scene_scores sahne tipi başına feedback puan toplamı ve sayısıdır. Tablolar
+        ilk kez oluşturulurken mevcut verilerden doldurulur. NULL sahne tipi '' sayılır.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'learning_totals'")
+        backfill = cursor.fetchone() is None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS learning_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generations INTEGER NOT NULL DEFAULT 0,
+                feedback INTEGER NOT NULL DEFAULT 0,
+                score_sum INTEGER NOT NULL DEFAULT 0,
+                hands INTEGER NOT NULL DEFAULT 0,
+                faces INTEGER NOT NULL DEFAULT 0,
+                blur INTEGER NOT NULL DEFAULT 0,
+                text INTEGER NOT NULL DEFAULT 0,
+                composition INTEGER NOT NULL DEFAULT 0,
+                anatomy INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scene_scores (
+                scene_type TEXT PRIMARY KEY NOT NULL,
+                score_sum INTEGER NOT NULL DEFAULT 0,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_generations_insert AFTER INSERT ON generations BEGIN
+                UPDATE learning_totals SET generations = generations + 1 WHERE id = 1;
+            END
+        ''')
+        # Silinen üretimin feedback'i sahne ortalamasından düşer (JOIN artık eşleşmez)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_generations_delete AFTER DELETE ON generations BEGIN
+                UPDATE learning_totals SET generations = generations - 1 WHERE id = 1;
+                UPDATE scene_scores SET
+                    score_sum = score_sum - (SELECT COALESCE(SUM(overall_score), 0) FROM feedback
+                                             WHERE generation_id = OLD.id),
+                    count = count - (SELECT COUNT(*) FROM feedback WHERE generation_id = OLD.id)
+                WHERE scene_type = COALESCE(OLD.scene_type, '');
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_feedback_insert AFTER INSERT ON feedback BEGIN
+                UPDATE learning_totals SET
+                    feedback = feedback + 1,
+                    score_sum = score_sum + COALESCE(NEW.overall_score, 0),
+                    hands = hands + COALESCE(NEW.has_hand_issues, 0),
+                    faces = faces + COALESCE(NEW.has_face_issues, 0),
+                    blur = blur + COALESCE(NEW.has_blur_issues, 0),
+                    text = text + COALESCE(NEW.has_text_artifacts, 0),
+                    composition = composition + COALESCE(NEW.has_composition_issues, 0),
+                    anatomy = anatomy + COALESCE(NEW.has_anatomy_issues, 0)
+                WHERE id = 1;
+                INSERT INTO scene_scores (scene_type, score_sum, count)
+                    SELECT COALESCE(scene_type, ''), COALESCE(NEW.overall_score, 0), 1
+                    FROM generations WHERE id = NEW.generation_id
+                ON CONFLICT(scene_type) DO UPDATE SET
+                    score_sum = score_sum + excluded.score_sum, count = count + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_feedback_delete AFTER DELETE ON feedback BEGIN
+                UPDATE learning_totals SET
+                    feedback = feedback - 1,
+                    score_sum = score_sum - COALESCE(OLD.overall_score, 0),
+                    hands = hands - COALESCE(OLD.has_hand_issues, 0),
+                    faces = faces - COALESCE(OLD.has_face_issues, 0),
+                    blur = blur - COALESCE(OLD.has_blur_issues, 0),
+                    text = text - COALESCE(OLD.has_text_artifacts, 0),
+                    composition = composition - COALESCE(OLD.has_composition_issues, 0),
+                    anatomy = anatomy - COALESCE(OLD.has_anatomy_issues, 0)
+                WHERE id = 1;
+                UPDATE scene_scores SET
+                    score_sum = score_sum - COALESCE(OLD.overall_score, 0), count = count - 1
+                WHERE scene_type = (SELECT COALESCE(scene_type, '') FROM generations
+                                    WHERE id = OLD.generation_id);
+            END
+        ''')
+
+        if backfill:
+            cursor.execute('''
+                INSERT OR REPLACE INTO learning_totals
+                    (id, generations, feedback, score_sum, hands, faces, blur, text, composition, anatomy)
+                SELECT 1, (SELECT COUNT(*) FROM generations), COUNT(*),
+                       COALESCE(SUM(overall_score), 0),
+                       COALESCE(SUM(has_hand_issues), 0), COALESCE(SUM(has_face_issues), 0),
+                       COALESCE(SUM(has_blur_issues), 0), COALESCE(SUM(has_text_artifacts), 0),
+                       COALESCE(SUM(has_composition_issues), 0), COALESCE(SUM(has_anatomy_issues), 0)
+                FROM feedback
+            ''')
+            cursor.execute('DELETE FROM scene_scores')
+            cursor.execute('''
+                INSERT INTO scene_scores (scene_type, score_sum, count)
+                SELECT COALESCE(g.scene_type, ''), SUM(f.overall_score), COUNT(*)
+                FROM feedback f JOIN generations g ON f.generation_id = g.id
+                GROUP BY COALESCE(g.scene_type, '')
+            ''')
+
+    @staticmethod
+    def _ensure_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+        """Eski veritabanlarına eksik kolonları ekle"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, decl in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+
     # ============== Generation CRUD ==============
 
     def save_generation(self, gen: Generation) -> int:
@@ -187,13 +313,15 @@ class DatabaseManager:
         cursor.execute('''
             INSERT OR REPLACE INTO generations
             (job_id, prompt, enhanced_prompt, negative_prompt, scene_type, mood, genre, style,
-             width, height, steps, cfg_scale, seed, model, generation_time, image_path, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             width, height, steps, cfg_scale, seed, model, generation_time, image_path, created_at,
+             timeline)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             gen.job_id, gen.prompt, gen.enhanced_prompt, gen.negative_prompt,
             gen.scene_type, gen.mood, gen.genre, gen.style,
             gen.width, gen.height, gen.steps, gen.cfg_scale, gen.seed,
-            gen.model, gen.generation_time, gen.image_path, gen.created_at
+            gen.model, gen.generation_time, gen.image_path, gen.created_at,
+            gen.timeline
         ))
 
         conn.commit()
@@ -228,6 +356,15 @@ class DatabaseManager:
         cursor.execute(query, params)
         return [Generation(**dict(row)) for row in cursor.fetchall()]
 
+    def get_image_metadata(self) -> List[Dict[str, str]]:
+        """Görsel listesi indeksini doldurmak için üretim başına dosya metadata'sı"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT job_id, model, scene_type, image_path FROM generations WHERE image_path != ''"
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     # ============== Feedback CRUD ==============
 
     def save_feedback(self, feedback: Feedback) -> int:
@@ -383,5 +520,28 @@ class DatabaseManager:
             return {k: v or 0 for k, v in dict(row).items()}
         return {}
 
+    # ============== İstatistik Sayaçları ==============
+
+    def get_learning_totals(self) -> Dict[str, int]:
+        """Tetikleyicilerle tutulan toplamlar (tek satır okuma)"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM learning_totals WHERE id = 1')
+        row = cursor.fetchone()
+        return dict(row) if row else {}
+
+    def get_top_scene_types(self, min_count: int = 3, limit: int = 5) -> List[Dict[str, Any]]:
+        """Ortalama feedback puanı en yüksek sahne tipleri (sayaç tablosundan)"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT scene_type, CAST(score_sum AS REAL) / count AS avg, count
+            FROM scene_scores
+            WHERE count >= ?
+            ORDER BY avg DESC, scene_type
+            LIMIT ?
+        ''', (min_count, limit))
+        return [{'type': row[0], 'avg_score': round(row[1], 2), 'count': row[2]} for row in cursor.fetchall()]
+
 # Singleton instance
 db = DatabaseManager()
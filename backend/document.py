@@ -0,0 +1,187 @@
+"""
+Document - Paylaşılan Açıklamalı Metin
+======================================
+Sahne metni bir kez işlenir: küçük harfli metin, cümle aralıkları, kelimeler
+ve konumları, cümle token'ları, kökler ve sözlük isabet indeksi. Analizörler
+(TurkishTextAnalyzer, EmotionAnalyzer, ContextTracker, ThemeAnalyzer, ...)
+ham metni yeniden taramak yerine aynı Document'ı kullanır.
+
+Tüm türetilmiş alanlar ilk erişimde hesaplanır. Sözlük indeksi yalnızca bir
+hızlandırmadır: indekste olmayan kelimeler için `contains`/`count` doğrudan
+metni tarar, sonuç her durumda `kw in text.lower()` ile aynıdır.
+"""
+
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Union
+
+from keyword_automaton import KeywordAutomaton, count_non_overlapping
+
+# Analizörlerin ortak cümle ayırıcısı: re.split(r'[.!?]+') parçaları
+_SENTENCE_RE = re.compile(r'[^.!?]+')
+# SentenceAnalyzer ile aynı token kuralı: noktalama boşluk sayılır
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
+class Span(NamedTuple):
+    """Orijinal metinde [start, end) aralığı"""
+    start: int
+    end: int
+    text: str
+
+
+# ============== Ortak sözlük ==============
+
+_lexicon: Set[str] = set()
+_lexicon_lock = threading.Lock()
+_automaton: Optional[KeywordAutomaton] = None
+
+
+def register_lexicon(*word_lists: Iterable[str]):
+    """Analizörün alt dize olarak aradığı kelimeleri ortak indekse ekle"""
+    global _automaton
+    with _lexicon_lock:
+        before = len(_lexicon)
+        for words in word_lists:
+            _lexicon.update(w.lower() for w in words if w)
+        if len(_lexicon) != before:
+            _automaton = None
+
+
+def lexicon_automaton() -> KeywordAutomaton:
+    global _automaton
+    with _lexicon_lock:
+        if _automaton is None:
+            _automaton = KeywordAutomaton(_lexicon)
+        return _automaton
+
+
+class Document:
+    """Bir sahne metninin tek seferlik açıklaması (salt okunur paylaşılır)"""
+
+    # Bu uzunluğun altında alt dize araması indeks sorgusundan ucuzdur
+    INDEX_MIN_CHARS = 1000
+
+    def __init__(self, text: str, indexed: Optional[bool] = None):
+        self.text = text
+        self.lower = text.lower()
+        # None: uzunluğa göre karar ver; False: contains/count doğrudan tarar
+        self.indexed = len(text) >= self.INDEX_MIN_CHARS if indexed is None else indexed
+        self._sentences: Optional[List[Span]] = None
+        self._words: Optional[List[str]] = None
+        self._word_offsets: Optional[List[int]] = None
+        self._sentence_tokens: Optional[List[List[str]]] = None
+        self._lemmas: Optional[List[List[str]]] = None
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._indexed_words: FrozenSet[str] = frozenset()
+        self._hits: Optional[Dict[str, List[int]]] = None
+
+    def __repr__(self) -> str:
+        return f"Document({len(self.text)} karakter)"
+
+    # ---------- Yapı ----------
+
+    @property
+    def sentences(self) -> List[Span]:
+        """Boş olmayan, kırpılmış cümleler ([.!?]+ ile ayrılmış)"""
+        if self._sentences is None:
+            spans = []
+            for match in _SENTENCE_RE.finditer(self.text):
+                raw = match.group()
+                stripped = raw.strip()
+                if stripped:
+                    start = match.start() + (len(raw) - len(raw.lstrip()))
+                    spans.append(Span(start, start + len(stripped), stripped))
+            self._sentences = spans
+        return self._sentences
+
+    @property
+    def sentence_texts(self) -> List[str]:
+        return [s.text for s in self.sentences]
+
+    @property
+    def words(self) -> List[str]:
+        """Boşlukla ayrılmış kelimeler (str.split)"""
+        if self._words is None:
+            self._words = self.text.split()
+        return self._words
+
+    @property
+    def word_offsets(self) -> List[int]:
+        """Her kelimenin orijinal metindeki başlangıç konumu"""
+        if self._word_offsets is None:
+            offsets = []
+            pos = 0
+            find = self.text.find
+            for word in self.words:
+                pos = find(word, pos)
+                offsets.append(pos)
+                pos += len(word)
+            self._word_offsets = offsets
+        return self._word_offsets
+
+    @property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Cümle başına noktalamasız token'lar"""
+        if self._sentence_tokens is None:
+            self._sentence_tokens = [_PUNCT_RE.sub(' ', s.text).split() for s in self.sentences]
+        return self._sentence_tokens
+
+    @property
+    def lemmas(self) -> List[List[str]]:
+        """Cümle başına token kökleri (morfoloji kelime önbelleği üzerinden)"""
+        if self._lemmas is None:
+            from turkish_nlp import TurkishMorphology
+            self._lemmas = [[TurkishMorphology.analyze_word(t).lemma for t in tokens]
+                            for tokens in self.sentence_tokens]
+        return self._lemmas
+
+    # ---------- Sözlük indeksi ----------
+
+    def _index(self) -> Dict[str, List[int]]:
+        """Ortak sözlüğü metinde bir kez tara (indekssiz Document'ta boş)"""
+        if self._hits is None:
+            if self.indexed:
+                self._automaton = lexicon_automaton()
+                self._indexed_words = self._automaton.pattern_set
+                self._hits = self._automaton.find_all(self.lower)
+            else:
+                self._hits = {}
+        return self._hits
+
+    def hits_covering(self, patterns: FrozenSet[str]) -> Optional[Dict[str, List[int]]]:
+        """Tüm desenler indeksteyse isabet sözlüğü (diğer kelimeleri de içerir), değilse None"""
+        hits = self._index()
+        return hits if self.indexed and patterns <= self._indexed_words else None
+
+    def contains(self, word: str) -> bool:
+        """`word in text.lower()` ile aynı"""
+        hits = self._hits if self._hits is not None else self._index()
+        if word in self._indexed_words:
+            return word in hits
+        return word in self.lower
+
+    def count(self, word: str) -> int:
+        """`text.lower().count(word)` ile aynı (çakışmayan geçişler)"""
+        hits = self._hits if self._hits is not None else self._index()
+        if word not in self._indexed_words:
+            return self.lower.count(word)
+        positions = hits.get(word)
+        return count_non_overlapping(positions, len(word)) if positions else 0
+
+    def contains_any(self, words: Iterable[str]) -> bool:
+        return any(self.contains(w) for w in words)
+
+
+def as_document(text: Union[str, Document], indexed: Optional[bool] = None) -> Document:
+    """Metni Document'a çevir; zaten Document ise aynen döndür.
+
+    Az sayıda kelime arayan analizörler ham metin için indexed=False kullanır:
+    tek seferlik Document'ta ortak indeksi kurmak doğrudan taramadan pahalıdır.
+    """
+    return text if isinstance(text, Document) else Document(text, indexed=indexed)
+
+
+def source_text(text: Union[str, Document]) -> str:
+    """Document ya da metinden ham metin"""
+    return text.text if isinstance(text, Document) else text
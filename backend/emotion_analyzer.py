@@ -6,10 +6,21 @@ Bağlam farkındalığı ve Türkçe desteği
 """
 
 import re
+import bisect
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, FrozenSet, Sequence, Any, Union
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # opsiyonel: yoksa toplu analiz metin başına yapılır
+    np = None
+
+from keyword_automaton import KeywordAutomaton
+from document import Document, register_lexicon
+import analysis_cache
+from analysis_cache import cached_analysis, lowercase
+
 class EmotionClass(str, Enum):
     """Ana duygu sınıfları"""
     JOY = "joy"              # Mutluluk, sevinç
@@ -36,6 +47,23 @@ class EmotionResult:
     context_notes: List[str]
     visual_cues: Dict[str, str]  # Görsel ipuçları
 
+@dataclass
+class _TextIndex:
+    """Metin başına tek ön geçişin sonucu"""
+    hits: Dict[str, List[int]]  # sözlük kelimesi -> artan başlangıç pozisyonları
+    negated: FrozenSet[str]  # negasyon kapsamına giren duygu kelimeleri
+    modifiers: List[Tuple[List[int], int, int]]  # metinde geçen değiştiriciler: (pozisyonlar, uzunluk, değer)
+    has_negation: bool
+    has_irony: bool
+
+@dataclass
+class _ScoreMatrix:
+    """Toplu skorlama için (duygu, kelime) yuvaları"""
+    emotions: List[EmotionClass]
+    keyword_slots: Dict[str, List[int]]  # kelime -> yuva indeksleri (kelime birden çok duyguda olabilir)
+    base: Any  # (yuva,) temel yoğunluklar
+    membership: Any  # (yuva, duygu) 0/1 ağırlık matrisi
+
 class EmotionAnalyzer:
     """
     Gelişmiş duygu analizi sistemi.
@@ -233,10 +261,98 @@ class EmotionAnalyzer:
         'barely': -3, 'hardly': -3
     }
 
+    # Bağlam notu için negasyon kelimeleri ve ironi işaretleri
+    NEGATION_WORDS = ['değil', 'yok', 'olmayan', 'hiç', 'asla', 'not', 'never', "n't"]
+    IRONY_MARKERS = ['sanki', 'güya', 'sözde', 'tabii ki', 'evet evet',
+                     'as if', 'yeah right', 'sure', 'of course']
+
+    # Yoğunluk penceresi: kelimenin ilk geçişinin iki yanında karakter sayısı
+    MODIFIER_WINDOW = 30
+
+    # Derlenmiş sözlük ve negasyon regex'leri, ilk kullanımda kurulur
+    _automaton: Optional[KeywordAutomaton] = None
+    _emotion_keywords: FrozenSet[str] = frozenset()
+    _negation_regexes: Optional[List[re.Pattern]] = None
+    _score_matrix: Optional[_ScoreMatrix] = None
+
+    @classmethod
+    def _lexicon_automaton(cls) -> KeywordAutomaton:
+        if cls._automaton is None:
+            patterns = set(cls.INTENSITY_BOOSTERS) | set(cls.INTENSITY_REDUCERS)
+            patterns.update(cls.NEGATION_WORDS)
+            patterns.update(cls.IRONY_MARKERS)
+            keywords = set()
+            for data in cls.EMOTION_PATTERNS.values():
+                keywords.update(data['keywords'])
+            patterns.update(keywords)
+            cls._emotion_keywords = frozenset(keywords)
+            cls._automaton = KeywordAutomaton(patterns)
+        return cls._automaton
+
+    @classmethod
+    def _compiled_negations(cls) -> List[re.Pattern]:
+        if cls._negation_regexes is None:
+            cls._negation_regexes = [re.compile(p, re.IGNORECASE) for p in cls.NEGATION_PATTERNS]
+        return cls._negation_regexes
+
+    @classmethod
+    def rebuild_lexicon(cls):
+        """Sözlükler değiştiğinde derlenmiş otomatı, regex'leri ve önbelleği yenile"""
+        cls._automaton = None
+        cls._negation_regexes = None
+        cls._score_matrix = None
+        analysis_cache.invalidate('emotion')
+
+    @classmethod
+    def _index_text(cls, lower_text: str, hits: Optional[Dict[str, List[int]]] = None) -> _TextIndex:
+        """Tek ön geçiş: sözlük isabetleri, negasyon kapsamları, değiştirici pozisyonları.
+
+        hits verilirse (Document'ın ortak indeksi) metin yeniden taranmaz; sözlüğün
+        tamamını kapsamalıdır, fazladan kelimeler yok sayılır.
+        """
+        automaton = cls._lexicon_automaton()
+        if hits is None:
+            hits = automaton.find_all(lower_text)
+
+        # Her negasyon kalıbının metindeki ilk eşleşmesi kapsamdır;
+        # kapsam metninde geçen sözlük kelimeleri negatif sayılır
+        negated = set()
+        if not cls._emotion_keywords.isdisjoint(hits):
+            for regex in cls._compiled_negations():
+                match = regex.search(lower_text)
+                if match:
+                    negated.update(automaton.find_all(match.group(0)))
+
+        modifiers = []
+        for lexicon in (cls.INTENSITY_BOOSTERS, cls.INTENSITY_REDUCERS):
+            for word, value in lexicon.items():
+                positions = hits.get(word)
+                if positions:
+                    modifiers.append((positions, len(word), value))
+
+        return _TextIndex(
+            hits=hits,
+            negated=frozenset(negated),
+            modifiers=modifiers,
+            has_negation=any(w in hits for w in cls.NEGATION_WORDS),
+            has_irony=any(m in hits for m in cls.IRONY_MARKERS),
+        )
+
     @classmethod
-    def analyze(cls, text: str) -> EmotionResult:
-        """Metni analiz et ve duygu sonucu döndür"""
-        lower_text = text.lower()
+    @cached_analysis('emotion', maxsize=512, normalizer=lowercase)
+    def analyze(cls, text: Union[str, Document]) -> EmotionResult:
+        """Metni (veya paylaşılan Document'ı) analiz et ve duygu sonucu döndür"""
+        # Tek ön geçiş; kelime başına negasyon ve yoğunluk sorguları bu indeksten
+        if isinstance(text, Document):
+            index = cls._index_text(text.lower, text.hits_covering(cls._lexicon_automaton().pattern_set))
+        else:
+            index = cls._index_text(text.lower())
+        return cls._build_result(cls._score_index(index), index)
+
+    @classmethod
+    def _score_index(cls, index: _TextIndex) -> Dict[EmotionClass, Tuple[int, int]]:
+        """Duygu -> (toplam yoğunluk, kelime sayısı); yalnızca isabet alan duygular"""
+        hits = index.hits
 
         # Tüm duyguları ve skorlarını hesapla
         emotion_scores: Dict[EmotionClass, Tuple[int, int]] = {}  # emotion -> (total_score, count)
@@ -246,14 +362,15 @@ class EmotionAnalyzer:
             count = 0
 
             for keyword, base_intensity in data['keywords'].items():
-                if keyword in lower_text:
+                positions = hits.get(keyword)
+                if positions:
                     # Negasyon kontrolü
-                    if cls._is_negated(lower_text, keyword):
+                    if keyword in index.negated:
                         continue
 
                     # Yoğunluk ayarlaması
                     intensity = base_intensity
-                    intensity += cls._get_intensity_modifier(lower_text, keyword)
+                    intensity += cls._window_modifier(index, positions[0], len(keyword))
 
                     # Sınırla
                     intensity = max(1, min(10, intensity))
@@ -264,6 +381,12 @@ class EmotionAnalyzer:
             if count > 0:
                 emotion_scores[emotion] = (total_score, count)
 
+        return emotion_scores
+
+    @classmethod
+    def _build_result(cls, emotion_scores: Dict[EmotionClass, Tuple[int, int]],
+                      index: _TextIndex) -> EmotionResult:
+        """Skorlardan sonuç: sıralama, güven, bağlam notları"""
         # En güçlü duyguyu bul
         if not emotion_scores:
             return EmotionResult(
@@ -302,9 +425,9 @@ class EmotionAnalyzer:
 
         # Bağlam notları
         context_notes = []
-        if cls._has_negation(lower_text):
+        if index.has_negation:
             context_notes.append("Negasyon tespit edildi - duygu yorumu dikkatli yapıldı")
-        if cls._has_irony_markers(lower_text):
+        if index.has_irony:
             context_notes.append("Olası ironi/alay işaretleri tespit edildi")
         if len(secondary) > 1:
             context_notes.append("Karmaşık/çoklu duygu durumu")
@@ -321,11 +444,106 @@ class EmotionAnalyzer:
             visual_cues=visual_cues
         )
 
+    @classmethod
+    def _scoring_matrix(cls) -> _ScoreMatrix:
+        """Duygu×kelime ağırlık matrisi, ilk kullanımda kurulur"""
+        if cls._score_matrix is None:
+            emotions = list(cls.EMOTION_PATTERNS)
+            keyword_slots: Dict[str, List[int]] = {}
+            base = []
+            owners = []
+            for e_idx, data in enumerate(cls.EMOTION_PATTERNS.values()):
+                for keyword, base_intensity in data['keywords'].items():
+                    keyword_slots.setdefault(keyword, []).append(len(base))
+                    base.append(base_intensity)
+                    owners.append(e_idx)
+            membership = np.zeros((len(base), len(emotions)), dtype=np.int64)
+            membership[np.arange(len(base)), owners] = 1
+            cls._score_matrix = _ScoreMatrix(
+                emotions=emotions,
+                keyword_slots=keyword_slots,
+                base=np.array(base, dtype=np.int64),
+                membership=membership,
+            )
+        return cls._score_matrix
+
+    @classmethod
+    def _score_indexes(cls, indexes: List[_TextIndex]) -> List[Dict[EmotionClass, Tuple[int, int]]]:
+        """_score_index'in toplu karşılığı: isabet sayısı matrisi × ağırlık matrisi"""
+        matrix = cls._scoring_matrix()
+        rows: List[int] = []
+        cols: List[int] = []
+        hit_counts: List[int] = []
+        window_mods: List[int] = []
+
+        # Seyrek toplama: yalnızca metinde geçen, negasyona girmeyen duygu kelimeleri
+        keyword_slots = matrix.keyword_slots
+        for row, index in enumerate(indexes):
+            for keyword, positions in index.hits.items():
+                slots = keyword_slots.get(keyword)
+                if slots is None or keyword in index.negated:
+                    continue
+                modifier = cls._window_modifier(index, positions[0], len(keyword))
+                for slot in slots:
+                    rows.append(row)
+                    cols.append(slot)
+                    hit_counts.append(len(positions))
+                    window_mods.append(modifier)
+
+        shape = (len(indexes), len(matrix.base))
+        counts = np.zeros(shape, dtype=np.int64)
+        modifiers = np.zeros(shape, dtype=np.int64)
+        counts[rows, cols] = hit_counts
+        modifiers[rows, cols] = window_mods
+
+        # Kelime başına bir kez sayılır (tekil analizle aynı); yoğunluk 1-10 aralığına sınırlanır
+        present = (counts > 0).astype(np.int64)
+        intensities = np.clip(matrix.base + modifiers, 1, 10) * present
+        totals = intensities @ matrix.membership
+        keyword_counts = present @ matrix.membership
+
+        results = []
+        for total_row, count_row in zip(totals.tolist(), keyword_counts.tolist()):
+            results.append({
+                emotion: (total, count)
+                for emotion, total, count in zip(matrix.emotions, total_row, count_row)
+                if count > 0
+            })
+        return results
+
+    @classmethod
+    def analyze_batch(cls, texts: Sequence[str]) -> List[EmotionResult]:
+        """Metin listesini analiz et; sonuçlar analyze() ile birebir aynı, aynı sırada"""
+        if np is None:
+            return [cls.analyze(text) for text in texts]
+
+        cache = analysis_cache.get_cache('emotion')
+        results: List[Optional[EmotionResult]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # küçük harfli metin -> sonuç sıraları (tekrarlar bir kez)
+        for i, text in enumerate(texts):
+            found, value = cache.lookup(text, scope=cls)
+            if found:
+                results[i] = value
+            else:
+                pending.setdefault(text.lower(), []).append(i)
+
+        if pending:
+            lower_texts = list(pending)
+            indexes = [cls._index_text(lower_text) for lower_text in lower_texts]
+            for lower_text, index, scores in zip(lower_texts, indexes, cls._score_indexes(indexes)):
+                result = cls._build_result(scores, index)
+                order = pending[lower_text]
+                cache.store(texts[order[0]], result, scope=cls)
+                for i in order:
+                    results[i] = result
+
+        return results
+
     @classmethod
     def _is_negated(cls, text: str, keyword: str) -> bool:
         """Kelimenin negatif bağlamda kullanılıp kullanılmadığını kontrol et"""
-        for pattern in cls.NEGATION_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for regex in cls._compiled_negations():
+            match = regex.search(text)
             if match and keyword in match.group(0):
                 return True
         return False
@@ -333,36 +551,33 @@ class EmotionAnalyzer:
     @classmethod
     def _has_negation(cls, text: str) -> bool:
         """Metinde negasyon var mı"""
-        negation_words = ['değil', 'yok', 'olmayan', 'hiç', 'asla', 'not', 'never', "n't"]
-        return any(w in text for w in negation_words)
+        return any(w in text for w in cls.NEGATION_WORDS)
 
     @classmethod
     def _has_irony_markers(cls, text: str) -> bool:
         """Metinde ironi işaretleri var mı"""
-        irony_markers = ['sanki', 'güya', 'sözde', 'tabii ki', 'evet evet',
-                        'as if', 'yeah right', 'sure', 'of course']
-        return any(m in text for m in irony_markers)
+        return any(m in text for m in cls.IRONY_MARKERS)
 
     @classmethod
     def _get_intensity_modifier(cls, text: str, keyword: str) -> int:
         """Yoğunluk değiştiricilerini hesapla"""
-        modifier = 0
-
-        # Keyword etrafındaki metni al
-        keyword_idx = text.find(keyword)
-        if keyword_idx == -1:
+        index = cls._index_text(text)
+        positions = index.hits.get(keyword)
+        if not positions:
             return 0
+        return cls._window_modifier(index, positions[0], len(keyword))
 
-        context = text[max(0, keyword_idx-30):keyword_idx+len(keyword)+30]
-
-        # Artırıcıları kontrol et
-        for booster, value in cls.INTENSITY_BOOSTERS.items():
-            if booster in context:
-                modifier += value
+    @classmethod
+    def _window_modifier(cls, index: _TextIndex, keyword_idx: int, keyword_len: int) -> int:
+        """Kelime penceresinde tamamen kalan her artırıcı/azaltıcıyı bir kez say"""
+        lo = max(0, keyword_idx - cls.MODIFIER_WINDOW)
+        hi = keyword_idx + keyword_len + cls.MODIFIER_WINDOW
+        modifier = 0
 
-        # Azaltıcıları kontrol et
-        for reducer, value in cls.INTENSITY_REDUCERS.items():
-            if reducer in context:
+        # Yalnızca metinde geçen değiştiriciler; lo'dan sonraki ilk geçiş pencereye sığıyorsa sayılır
+        for positions, length, value in index.modifiers:
+            i = bisect.bisect_left(positions, lo)
+            if i < len(positions) and positions[i] + length <= hi:
                 modifier += value
 
         return modifier
@@ -420,3 +635,6 @@ class EmotionAnalyzer:
 
 # Singleton instance
 emotion_analyzer = EmotionAnalyzer()
+
+# Sahne Document'larının ortak indeksine duygu sözlüğünü ekle
+register_lexicon(EmotionAnalyzer._lexicon_automaton().patterns)
@@ -0,0 +1,171 @@
+"""
+Sınırlı Thread Havuzları
+========================
+async uç noktalar bloklayan işi (SQLite sorguları, CPU yoğun analiz) event
+loop'ta çalıştırmaz; işi amacına göre ayrılmış, boyutu sınırlı havuzlara
+gönderir:
+
+- "db": öğrenme veritabanı, çıktı indeksi (SQLite; yazmalar zaten sıralanır)
+- "analysis": içerik filtresi, duygu/tema analizi (saf Python, CPU)
+- "io": görsel dosyaları (ilk istekte ETag hash'i, Range okumaları)
+
+Her havuzda bekleyen + çalışan iş sayısı `max_pending` ile sınırlıdır;
+sınır aşılırsa ExecutorSaturated fırlatılır (sunucu 503 + Retry-After döner),
+kuyruk sınırsız büyüyüp gecikmeyi herkese yaymaz. Havuz başına aktif/bekleyen
+iş, reddedilen, tamamlanan ve toplam bekleme/çalışma süresi izlenir.
+
+Kullanım:
+    result = await executors.run("db", learning_manager.get_learning_stats)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+
+
+class ExecutorSaturated(RuntimeError):
+    """Havuzun bekleyen iş sınırı dolu"""
+
+    def __init__(self, name: str, limit: int):
+        super().__init__(f"'{name}' havuzu dolu ({limit} bekleyen iş)")
+        self.name = name
+        self.limit = limit
+
+
+class BoundedExecutor:
+    """Bekleyen iş sayısı sınırlı ThreadPoolExecutor (istatistikli)"""
+
+    def __init__(self, name: str, max_workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"vsg-{name}")
+        self._lock = threading.Lock()
+        self.pending = 0  # Kuyrukta bekleyen + çalışan
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name, self.max_pending)
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self.active += 1
+                waited = started - submitted
+                self.wait_seconds += waited
+                if waited > self.max_wait_seconds:
+                    self.max_wait_seconds = waited
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.pending -= 1
+                    self.completed += ok
+                    self.failed += not ok
+                    self.busy_seconds += time.perf_counter() - started
+
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        # Başlamadan iptal edilen iş call()'a hiç girmez: yeri burada bırakılır
+        future.add_done_callback(self._release_if_cancelled)
+        return future
+
+    def _release_if_cancelled(self, future: Future):
+        if future.cancelled():
+            with self._lock:
+                self.pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'active': self.active,
+                'queued': self.pending - self.active,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'busy_seconds': round(self.busy_seconds, 6),
+                'max_wait_seconds': round(self.max_wait_seconds, 6),
+            }
+
+
+# ============== Kayıt ==============
+
+_pools: Dict[str, BoundedExecutor] = {}
+_registry_lock = threading.Lock()
+
+
+def get(name: str) -> BoundedExecutor:
+    """İsimli havuzu getir, yoksa varsayılan boyutla oluştur"""
+    with _registry_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = BoundedExecutor(name)
+        return pool
+
+
+def configure(name: str, workers: Optional[int] = None, max_pending: Optional[int] = None) -> BoundedExecutor:
+    """Havuzu verilen boyutla (yeniden) oluştur; eski havuzdaki işler iptal edilmeden tamamlanır"""
+    with _registry_lock:
+        old = _pools.get(name)
+        pool = _pools[name] = BoundedExecutor(
+            name,
+            max_workers=workers or (old.max_workers if old else DEFAULT_WORKERS),
+            max_pending=max_pending or (old.max_pending if old else DEFAULT_MAX_PENDING),
+        )
+    if old is not None:
+        old.shutdown(wait=False, cancel_futures=False)
+    return pool
+
+
+async def run(name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """fn'i isimli havuzda çalıştır ve sonucu bekle"""
+    return await get(name).run(fn, *args, **kwargs)
+
+
+def shutdown(wait: bool = True):
+    with _registry_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: pool.stats() for name, pool in sorted(_pools.items())}
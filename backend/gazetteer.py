@@ -0,0 +1,136 @@
+"""
+Gazetteer - Çok Kelimeli Varlık Sözlüğü
+=======================================
+İsim, şehir, ilçe, semt, yer adı gibi varlıklar kelime (token) düzeyinde
+bir trie'de tutulur. Metnin token'ları soldan sağa bir kez yürünür; her
+pozisyonda en uzun eşleşme aranır. Token başına maliyet sözlük boyutundan
+bağımsızdır, en uzun girdinin token sayısıyla sınırlıdır.
+
+Dosya biçimi (UTF-8, satır başına bir girdi, '#' ile başlayan satırlar yorum):
+
+    kadıköy<TAB>LOCATION
+    bağdat caddesi<TAB>LOCATION
+    mehmet akif ersoy<TAB>PERSON
+
+Etiket sütunu yoksa load(default_label=...) kullanılır.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+_LABELS = ''  # Düğümde biten girdinin etiketleri (token'lar boş olamaz)
+_STRIP_CHARS = '.,!?;:'  # EntityRecognizer ile aynı kelime kırpma kuralı
+
+
+def normalize_token(word: str) -> str:
+    """Sözlük anahtarı: küçük harf, baş/son noktalama kırpılmış"""
+    return word.lower().strip(_STRIP_CHARS)
+
+
+class GazetteerMatch(NamedTuple):
+    """Token dizisinde [start, end) aralığındaki girdi"""
+    start: int
+    end: int
+    labels: Tuple[str, ...]
+
+
+class Gazetteer:
+    """Token trie'si; eklemeler thread-safe, okumalar kilitsiz"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        self._root: Dict[str, Any] = {}
+        self._size = 0
+        self.max_tokens = 0
+        self._lock = threading.Lock()
+        for phrase, label in entries:
+            self.add(phrase, label)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, phrase: str, label: str) -> bool:
+        """Girdi ekle; yeni (ifade, etiket) çiftiyse True"""
+        with self._lock:
+            return self._insert(phrase, label)
+
+    def add_all(self, phrases: Iterable[str], label: str) -> int:
+        with self._lock:
+            return sum(1 for phrase in phrases if self._insert(phrase, label))
+
+    def load(self, path: Union[str, Path], default_label: Optional[str] = None) -> int:
+        """TSV dosyasından girdileri yükle; eklenen yeni girdi sayısını döndür"""
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                phrase, _, label = line.partition('\t')
+                label = label.strip() or default_label
+                if not label:
+                    raise ValueError(f"{path}:{line_no}: etiket yok ve default_label verilmedi")
+                entries.append((phrase, label))
+
+        # Dosya önce tamamen doğrulanır: hatalı dosya sözlüğü yarım bırakmaz
+        with self._lock:
+            return sum(1 for phrase, label in entries if self._insert(phrase, label))
+
+    def _insert(self, phrase: str, label: str) -> bool:
+        tokens = [token for token in map(normalize_token, phrase.split()) if token]
+        if not tokens or not label:
+            return False
+
+        node = self._root
+        intern = sys.intern
+        for token in tokens:
+            child = node.get(token)
+            if child is None:
+                # Tekrarlayan token'lar ('caddesi', 'mahallesi') tek string nesnesi paylaşır
+                child = node[intern(token)] = {}
+            node = child
+        labels = node.get(_LABELS, ())
+        if label in labels:
+            return False
+        if not labels:
+            self._size += 1
+        node[_LABELS] = labels + (label,)
+        if len(tokens) > self.max_tokens:
+            self.max_tokens = len(tokens)
+        return True
+
+    def labels(self, token: str) -> Tuple[str, ...]:
+        """Tek token'lık girdinin etiketleri (token normalize edilmiş olmalı)"""
+        node = self._root.get(token)
+        return node.get(_LABELS, ()) if node is not None else ()
+
+    def match_at(self, tokens: List[str], start: int) -> Optional[GazetteerMatch]:
+        """start pozisyonundan başlayan en uzun girdi"""
+        node = self._root
+        best = None
+        for end in range(start, min(len(tokens), start + self.max_tokens)):
+            node = node.get(tokens[end])
+            if node is None:
+                break
+            labels = node.get(_LABELS)
+            if labels:
+                best = GazetteerMatch(start, end + 1, labels)
+        return best
+
+    def find(self, tokens: List[str], min_tokens: int = 1) -> List[GazetteerMatch]:
+        """Soldan sağa en uzun, çakışmayan eşleşmeler (token'lar normalize edilmiş olmalı)"""
+        matches = []
+        root = self._root
+        i = 0
+        while i < len(tokens):
+            # Kök düğümde olmayan token'lar trie yürüyüşü olmadan atlanır
+            if tokens[i] in root:
+                match = self.match_at(tokens, i)
+                if match is not None:
+                    if match.end - match.start >= min_tokens:
+                        matches.append(match)
+                    i = match.end
+                    continue
+            i += 1
+        return matches
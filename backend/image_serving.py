@@ -0,0 +1,339 @@
+"""
+Görsel Sunumu - HTTP Önbellekleme
+=================================
+Üretilen görseller yazıldıktan sonra değişmez (dosya adları benzersizdir).
+Bu yüzden:
+
+- ETag içerikten türetilir (blake2b), dosya başına bir kez hesaplanır.
+- Cache-Control: uzun ömürlü ve `immutable`; tarayıcı yeniden doğrulama bile yapmaz.
+- If-None-Match / If-Modified-Since eşleşirse 304, gövde gönderilmez.
+- Tek aralıklı Range istekleri 206 ile yanıtlanır (If-Range desteklenir);
+  çok aralıklı istekler tam gövdeyle (200) yanıtlanır.
+
+ImageCatalog dosya adı başına doğrulanmış yolu ve ETag'i önbellekte tutar;
+tekrar eden isteklerde yalnızca bir stat çağrısı yapılır (dosya silinmiş veya
+değişmişse kayıt yenilenir). Kaçırmada resolve() dosyanın tamamını okuyup
+hash'ler; async çağıranlar önce cached() dener, kaçırmayı executor'da çözer.
+
+Ters vekil devri (offload): doğrulama ve 304 kararı yine burada verilir,
+gövde yerine dahili yönlendirme başlığı döner; baytları vekil gönderir.
+
+- x-accel-redirect (nginx): `X-Accel-Redirect: <internal location>/<dosya>`
+- x-sendfile (Apache mod_xsendfile, lighttpd, Caddy eklentileri): mutlak yol
+
+Range ve gövde vekil tarafından sunulur. Yerel doğrulama için
+benchmarks/offload_proxy.py vekili taklit eder.
+
+ImageByteCache yeni üretilen görsellerin kodlanmış baytlarını boyut sınırlı
+bir LRU'da tutar; üretim aşaması dosyayı yazarken doldurur (iş biter bitmez
+gelen ilk istek ve galeri/paylaşım tekrarları diskten okunmaz). Baytlar ETag
+ile eşlenir: dosya değişirse eski baytlar sunulmaz.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote
+
+from security import PathSecurity
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+_HASH_CHUNK = 1 << 20
+
+
+class ImageEntry(NamedTuple):
+    path: Path
+    size: int
+    mtime_ns: int
+    etag: str
+    last_modified: str
+    media_type: str
+
+
+class ServePlan(NamedTuple):
+    """Yanıt planı; 206'da [start, end] (dahil) aralığı gönderilir"""
+    status: int
+    headers: Dict[str, str]
+    start: int = 0
+    end: int = -1
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def content_etag(path: Union[str, Path]) -> str:
+    """İçerikten güçlü ETag"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()}"'
+
+
+def bytes_etag(data: bytes) -> str:
+    """content_etag ile aynı, bellekteki baytlar için"""
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match karşılaştırması (zayıf karşılaştırma, '*' dahil)"""
+    if header.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """'bytes=a-b' başlığından [start, end] (dahil).
+
+    Biçimsiz veya çok aralıklı başlıkta None (tam gövde gönderilir);
+    karşılanamayan aralıkta RangeNotSatisfiable.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Son N bayt
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _not_modified_since(header: str, mtime_ns: int) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    return mtime_ns // 1_000_000_000 <= since
+
+
+def plan(entry: ImageEntry, headers: Mapping[str, str]) -> ServePlan:
+    """İstek başlıklarına göre 200/206/304/416 yanıt planı"""
+    response_headers = {
+        'ETag': entry.etag,
+        'Cache-Control': CACHE_CONTROL,
+        'Last-Modified': entry.last_modified,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        if etag_matches(if_none_match, entry.etag):
+            return ServePlan(304, response_headers)
+    else:
+        if_modified_since = headers.get('if-modified-since')
+        if if_modified_since and _not_modified_since(if_modified_since, entry.mtime_ns):
+            return ServePlan(304, response_headers)
+
+    range_header = headers.get('range')
+    if_range = headers.get('if-range')
+    if range_header and (if_range is None or if_range.strip() == entry.etag):
+        try:
+            byte_range = parse_range(range_header, entry.size)
+        except RangeNotSatisfiable:
+            response_headers['Content-Range'] = f"bytes */{entry.size}"
+            return ServePlan(416, response_headers)
+        if byte_range is not None:
+            start, end = byte_range
+            response_headers['Content-Range'] = f"bytes {start}-{end}/{entry.size}"
+            response_headers['Content-Length'] = str(end - start + 1)
+            return ServePlan(206, response_headers, start, end)
+
+    response_headers['Content-Length'] = str(entry.size)
+    return ServePlan(200, response_headers, 0, entry.size - 1)
+
+
+def offload(entry: ImageEntry, served: ServePlan, mode: str, location: str = '') -> ServePlan:
+    """200/206 planını gövdesiz dahili yönlendirmeye çevir; diğer planlar aynen döner"""
+    if served.status not in (200, 206):
+        return served
+    headers = {key: value for key, value in served.headers.items()
+               if key not in ('Content-Length', 'Content-Range')}
+    headers['Content-Type'] = entry.media_type
+    if mode == 'x-accel-redirect':
+        headers['X-Accel-Redirect'] = location.rstrip('/') + '/' + quote(entry.path.name)
+    elif mode == 'x-sendfile':
+        headers['X-Sendfile'] = str(entry.path.resolve())
+    else:
+        raise ValueError(f"Bilinmeyen offload modu: {mode}")
+    return ServePlan(200, headers)
+
+
+def read_range(path: Union[str, Path], start: int, end: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start + 1)
+
+
+class ImageCatalog:
+    """Dosya adı -> doğrulanmış yol + ETag (LRU, thread-safe)"""
+
+    def __init__(self, output_dir: Union[str, Path], maxsize: int = 4096):
+        self.output_dir = Path(output_dir)
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[str, ImageEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, filename: str) -> Optional[ImageEntry]:
+        """Önbellekte olan ve değişmemiş dosyanın kaydı (tek stat); aksi halde None -> resolve()"""
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None:
+                self._entries.move_to_end(filename)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(entry.path)
+        except OSError:
+            return None
+        if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+            return None
+        self.hits += 1
+        return entry
+
+    def resolve(self, filename: str) -> Optional[ImageEntry]:
+        """Sunulacak dosya; yoksa None, geçersiz adda ValueError"""
+        entry = self.cached(filename)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            stale = self._entries.get(filename)
+        if stale is not None:
+            path = stale.path  # Silinmiş veya değişmiş: doğrulama geçerli, ETag yeniden hesaplanır
+        else:
+            safe_filename = PathSecurity.sanitize_filename(filename)
+            path = self.output_dir / safe_filename
+            is_valid, error = PathSecurity.validate_path(str(path), str(self.output_dir))
+            if not is_valid:
+                raise ValueError(error)
+
+        self.misses += 1
+        try:
+            st = os.stat(path)
+            etag = content_etag(path)
+        except OSError:
+            self.forget(filename)
+            return None
+        return self._store(filename, path, st, etag)
+
+    def prime(self, path: Union[str, Path], data: bytes, st: Optional[os.stat_result] = None) -> ImageEntry:
+        """Yeni yazılan dosyayı kaydet; ETag yazılan baytlardan, dosya yeniden okunmaz"""
+        path = Path(path)
+        return self._store(path.name, path, st if st is not None else os.stat(path), bytes_etag(data))
+
+    def _store(self, filename: str, path: Path, st: os.stat_result, etag: str) -> ImageEntry:
+        entry = ImageEntry(
+            path=path,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            etag=etag,
+            last_modified=formatdate(st.st_mtime, usegmt=True),
+            media_type=mimetypes.guess_type(path.name)[0] or 'image/png',
+        )
+        with self._lock:
+            self._entries[filename] = entry
+            self._entries.move_to_end(filename)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def forget(self, filename: str) -> None:
+        with self._lock:
+            self._entries.pop(filename, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ImageByteCache:
+    """Dosya adı -> (ETag, kodlanmış baytlar); toplam bayt sınırlı LRU, thread-safe"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: 'OrderedDict[str, Tuple[str, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, filename: str, etag: str, data: bytes) -> bool:
+        """Baytları ekle; tek başına sınırı aşan görseller tutulmaz"""
+        if len(data) > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._items.pop(filename, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._items[filename] = (etag, data)
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def get(self, filename: str, etag: str) -> Optional[bytes]:
+        """ETag eşleşirse baytlar; eşleşmeyen (değişmiş dosya) kayıt düşürülür"""
+        with self._lock:
+            item = self._items.get(filename)
+            if item is not None and item[0] == etag:
+                self._items.move_to_end(filename)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._items[filename]
+                self.bytes -= len(item[1])
+            self.misses += 1
+            return None
+
+    def discard(self, filename: str) -> None:
+        with self._lock:
+            item = self._items.pop(filename, None)
+            if item is not None:
+                self.bytes -= len(item[1])
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._items),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,500 @@
+"""
+Dayanıklı İş Kuyruğu (Broker)
+=============================
+API ve işçi süreçlerinin paylaştığı iş kuyruğu. API yalnızca iş ekler ve
+durum okur; üretimi bir veya daha fazla işçi süreci (worker.py) yapar. Süreçler
+ve makineler arası paylaşım için bir broker yeterlidir; varsayılanı tek
+dosyalık SQLite'tır (ortak disk), JobBroker arayüzünü uygulayan başka
+adaptörler register_broker ile eklenebilir.
+
+İş yaşam döngüsü:
+    pending -> processing (claim) -> completed | failed | cancelled
+                 |  lease süresi doldu, deneme hakkı var
+                 +-> pending
+
+- claim(): en eski bekleyen işi atomik olarak alır (BEGIN IMMEDIATE), işe
+  rastgele bir lease token'ı ve `lease_seconds` sonrası biten kira yazar.
+- heartbeat(): kirayı uzatır, ilerleme/mesaj/zaman çizelgesini yayımlar.
+  İş iptal edildiyse veya kira başka işçiye geçtiyse False döner.
+- complete()/fail(): yalnızca token'ı tutan işçi bitirebilir; kirası dolmuş
+  "zombi" işçinin geç yazması reddedilir.
+- Kirası dolan işler (çöken/donan işçi) sonraki claim'de yeniden kuyruğa
+  alınır; `max_attempts` deneme sonrası failed olur.
+
+BrokerWorker tek bir işçi döngüsüdür: claim, çalışırken arka planda
+heartbeat, sonuçta complete/fail. İş fonksiyonu (record, context) alır;
+context.progress() ilerlemeyi seyrekleştirerek broker'a iletir.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('pending', 'processing', 'completed', 'failed', 'cancelled')
+LEASE_EXPIRED_ERROR = "İşçi yanıt vermedi (kira süresi doldu)"
+
+
+class JobBroker(ABC):
+    """Süreçler arası iş kuyruğu arayüzü
+
+    İş kaydı (get/claim dönüşü) sözlüktür: job_id, status, payload, result,
+    error, progress, progress_message, attempts, max_attempts, worker_id,
+    lease_token, lease_expires, timeline, version, created_at, started_at,
+    completed_at (zamanlar epoch saniye). `version` iş her görünür biçimde
+    değiştiğinde artar.
+    """
+
+    @abstractmethod
+    def submit(self, job_id: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> bool:
+        """İşi kuyruğa ekle; bekleyen iş sınırı doluysa False"""
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """En eski bekleyen işi kiralayarak al; yoksa None"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, lease_token: str, lease_seconds: Optional[float] = None,
+                  progress: Optional[int] = None, message: Optional[str] = None,
+                  timeline: Optional[Dict[str, Any]] = None) -> bool:
+        """Kirayı uzat, ilerlemeyi yayımla; kira kaybedildiyse/iptal edildiyse False"""
+
+    @abstractmethod
+    def complete(self, job_id: str, lease_token: str, result: Any, message: str = "Tamamlandı!",
+                 timeline: Optional[Dict[str, Any]] = None) -> bool:
+        """İşi başarıyla bitir; kira bu token'da değilse False"""
+
+    @abstractmethod
+    def fail(self, job_id: str, lease_token: str, error: str, message: Optional[str] = None,
+             retry: bool = False, timeline: Optional[Dict[str, Any]] = None) -> bool:
+        """İşi hatayla bitir (retry ve deneme hakkı varsa yeniden kuyruğa al)"""
+
+    @abstractmethod
+    def cancel(self, job_id: str, message: str = "Kullanıcı tarafından iptal edildi") -> bool:
+        """Bekleyen veya çalışan işi iptal et"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İş kaydı; yoksa None"""
+
+    @abstractmethod
+    def version(self, job_id: str) -> Optional[int]:
+        """İşin sürümü (yanıt önbelleği anahtarı); yoksa None"""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Durum -> iş sayısı"""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Kirası dolmuş işleri yeniden kuyruğa al / başarısız say"""
+
+    @abstractmethod
+    def purge(self, max_age_seconds: float) -> List[str]:
+        """Bitişinin üzerinden max_age_seconds geçmiş işleri sil, kimliklerini döndür"""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobBroker(JobBroker):
+    """Tek SQLite dosyasında iş kuyruğu (WAL; aynı diski gören tüm süreçler paylaşır)"""
+
+    def __init__(self, path: Union[str, Path], max_pending: int = 0, lease_seconds: float = 60.0,
+                 max_attempts: int = 3):
+        self.path = Path(path)
+        self.max_pending = max_pending  # 0 = sınırsız
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: işlemler BEGIN IMMEDIATE ile elle açılır
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        self._get_conn().executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                progress INTEGER NOT NULL DEFAULT 0,
+                progress_message TEXT NOT NULL DEFAULT '',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker_id TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                timeline TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                completed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(lease_expires) WHERE status = 'processing';
+            CREATE INDEX IF NOT EXISTS idx_jobs_completed ON jobs(completed_at) WHERE completed_at IS NOT NULL;
+            COMMIT;
+        """)
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """fn'i yazma kilidi alınmış tek işlemde çalıştır"""
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _decode(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        record = dict(row)
+        for key in ('payload', 'result', 'timeline'):
+            if record[key] is not None:
+                record[key] = json.loads(record[key])
+        return record
+
+    @staticmethod
+    def _encode(value: Any) -> Optional[str]:
+        return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+    # ---------- API tarafı ----------
+
+    def submit(self, job_id: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> bool:
+        encoded = self._encode(payload)
+
+        def insert(conn: sqlite3.Connection) -> bool:
+            if self.max_pending:
+                pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+                if pending >= self.max_pending:
+                    return False
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, payload, max_attempts, created_at) VALUES (?, 'pending', ?, ?, ?)",
+                (job_id, encoded, max_attempts or self.max_attempts, time.time()))
+            return True
+
+        return self._write(insert)
+
+    def cancel(self, job_id: str, message: str = "Kullanıcı tarafından iptal edildi") -> bool:
+        def update(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', progress_message = ?, lease_token = NULL,"
+                " lease_expires = NULL, completed_at = ?, version = version + 1"
+                " WHERE job_id = ? AND status IN ('pending', 'processing')",
+                (message, time.time(), job_id))
+            return cursor.rowcount == 1
+
+        return self._write(update)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._get_conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._decode(row)
+
+    def version(self, job_id: str) -> Optional[int]:
+        row = self._get_conn().execute("SELECT version FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for status, count in self._get_conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def purge(self, max_age_seconds: float) -> List[str]:
+        cutoff = time.time() - max_age_seconds
+
+        def delete(conn: sqlite3.Connection) -> List[str]:
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE completed_at < ? AND status IN ('completed', 'failed', 'cancelled')",
+                (cutoff,))]
+            conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+            return job_ids
+
+        return self._write(delete)
+
+    # ---------- İşçi tarafı ----------
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> int:
+        """Kirası dolan işler: deneme hakkı varsa pending, yoksa failed (işlem içinde)"""
+        cursor = conn.execute(
+            "UPDATE jobs SET"
+            " status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,"
+            " error = CASE WHEN attempts < max_attempts THEN error ELSE ? END,"
+            " progress_message = CASE WHEN attempts < max_attempts THEN 'Yeniden kuyruğa alındı' ELSE ? END,"
+            " completed_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,"
+            " progress = 0, worker_id = NULL, lease_token = NULL, lease_expires = NULL, version = version + 1"
+            " WHERE status = 'processing' AND lease_expires < ?",
+            (LEASE_EXPIRED_ERROR, f"Hata: {LEASE_EXPIRED_ERROR[:50]}", now, now))
+        if cursor.rowcount:
+            logger.warning(f"{cursor.rowcount} işin kirası doldu")
+        return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        return self._write(lambda conn: self._expire(conn, time.time()))
+
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        lease = lease_seconds or self.lease_seconds
+
+        def take(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            now = time.time()
+            self._expire(conn, now)
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'pending' ORDER BY created_at, rowid LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'processing', worker_id = ?, lease_token = ?, lease_expires = ?,"
+                " attempts = attempts + 1, progress = 0, progress_message = 'Başlatılıyor...',"
+                " started_at = COALESCE(started_at, ?), version = version + 1 WHERE job_id = ?",
+                (worker_id, uuid.uuid4().hex, now + lease, now, row[0]))
+            return self._decode(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row[0],)).fetchone())
+
+        return self._write(take)
+
+    def heartbeat(self, job_id: str, lease_token: str, lease_seconds: Optional[float] = None,
+                  progress: Optional[int] = None, message: Optional[str] = None,
+                  timeline: Optional[Dict[str, Any]] = None) -> bool:
+        lease = lease_seconds or self.lease_seconds
+        # Yalnızca kira uzatması görünür değişiklik değildir: sürüm artmaz
+        changed = int(progress is not None or message is not None or timeline is not None)
+        cursor = self._get_conn().execute(
+            "UPDATE jobs SET lease_expires = ?, progress = COALESCE(?, progress),"
+            " progress_message = COALESCE(?, progress_message), timeline = COALESCE(?, timeline),"
+            " version = version + ? WHERE job_id = ? AND lease_token = ? AND status = 'processing'",
+            (time.time() + lease, progress, message, self._encode(timeline), changed, job_id, lease_token))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, lease_token: str, result: Any, message: str = "Tamamlandı!",
+                 timeline: Optional[Dict[str, Any]] = None) -> bool:
+        cursor = self._get_conn().execute(
+            "UPDATE jobs SET status = 'completed', result = ?, progress = 100, progress_message = ?,"
+            " timeline = COALESCE(?, timeline), lease_token = NULL, lease_expires = NULL, completed_at = ?,"
+            " version = version + 1 WHERE job_id = ? AND lease_token = ? AND status = 'processing'",
+            (self._encode(result), message, self._encode(timeline), time.time(), job_id, lease_token))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, lease_token: str, error: str, message: Optional[str] = None,
+             retry: bool = False, timeline: Optional[Dict[str, Any]] = None) -> bool:
+        message = message or f"Hata: {error[:50]}"
+        cursor = self._get_conn().execute(
+            "UPDATE jobs SET"
+            " status = CASE WHEN ? AND attempts < max_attempts THEN 'pending' ELSE 'failed' END,"
+            " completed_at = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE ? END,"
+            " error = ?, progress_message = ?, timeline = COALESCE(?, timeline),"
+            " worker_id = NULL, lease_token = NULL, lease_expires = NULL, version = version + 1"
+            " WHERE job_id = ? AND lease_token = ? AND status = 'processing'",
+            (int(retry), int(retry), time.time(), error, message, self._encode(timeline), job_id, lease_token))
+        return cursor.rowcount == 1
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ============== Kayıt ==============
+
+BrokerFactory = Callable[[str], JobBroker]
+_brokers: Dict[str, BrokerFactory] = {}
+
+
+def register_broker(scheme: str, factory: BrokerFactory) -> None:
+    """`scheme://...` adresleri için broker fabrikası (fabrika adresin geri kalanını alır)"""
+    _brokers[scheme] = factory
+
+
+def open_broker(url: str, **options) -> JobBroker:
+    """Adresten broker: "sqlite:///yol/jobs.db", "sqlite://./data/jobs.db" veya düz dosya yolu"""
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        scheme, rest = 'sqlite', url
+    if scheme == 'sqlite':
+        return SQLiteJobBroker(rest, **options)
+    factory = _brokers.get(scheme)
+    if factory is None:
+        raise ValueError(f"Bilinmeyen broker türü: {scheme}")
+    return factory(rest)
+
+
+# ============== İşçi ==============
+
+class JobContext:
+    """Çalışan işin broker bağlantısı: seyrekleştirilmiş ilerleme + arka plan heartbeat"""
+
+    def __init__(self, broker: JobBroker, record: Dict[str, Any], lease_seconds: float,
+                 heartbeat_interval: float, progress_interval: float):
+        self.broker = broker
+        self.record = record
+        self.job_id = record['job_id']
+        self.lease_token = record['lease_token']
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.progress_interval = progress_interval
+        self.timeline = None  # to_dict() sağlayan nesne; heartbeat'lerde yayımlanır
+        self.lost = False  # İptal edildi veya kira başka işçiye geçti
+        self._pending: Optional[tuple] = None
+        self._last_sent = 0.0
+        self._published_spans = -1
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def progress(self, progress: int, message: str) -> None:
+        """İlerleme bildir; en fazla progress_interval'da bir broker'a yazılır"""
+        with self._lock:
+            self._pending = (progress, message)
+            due = time.monotonic() - self._last_sent >= self.progress_interval
+        if due:
+            self.flush()
+
+    def timeline_dict(self) -> Optional[Dict[str, Any]]:
+        return self.timeline.to_dict() if self.timeline is not None else None
+
+    def flush(self) -> bool:
+        """Bekleyen ilerlemeyi ve yeni span'leri yayımla, kirayı uzat"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._last_sent = time.monotonic()
+        progress, message = pending if pending else (None, None)
+        timeline = None
+        spans = len(self.timeline.spans) if self.timeline is not None else 0
+        if spans != self._published_spans:
+            self._published_spans = spans
+            timeline = self.timeline_dict()
+        try:
+            alive = self.broker.heartbeat(self.job_id, self.lease_token, self.lease_seconds,
+                                          progress=progress, message=message, timeline=timeline)
+        except Exception as e:
+            # Geçici hata (ör. kilit zaman aşımı): kira henüz dolmadı, sonraki heartbeat dener
+            logger.warning(f"Heartbeat yazılamadı ({self.job_id}): {e}")
+            return not self.lost
+        if not alive and not self.lost:
+            self.lost = True
+            logger.info(f"İş artık bu işçide değil (iptal/kira): {self.job_id}")
+        return alive
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._heartbeat_loop, name=f"heartbeat-{self.job_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_interval + 5)
+
+    def _heartbeat_loop(self) -> None:
+        # Uzun adımlar (model yükleme) ilerleme bildirmese de kira düzenli uzatılır
+        while not self._done.wait(self.heartbeat_interval):
+            if not self.flush():
+                return
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Any]
+
+
+class BrokerWorker:
+    """Broker'dan iş alıp handler ile çalıştıran tek işçi döngüsü"""
+
+    def __init__(self, broker: JobBroker, handler: JobHandler, worker_id: Optional[str] = None,
+                 lease_seconds: float = 60.0, heartbeat_interval: Optional[float] = None,
+                 progress_interval: float = 0.5, poll_interval: float = 1.0,
+                 on_finish: Optional[Callable[[str, float], None]] = None):
+        self.broker = broker
+        self.handler = handler
+        self.worker_id = worker_id or f"worker-{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        # Kira dolmadan en az iki heartbeat denemesi
+        self.heartbeat_interval = heartbeat_interval or max(lease_seconds / 3, 0.01)
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+        self.on_finish = on_finish  # (durum, süre) - metrikler için
+        self.processed: Dict[str, int] = {}
+        self.thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def run_once(self) -> Optional[str]:
+        """Bir iş al ve çalıştır; sonuç durumunu döndür (iş yoksa None)"""
+        record = self.broker.claim(self.worker_id, self.lease_seconds)
+        if record is None:
+            return None
+        job_id, token = record['job_id'], record['lease_token']
+        context = JobContext(self.broker, record, self.lease_seconds,
+                             self.heartbeat_interval, self.progress_interval)
+        started = time.perf_counter()
+        context.start()
+        try:
+            result = self.handler(record, context)
+        except Exception as e:
+            context.stop()
+            logger.error(f"İş hatası ({job_id}): {e}")
+            finished = self.broker.fail(job_id, token, str(e), timeline=context.timeline_dict())
+            status = 'failed'
+        else:
+            context.stop()
+            if context.lost:
+                finished, status = False, 'cancelled'
+            elif result:
+                finished = self.broker.complete(job_id, token, result, timeline=context.timeline_dict())
+                status = 'completed'
+            else:
+                finished = self.broker.fail(job_id, token, "Görsel üretilemedi", message="Hata oluştu",
+                                            timeline=context.timeline_dict())
+                status = 'failed'
+        if not finished and status != 'cancelled':
+            # İş bu sırada iptal edildi ya da kira doldu ve başka işçiye geçti: sonuç yazılmadı
+            record = self.broker.get(job_id)
+            status = 'cancelled' if record and record['status'] == 'cancelled' else 'lost'
+        self.processed[status] = self.processed.get(status, 0) + 1
+        if self.on_finish:
+            self.on_finish(status, time.perf_counter() - started)
+        return status
+
+    def run_forever(self) -> None:
+        logger.info(f"İşçi başladı: {self.worker_id}")
+        while not self._stop.is_set():
+            try:
+                status = self.run_once()
+            except Exception as e:
+                logger.error(f"Broker hatası: {e}")
+                status = None
+            if status is None:
+                self._stop.wait(self.poll_interval)
+        logger.info(f"İşçi durdu: {self.worker_id}")
+
+    def start(self) -> threading.Thread:
+        self._stop.clear()
+        self.thread = threading.Thread(target=self.run_forever, name=self.worker_id, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Yeni iş almayı bırak; çalışan iş bitene kadar (timeout) bekle"""
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
@@ -0,0 +1,137 @@
+"""
+Keyword Automaton - Çoklu Desen Anahtar Kelime Eşleyici
+=======================================================
+Sözlükteki tüm kelimeler tek bir trie'ye derlenir; trie, C tarafında
+çalışan tek bir regex'e çevrilir. Metin tek geçişte taranır ve çakışan
+(iç içe / önek) eşleşmeler dahil tüm isabetler pozisyonlarıyla döner.
+
+Eşleşme semantiği `keyword in text` ile aynıdır: kelime sınırı aranmaz,
+alt dize eşleşmesi yeterlidir. Büyük/küçük harf dönüşümü çağırana aittir.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Trie düğümünü regex'e çevir (açgözlü: önce en uzun eşleşme)"""
+    end = '' in node
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    if len(branches) == 1:
+        body = branches[0]
+        if end:
+            return f"(?:{body})?"
+        return body
+    body = '(?:' + '|'.join(branches) + ')'
+    return body + '?' if end else body
+
+
+def count_non_overlapping(positions: List[int], length: int) -> int:
+    """Artan pozisyonlardan `str.count` sonucu: çakışan geçişler bir kez sayılır"""
+    if len(positions) < 2:
+        return len(positions)
+    count = 0
+    next_free = 0
+    for pos in positions:
+        if pos >= next_free:
+            count += 1
+            next_free = pos + length
+    return count
+
+
+class KeywordAutomaton:
+    """Derlenmiş anahtar kelime kümesi; tek geçişte tüm isabetler"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: Tuple[str, ...] = tuple(sorted({p for p in patterns if p}))
+        self.pattern_set: FrozenSet[str] = frozenset(self.patterns)
+        trie: Dict[str, dict] = {}
+        for pattern in self.patterns:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        # Her pozisyonda en uzun eşleşme yakalanır; sözlükteki önekleri de o pozisyonda eşleşir
+        pattern_set = self.pattern_set
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            p: tuple(p[:i] for i in range(1, len(p) + 1) if p[:i] in pattern_set)
+            for p in self.patterns
+        }
+        self._regex: Optional[re.Pattern] = re.compile(_trie_pattern(trie)) if self.patterns else None
+
+        # ASCII metinler için ASCII desenlerden bytes regex: sre bytes üzerinde daha hızlı tarar,
+        # ASCII'de karakter ve bayt pozisyonları aynıdır
+        ascii_trie: Dict[str, dict] = {}
+        for pattern in self.patterns:
+            if pattern.isascii():
+                node = ascii_trie
+                for char in pattern:
+                    node = node.setdefault(char, {})
+                node[''] = {}
+        self._ascii_regex: Optional[re.Pattern] = (
+            re.compile(_trie_pattern(ascii_trie).encode('ascii')) if ascii_trie else None)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self.pattern_set
+
+    def covers(self, patterns: FrozenSet[str]) -> bool:
+        """Verilen desenlerin hepsi bu otomatta mı"""
+        return patterns <= self.pattern_set
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(başlangıç, kelime) çiftleri; başlangıca, sonra uzunluğa göre sıralı"""
+        if text.isascii():
+            if self._ascii_regex is None:
+                return
+            search = self._ascii_regex.search
+            text = text.encode('ascii')
+            decode = bytes.decode
+        else:
+            if self._regex is None:
+                return
+            search = self._regex.search
+            decode = None
+        prefixes = self._prefixes
+        pos = 0
+        # Her aramadan sonra bir karakter ilerle: çakışan eşleşmeler de bulunur,
+        # aday olmayan pozisyonlar C tarafında atlanır
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return
+            start = match.start()
+            found = match.group()
+            for pattern in prefixes[decode(found) if decode else found]:
+                yield start, pattern
+            pos = start + 1
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Kelime -> artan sıralı başlangıç pozisyonları (yalnızca geçenler)"""
+        hits: Dict[str, List[int]] = {}
+        for start, pattern in self.iter_matches(text):
+            positions = hits.get(pattern)
+            if positions is None:
+                hits[pattern] = [start]
+            else:
+                positions.append(start)
+        return hits
+
+    def first_positions(self, text: str) -> Dict[str, int]:
+        """Kelime -> ilk geçtiği pozisyon (str.find ile aynı)"""
+        first: Dict[str, int] = {}
+        for start, pattern in self.iter_matches(text):
+            if pattern not in first:
+                first[pattern] = start
+        return first
+
+    def count_all(self, text: str) -> Dict[str, int]:
+        """Kelime -> `text.count(kelime)` (yalnızca geçenler)"""
+        return {pattern: count_non_overlapping(positions, len(pattern))
+                for pattern, positions in self.find_all(text).items()}
@@ -5,6 +5,7 @@ Feedback'lerden öğrenerek prompt ve ayarları optimize eder.
 """
 
 import logging
+import json
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from database import db, Generation, Feedback, LearnedPattern
@@ -106,7 +107,8 @@ class LearningManager:
                          negative_prompt: str, scene_type: str, mood: str,
                          genre: str, style: str, width: int, height: int,
                          steps: int, cfg_scale: float, seed: int, model: str,
-                         generation_time: float, image_path: str) -> int:
+                         generation_time: float, image_path: str,
+                         timeline: Optional[Dict[str, Any]] = None) -> int:
         """Yeni üretimi kaydet"""
         gen = Generation(
             job_id=job_id,
@@ -124,7 +126,8 @@ class LearningManager:
             seed=seed,
             model=model,
             generation_time=generation_time,
-            image_path=image_path
+            image_path=image_path,
+            timeline=json.dumps(timeline, ensure_ascii=False) if timeline else None
         )
         return db.save_generation(gen)
 
@@ -288,45 +291,29 @@ class LearningManager:
         )
 
     def get_learning_stats(self) -> Dict[str, Any]:
-        """Öğrenme istatistiklerini döndür"""
+        """Öğrenme istatistiklerini döndür (sayaç tablolarından; feedback taranmaz)"""
         conn = db._get_conn()
         cursor = conn.cursor()
 
-        # Toplam üretim sayısı
-        cursor.execute('SELECT COUNT(*) FROM generations')
-        total_generations = cursor.fetchone()[0]
+        totals = db.get_learning_totals()
+        total_feedback = totals.get('feedback', 0)
 
-        # Toplam feedback sayısı
-        cursor.execute('SELECT COUNT(*) FROM feedback')
-        total_feedback = cursor.fetchone()[0]
-
-        # Öğrenilmiş pattern sayısı
+        # Öğrenilmiş pattern sayısı (küçük tablo)
         cursor.execute('SELECT COUNT(*) FROM learned_patterns WHERE sample_count >= ?',
                       (self.min_samples_for_learning,))
         learned_patterns = cursor.fetchone()[0]
 
         # Ortalama puan
-        cursor.execute('SELECT AVG(overall_score) FROM feedback')
-        avg_score = cursor.fetchone()[0] or 0
+        avg_score = totals['score_sum'] / total_feedback if total_feedback else 0
 
         # En yaygın hatalar
-        issues = db.get_common_issues()
+        issues = {key: totals.get(key, 0) for key in ('hands', 'faces', 'blur', 'text', 'composition', 'anatomy')}
 
         # En başarılı scene types
-        cursor.execute('''
-            SELECT g.scene_type, AVG(f.overall_score) as avg, COUNT(*) as cnt
-            FROM feedback f
-            JOIN generations g ON f.generation_id = g.id
-            GROUP BY g.scene_type
-            HAVING cnt >= 3
-            ORDER BY avg DESC
-            LIMIT 5
-        ''')
-        top_scene_types = [{'type': row[0], 'avg_score': round(row[1], 2), 'count': row[2]}
-                          for row in cursor.fetchall()]
+        top_scene_types = db.get_top_scene_types(min_count=3, limit=5)
 
         return {
-            'total_generations': total_generations,
+            'total_generations': totals.get('generations', 0),
             'total_feedback': total_feedback,
             'learned_patterns': learned_patterns,
             'average_score': round(avg_score, 2),
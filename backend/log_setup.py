@@ -0,0 +1,120 @@
+"""
+Log Setup - Bloklamayan Loglama Hattı
+=====================================
+Çağıran thread yalnızca kaydı kuyruğa koyar; biçimlendirme ve disk yazımı
+arka plandaki QueueListener thread'inde yapılır. Dosya boyuta göre döner.
+Prompt içerikleri örneklenerek ve kısaltılarak loglanır.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+from typing import List, Optional
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruk doluysa bekleme yerine kaydı düşüren QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Sadece mesajı çöz (args değişebilir); zaman/format işini listener yapar
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class PromptSampler:
+    """Prompt loglarını örnekle ve kısalt"""
+
+    def __init__(self, sample_rate: float = 1.0, max_chars: int = 500):
+        self.configure(sample_rate, max_chars)
+
+    def configure(self, sample_rate: float, max_chars: int):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_chars = max(max_chars, 0)
+
+    def sample(self, text: str) -> Optional[str]:
+        """Loglanacaksa kısaltılmış metni, değilse None döndür"""
+        if self.sample_rate <= 0.0 or self.max_chars == 0:
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... (+{len(text) - self.max_chars} karakter)"
+        return text
+
+
+prompt_sampler = PromptSampler()
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_target: Optional[logging.Logger] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level: int = logging.INFO, log_file: Optional[str] = 'server.log',
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  queue_size: int = 10000, fmt: str = DEFAULT_FORMAT, console: bool = True,
+                  target: Optional[logging.Logger] = None) -> NonBlockingQueueHandler:
+    """Logger'ı (varsayılan: root) kuyruk tabanlı hatta bağla; tekrar çağrılırsa eskisini değiştirir"""
+    global _listener, _queue_handler, _target
+
+    with _setup_lock:
+        shutdown_logging()
+
+        formatter = logging.Formatter(fmt)
+        targets: List[logging.Handler] = [logging.StreamHandler()] if console else []
+        if log_file:
+            targets.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            ))
+        for handler in targets:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, *targets, respect_handler_level=True)
+        _listener.start()
+
+        _target = target if target is not None else logging.getLogger()
+        for handler in list(_target.handlers):
+            _target.removeHandler(handler)
+        _target.addHandler(_queue_handler)
+        _target.setLevel(level)
+        return _queue_handler
+
+
+def shutdown_logging():
+    """Kuyruktaki kayıtları yaz ve arka plan thread'ini durdur"""
+    global _listener, _queue_handler, _target
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None and _target is not None:
+        _target.removeHandler(_queue_handler)
+    _queue_handler = None
+    _target = None
+
+
+def dropped_records() -> int:
+    """Kuyruk dolduğu için düşürülen kayıt sayısı"""
+    return _queue_handler.dropped if _queue_handler else 0
+
+
+atexit.register(shutdown_logging)
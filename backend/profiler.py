@@ -0,0 +1,115 @@
+"""
+Profiler - Örneklemeli Yığın Profilleyici
+=========================================
+sys._current_frames() ile belirli thread'lerin yığınlarını periyodik örnekler.
+Hedef kodu enstrümante etmez, yük yalnızca örnekleme thread'indedir.
+Çıktı: collapsed-stack formatı (flamegraph.pl, speedscope, inferno).
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict
+
+MAX_DURATION_S = 60.0
+MIN_INTERVAL_S = 0.001
+
+# Aynı anda tek profil
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Başka bir profil zaten çalışıyor"""
+
+
+@dataclass
+class ProfileResult:
+    stacks: Counter = field(default_factory=Counter)
+    samples: int = 0
+    duration_s: float = 0.0
+    interval_s: float = 0.0
+    threads: Dict[str, int] = field(default_factory=dict)
+
+    def collapsed(self) -> str:
+        """'thread;kök;...;yaprak sayı' satırları, çok örneklenenden aza"""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'samples': self.samples,
+            'duration_s': round(self.duration_s, 3),
+            'interval_ms': round(self.interval_s * 1000, 3),
+            'unique_stacks': len(self.stacks),
+            'threads': self.threads,
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame, max_depth: int) -> str:
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+def sample(threads: Dict[str, int], duration_s: float = 10.0, interval_s: float = 0.005,
+           max_depth: int = 128) -> ProfileResult:
+    """Verilen thread'leri (ad -> ident) süre boyunca örnekle. Tek profil kuralı uygulanır.
+
+    Sonlu ve pozitif olmayan süre/aralıkta ValueError (nan ile bitiş anına hiç ulaşılmaz).
+    """
+    for name, value in (('duration_s', duration_s), ('interval_s', interval_s)):
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"{name} sonlu ve pozitif olmalı: {value}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("Profil zaten çalışıyor")
+    try:
+        return _sample(threads, min(duration_s, MAX_DURATION_S), max(interval_s, MIN_INTERVAL_S), max_depth)
+    finally:
+        _profile_lock.release()
+
+
+def _sample(threads: Dict[str, int], duration_s: float, interval_s: float, max_depth: int) -> ProfileResult:
+    result = ProfileResult(interval_s=interval_s, threads=dict(threads))
+    targets = {ident: name for name, ident in threads.items() if ident}
+    started = time.perf_counter()
+    deadline = started + duration_s
+    next_tick = started
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        frames = sys._current_frames()
+        for ident, name in targets.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                result.stacks[f"{name};{_collapse(frame, max_depth)}"] += 1
+        del frames
+        result.samples += 1
+
+        # Sabit aralık; gecikme birikirse atlanan tikleri telafi etme
+        next_tick += interval_s
+        sleep_for = next_tick - time.perf_counter()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        else:
+            next_tick = time.perf_counter()
+
+    result.duration_s = time.perf_counter() - started
+    return result
+
+
+def is_running() -> bool:
+    return _profile_lock.locked()
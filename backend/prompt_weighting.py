@@ -7,11 +7,13 @@ Dinamik Prompt Ağırlıklandırma ve Sahne Kompozisyon Analizi
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from enum import Enum
 import re
 import math
 
+from document import Document, as_document, register_lexicon
+
 
 class CompositionRule(str, Enum):
     """Kompozisyon kuralları"""
@@ -372,8 +374,20 @@ class SceneCompositionAnalyzer:
 class VisualBalanceAnalyzer:
     """Görsel denge analizi"""
 
+    # Işık analizi
+    LIGHT_WORDS = ['aydınlık', 'parlak', 'güneş', 'ışık', 'beyaz', 'altın']
+    DARK_WORDS = ['karanlık', 'gece', 'gölge', 'siyah', 'loş', 'kasvet']
+
+    # Karmaşıklık analizi
+    COMPLEXITY_INDICATORS = ['kalabalık', 'dolu', 'detaylı', 'karmaşık', 'çok']
+    MINIMAL_INDICATORS = ['boş', 'yalnız', 'tek', 'sade', 'minimal']
+
+    # Ön plan/arka plan analizi
+    FOREGROUND_WORDS = ['yakın', 'önde', 'yüz', 'el', 'detay']
+    BACKGROUND_WORDS = ['uzak', 'arkada', 'manzara', 'ufuk', 'gökyüzü']
+
     @classmethod
-    def analyze_text_for_balance(cls, text: str, elements: List[str]) -> Dict[str, float]:
+    def analyze_text_for_balance(cls, text: Union[str, Document], elements: List[str]) -> Dict[str, float]:
         """Metin ve öğelerden görsel denge öner"""
 
         balance = {
@@ -384,34 +398,25 @@ class VisualBalanceAnalyzer:
             'complexity': 0.5,  # 0 = minimal, 1 = karmaşık
         }
 
-        text_lower = text.lower()
+        doc = as_document(text, indexed=False)
 
         # Işık analizi
-        light_words = ['aydınlık', 'parlak', 'güneş', 'ışık', 'beyaz', 'altın']
-        dark_words = ['karanlık', 'gece', 'gölge', 'siyah', 'loş', 'kasvet']
-
-        light_score = sum(1 for w in light_words if w in text_lower)
-        dark_score = sum(1 for w in dark_words if w in text_lower)
+        light_score = sum(1 for w in cls.LIGHT_WORDS if doc.contains(w))
+        dark_score = sum(1 for w in cls.DARK_WORDS if doc.contains(w))
 
         if light_score + dark_score > 0:
             balance['light_dark'] = light_score / (light_score + dark_score)
 
         # Karmaşıklık analizi
-        complexity_indicators = ['kalabalık', 'dolu', 'detaylı', 'karmaşık', 'çok']
-        minimal_indicators = ['boş', 'yalnız', 'tek', 'sade', 'minimal']
-
-        complexity_score = sum(1 for w in complexity_indicators if w in text_lower)
-        minimal_score = sum(1 for w in minimal_indicators if w in text_lower)
+        complexity_score = sum(1 for w in cls.COMPLEXITY_INDICATORS if doc.contains(w))
+        minimal_score = sum(1 for w in cls.MINIMAL_INDICATORS if doc.contains(w))
 
         if complexity_score + minimal_score > 0:
             balance['complexity'] = complexity_score / (complexity_score + minimal_score)
 
         # Ön plan/arka plan analizi
-        foreground_words = ['yakın', 'önde', 'yüz', 'el', 'detay']
-        background_words = ['uzak', 'arkada', 'manzara', 'ufuk', 'gökyüzü']
-
-        fg_score = sum(1 for w in foreground_words if w in text_lower)
-        bg_score = sum(1 for w in background_words if w in text_lower)
+        fg_score = sum(1 for w in cls.FOREGROUND_WORDS if doc.contains(w))
+        bg_score = sum(1 for w in cls.BACKGROUND_WORDS if doc.contains(w))
 
         if fg_score + bg_score > 0:
             balance['foreground_background'] = bg_score / (fg_score + bg_score)
@@ -444,6 +449,14 @@ class VisualBalanceAnalyzer:
         return ", ".join(parts) if parts else ""
 
 
+# Sahne Document'larının ortak indeksine alt dize olarak aranan kelimeleri ekle
+register_lexicon(
+    VisualBalanceAnalyzer.LIGHT_WORDS, VisualBalanceAnalyzer.DARK_WORDS,
+    VisualBalanceAnalyzer.COMPLEXITY_INDICATORS, VisualBalanceAnalyzer.MINIMAL_INDICATORS,
+    VisualBalanceAnalyzer.FOREGROUND_WORDS, VisualBalanceAnalyzer.BACKGROUND_WORDS,
+)
+
+
 class DynamicPromptBuilder:
     """Dinamik prompt oluşturucu"""
 
@@ -0,0 +1,242 @@
+"""
+API Yanıtları - Hızlı JSON ve Sıkıştırma
+========================================
+- dumps(): orjson varsa onunla (C, doğrudan UTF-8 bayt), yoksa Starlette
+  JSONResponse ile aynı ayarlarla json.dumps. Çıktı iki yolda da aynı JSON'dur.
+- SnapshotCache: anahtar başına serileştirilmiş gövde; yalnızca sürüm
+  değişince yeniden üretilir (iş durumu yoklaması gibi sık, değişmeyen yanıtlar).
+- CoalescedSnapshot: kısa ömürlü (TTL) async anlık görüntü; süresi dolduğunda
+  aynı anda gelen N çağrı tek bir hesaplamayı bekler (/api/status gibi
+  her sekmenin periyodik yokladığı uç noktalar).
+- CompressionMiddleware: saf ASGI; Accept-Encoding'e göre brotli (kuruluysa)
+  veya gzip. Yalnızca metin/JSON türlerinde, eşik üzerindeki tek parçalı
+  gövdeler sıkıştırılır; görseller, 206/304 ve zaten kodlanmış yanıtlar aynen geçer.
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # opsiyonel: yoksa standart json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # opsiyonel: yoksa yalnızca gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+SKIP_STATUSES = (204, 206, 304)
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def dumps(content: Any) -> bytes:
+    """JSON baytları (Starlette JSONResponse.render ile aynı biçim)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(',', ':')).encode('utf-8')
+
+
+class SnapshotCache:
+    """Anahtar -> (sürüm, değer); sürüm aynıysa build çağrılmaz (thread-safe)"""
+
+    def __init__(self):
+        self._items: Dict[Hashable, Tuple[Hashable, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> Any:
+        """Sürüm, build'in okuduğu durumdan önce alınmalı: yarışta en kötü ihtimalle fazladan bir build"""
+        with self._lock:
+            item = self._items.get(key)
+        if item is not None and item[0] == version:
+            self.hits += 1
+            return item[1]
+        self.misses += 1
+        value = build()
+        with self._lock:
+            self._items[key] = (version, value)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class CoalescedSnapshot:
+    """TTL'li async değer; eşzamanlı yenilemeler tek hesaplamada birleşir (event loop'a bağlı)"""
+
+    def __init__(self, compute: Callable[[], Awaitable[Any]], ttl: float = 2.0):
+        self._compute = compute
+        self.ttl = ttl
+        self._value: Any = None
+        self._expires = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.coalesced = 0
+        self.computes = 0
+
+    async def get(self) -> Any:
+        if time.monotonic() < self._expires:
+            self.hits += 1
+            return self._value
+        if self._inflight is not None:
+            self.coalesced += 1
+        else:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # Bekleyen istemci iptal edilse de ortak hesaplama diğerleri için sürer
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> Any:
+        try:
+            value = await self._compute()
+            self.computes += 1
+            self._value, self._expires = value, time.monotonic() + self.ttl
+            return value
+        finally:
+            self._inflight = None
+
+    def invalidate(self) -> None:
+        """Sonraki çağrı yeniden hesaplasın (devam eden hesaplama etkilenmez)"""
+        self._expires = 0.0
+
+
+# ============== Sıkıştırma ==============
+
+def negotiate(accept_encoding: str, supported: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Accept-Encoding'den kullanılacak kodlama; q eşitse supported sırası (br > gzip)"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"Desteklenmeyen kodlama: {encoding}")
+
+
+class CompressionStats:
+    """Kodlama başına sıkıştırılan yanıt, giriş/çıkış baytı"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses: Dict[str, int] = {encoding: 0 for encoding in ENCODINGS}
+        self.bytes_in: Dict[str, int] = {encoding: 0 for encoding in ENCODINGS}
+        self.bytes_out: Dict[str, int] = {encoding: 0 for encoding in ENCODINGS}
+
+    def record(self, encoding: str, raw: int, compressed: int) -> None:
+        with self._lock:
+            self.responses[encoding] += 1
+            self.bytes_in[encoding] += raw
+            self.bytes_out[encoding] += compressed
+
+
+stats = CompressionStats()
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """Accept-Encoding müzakereli gzip/brotli ASGI ara katmanı"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope.get('headers') or [], b'accept-encoding')
+        encoding = negotiate(accept.decode('latin-1')) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start: Optional[Dict[str, Any]] = None
+        decided = False
+
+        async def send_wrapper(message):
+            nonlocal pending_start, decided
+            if decided:
+                await send(message)
+                return
+            if message['type'] == 'http.response.start':
+                pending_start = message  # Karar ilk gövde parçasıyla verilir
+                return
+            decided = True
+            start = pending_start
+            if message['type'] != 'http.response.body':
+                await send(start)
+                await send(message)
+                return
+
+            headers = list(start.get('headers') or [])
+            body = message.get('body', b'')
+            content_type = (_header(headers, b'content-type') or b'').decode('latin-1')
+            compressible = (
+                start['status'] not in SKIP_STATUSES
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+                and _header(headers, b'content-encoding') is None
+            )
+            if compressible:
+                vary = _header(headers, b'vary')
+                if vary is None:
+                    headers.append((b'vary', b'Accept-Encoding'))
+                elif b'accept-encoding' not in vary.lower():
+                    headers = [(k, v + b', Accept-Encoding' if k.lower() == b'vary' else v) for k, v in headers]
+            if not compressible or message.get('more_body', False) or len(body) < self.minimum_size:
+                await send({**start, 'headers': headers})
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            stats.record(encoding, len(body), len(compressed))
+            headers = [(k, v) for k, v in headers if k.lower() != b'content-length']
+            headers.append((b'content-encoding', encoding.encode('latin-1')))
+            headers.append((b'content-length', str(len(compressed)).encode('latin-1')))
+            await send({**start, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_wrapper)
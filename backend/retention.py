@@ -0,0 +1,396 @@
+"""
+Çıktı Saklama Servisi
+=====================
+Üretilen görseller mtime sıralı bir SQLite indeksinde (output_files) tutulur;
+indeks dosya yazılırken güncellenir. Arka plan thread'i yaş, dosya sayısı ve
+toplam bayt kotalarını küçük dilimler halinde uygular: her dilim en eski
+kayıtlardan en fazla `slice_size` dosya siler, dizin taranmaz.
+
+Toplam sayı/bayt trigger'larla output_totals tablosunda tutulur, kota kontrolü
+O(1)'dir. İndeks dosyası paylaşıldığı için birden çok işçi aynı kotaları uygular.
+Dizin indeks boşken (ilk çalıştırma) bir kez, indeks doluysa başlatmadan
+sonra arka planda bir kez ve ardından `reconcile_interval` aralıklarla indeks
+dışı eklenen/silinen dosyalar (ör. kapalıyken yazılanlar, silinemeyenler) için taranır.
+
+Aynı tablo görsel listesini de sunar: iş kimliği, model ve sahne tipi yazma
+sırasında kaydedilir; page() (mtime, dosya adı) üzerinde keyset sayfalama
+yapar, maliyeti arşiv boyutuna değil sayfa boyutuna bağlıdır.
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+REASONS = ('age', 'count', 'bytes')
+METADATA_COLUMNS = {'job_id': 'TEXT', 'model': 'TEXT', 'scene_type': 'TEXT'}
+ROW_COLUMNS = 'filename, mtime, size, job_id, model, scene_type'
+# Tarama sırasında record() edilen dosyanın mtime'ı tarama başlangıcından az önce
+# görünebilir (kaba mtime çözünürlüğü); bu paydan yeni kayıtlar tarama ile düşürülmez
+SCAN_MTIME_SLACK = 2.0
+
+
+def encode_cursor(mtime: float, filename: str) -> str:
+    """Sayfanın son kaydından opak imleç (float repr'ı json'da birebir korunur)"""
+    return base64.urlsafe_b64encode(json.dumps([mtime, filename]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Geçersiz imleçte ValueError"""
+    try:
+        mtime, filename = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(mtime), str(filename)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Geçersiz imleç: {cursor[:40]}") from e
+
+
+class OutputRetention:
+    """Çıktı dizini için indeksli, dilimli saklama politikası"""
+
+    def __init__(self, output_dir: Union[str, Path], index_path: Union[str, Path],
+                 max_files: int = 500, max_age_hours: float = 24, max_bytes: int = 0,
+                 slice_size: int = 100, interval_seconds: float = 60.0,
+                 reconcile_interval: float = 0, pattern: str = '*.png',
+                 on_remove: Optional[Callable[[str], None]] = None):
+        self.output_dir = Path(output_dir)
+        self.index_path = Path(index_path)
+        self.max_files = max_files  # 0 = sınırsız
+        self.max_age_hours = max_age_hours
+        self.max_bytes = max_bytes
+        self.slice_size = slice_size
+        self.interval_seconds = interval_seconds
+        self.reconcile_interval = reconcile_interval
+        self.pattern = pattern
+        self.on_remove = on_remove  # Silinen dosya adıyla çağrılır (önbellek geçersizleştirme)
+
+        self.removed: Dict[str, int] = {reason: 0 for reason in REASONS}
+        self.errors = 0
+        self.slices = 0
+        self.last_run: Optional[float] = None
+        self.last_reconcile: Optional[float] = None
+
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    # ---------- İndeks ----------
+
+    def _get_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: işlemler BEGIN IMMEDIATE ile elle açılır
+            conn = sqlite3.connect(str(self.index_path), timeout=5.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._get_conn()
+        conn.executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS output_files (
+                filename TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                job_id TEXT,
+                model TEXT,
+                scene_type TEXT
+            );
+            CREATE TABLE IF NOT EXISTS output_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                files INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO output_totals (id, files, bytes) VALUES (1, 0, 0);
+            CREATE TRIGGER IF NOT EXISTS output_files_ins AFTER INSERT ON output_files BEGIN
+                UPDATE output_totals SET files = files + 1, bytes = bytes + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS output_files_del AFTER DELETE ON output_files BEGIN
+                UPDATE output_totals SET files = files - 1, bytes = bytes - OLD.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS output_files_upd AFTER UPDATE OF size ON output_files BEGIN
+                UPDATE output_totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 1;
+            END;
+            COMMIT;
+        """)
+        # Eski indeks dosyalarına metadata kolonlarını ekle
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(output_files)")}
+        for name, decl in METADATA_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE output_files ADD COLUMN {name} {decl}")
+        # Keyset sayfalama ve filtreler için (mtime, filename) sıralı indeksler
+        conn.execute("DROP INDEX IF EXISTS idx_output_files_mtime")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_output_files_order ON output_files(mtime, filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_output_files_model ON output_files(model, mtime, filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_output_files_scene ON output_files(scene_type, mtime, filename)")
+
+    def record(self, path: Union[str, Path], size: Optional[int] = None, mtime: Optional[float] = None,
+               job_id: Optional[str] = None, model: Optional[str] = None,
+               scene_type: Optional[str] = None) -> None:
+        """Yeni yazılan dosyayı indekse ekle (yazma sırasında bir kez çağrılır)"""
+        path = Path(path)
+        if size is None or mtime is None:
+            st = path.stat()
+            size, mtime = st.st_size, st.st_mtime
+        self._get_conn().execute(
+            "INSERT INTO output_files (filename, mtime, size, job_id, model, scene_type) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(filename) DO UPDATE SET mtime = excluded.mtime, size = excluded.size, "
+            "job_id = excluded.job_id, model = excluded.model, scene_type = excluded.scene_type",
+            (path.name, mtime, size, job_id, model, scene_type or None))
+
+    def annotate(self, rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str]]]) -> int:
+        """Metadata'sı olmayan kayıtları (dosya adı, iş kimliği, model, sahne tipi) ile doldur"""
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = conn.executemany(
+                "UPDATE output_files SET job_id = ?, model = ?, scene_type = ? "
+                "WHERE filename = ? AND job_id IS NULL",
+                ((job_id, model, scene_type or None, filename) for filename, job_id, model, scene_type in rows)
+            ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return updated
+
+    def forget(self, filename: str) -> bool:
+        """Dosya başka yoldan silindiyse indeksten çıkar"""
+        return self._get_conn().execute(
+            "DELETE FROM output_files WHERE filename = ?", (filename,)).rowcount > 0
+
+    def totals(self) -> Tuple[int, int]:
+        """(dosya sayısı, toplam bayt)"""
+        return self._get_conn().execute("SELECT files, bytes FROM output_totals WHERE id = 1").fetchone()
+
+    def reconcile(self) -> Dict[str, int]:
+        """Dizini tek geçişte tarayıp indeksi dizinle eşitle (dosya başına bir stat).
+
+        Kalan kayıtların metadata'sı korunur; dizinde olmayanlar düşülür. Tarama
+        yazma kilidi dışında yapılır: bu sırada record() edilen dosyalar taramada
+        görünmeyebilir, bu yüzden yalnızca tarama başlangıcından eski kayıtlar düşülür.
+        """
+        scan_started = time.time()
+        entries = []
+        if self.output_dir.exists():
+            suffix = self.pattern.lstrip('*')
+            with os.scandir(self.output_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(suffix) or not entry.is_file():
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # Tarama sırasında silinmiş
+                    entries.append((entry.name, st.st_mtime, st.st_size))
+
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.execute("SELECT files FROM output_totals WHERE id = 1").fetchone()[0]
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS output_scan "
+                         "(filename TEXT PRIMARY KEY, mtime REAL, size INTEGER)")
+            conn.execute("DELETE FROM output_scan")
+            conn.executemany("INSERT OR IGNORE INTO output_scan VALUES (?, ?, ?)", entries)
+            conn.execute("DELETE FROM output_files WHERE mtime < ? AND filename NOT IN "
+                         "(SELECT filename FROM output_scan)", (scan_started - SCAN_MTIME_SLACK,))
+            conn.execute(
+                "INSERT INTO output_files (filename, mtime, size) SELECT filename, mtime, size FROM output_scan "
+                "WHERE true ON CONFLICT(filename) DO UPDATE SET mtime = excluded.mtime, size = excluded.size")
+            conn.execute("DELETE FROM output_scan")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.last_reconcile = time.time()
+        logger.info(f"Çıktı indeksi yeniden kuruldu: {len(entries)} dosya (önceki: {before})")
+        return {'files': len(entries), 'previous': before}
+
+    # ---------- Listeleme ----------
+
+    def page(self, limit: int = 50, cursor: Optional[str] = None, model: Optional[str] = None,
+             scene_type: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """En yeniden eskiye bir sayfa ve sonraki sayfanın imleci (yoksa None)"""
+        where, params = [], []
+        if cursor:
+            where.append("(mtime, filename) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        if model:
+            where.append("model = ?")
+            params.append(model)
+        if scene_type:
+            where.append("scene_type = ?")
+            params.append(scene_type)
+        if since is not None:
+            where.append("mtime >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("mtime < ?")
+            params.append(until)
+        sql = "SELECT filename, mtime, size, job_id, model, scene_type FROM output_files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Bir fazla kayıt: sonraki sayfa olup olmadığını ek sorgu olmadan bil
+        rows = self._get_conn().execute(
+            sql + " ORDER BY mtime DESC, filename DESC LIMIT ?", (*params, limit + 1)).fetchall()
+
+        items = [
+            {'filename': filename, 'mtime': mtime, 'size': size,
+             'job_id': job_id, 'model': row_model, 'scene_type': row_scene}
+            for filename, mtime, size, job_id, row_model, row_scene in rows[:limit]
+        ]
+        next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return items, next_cursor
+
+    # ---------- Kota uygulama ----------
+
+    def _claim(self, now: float, budget: int) -> List[Tuple[tuple, str]]:
+        """Silinecek en eski kayıtları seç ve indeksten düş; (kayıt, neden) listesi.
+
+        Seçim ve silme tek yazma işleminde yapılır: aynı dosyayı iki işçi talep edemez.
+        Kayıt tüm kolonlarıyla döner: silinemeyen dosya _restore ile geri eklenir.
+        """
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            claimed: List[Tuple[tuple, str]] = []
+            if self.max_age_hours > 0:
+                cutoff = now - self.max_age_hours * 3600
+                claimed.extend((row, 'age') for row in conn.execute(
+                    f"SELECT {ROW_COLUMNS} FROM output_files WHERE mtime < ? ORDER BY mtime LIMIT ?",
+                    (cutoff, budget)).fetchall())
+                conn.executemany("DELETE FROM output_files WHERE filename = ?", [(row[0],) for row, _ in claimed])
+
+            files, total_bytes = conn.execute(
+                "SELECT files, bytes FROM output_totals WHERE id = 1").fetchone()
+            quota: List[Tuple[tuple, str]] = []
+            if len(claimed) < budget and ((self.max_files > 0 and files > self.max_files)
+                                          or (self.max_bytes > 0 and total_bytes > self.max_bytes)):
+                rows = conn.execute(f"SELECT {ROW_COLUMNS} FROM output_files ORDER BY mtime LIMIT ?",
+                                    (budget - len(claimed),)).fetchall()
+                for row in rows:
+                    if self.max_files > 0 and files > self.max_files:
+                        quota.append((row, 'count'))
+                    elif self.max_bytes > 0 and total_bytes > self.max_bytes:
+                        quota.append((row, 'bytes'))
+                    else:
+                        break
+                    files -= 1
+                    total_bytes -= row[2]
+                conn.executemany("DELETE FROM output_files WHERE filename = ?", [(row[0],) for row, _ in quota])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        claimed.extend(quota)
+        return claimed
+
+    def _restore(self, rows: List[tuple]) -> None:
+        """Silinemeyen dosyaların kayıtlarını geri ekle (arada reconcile eklediyse dokunma)"""
+        self._get_conn().executemany(
+            f"INSERT OR IGNORE INTO output_files ({ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def enforce(self, now: Optional[float] = None, budget: Optional[int] = None) -> int:
+        """Tek dilim: en fazla `budget` dosya sil, silinen sayısını döndür"""
+        now = time.time() if now is None else now
+        claimed = self._claim(now, budget or self.slice_size)
+        removed = 0
+        failed: List[tuple] = []
+        for row, reason in claimed:
+            name = row[0]
+            try:
+                (self.output_dir / name).unlink()
+            except FileNotFoundError:
+                pass  # Başka yoldan silinmiş; indeks kaydı zaten düşürüldü
+            except OSError as e:
+                self.errors += 1
+                logger.warning(f"Dosya silinirken hata: {name} - {e}")
+                failed.append(row)  # Dosya duruyor: indeks dışı kalırsa kotalardan kaçar
+                continue
+            if self.on_remove is not None:
+                self.on_remove(name)
+            self.removed[reason] += 1
+            removed += 1
+        if failed:
+            self._restore(failed)
+        self.slices += 1
+        self.last_run = now
+        if removed:
+            logger.info(f"Saklama: {removed} dosya silindi")
+        return removed
+
+    def enforce_all(self, max_slices: int = 1000) -> int:
+        """Kotalar sağlanana kadar dilimleri art arda çalıştır (/api/cleanup)"""
+        total = 0
+        for _ in range(max_slices):
+            removed = self.enforce()
+            total += removed
+            if removed < self.slice_size:
+                break
+        return total
+
+    # ---------- Arka plan ----------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.last_reconcile is None and self.totals()[0] == 0:
+            self.reconcile()  # İlk çalıştırma (çağıran henüz indekslemediyse): mevcut dosyaları indeksle
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="output-retention", daemon=True)
+        self._thread.start()
+        logger.info("Çıktı saklama servisi başlatıldı")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            delay = self.interval_seconds
+            try:
+                # Bu süreçte hiç taranmadıysa (dolu indeksle başlatma) tarama vadesi gelmiştir
+                if self.reconcile_interval > 0 and (self.last_reconcile is None
+                                                    or time.time() - self.last_reconcile >= self.reconcile_interval):
+                    self.reconcile()
+                # Dilim doluysa iş kalmıştır: kısa bir aradan sonra devam
+                if self.enforce() >= self.slice_size:
+                    delay = 0.05
+            except Exception as e:
+                logger.error(f"Saklama servisi hatası: {e}")
+            self._stop.wait(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        files, total_bytes = self.totals()
+        oldest = self._get_conn().execute("SELECT MIN(mtime) FROM output_files").fetchone()[0]
+        now = time.time()
+        return {
+            'files': files,
+            'bytes': total_bytes,
+            'oldest_age_seconds': round(now - oldest, 1) if oldest is not None else None,
+            'quotas': {
+                'max_files': self.max_files,
+                'max_age_hours': self.max_age_hours,
+                'max_bytes': self.max_bytes,
+            },
+            'removed': dict(self.removed),
+            'errors': self.errors,
+            'slices': self.slices,
+            'slice_size': self.slice_size,
+            'last_run': self.last_run,
+            'last_reconcile': self.last_reconcile,
+            'running': self._thread is not None and self._thread.is_alive(),
+        }
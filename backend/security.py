@@ -9,16 +9,36 @@ import os
 import uuid
 import hashlib
 import logging
+import sqlite3
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set, Union
 from dataclasses import dataclass
 from functools import wraps
 import time
 
+import analysis_cache
+from analysis_cache import cached_analysis, identity
+from keyword_automaton import KeywordAutomaton
+
 logger = logging.getLogger(__name__)
 
 # ============== Content Filtering ==============
 
+def fold_text(text: str) -> str:
+    """Eşleşme için harf katlama (küçük harf + I/İ/ı -> i); karakter pozisyonları korunur.
+
+    Noktalı/noktasız i ayrımı yok sayılır: 'ÇIPLAK', 'İŞKENCE', 'NUDE' hepsi yakalanır.
+    'İ'.lower() iki karakterdir; önce tek 'i'ye çevrilir, böylece uzunluk değişmez.
+    """
+    if 'İ' in text:
+        text = text.replace('İ', 'i')
+    folded = text.lower()
+    if 'ı' in folded:
+        folded = folded.replace('ı', 'i')
+    return folded
+
+
 @dataclass
 class ContentCheckResult:
     """İçerik kontrol sonucu"""
@@ -72,43 +92,89 @@ class ContentFilter:
         'tarih', 'müze', 'belgesel', 'eğitim', 'tıbbi', 'fantazi', 'oyun'
     }
 
+    _matcher: Optional[KeywordAutomaton] = None
+    _term_kinds: Dict[str, Tuple[Tuple[str, str], ...]] = {}  # katlanmış terim -> ((tür, terim), ...)
+
+    @classmethod
+    def _compiled_terms(cls) -> KeywordAutomaton:
+        """Yasaklı, uyarı ve güvenli bağlam listelerini tek otomata derle"""
+        if cls._matcher is None:
+            kinds: Dict[str, List[Tuple[str, str]]] = {}
+            for kind, terms in (('blocked', cls.BLOCKED_TERMS), ('warning', cls.WARNING_TERMS),
+                                ('safe', cls.SAFE_CONTEXTS)):
+                for term in sorted(terms):
+                    kinds.setdefault(fold_text(term), []).append((kind, term))
+            cls._term_kinds = {folded: tuple(entries) for folded, entries in kinds.items()}
+            cls._matcher = KeywordAutomaton(cls._term_kinds)
+        return cls._matcher
+
+    @classmethod
+    def rebuild_terms(cls):
+        """Terim listeleri değiştiğinde derlenmiş otomatı ve önbelleği yenile"""
+        cls._matcher = None
+        analysis_cache.invalidate('content_filter')
+
     @classmethod
+    @cached_analysis('content_filter', maxsize=1024, normalizer=identity)
     def check_prompt(cls, prompt: str) -> ContentCheckResult:
         """Prompt'u güvenlik açısından kontrol et"""
-        lower_prompt = prompt.lower()
+        matcher = cls._compiled_terms()
+        term_kinds = cls._term_kinds
         blocked = []
+        blocked_spans = []
         warnings = []
-
-        # Yasaklı terimleri kontrol et
-        for term in cls.BLOCKED_TERMS:
-            if term in lower_prompt:
-                blocked.append(term)
-
-        # Uyarı terimlerini kontrol et
-        for term in cls.WARNING_TERMS:
-            if term in lower_prompt:
-                # Güvenli bağlam var mı kontrol et
-                has_safe_context = any(ctx in lower_prompt for ctx in cls.SAFE_CONTEXTS)
-                if not has_safe_context:
-                    warnings.append(term)
+        has_safe_context = False
+
+        # Tek geçiş: tüm isabetler başlangıç pozisyonuna göre sıralı gelir
+        for start, folded in matcher.iter_matches(fold_text(prompt)):
+            for kind, term in term_kinds[folded]:
+                if kind == 'blocked':
+                    blocked_spans.append((start, start + len(folded)))
+                    if term not in blocked:
+                        blocked.append(term)
+                elif kind == 'warning':
+                    if term not in warnings:
+                        warnings.append(term)
+                else:
+                    has_safe_context = True
+
+        # Güvenli bağlam varsa uyarılar düşer
+        if has_safe_context:
+            warnings = []
 
         # Sonuç
         is_safe = len(blocked) == 0
         confidence = 1.0 - (len(warnings) * 0.1)  # Her uyarı %10 güven düşürür
 
-        # Sanitize: yasaklı terimleri kaldır
-        sanitized = prompt
-        for term in blocked:
-            sanitized = re.sub(re.escape(term), '[BLOCKED]', sanitized, flags=re.IGNORECASE)
-
         return ContentCheckResult(
             is_safe=is_safe,
             blocked_categories=blocked,
             warning_categories=warnings,
             confidence=max(0.0, confidence),
-            sanitized_prompt=sanitized
+            sanitized_prompt=cls._sanitize(prompt, blocked_spans)
         )
 
+    @staticmethod
+    def _sanitize(prompt: str, spans: List[Tuple[int, int]]) -> str:
+        """Yasaklı terim aralıklarını tek geçişte [BLOCKED] ile değiştir; çakışan aralıklar birleşir"""
+        if not spans:
+            return prompt
+        parts = []
+        pos = 0
+        span_start, span_end = spans[0]
+        for start, end in spans[1:]:
+            if start < span_end:
+                span_end = max(span_end, end)
+                continue
+            parts.append(prompt[pos:span_start])
+            parts.append('[BLOCKED]')
+            pos = span_end
+            span_start, span_end = start, end
+        parts.append(prompt[pos:span_start])
+        parts.append('[BLOCKED]')
+        parts.append(prompt[span_end:])
+        return ''.join(parts)
+
     @classmethod
     def get_safe_negative_prompt(cls) -> str:
         """Güvenli içerik için negatif prompt eklemeleri"""
@@ -215,82 +281,170 @@ class JobIdManager:
 
 # ============== Rate Limiting ==============
 
-class RateLimiter:
-    """Basit rate limiting"""
+# İstemci başına kayan pencere sayacı, O(1) bellek:
+# (geçerli sabit pencerenin başlangıcı, geçerli penceredeki istek, önceki penceredeki istek)
+RateLimitState = Tuple[float, int, int]
 
-    def __init__(self, requests_per_minute: int = 30):
-        self.requests_per_minute = requests_per_minute
-        self.requests: dict = {}  # ip -> [(timestamp, ...)]
 
-    def is_allowed(self, client_ip: str) -> Tuple[bool, int]:
-        """İstek izni kontrolü"""
-        now = time.time()
-        minute_ago = now - 60
-
-        # Eski istekleri temizle
-        if client_ip in self.requests:
-            self.requests[client_ip] = [
-                ts for ts in self.requests[client_ip]
-                if ts > minute_ago
-            ]
-        else:
-            self.requests[client_ip] = []
+def _sliding_window(state: Optional[RateLimitState], now: float, window: float,
+                    limit: int) -> Tuple[bool, int, RateLimitState]:
+    """Kayan pencere sayacı kararı: (izin, Retry-After saniye, yeni durum).
 
-        # Limit kontrolü
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            wait_time = int(60 - (now - self.requests[client_ip][0]))
-            return False, wait_time
+    Tahmini istek sayısı = önceki pencere * (kalan oran) + geçerli pencere.
+    """
+    window_start = now - now % window
+    if state is None or state[0] <= window_start - 2 * window:
+        current = previous = 0
+    elif state[0] < window_start:
+        current, previous = 0, state[1]  # Bir sonraki pencereye geçildi
+    else:
+        _, current, previous = state
 
-        # İsteği kaydet
-        self.requests[client_ip].append(now)
-        return True, 0
+    elapsed = now - window_start
+    if previous * (1 - elapsed / window) + current < limit:
+        return True, 0, (window_start, current + 1, previous)
 
-# ============== Output Cleanup ==============
+    # Tahminin limite eşit olduğu an; izin için kesin küçük olmalı (floor + 1)
+    if current < limit and previous > 0:
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        # Bu pencere doldu: sonraki pencerede bu pencerenin payı azalana kadar beklenir
+        wait = (window - elapsed) + window * (1 - limit / current) if current else window - elapsed
+    return False, max(1, int(wait) + 1), (window_start, current, previous)
+
+
+class MemoryRateLimitBackend:
+    """Süreç içi sayaçlar (tek işçi)"""
+
+    def __init__(self):
+        self._states: Dict[str, RateLimitState] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, client: str, now: float, window: float, limit: int) -> Tuple[bool, int]:
+        with self._lock:
+            allowed, retry_after, state = _sliding_window(self._states.get(client), now, window, limit)
+            self._states[client] = state
+        return allowed, retry_after
+
+    def evict(self, before: float) -> int:
+        """Son penceresi `before`dan eski istemcileri sil"""
+        with self._lock:
+            idle = [client for client, state in self._states.items() if state[0] < before]
+            for client in idle:
+                del self._states[client]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SQLiteRateLimitBackend:
+    """Birden çok uvicorn işçisinin paylaştığı sayaçlar (WAL modunda SQLite dosyası)
+
+    Çağrılar bloklayıcıdır; API bunları event loop dışında ("db" havuzu) çalıştırır.
+    Kilit `busy_timeout` içinde alınamazsa istek reddedilmez (fail-open): limitin
+    kısa süre gevşemesi, tüm isteklerin kilit beklemesinden iyidir.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 0.1):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self.fail_open = 0
+        self._local = threading.local()
+        conn = self._get_conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    client TEXT PRIMARY KEY,
+                    window_start REAL NOT NULL,
+                    current INTEGER NOT NULL,
+                    previous INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_window ON rate_limits(window_start)")
+        # /metrics için: yeni istemcide artırılır, temizlikte yeniden sayılır (scrape sorgu yapmaz)
+        self._clients = conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def _get_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: işlemler BEGIN IMMEDIATE ile elle açılır
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, client: str, now: float, window: float, limit: int) -> Tuple[bool, int]:
+        conn = self._get_conn()
+        try:
+            # Yazma kilidi okumadan önce alınır: işçiler arası oku-değiştir-yaz atomik
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            self.fail_open += 1
+            logger.warning(f"Rate limit kilidi alınamadı, istek kabul edildi: {e}")
+            return True, 0
+        try:
+            row = conn.execute(
+                "SELECT window_start, current, previous FROM rate_limits WHERE client = ?", (client,)
+            ).fetchone()
+            allowed, retry_after, state = _sliding_window(
+                tuple(row) if row else None, now, window, limit)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (client, window_start, current, previous) VALUES (?, ?, ?, ?)",
+                (client, *state))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            self._clients += 1
+        return allowed, retry_after
+
+    def evict(self, before: float) -> int:
+        conn = self._get_conn()
+        removed = conn.execute("DELETE FROM rate_limits WHERE window_start < ?", (before,)).rowcount
+        self._clients = conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+        return removed
 
-class OutputCleaner:
-    """Çıktı dosyalarını temizleme"""
+    def __len__(self) -> int:
+        return self._clients
 
-    def __init__(self, output_dir: str, max_files: int = 500, max_age_hours: int = 24):
-        self.output_dir = Path(output_dir)
-        self.max_files = max_files
-        self.max_age_hours = max_age_hours
 
-    def cleanup(self) -> int:
-        """Eski dosyaları temizle"""
-        if not self.output_dir.exists():
-            return 0
+class RateLimiter:
+    """Kayan pencere sayaçlı rate limiting; boşta kalan istemciler periyodik silinir"""
 
-        files = list(self.output_dir.glob('*.png'))
-        removed = 0
+    def __init__(self, requests_per_minute: int = 30, window_seconds: float = 60.0,
+                 backend: Optional[Union[MemoryRateLimitBackend, SQLiteRateLimitBackend]] = None):
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        # SQLite arka ucu dosya kilidi bekleyebilir: çağıran event loop dışında çalıştırmalı
+        self.blocking = isinstance(self.backend, SQLiteRateLimitBackend)
+        self._next_eviction = time.time() + window_seconds
 
-        # Yaşa göre sil
+    def is_allowed(self, client_ip: str) -> Tuple[bool, int]:
+        """İstek izni kontrolü: (izin, Retry-After saniye)"""
         now = time.time()
-        max_age_seconds = self.max_age_hours * 3600
-
-        for f in files:
-            try:
-                age = now - f.stat().st_mtime
-                if age > max_age_seconds:
-                    f.unlink()
-                    removed += 1
-            except Exception as e:
-                logger.warning(f"Dosya silinirken hata: {f} - {e}")
-
-        # Sayıya göre sil (en eskiler)
-        files = sorted(self.output_dir.glob('*.png'), key=lambda x: x.stat().st_mtime)
-        while len(files) > self.max_files:
-            try:
-                files[0].unlink()
-                files.pop(0)
-                removed += 1
-            except Exception as e:
-                logger.warning(f"Dosya silinirken hata: {e}")
-                break
-
-        if removed > 0:
-            logger.info(f"Temizlik: {removed} dosya silindi")
+        if now >= self._next_eviction:
+            self._next_eviction = now + self.window_seconds
+            self.evict_idle(now)
+        return self.backend.hit(client_ip, now, self.window_seconds, self.requests_per_minute)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """İki pencereden uzun süredir istek yapmayan istemcileri sil (sayaçları zaten sıfırdır)"""
+        now = time.time() if now is None else now
+        window_start = now - (now % self.window_seconds)
+        try:
+            return self.backend.evict(window_start - self.window_seconds)
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limit temizliği başarısız: {e}")
+            return 0
 
-        return removed
+    def tracked_clients(self) -> int:
+        return len(self.backend)
 
 # ============== CORS Configuration ==============
 
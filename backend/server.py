@@ -13,6 +13,8 @@ Yenilikler v3.0:
 - Path güvenliği
 """
 
+import io
+import math
 import os
 import sys
 import time
@@ -23,16 +25,18 @@ import logging
 import gc
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List, Tuple, Union
+from dataclasses import dataclass, field
+import asyncio
+import hmac
 from enum import Enum
 import traceback
 
 # FastAPI imports
 try:
-    from fastapi import FastAPI, HTTPException, Request, Depends
+    from fastapi import FastAPI, HTTPException, Request, Depends, Query
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import FileResponse, JSONResponse
+    from fastapi.responses import FileResponse, JSONResponse, Response, PlainTextResponse
     from pydantic import BaseModel, Field
     import uvicorn
 except ImportError:
@@ -44,23 +48,30 @@ try:
     from database import db, Generation, Feedback
     from learning_manager import learning_manager, OptimizationResult
     from security import (
-        ContentFilter, PathSecurity, JobIdManager, RateLimiter,
-        OutputCleaner, RequestValidator, get_cors_config
+        ContentFilter, PathSecurity, JobIdManager, RateLimiter, SQLiteRateLimitBackend,
+        RequestValidator, get_cors_config
     )
+    from retention import OutputRetention, REASONS as RETENTION_REASONS
+    import image_serving
+    from image_serving import ImageCatalog, ImageByteCache
     from emotion_analyzer import emotion_analyzer, EmotionResult
+    from turkish_nlp import ThemeAnalyzer, EntityRecognizer
+    from metrics import registry as metrics_registry, CONTENT_TYPE_LATEST
+    import tracing
+    from tracing import Timeline
+    import executors
+    from executors import ExecutorSaturated
+    import responses
+    from responses import CoalescedSnapshot, CompressionMiddleware, SnapshotCache
+    from job_broker import BrokerWorker, JobBroker, JobContext, open_broker
+    from weight_store import WeightStore, STORE_FORMAT
+    import profiler
+    from log_setup import setup_logging, prompt_sampler, dropped_records
+    import analysis_cache
 except ImportError as e:
     print(f"Modül import hatası: {e}")
     print("Modüller yüklenemedi, temel modda çalışılacak.")
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('server.log', encoding='utf-8')
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # ============== Configuration ==============
@@ -115,7 +126,9 @@ MODEL_CONFIGS = {
         "default_size": 1024,
         "max_size": 1024,
         "supports_refiner": False,
-        "fixed_steps": 4
+        "fixed_steps": 4,
+        "base": "stabilityai/stable-diffusion-xl-base-1.0",
+        "lora": "sdxl_lightning_4step_lora.safetensors"
     }
 }
 
@@ -132,14 +145,166 @@ class ServerConfig:
     port: int = 8765
     output_dir: str = "./generated_images"
     model_cache_dir: str = "./models"
+    # İşlenmiş (dtype + LoRA) ağırlıkların mmap ile yüklendiği yerel depo; boşsa her başlatmada from_pretrained
+    weight_store_dir: str = field(default_factory=lambda: os.environ.get("VSG_WEIGHT_STORE", ""))
     max_queue_size: int = 10
     max_concurrent_jobs: int = 1
     max_retries: int = 2
-    cleanup_interval_hours: int = 24
+    cleanup_interval_hours: int = 24  # İndeksin dizinle tam uzlaştırılma aralığı
     production: bool = False
+    # Yönetici uç noktaları (profil vb.) - boşsa kapalı
+    admin_token: str = field(default_factory=lambda: os.environ.get("ADMIN_TOKEN", ""))
+    # Loglama - kuyruk tabanlı, boyuta göre dönen dosya
+    log_file: str = "server.log"
+    log_max_mb: int = 10
+    log_backup_count: int = 5
+    log_prompt_sample_rate: float = 0.1  # Prompt içeriği loglanan üretim oranı
+    log_prompt_max_chars: int = 200
+    # Analiz sonuç önbellekleri (kayıt sayısı, 0 = kapalı)
+    analysis_cache_sizes: Dict[str, int] = field(default_factory=lambda: {
+        "emotion": 512,
+        "turkish_nlp": 256,
+        "theme.themes": 256,
+        "theme.mood": 256,
+        "content_filter": 1024,
+        "morphology.word": 4096,
+    })
+    # Toplu duygu analizi sınırları
+    emotion_batch_max_texts: int = 200
+    emotion_batch_max_chars: int = 200_000
+    theme_batch_max_texts: int = 500
+    theme_batch_max_chars: int = 500_000
+    # Rate limiting - kayan pencere; VSG_RATE_LIMIT_DB verilirse işçiler SQLite üzerinden tek limit paylaşır
+    rate_limit_per_minute: int = 30
+    rate_limit_db: str = field(default_factory=lambda: os.environ.get("VSG_RATE_LIMIT_DB", ""))
+    # Çıktı saklama - mtime indeksli, arka planda dilimler halinde uygulanır (0 = sınırsız)
+    output_index_db: str = "./data/output_index.db"
+    output_max_files: int = 500
+    output_max_age_hours: float = 24
+    output_max_mb: int = 0
+    retention_interval_seconds: float = 60.0
+    retention_slice_size: int = 100
+    images_page_max: int = 200  # /api/images sayfa boyutu üst sınırı
+    image_catalog_size: int = 4096  # Doğrulanmış yol + ETag önbelleği (dosya adı sayısı)
+    image_byte_cache_mb: int = 64  # Yeni üretilen görsellerin bellekteki baytları (0 = kapalı)
+    # Görsel baytlarını ters vekile devret: "" (kapalı), "x-accel-redirect" (nginx) veya "x-sendfile"
+    image_offload: str = field(default_factory=lambda: os.environ.get("VSG_IMAGE_OFFLOAD", "").lower())
+    # nginx'te output_dir'e bakan `internal` location
+    image_offload_location: str = field(
+        default_factory=lambda: os.environ.get("VSG_IMAGE_OFFLOAD_LOCATION", "/_protected_images"))
+    # /api/status ve /api/learning/stats anlık görüntü ömrü; eşzamanlı istekler tek hesaplamayı bekler
+    status_ttl_seconds: float = 2.0
+    # Yanıt sıkıştırma (Accept-Encoding: br kuruluysa, gzip); eşik altındaki gövdeler olduğu gibi gider
+    compress_min_bytes: int = 1024
+    compress_gzip_level: int = 6
+    compress_brotli_quality: int = 4
+    # Bloklayan iş havuzları: "db" (SQLite), "analysis" (CPU yoğun analiz); doluysa 503
+    executor_pools: Dict[str, Dict[str, int]] = field(default_factory=lambda: {
+        "db": {"workers": 2, "max_pending": 64},
+        "analysis": {"workers": 2, "max_pending": 32},
+        "io": {"workers": 4, "max_pending": 64},
+    })
+    # Paylaşılan iş kuyruğu: boşsa süreç içi kuyruk; "sqlite:///yol/jobs.db" ile API ve worker.py
+    # süreçleri (ortak diskteki) aynı broker'ı kullanır
+    job_broker: str = field(default_factory=lambda: os.environ.get("VSG_JOB_BROKER", ""))
+    # Broker modunda API süreci de bir işçi çalıştırsın mı (ayrı işçi süreçleri varsa 0)
+    api_worker: bool = field(default_factory=lambda: os.environ.get("VSG_API_WORKER", "1") != "0")
+    job_lease_seconds: float = 60.0  # Heartbeat gelmezse iş bu süre sonunda yeniden kuyruğa alınır
+    job_max_attempts: int = 3  # Kirası dolan (işçisi çöken) iş en fazla bu kadar denenir
+    # Varlık tanıma için ek gazetteer dosyaları (TSV: ifade<TAB>ETİKET), os.pathsep ile ayrılmış
+    gazetteer_paths: List[str] = field(default_factory=lambda: [
+        p for p in os.environ.get("VSG_GAZETTEER_PATHS", "").split(os.pathsep) if p])
 
 CONFIG = ServerConfig()
 
+# Logging setup
+setup_logging(
+    level=logging.INFO,
+    log_file=CONFIG.log_file,
+    max_bytes=CONFIG.log_max_mb * 1024 * 1024,
+    backup_count=CONFIG.log_backup_count
+)
+prompt_sampler.configure(CONFIG.log_prompt_sample_rate, CONFIG.log_prompt_max_chars)
+
+# ============== Metrics ==============
+
+JOBS_TOTAL = metrics_registry.counter(
+    "vsg_jobs", "Sonuçlanan iş sayısı", ("status",))
+QUEUE_WAIT_SECONDS = metrics_registry.histogram(
+    "vsg_queue_wait_seconds", "İşin kuyrukta bekleme süresi")
+JOB_DURATION_SECONDS = metrics_registry.histogram(
+    "vsg_job_duration_seconds", "İşin işçide toplam işlenme süresi", ("status",))
+STAGE_SECONDS = metrics_registry.histogram(
+    "vsg_generation_stage_seconds", "Üretim aşaması süresi", ("stage",))
+INFERENCE_SECONDS = metrics_registry.histogram(
+    "vsg_inference_seconds", "Difüzyon çıkarım süresi", ("model", "resolution"))
+OOM_RETRIES = metrics_registry.counter(
+    "vsg_oom_retries", "OOM sonrası küçültülmüş boyutla yeniden deneme", ("model",))
+GENERATION_FAILURES = metrics_registry.counter(
+    "vsg_generation_failures", "Başarısız üretim", ("model", "reason"))
+RATE_LIMIT_REJECTIONS = metrics_registry.counter(
+    "vsg_rate_limit_rejections", "Hız sınırı nedeniyle reddedilen istek", ("path",))
+RATE_LIMIT_CLIENTS = metrics_registry.gauge(
+    "vsg_rate_limit_clients", "Rate limiter'ın izlediği istemci sayısı")
+QUEUE_DEPTH = metrics_registry.gauge(
+    "vsg_queue_depth", "Kuyrukta bekleyen iş sayısı")
+QUEUE_CAPACITY = metrics_registry.gauge(
+    "vsg_queue_capacity", "Kuyruk kapasitesi")
+MODELS_LOADED = metrics_registry.gauge(
+    "vsg_models_loaded", "Bellekteki pipeline sayısı")
+MODEL_LOADED = metrics_registry.gauge(
+    "vsg_model_loaded", "Model bellekte mi (1/0)", ("model",))
+MODEL_LOAD_SECONDS = metrics_registry.histogram(
+    "vsg_model_load_seconds", "Pipeline yükleme süresi (cihaza taşıma dahil)", ("model", "source"))
+VRAM_FREE_BYTES = metrics_registry.gauge(
+    "vsg_vram_free_bytes", "Boş VRAM (DeviceManager)")
+VRAM_TOTAL_BYTES = metrics_registry.gauge(
+    "vsg_vram_total_bytes", "Toplam VRAM (DeviceManager)")
+metrics_registry.gauge(
+    "vsg_log_records_dropped", "Kuyruk dolduğu için düşürülen log kaydı"
+).set_function(dropped_records)
+ANALYSIS_CACHE_HITS = metrics_registry.counter(
+    "vsg_analysis_cache_hits", "Analiz önbelleği isabetleri", ("cache",))
+ANALYSIS_CACHE_MISSES = metrics_registry.counter(
+    "vsg_analysis_cache_misses", "Analiz önbelleği kaçırmaları", ("cache",))
+ANALYSIS_CACHE_ENTRIES = metrics_registry.gauge(
+    "vsg_analysis_cache_entries", "Analiz önbelleğindeki kayıt sayısı", ("cache",))
+IMAGE_CACHE_HITS = metrics_registry.counter(
+    "vsg_image_cache_hits", "Bellekten sunulan görsel isteği")
+IMAGE_CACHE_MISSES = metrics_registry.counter(
+    "vsg_image_cache_misses", "Bellekte bulunamayıp diskten sunulan görsel isteği")
+IMAGE_CACHE_BYTES = metrics_registry.gauge(
+    "vsg_image_cache_bytes", "Görsel bayt önbelleğinin boyutu")
+OUTPUT_FILES = metrics_registry.gauge(
+    "vsg_output_files", "Saklama indeksindeki çıktı dosyası sayısı")
+OUTPUT_BYTES = metrics_registry.gauge(
+    "vsg_output_bytes", "Saklama indeksindeki çıktıların toplam boyutu")
+OUTPUT_REMOVED = metrics_registry.counter(
+    "vsg_output_removed", "Saklama kotası nedeniyle silinen çıktı", ("reason",))
+RESPONSES_COMPRESSED = metrics_registry.counter(
+    "vsg_responses_compressed", "Sıkıştırılarak gönderilen yanıt", ("encoding",))
+RESPONSE_BYTES_SAVED = metrics_registry.counter(
+    "vsg_response_bytes_saved", "Sıkıştırmayla kazanılan bayt", ("encoding",))
+EXECUTOR_WORKERS = metrics_registry.gauge(
+    "vsg_executor_workers", "Havuzdaki thread sayısı", ("pool",))
+EXECUTOR_ACTIVE = metrics_registry.gauge(
+    "vsg_executor_active", "Havuzda çalışan iş", ("pool",))
+EXECUTOR_QUEUED = metrics_registry.gauge(
+    "vsg_executor_queued", "Havuzda thread bekleyen iş", ("pool",))
+EXECUTOR_COMPLETED = metrics_registry.counter(
+    "vsg_executor_completed", "Havuzda tamamlanan iş", ("pool",))
+EXECUTOR_REJECTED = metrics_registry.counter(
+    "vsg_executor_rejected", "Havuz dolu olduğu için reddedilen iş (503)", ("pool",))
+EXECUTOR_WAIT_SECONDS = metrics_registry.counter(
+    "vsg_executor_wait_seconds", "İşlerin thread beklerken geçirdiği toplam süre", ("pool",))
+
+def observe_stage(name: str, seconds: float):
+    """Timeline span'lerini histogramlara aktar"""
+    if name == "queue_wait":
+        QUEUE_WAIT_SECONDS.observe(seconds)
+    else:
+        STAGE_SECONDS.labels(stage=name).observe(seconds)
+
 # ============== Unified Prompt Enhancer ==============
 
 class UnifiedPromptEnhancer:
@@ -185,7 +350,7 @@ class UnifiedPromptEnhancer:
             if last_comma > 200:
                 clean_prompt = clean_prompt[:last_comma]
 
-        logger.info(f"[PROMPT] Uzunluk: {len(clean_prompt)} karakter")
+        logger.debug("[PROMPT] Uzunluk: %d karakter", len(clean_prompt))
 
         return clean_prompt
 
@@ -226,6 +391,7 @@ class DeviceManager:
         self.gpu_info: Optional[str] = None
         self.vram_gb: float = 0
         self.vram_free_gb: float = 0
+        self._available_models: Optional[List[Dict[str, Any]]] = None
         self._detect_device()
 
     def _detect_device(self):
@@ -277,6 +443,9 @@ class DeviceManager:
         return self.vram_free_gb >= estimated_usage
 
     def get_available_models(self) -> List[Dict[str, Any]]:
+        # Yalnızca algılanan cihaza bağlı: bir kez hesaplanır
+        if self._available_models is not None:
+            return self._available_models
         models = []
         for model_type, config in MODEL_CONFIGS.items():
             available = self.vram_gb >= config["min_vram"] or self.mode == DeviceMode.CPU
@@ -290,6 +459,7 @@ class DeviceManager:
                     (model_type == ModelType.SD15 and self.vram_gb < 8)
                 )
             })
+        self._available_models = models
         return models
 
     def get_recommended_model(self) -> ModelType:
@@ -362,9 +532,24 @@ class ImageGenerator:
                 self.device_manager.clear_cache()
 
             dtype = torch.float16 if self.device_manager.mode == DeviceMode.GPU else torch.float32
+            started = time.perf_counter()
+            store_key = f"{model_type.value}-{'fp16' if dtype == torch.float16 else 'fp32'}"
+            fingerprint = {
+                "format": STORE_FORMAT,
+                "model_id": model_id,
+                "base": config.get("base"),
+                "lora": config.get("lora"),
+                "dtype": str(dtype),
+            }
+
+            # Depoda işlenmiş hali varsa mmap ile (kopyasız), yoksa hub'dan
+            pipe = weight_store.load_pipeline(store_key, fingerprint) if weight_store else None
+            source = "store" if pipe is not None else "hub"
 
             # Model tipine göre pipeline
-            if model_type == ModelType.SD15:
+            if pipe is not None:
+                pass  # Zamanlayıcı ayarları ve birleştirilmiş LoRA girişe dahil
+            elif model_type == ModelType.SD15:
                 pipe = StableDiffusionPipeline.from_pretrained(
                     model_id,
                     torch_dtype=dtype,
@@ -396,9 +581,8 @@ class ImageGenerator:
                 )
 
             elif model_type == ModelType.SDXL_LIGHTNING:
-                base = "stabilityai/stable-diffusion-xl-base-1.0"
                 pipe = StableDiffusionXLPipeline.from_pretrained(
-                    base,
+                    config["base"],
                     torch_dtype=dtype,
                     cache_dir=str(cache_dir),
                     variant="fp16" if dtype == torch.float16 else None
@@ -408,11 +592,20 @@ class ImageGenerator:
                     timestep_spacing="trailing"
                 )
                 pipe.load_lora_weights(
-                    "ByteDance/SDXL-Lightning",
-                    weight_name="sdxl_lightning_4step_lora.safetensors",
+                    model_id,
+                    weight_name=config["lora"],
                     cache_dir=str(cache_dir)
                 )
                 pipe.fuse_lora()
+                # Birleştirilmiş ağırlıklar kalır, LoRA katmanları atılır (depoya sade modül yazılır)
+                pipe.unload_lora_weights()
+
+            if weight_store and source == "hub":
+                # Sonraki başlatmalar (ve aynı makinedeki diğer işçiler) dönüştürme/LoRA adımını atlar
+                try:
+                    weight_store.save_pipeline(store_key, fingerprint, pipe)
+                except Exception as e:
+                    logger.warning(f"Ağırlık deposuna aktarılamadı ({store_key}): {e}")
 
             pipe = pipe.to(self.device_manager.device)
 
@@ -425,10 +618,14 @@ class ImageGenerator:
                     if hasattr(pipe, 'enable_model_cpu_offload'):
                         pipe.enable_model_cpu_offload()
 
+            self._install_stage_hooks(pipe)
+
             self.pipes[model_type] = pipe
             self.current_model = model_type
             self._consecutive_failures = 0
-            logger.info(f"Model başarıyla yüklendi: {config['name']}")
+            load_seconds = time.perf_counter() - started
+            MODEL_LOAD_SECONDS.labels(model=model_type.value, source=source).observe(load_seconds)
+            logger.info(f"Model başarıyla yüklendi: {config['name']} ({source}, {load_seconds:.1f}s)")
             return True
 
         except Exception as e:
@@ -438,6 +635,54 @@ class ImageGenerator:
         finally:
             self.loading = False
 
+    def _install_stage_hooks(self, pipe):
+        """Text encoder ve VAE decode sürelerini aktif timeline'a yaz"""
+        sync = self.device_manager.device == "cuda"
+
+        def cuda_sync():
+            if sync:
+                import torch
+                torch.cuda.synchronize()
+
+        def pre_hook(module, args):
+            tracing.begin("text_encoding")
+
+        def post_hook(module, args, output):
+            cuda_sync()
+            tracing.end("text_encoding")
+
+        for attr in ("text_encoder", "text_encoder_2"):
+            module = getattr(pipe, attr, None)
+            if module is not None and hasattr(module, "register_forward_pre_hook"):
+                module.register_forward_pre_hook(pre_hook)
+                module.register_forward_hook(post_hook)
+
+        vae = getattr(pipe, "vae", None)
+        if vae is not None and hasattr(vae, "decode"):
+            original_decode = vae.decode
+
+            def traced_decode(*args, **kwargs):
+                with tracing.stage("vae_decode"):
+                    output = original_decode(*args, **kwargs)
+                    cuda_sync()
+                    return output
+
+            vae.decode = traced_decode
+
+    def _register_output(self, filepath: Path, encoded: bytes, model_type: ModelType, scene_type: str):
+        """Yeni görseli katalog, bayt önbelleği ve saklama indeksine kaydet (tek stat)"""
+        try:
+            st = os.stat(filepath)
+            entry = image_catalog.prime(filepath, encoded, st)
+            if image_bytes.max_bytes and not CONFIG.image_offload:
+                # İş biter bitmez gelen istekler diskten okunmasın
+                image_bytes.put(filepath.name, entry.etag, encoded)
+            if output_retention:
+                output_retention.record(filepath, size=st.st_size, mtime=st.st_mtime,
+                                        job_id=filepath.stem, model=model_type.value, scene_type=scene_type)
+        except Exception as e:
+            logger.warning(f"Çıktı kaydı güncellenemedi: {e}")
+
     def generate(
         self,
         prompt: str,
@@ -455,15 +700,22 @@ class ImageGenerator:
         style: str = "cinematic",
         remove_background: bool = False,  # Şeffaf arka plan
         progress_callback: Optional[callable] = None,  # Progress bildirimi
-        retry_count: int = 0
+        retry_count: int = 0,
+        timeline: Optional[Timeline] = None  # Aşama zamanlaması
     ) -> Optional[Dict[str, Any]]:
         """OOM korumalı görsel üretimi - Şeffaf arka plan destekli"""
 
+        if timeline is None:
+            timeline = Timeline(on_span=observe_stage)
+
         if model_type is None:
             model_type = self.device_manager.get_recommended_model()
 
         if model_type not in self.pipes:
-            if not self.load_model(model_type):
+            with timeline.span("model_load", model=model_type.value):
+                loaded = self.load_model(model_type)
+            if not loaded:
+                GENERATION_FAILURES.labels(model=model_type.value, reason="model_load").inc()
                 return None
 
         pipe = self.pipes[model_type]
@@ -471,23 +723,25 @@ class ImageGenerator:
 
         # Duygu analizi
         emotion = None
-        try:
-            emotion = emotion_analyzer.analyze(prompt)
-        except:
-            pass
+        with timeline.span("emotion_analysis"):
+            try:
+                emotion = emotion_analyzer.analyze(prompt)
+            except:
+                pass
 
         # Öğrenme optimizasyonları
         optimization = None
-        try:
-            optimization = learning_manager.get_optimized_settings(
-                scene_type=scene_type,
-                mood=mood,
-                genre=genre,
-                base_steps=steps,
-                base_cfg=guidance_scale
-            )
-        except:
-            pass
+        with timeline.span("learning_lookup"):
+            try:
+                optimization = learning_manager.get_optimized_settings(
+                    scene_type=scene_type,
+                    mood=mood,
+                    genre=genre,
+                    base_steps=steps,
+                    base_cfg=guidance_scale
+                )
+            except:
+                pass
 
         # Prompt'u minimize düzeyde zenginleştir
         enhanced_prompt = UnifiedPromptEnhancer.enhance(
@@ -543,15 +797,19 @@ class ImageGenerator:
 
             generator = torch.Generator(device=self.device_manager.device).manual_seed(seed)
 
-            logger.info(f"Görsel üretiliyor: {config['name']} {width}x{height} steps={steps}")
-            logger.info(f"===== PROMPT (ilk 500 karakter) =====")
-            logger.info(f"{enhanced_prompt[:500]}...")
-            logger.info(f"=====================================")
+            logger.info("Görsel üretiliyor: %s %dx%d steps=%d", config['name'], width, height, steps)
+            logged_prompt = prompt_sampler.sample(enhanced_prompt)
+            if logged_prompt is not None:
+                logger.info("[PROMPT] %s", logged_prompt)
 
             start_time = time.time()
 
+            # Denoise süresi adım callback'lerinden türetilir
+            step_times: List[float] = []
+
             # Progress callback wrapper
             def step_callback(step, timestep, latents):
+                step_times.append(time.perf_counter())
                 if progress_callback:
                     progress = int((step / steps) * 80)  # 0-80% üretim
                     progress_callback(progress, f"Görsel oluşturuluyor... ({step}/{steps})")
@@ -561,7 +819,10 @@ class ImageGenerator:
                 progress_callback(5, "Model hazırlanıyor...")
 
             # Üretim
-            with torch.inference_mode():
+            resolution = f"{width}x{height}"
+            with tracing.activate(timeline), \
+                    timeline.span("inference", model=model_type.value, resolution=resolution, attempt=retry_count), \
+                    torch.inference_mode():
                 result = pipe(
                     prompt=enhanced_prompt,
                     negative_prompt=final_negative,
@@ -575,30 +836,36 @@ class ImageGenerator:
                 )
 
             image = result.images[0]
+            inference = timeline.last("inference")
+            INFERENCE_SECONDS.labels(model=model_type.value, resolution=resolution).observe(inference.duration)
+            if step_times:
+                encoded = timeline.last("text_encoding")
+                denoise_start = encoded.end if encoded and encoded.end >= inference.start else inference.start
+                timeline.add("denoise", denoise_start, step_times[-1], steps=len(step_times))
 
             # Arka plan kaldırma (istenirse)
             if remove_background:
                 if progress_callback:
                     progress_callback(85, "Arka plan kaldırılıyor...")
-                try:
-                    from rembg import remove
-                    from PIL import Image
-                    import io
-
-                    # PIL Image'ı bytes'a çevir
-                    img_bytes = io.BytesIO()
-                    image.save(img_bytes, format='PNG')
-                    img_bytes.seek(0)
-
-                    # Arka planı kaldır
-                    output_bytes = remove(img_bytes.read())
-                    image = Image.open(io.BytesIO(output_bytes))
-                    logger.info("Arka plan başarıyla kaldırıldı")
-
-                except ImportError:
-                    logger.warning("rembg kurulu değil! pip install rembg ile kurun")
-                except Exception as e:
-                    logger.warning(f"Arka plan kaldırma hatası: {e}")
+                with timeline.span("rembg"):
+                    try:
+                        from rembg import remove
+                        from PIL import Image
+
+                        # PIL Image'ı bytes'a çevir
+                        img_bytes = io.BytesIO()
+                        image.save(img_bytes, format='PNG')
+                        img_bytes.seek(0)
+
+                        # Arka planı kaldır
+                        output_bytes = remove(img_bytes.read())
+                        image = Image.open(io.BytesIO(output_bytes))
+                        logger.info("Arka plan başarıyla kaldırıldı")
+
+                    except ImportError:
+                        logger.warning("rembg kurulu değil! pip install rembg ile kurun")
+                    except Exception as e:
+                        logger.warning(f"Arka plan kaldırma hatası: {e}")
 
             if progress_callback:
                 progress_callback(95, "Görsel kaydediliyor...")
@@ -610,15 +877,22 @@ class ImageGenerator:
             filename = PathSecurity.generate_secure_filename("scene", ".png")
             filepath = output_dir / filename
 
-            # PNG olarak kaydet (şeffaflık korunur)
-            image.save(filepath, format='PNG')
+            # PNG olarak kaydet (şeffaflık korunur); baytlar bir kez kodlanır
+            with timeline.span("png_encode"):
+                buffer = io.BytesIO()
+                image.save(buffer, format='PNG')
+                encoded = buffer.getvalue()
+                with open(filepath, 'wb') as f:
+                    f.write(encoded)
+            self._register_output(filepath, encoded, model_type, scene_type)
 
             elapsed = time.time() - start_time
             logger.info(f"Görsel üretildi: {filename} ({elapsed:.1f}s)")
 
             self._consecutive_failures = 0
 
-            # Öğrenme sistemine kaydet
+            # Öğrenme sistemine kaydet (kayıttaki timeline db_insert öncesini kapsar)
+            db_start = time.perf_counter()
             try:
                 learning_manager.record_generation(
                     job_id=filename.replace('.png', ''),
@@ -636,10 +910,12 @@ class ImageGenerator:
                     seed=seed,
                     model=config["name"],
                     generation_time=elapsed,
-                    image_path=str(filepath)
+                    image_path=str(filepath),
+                    timeline=timeline.to_dict()
                 )
             except Exception as e:
                 logger.warning(f"Öğrenme kaydı hatası: {e}")
+            timeline.add("db_insert", db_start, time.perf_counter())
 
             return {
                 "filepath": str(filepath),
@@ -670,6 +946,7 @@ class ImageGenerator:
                     new_width = max(256, width // 2)
                     new_height = max(256, height // 2)
                     logger.info(f"Boyut küçültülerek tekrar deneniyor: {new_width}x{new_height}")
+                    OOM_RETRIES.labels(model=model_type.value).inc()
 
                     return self.generate(
                         prompt=prompt,
@@ -685,10 +962,15 @@ class ImageGenerator:
                         mood=mood,
                         genre=genre,
                         style=style,
-                        retry_count=retry_count + 1
+                        retry_count=retry_count + 1,
+                        timeline=timeline
                     )
 
             self._consecutive_failures += 1
+            GENERATION_FAILURES.labels(
+                model=model_type.value,
+                reason="oom" if "out of memory" in str(e).lower() else "runtime"
+            ).inc()
             logger.error(f"Görsel üretim hatası: {e}")
             traceback.print_exc()
 
@@ -700,12 +982,16 @@ class ImageGenerator:
 
         except Exception as e:
             self._consecutive_failures += 1
+            GENERATION_FAILURES.labels(model=model_type.value, reason="error").inc()
             logger.error(f"Görsel üretim hatası: {e}")
             traceback.print_exc()
             return None
 
 # ============== Job Queue ==============
 
+JOB_STATE_FIELDS = ("status", "progress", "progress_message", "result", "error",
+                    "completed_at", "retry_count", "cancelled")
+
 @dataclass
 class GenerationJob:
     job_id: str
@@ -734,11 +1020,77 @@ class GenerationJob:
     retry_count: int = 0
     cancelled: bool = False  # İptal edildi mi
 
+def run_generation(generator: ImageGenerator, job: GenerationJob, progress_callback,
+                   timeline: Optional[Timeline]) -> Optional[Dict]:
+    """İş alanlarını generate() argümanlarına çevirip üret (süreç içi kuyruk ve broker işçisi ortak)"""
+    model_type = None
+    if job.model_type:
+        try:
+            model_type = ModelType(job.model_type)
+        except ValueError:
+            pass
+
+    quality_mode = QualityMode.BALANCED
+    try:
+        quality_mode = QualityMode(job.quality_mode)
+    except ValueError:
+        pass
+
+    return generator.generate(
+        prompt=job.prompt,
+        negative_prompt=job.negative_prompt,
+        width=job.width,
+        height=job.height,
+        steps=job.steps,
+        guidance_scale=job.guidance_scale,
+        seed=job.seed,
+        model_type=model_type,
+        quality_mode=quality_mode,
+        scene_type=job.scene_type,
+        mood=job.mood,
+        genre=job.genre,
+        style=job.style,
+        remove_background=job.remove_background,
+        progress_callback=progress_callback,
+        timeline=timeline
+    )
+
+def observe_job(status: str, seconds: float):
+    JOBS_TOTAL.labels(status=status).inc()
+    JOB_DURATION_SECONDS.labels(status=status).observe(seconds)
+
+def render_job(response: Dict[str, Any], timeline: Optional[Dict[str, Any]]) -> Tuple[bytes, Optional[str]]:
+    """İş alanlarından (vars(GenerationJob) kopyası) /api/job gövdesi ve Server-Timing başlığı"""
+    response["timeline"] = timeline
+    response["can_rate"] = response["status"] == "completed" and not response["cancelled"]
+
+    result = response["result"]
+    if response["status"] == "completed" and result:
+        response["image_url"] = f"/api/image/{result['filename']}"
+        response["generation_info"] = {
+            "model": result.get("model"),
+            "seed": result.get("seed"),
+            "enhanced_prompt": result.get("enhanced_prompt"),
+            "generation_time": result.get("generation_time"),
+            "emotion": result.get("emotion"),
+            "optimization_applied": result.get("optimization_applied")
+        }
+
+    server_timing = tracing.server_timing_header(timeline) if timeline else None
+    return responses.dumps(response), server_timing
+
 class JobQueue:
+    blocking = False  # Okumalar bellekten: event loop'ta çağrılabilir
+
     def __init__(self, generator: ImageGenerator, max_size: int = 10):
         self.generator = generator
         self.queue: queue.Queue = queue.Queue(maxsize=max_size)
         self.jobs: Dict[str, GenerationJob] = {}
+        self._timelines: Dict[str, Timeline] = {}  # İş bazlı aşama zamanlaması
+        self._versions: Dict[str, int] = {}  # İş her değiştiğinde artar
+        self._status_counts: Dict[str, int] = {}  # Durum -> iş sayısı (get_queue_status taramasız)
+        self._counted_status: Dict[str, str] = {}  # İş -> sayaçlara işlenmiş durumu
+        self._snapshots = SnapshotCache()  # /api/job yanıtı: sürüm değişene kadar yeniden serileştirilmez
         self.worker_thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
         self._shutdown = False
@@ -755,6 +1107,9 @@ class JobQueue:
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
 
+    def worker_alive(self) -> bool:
+        return bool(self.worker_thread and self.worker_thread.is_alive())
+
     def _worker_loop(self):
         while not self._shutdown:
             try:
@@ -767,13 +1122,26 @@ class JobQueue:
                 logger.error(f"Worker hatası: {e}")
 
     def _process_job(self, job_id: str):
+        started = time.perf_counter()
+        with self._lock:
+            timeline = self._timelines.get(job_id)
+        if timeline is not None:
+            timeline.add("queue_wait", timeline.origin, started)
+
+        status = self._run_job(job_id, timeline)
+        if status:
+            observe_job(status, time.perf_counter() - started)
+
+    def _run_job(self, job_id: str, timeline: Optional[Timeline]) -> Optional[str]:
+        """İşi çalıştır, sonuç durumunu döndür"""
         with self._lock:
             if job_id not in self.jobs:
-                return
+                return None
             job = self.jobs[job_id]
             job.status = "processing"
             job.progress = 0
             job.progress_message = "Başlatılıyor..."
+            self._touch(job_id)
 
         # Progress callback fonksiyonu
         def update_progress(progress: int, message: str):
@@ -781,6 +1149,7 @@ class JobQueue:
                 if job_id in self.jobs:
                     self.jobs[job_id].progress = progress
                     self.jobs[job_id].progress_message = message
+                    self._touch(job_id)
 
         try:
             # İptal kontrolü
@@ -788,38 +1157,10 @@ class JobQueue:
                 if self.jobs[job_id].cancelled:
                     self.jobs[job_id].status = "cancelled"
                     self.jobs[job_id].progress_message = "İptal edildi"
-                    return
-
-            model_type = None
-            if job.model_type:
-                try:
-                    model_type = ModelType(job.model_type)
-                except ValueError:
-                    pass
+                    self._touch(job_id)
+                    return "cancelled"
 
-            quality_mode = QualityMode.BALANCED
-            try:
-                quality_mode = QualityMode(job.quality_mode)
-            except ValueError:
-                pass
-
-            result = self.generator.generate(
-                prompt=job.prompt,
-                negative_prompt=job.negative_prompt,
-                width=job.width,
-                height=job.height,
-                steps=job.steps,
-                guidance_scale=job.guidance_scale,
-                seed=job.seed,
-                model_type=model_type,
-                quality_mode=quality_mode,
-                scene_type=job.scene_type,
-                mood=job.mood,
-                genre=job.genre,
-                style=job.style,
-                remove_background=job.remove_background,
-                progress_callback=update_progress
-            )
+            result = run_generation(self.generator, job, update_progress, timeline)
 
             with self._lock:
                 # Son iptal kontrolü
@@ -827,7 +1168,8 @@ class JobQueue:
                     self.jobs[job_id].status = "cancelled"
                     self.jobs[job_id].progress = 0
                     self.jobs[job_id].progress_message = "İptal edildi"
-                    return
+                    self._touch(job_id)
+                    return "cancelled"
 
                 if result:
                     job.status = "completed"
@@ -839,6 +1181,8 @@ class JobQueue:
                     job.error = "Görsel üretilemedi"
                     job.progress_message = "Hata oluştu"
                 job.completed_at = datetime.now().isoformat()
+                self._touch(job_id)
+                return job.status
 
         except Exception as e:
             with self._lock:
@@ -846,6 +1190,8 @@ class JobQueue:
                 job.error = str(e)
                 job.progress_message = f"Hata: {str(e)[:50]}"
                 job.completed_at = datetime.now().isoformat()
+                self._touch(job_id)
+            return "failed"
 
     def cancel_job(self, job_id: str) -> bool:
         """İşi iptal et"""
@@ -856,6 +1202,7 @@ class JobQueue:
                     job.cancelled = True
                     job.status = "cancelled"
                     job.progress_message = "Kullanıcı tarafından iptal edildi"
+                    self._touch(job_id)
                     return True
         return False
 
@@ -863,23 +1210,70 @@ class JobQueue:
         try:
             with self._lock:
                 self.jobs[job.job_id] = job
+                self._timelines[job.job_id] = Timeline(on_span=observe_stage)
+                self._touch(job.job_id)
             self.queue.put_nowait(job.job_id)
             return True
         except queue.Full:
+            with self._lock:
+                # Reddedilen iş "pending" olarak kalmasın
+                self._forget(job.job_id)
+            JOBS_TOTAL.labels(status="rejected").inc()
             return False
 
     def get_job(self, job_id: str) -> Optional[GenerationJob]:
         with self._lock:
             return self.jobs.get(job_id)
 
+    def _touch(self, job_id: str):
+        """İş değişti: önbellekteki /api/job yanıtı geçersiz, durum sayaçları güncel (kilit altında çağrılır)"""
+        self._versions[job_id] = self._versions.get(job_id, 0) + 1
+        status = self.jobs[job_id].status
+        previous = self._counted_status.get(job_id)
+        if previous != status:
+            if previous is not None:
+                self._status_counts[previous] -= 1
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+            self._counted_status[job_id] = status
+
+    def _forget(self, job_id: str):
+        """İşi ve tüm yan kayıtlarını kaldır (kilit altında çağrılır)"""
+        self.jobs.pop(job_id, None)
+        self._timelines.pop(job_id, None)
+        self._versions.pop(job_id, None)
+        self._snapshots.discard(job_id)
+        previous = self._counted_status.pop(job_id, None)
+        if previous is not None:
+            self._status_counts[previous] -= 1
+
+    def get_job_snapshot(self, job_id: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """/api/job gövdesi (JSON bayt) ve Server-Timing başlığı; iş yoksa None"""
+        with self._lock:
+            if job_id not in self.jobs:
+                return None
+            timeline = self._timelines.get(job_id)
+            # Aşamalar iş nesnesine dokunmadan eklenir: span sayısı da sürümün parçası
+            version = (self._versions.get(job_id, 0), len(timeline.spans) if timeline else 0)
+        return self._snapshots.get(job_id, version, lambda: self._render_job(job_id))
+
+    def _render_job(self, job_id: str) -> Tuple[bytes, Optional[str]]:
+        with self._lock:
+            # Sığ kopya yeterli: result yerinde değiştirilmez, yalnızca yeniden atanır
+            response = dict(vars(self.jobs[job_id]))
+        return render_job(response, self.get_timeline(job_id))
+
+    def get_timeline(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İşin aşama zaman çizelgesi (devam eden işler için anlık)"""
+        with self._lock:
+            timeline = self._timelines.get(job_id)
+        return timeline.to_dict() if timeline else None
+
     def get_queue_status(self) -> Dict[str, Any]:
         with self._lock:
-            pending = sum(1 for j in self.jobs.values() if j.status == "pending")
-            processing = sum(1 for j in self.jobs.values() if j.status == "processing")
             return {
                 "queue_size": self.queue.qsize(),
-                "pending": pending,
-                "processing": processing,
+                "pending": self._status_counts.get("pending", 0),
+                "processing": self._status_counts.get("processing", 0),
                 "max_size": self.queue.maxsize
             }
 
@@ -901,29 +1295,176 @@ class JobQueue:
 
             for job_id in to_remove:
                 JobIdManager.remove(job_id)
-                del self.jobs[job_id]
+                self._forget(job_id)
 
         if to_remove:
             logger.info(f"{len(to_remove)} eski iş temizlendi")
 
+def broker_job_handler(generator: ImageGenerator):
+    """Broker kaydını GenerationJob'a çevirip üreten BrokerWorker handler'ı"""
+    def handle(record: Dict[str, Any], context: JobContext) -> Optional[Dict]:
+        job = GenerationJob(**record["payload"])
+        # Kuyruk beklemesi broker'daki oluşturma zamanından (süreçler arası duvar saati)
+        waited = max(time.time() - record["created_at"], 0.0)
+        timeline = Timeline(on_span=observe_stage, origin=time.perf_counter() - waited)
+        timeline.add("queue_wait", timeline.origin, time.perf_counter())
+        context.timeline = timeline
+        return run_generation(generator, job, context.progress, timeline)
+    return handle
+
+def broker_job_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Broker kaydından süreç içi kuyruktaki ile aynı alanlar (vars(GenerationJob))"""
+    job = GenerationJob(**record["payload"])
+    job.status = record["status"]
+    job.progress = record["progress"]
+    job.progress_message = record["progress_message"]
+    job.result = record["result"]
+    job.error = record["error"]
+    if record["completed_at"]:
+        job.completed_at = datetime.fromtimestamp(record["completed_at"]).isoformat()
+    job.retry_count = max(record["attempts"] - 1, 0)
+    job.cancelled = record["status"] == "cancelled"
+    return vars(job)
+
+class BrokeredJobQueue:
+    """JobQueue arayüzü; iş durumu paylaşılan broker'da tutulur
+
+    API süreçleri durumsuzdur: iş ekler, durumu broker'dan okur. İşleri aynı
+    broker'a bağlı worker.py süreçleri ve (generator verilirse) bu süreçteki
+    gömülü işçi çalıştırır.
+    """
+
+    blocking = True  # Her okuma SQLite sorgusu: API bunları "db" havuzunda çalıştırır
+
+    def __init__(self, broker: JobBroker, generator: Optional[ImageGenerator] = None,
+                 max_size: int = 10, lease_seconds: float = 60.0):
+        self.broker = broker
+        self.generator = generator  # None: bu süreç iş çalıştırmaz
+        self.max_size = max_size
+        self.lease_seconds = lease_seconds
+        self._snapshots = SnapshotCache()  # Anahtar broker sürümü: başka süreçteki değişiklikler de görünür
+        self.worker: Optional[BrokerWorker] = None
+        self.worker_thread: Optional[threading.Thread] = None
+
+    def start_worker(self):
+        if self.generator is None:
+            logger.info("Gömülü işçi kapalı: işler worker.py süreçlerinde çalışır")
+            return
+        if self.worker_thread is None or not self.worker_thread.is_alive():
+            self.worker = BrokerWorker(self.broker, broker_job_handler(self.generator),
+                                       worker_id=f"api-{os.getpid()}", lease_seconds=self.lease_seconds,
+                                       on_finish=observe_job)
+            self.worker_thread = self.worker.start()
+            logger.info(f"Gömülü broker işçisi başlatıldı: {self.worker.worker_id}")
+
+    def stop_worker(self):
+        if self.worker:
+            self.worker.stop(timeout=5)
+
+    def worker_alive(self) -> bool:
+        # Gömülü işçi yoksa işler ayrı süreçlerde: API'nin hazırlığı onlara bağlı değil
+        return self.worker is None or bool(self.worker_thread and self.worker_thread.is_alive())
+
+    def add_job(self, job: GenerationJob) -> bool:
+        payload = {name: value for name, value in vars(job).items() if name not in JOB_STATE_FIELDS}
+        if self.broker.submit(job.job_id, payload):
+            return True
+        JOBS_TOTAL.labels(status="rejected").inc()
+        return False
+
+    def cancel_job(self, job_id: str) -> bool:
+        """İşi iptal et (çalıştıran işçi sonraki heartbeat'te bırakır, sonucu yazılmaz)"""
+        return self.broker.cancel(job_id)
+
+    def get_job_snapshot(self, job_id: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        version = self.broker.version(job_id)
+        if version is None:
+            return None
+        return self._snapshots.get(job_id, version, lambda: self._render_job(job_id))
+
+    def _render_job(self, job_id: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        record = self.broker.get(job_id)
+        if record is None:
+            return None
+        return render_job(broker_job_fields(record), record["timeline"])
+
+    def get_timeline(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self.broker.get(job_id)
+        return record["timeline"] if record else None
+
+    def get_queue_status(self) -> Dict[str, Any]:
+        counts = self.broker.counts()
+        return {
+            "queue_size": counts["pending"],
+            "pending": counts["pending"],
+            "processing": counts["processing"],
+            "max_size": self.max_size
+        }
+
+    def cleanup_old_jobs(self, max_age_hours: int = 24):
+        """Eski işleri broker'dan sil"""
+        removed = self.broker.purge(max_age_hours * 3600)
+        for job_id in removed:
+            JobIdManager.remove(job_id)
+            self._snapshots.discard(job_id)
+        if removed:
+            logger.info(f"{len(removed)} eski iş temizlendi")
+
 # ============== API ==============
 
+class FastJSONResponse(JSONResponse):
+    """responses.dumps ile serileştiren JSONResponse (orjson varsa)"""
+
+    def render(self, content: Any) -> bytes:
+        return responses.dumps(content)
+
+class FullFileResponse(FileResponse):
+    """Range başlığını yok sayan FileResponse: aralık kararı image_serving.plan'da verilir
+
+    Starlette'in FileResponse'u Range'i kendisi de işler (çok aralıkta multipart 206,
+    geçersizde 400); plan 200 dediyse gövde, bayt önbelleği isabetinde olduğu gibi tam döner.
+    """
+
+    async def __call__(self, scope, receive, send):
+        headers = [(name, value) for name, value in scope["headers"] if name != b"range"]
+        await super().__call__({**scope, "headers": headers}, receive, send)
+
 app = FastAPI(
     title="Görsel Hikaye Üretici API v3.0",
     description="Öğrenen, güvenli, optimize görsel üretim servisi",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS - ortama göre
 cors_config = get_cors_config(CONFIG.production)
 app.add_middleware(CORSMiddleware, **cors_config)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=CONFIG.compress_min_bytes,
+    gzip_level=CONFIG.compress_gzip_level,
+    brotli_quality=CONFIG.compress_brotli_quality
+)
 
 # Global instances
 device_manager: Optional[DeviceManager] = None
 generator: Optional[ImageGenerator] = None
-job_queue: Optional[JobQueue] = None
-rate_limiter = RateLimiter(requests_per_minute=30)
-output_cleaner: Optional[OutputCleaner] = None
+job_queue: Optional[Union[JobQueue, BrokeredJobQueue]] = None
+rate_limiter = RateLimiter(
+    requests_per_minute=CONFIG.rate_limit_per_minute,
+    backend=SQLiteRateLimitBackend(CONFIG.rate_limit_db) if CONFIG.rate_limit_db else None
+)
+output_retention: Optional[OutputRetention] = None
+image_catalog = ImageCatalog(CONFIG.output_dir, maxsize=CONFIG.image_catalog_size)
+image_bytes = ImageByteCache(max_bytes=CONFIG.image_byte_cache_mb * 1024 * 1024)
+weight_store = WeightStore(CONFIG.weight_store_dir) if CONFIG.weight_store_dir else None
+
+def _forget_output(filename: str):
+    """Saklama servisi dosyayı sildi: bellekteki kayıtları düşür"""
+    image_bytes.discard(filename)
+    image_catalog.forget(filename)
+event_loop_thread_id: Optional[int] = None
+server_ready = False  # /readyz: başlangıç tamamlandı, kapanış başlamadı
 
 # Pydantic models
 class GenerateRequest(BaseModel):
@@ -970,6 +1511,12 @@ class FeedbackRequest(BaseModel):
     low_score_details: str = ""  # Detaylı açıklama
     was_cancelled: bool = False  # Üretim iptal edildi mi
 
+class EmotionBatchRequest(BaseModel):
+    texts: List[str]
+
+class ThemeBatchRequest(BaseModel):
+    texts: List[str]
+
 class JobResponse(BaseModel):
     job_id: str
     status: str
@@ -978,16 +1525,54 @@ class JobResponse(BaseModel):
 # Rate limiting dependency
 async def check_rate_limit(request: Request):
     client_ip = request.client.host if request.client else "unknown"
-    allowed, wait_time = rate_limiter.is_allowed(client_ip)
+    if rate_limiter.blocking:
+        allowed, wait_time = await executors.run("db", rate_limiter.is_allowed, client_ip)
+    else:
+        allowed, wait_time = rate_limiter.is_allowed(client_ip)
     if not allowed:
+        RATE_LIMIT_REJECTIONS.labels(path=request.url.path).inc()
         raise HTTPException(
             status_code=429,
-            detail=f"Çok fazla istek. {wait_time} saniye bekleyin."
+            detail=f"Çok fazla istek. {wait_time} saniye bekleyin.",
+            headers={"Retry-After": str(wait_time)}
         )
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated(request: Request, exc: ExecutorSaturated):
+    """Bloklayan iş havuzu dolu: kuyruğu büyütmek yerine istemciye geri çekilmesini söyle"""
+    logger.warning(f"{exc} - {request.url.path} reddedildi")
+    return FastJSONResponse(status_code=503, content={"detail": "Sunucu meşgul, lütfen tekrar deneyin"},
+                            headers={"Retry-After": "1"})
+
+def _collect_runtime_gauges():
+    """Scrape anında kuyruk, model ve VRAM göstergelerini tazele"""
+    if job_queue:
+        queue_status = job_queue.get_queue_status()
+        QUEUE_DEPTH.set(queue_status["queue_size"])
+        QUEUE_CAPACITY.set(queue_status["max_size"])
+    if generator:
+        loaded = set(generator.pipes)
+        MODELS_LOADED.set(len(loaded))
+        for model_type in ModelType:
+            MODEL_LOADED.labels(model=model_type.value).set(1 if model_type in loaded else 0)
+    if device_manager:
+        device_manager._update_free_vram()
+        VRAM_FREE_BYTES.set(device_manager.vram_free_gb * (1024**3))
+        VRAM_TOTAL_BYTES.set(device_manager.vram_gb * (1024**3))
+
+# Yönetici yetkisi dependency
+async def require_admin(request: Request):
+    if not CONFIG.admin_token:
+        raise HTTPException(403, "Yönetici uç noktaları kapalı (ADMIN_TOKEN tanımlı değil)")
+    token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), CONFIG.admin_token.encode()):
+        raise HTTPException(401, "Geçersiz yönetici token'ı")
+
 @app.on_event("startup")
 async def startup():
-    global device_manager, generator, job_queue, output_cleaner
+    global device_manager, generator, job_queue, output_retention, event_loop_thread_id, server_ready
+
+    event_loop_thread_id = threading.get_ident()
 
     logger.info("=" * 60)
     logger.info("   GÖRSEL HİKAYE ÜRETİCİ v3.0 - ÖĞRENEN BACKEND")
@@ -995,14 +1580,94 @@ async def startup():
 
     device_manager = DeviceManager()
     generator = ImageGenerator(device_manager)
-    job_queue = JobQueue(generator, max_size=CONFIG.max_queue_size)
+    if CONFIG.job_broker:
+        broker = open_broker(CONFIG.job_broker, max_pending=CONFIG.max_queue_size,
+                             lease_seconds=CONFIG.job_lease_seconds, max_attempts=CONFIG.job_max_attempts)
+        job_queue = BrokeredJobQueue(broker, generator if CONFIG.api_worker else None,
+                                     max_size=CONFIG.max_queue_size, lease_seconds=CONFIG.job_lease_seconds)
+        logger.info(f"Paylaşılan iş kuyruğu: {CONFIG.job_broker}")
+    else:
+        job_queue = JobQueue(generator, max_size=CONFIG.max_queue_size)
     job_queue.start_worker()
 
-    output_cleaner = OutputCleaner(CONFIG.output_dir)
+    metrics_registry.add_collector(_collect_runtime_gauges)
+
+    for name, size in CONFIG.analysis_cache_sizes.items():
+        try:
+            analysis_cache.configure(name, maxsize=size, enabled=size > 0)
+        except KeyError:
+            logger.warning(f"Bilinmeyen analiz önbelleği: {name}")
+    for name in analysis_cache.cache_stats():
+        cache = analysis_cache.get_cache(name)
+        ANALYSIS_CACHE_HITS.labels(cache=name).set_function(lambda c=cache: c.hits)
+        ANALYSIS_CACHE_MISSES.labels(cache=name).set_function(lambda c=cache: c.misses)
+        ANALYSIS_CACHE_ENTRIES.labels(cache=name).set_function(lambda c=cache: len(c._data))
+
+    for name, sizes in CONFIG.executor_pools.items():
+        pool = executors.configure(name, workers=sizes.get("workers"), max_pending=sizes.get("max_pending"))
+        EXECUTOR_WORKERS.labels(pool=name).set(pool.max_workers)
+        EXECUTOR_ACTIVE.labels(pool=name).set_function(lambda p=pool: p.active)
+        EXECUTOR_QUEUED.labels(pool=name).set_function(lambda p=pool: p.pending - p.active)
+        EXECUTOR_COMPLETED.labels(pool=name).set_function(lambda p=pool: p.completed)
+        EXECUTOR_REJECTED.labels(pool=name).set_function(lambda p=pool: p.rejected)
+        EXECUTOR_WAIT_SECONDS.labels(pool=name).set_function(lambda p=pool: p.wait_seconds)
+
+    RATE_LIMIT_CLIENTS.set_function(rate_limiter.tracked_clients)
+    IMAGE_CACHE_HITS.set_function(lambda: image_bytes.hits)
+    IMAGE_CACHE_MISSES.set_function(lambda: image_bytes.misses)
+    IMAGE_CACHE_BYTES.set_function(lambda: image_bytes.bytes)
+    for encoding in responses.ENCODINGS:
+        RESPONSES_COMPRESSED.labels(encoding=encoding).set_function(
+            lambda e=encoding: responses.stats.responses[e])
+        RESPONSE_BYTES_SAVED.labels(encoding=encoding).set_function(
+            lambda e=encoding: responses.stats.bytes_in[e] - responses.stats.bytes_out[e])
+
+    for path in CONFIG.gazetteer_paths:
+        try:
+            started = time.perf_counter()
+            added = EntityRecognizer.load_gazetteer(path)
+            logger.info(f"Gazetteer yüklendi: {path} ({added} girdi, {time.perf_counter() - started:.2f}s)")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Gazetteer yüklenemedi: {path} - {e}")
 
     Path(CONFIG.output_dir).mkdir(parents=True, exist_ok=True)
     Path("./data").mkdir(parents=True, exist_ok=True)
 
+    if CONFIG.image_offload and CONFIG.image_offload not in image_serving.OFFLOAD_MODES:
+        logger.warning(f"Bilinmeyen görsel offload modu: {CONFIG.image_offload} - kapatıldı")
+        CONFIG.image_offload = ""
+    elif CONFIG.image_offload:
+        logger.info(f"Görsel gövdeleri ters vekile devrediliyor: {CONFIG.image_offload}")
+
+    output_retention = OutputRetention(
+        CONFIG.output_dir, CONFIG.output_index_db,
+        max_files=CONFIG.output_max_files,
+        max_age_hours=CONFIG.output_max_age_hours,
+        max_bytes=CONFIG.output_max_mb * 1024 * 1024,
+        slice_size=CONFIG.retention_slice_size,
+        interval_seconds=CONFIG.retention_interval_seconds,
+        reconcile_interval=CONFIG.cleanup_interval_hours * 3600,
+        on_remove=_forget_output,
+    )
+    if output_retention.totals()[0] == 0:
+        # İlk çalıştırma: mevcut dosyaları indeksle, metadata'yı üretim kayıtlarından doldur
+        output_retention.reconcile()
+        try:
+            model_types = {config["name"]: model_type.value for model_type, config in MODEL_CONFIGS.items()}
+            output_retention.annotate(
+                (Path(row["image_path"]).name, row["job_id"], model_types.get(row["model"], row["model"]),
+                 row["scene_type"])
+                for row in db.get_image_metadata()
+            )
+        except Exception as e:
+            logger.warning(f"Görsel metadata'sı doldurulamadı: {e}")
+    output_retention.start()
+    OUTPUT_FILES.set_function(lambda: output_retention.totals()[0])
+    OUTPUT_BYTES.set_function(lambda: output_retention.totals()[1])
+    for reason in RETENTION_REASONS:
+        OUTPUT_REMOVED.labels(reason=reason).set_function(lambda r=reason: output_retention.removed[r])
+
+    server_ready = True
     logger.info(f"Sunucu hazır: http://localhost:{CONFIG.port}")
     logger.info(f"Mod: {device_manager.mode.value.upper()}")
     if device_manager.gpu_info:
@@ -1010,8 +1675,13 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    global server_ready
+    server_ready = False
     if job_queue:
         job_queue.stop_worker()
+    if output_retention:
+        output_retention.stop()
+    executors.shutdown(wait=False)
     logger.info("Sunucu kapatılıyor")
 
 @app.get("/")
@@ -1023,11 +1693,20 @@ async def root():
         "features": ["learning", "emotion_analysis", "safety_filter", "auto_optimization"]
     }
 
-@app.get("/api/status")
-async def get_status():
-    queue_status = job_queue.get_queue_status() if job_queue else {}
+async def _compute_learning_stats() -> Dict[str, Any]:
+    return await executors.run("db", learning_manager.get_learning_stats)
+
+learning_stats_snapshot = CoalescedSnapshot(_compute_learning_stats, ttl=CONFIG.status_ttl_seconds)
+
+QUALITY_MODES = [{"id": m.value, "desc": QUALITY_SETTINGS[m]["desc"]} for m in QualityMode]
+
+async def _compute_status() -> bytes:
+    """/api/status gövdesi; en fazla status_ttl_seconds'ta bir hesaplanır"""
+    queue_status = await executors.run("db", job_queue.get_queue_status) if job_queue else {}
     models = device_manager.get_available_models() if device_manager else []
     recommended = device_manager.get_recommended_model() if device_manager else ModelType.SD15
+    if device_manager:
+        device_manager._update_free_vram()
 
     current_model = None
     model_loaded = False
@@ -1039,11 +1718,11 @@ async def get_status():
     # Öğrenme istatistikleri
     learning_stats = {}
     try:
-        learning_stats = learning_manager.get_learning_stats()
-    except:
+        learning_stats = await learning_stats_snapshot.get()
+    except Exception:
         pass
 
-    return {
+    return responses.dumps({
         "device": {
             "mode": device_manager.mode.value if device_manager else "unknown",
             "device": device_manager.device if device_manager else "unknown",
@@ -1060,17 +1739,80 @@ async def get_status():
         },
         "queue": queue_status,
         "learning": learning_stats,
-        "quality_modes": [
-            {"id": m.value, "desc": QUALITY_SETTINGS[m]["desc"]}
-            for m in QualityMode
-        ],
+        "quality_modes": QUALITY_MODES,
         "recommended_settings": {
             "steps": QUALITY_SETTINGS[QualityMode.BALANCED]["steps"],
             "width": MODEL_CONFIGS[recommended]["default_size"],
             "height": MODEL_CONFIGS[recommended]["default_size"],
             "estimated_time": "15-30 saniye" if device_manager and device_manager.mode == DeviceMode.GPU else "2-5 dakika"
         }
-    }
+    })
+
+status_snapshot = CoalescedSnapshot(_compute_status, ttl=CONFIG.status_ttl_seconds)
+
+@app.get("/api/status")
+async def get_status():
+    return Response(content=await status_snapshot.get(), media_type="application/json")
+
+_HEALTHY_BODY = responses.dumps({"status": "ok"})
+
+@app.get("/healthz")
+async def healthz():
+    """Canlılık: event loop yanıt veriyor (G/Ç yok)"""
+    return Response(content=_HEALTHY_BODY, media_type="application/json")
+
+@app.get("/readyz")
+async def readyz():
+    """Hazırlık: başlangıç tamamlandı ve kuyruk işçisi çalışıyor (G/Ç yok)"""
+    problems = []
+    if not server_ready:
+        problems.append("starting" if job_queue is None else "shutting_down")
+    elif not job_queue.worker_alive():
+        problems.append("queue_worker_down")
+    if problems:
+        return FastJSONResponse(status_code=503, content={"status": "unavailable", "problems": problems})
+    return Response(content=_HEALTHY_BODY, media_type="application/json")
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrikleri (text exposition formatı)"""
+    # Toplayıcılar broker ve saklama indeksini (SQLite) sorgular: event loop dışında çalışır
+    content = await executors.run("db", metrics_registry.render)
+    return Response(content=content, media_type=CONTENT_TYPE_LATEST)
+
+@app.post("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def profile(seconds: float = Query(10.0, gt=0, le=profiler.MAX_DURATION_S),
+                  interval_ms: float = Query(5.0, gt=0, le=1000.0)):
+    """Event loop ve kuyruk işçisi thread'lerini örnekle, collapsed-stack döndür"""
+    # nan karşılaştırmaları hep False: sınır kontrolünden geçebilir, örnekleme hiç bitmez
+    if not (math.isfinite(seconds) and math.isfinite(interval_ms)):
+        raise HTTPException(400, "seconds ve interval_ms sonlu sayılar olmalı")
+    if profiler.is_running():
+        raise HTTPException(409, "Profil zaten çalışıyor")
+
+    threads = {"event_loop": event_loop_thread_id}
+    if job_queue and job_queue.worker_thread and job_queue.worker_thread.is_alive():
+        threads["worker"] = job_queue.worker_thread.ident
+
+    # Örnekleme ayrı thread'de; event loop örneklenirken serbest kalmalı
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(
+            None, profiler.sample, threads, seconds, interval_ms / 1000.0
+        )
+    except profiler.ProfilerBusy:
+        raise HTTPException(409, "Profil zaten çalışıyor")
+
+    summary = result.summary()
+    logger.info(f"Profil tamamlandı: {summary['samples']} örnek, {summary['duration_s']}s")
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "X-Profile-Samples": str(summary["samples"]),
+            "X-Profile-Duration": str(summary["duration_s"]),
+            "X-Profile-Threads": ",".join(threads),
+        }
+    )
 
 @app.post("/api/load-model")
 async def load_model(model: Optional[str] = None):
@@ -1108,7 +1850,7 @@ async def generate_image(request: GenerateRequest):
         raise HTTPException(500, "Kuyruk başlatılmadı")
 
     # İçerik güvenlik kontrolü
-    content_check = ContentFilter.check_prompt(request.prompt)
+    content_check = await executors.run("analysis", ContentFilter.check_prompt, request.prompt)
     if not content_check.is_safe:
         raise HTTPException(
             400,
@@ -1155,10 +1897,10 @@ async def generate_image(request: GenerateRequest):
         created_at=datetime.now().isoformat()
     )
 
-    if not job_queue.add_job(job):
+    if not await executors.run("db", job_queue.add_job, job):
         raise HTTPException(429, "Kuyruk dolu, lütfen bekleyin")
 
-    queue_status = job_queue.get_queue_status()
+    queue_status = await executors.run("db", job_queue.get_queue_status)
 
     # Uyarılar varsa ekle
     message = f"İş kuyruğa eklendi (sıra: {queue_status['pending']})"
@@ -1180,29 +1922,37 @@ async def get_job_status(job_id: str):
     if not job_queue:
         raise HTTPException(500, "Kuyruk başlatılmadı")
 
-    job = job_queue.get_job(job_id)
-    if not job:
+    if job_queue.blocking:
+        snapshot = await executors.run("db", job_queue.get_job_snapshot, job_id)
+    else:
+        snapshot = job_queue.get_job_snapshot(job_id)
+    if not snapshot:
         raise HTTPException(404, "İş bulunamadı")
 
-    response = asdict(job)
+    body, server_timing = snapshot
+    headers = {"Server-Timing": server_timing} if server_timing else None
+    return Response(content=body, media_type="application/json", headers=headers)
 
-    # Progress bilgisi ekle
-    response["progress"] = job.progress
-    response["progress_message"] = job.progress_message
-    response["can_rate"] = job.status == "completed" and not job.cancelled
+@app.get("/api/job/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    """İş zaman çizelgesini Chrome trace formatında indir (chrome://tracing, Perfetto)"""
+    if not JobIdManager.validate(job_id):
+        raise HTTPException(400, "Geçersiz iş ID formatı")
 
-    if job.status == "completed" and job.result:
-        response["image_url"] = f"/api/image/{job.result['filename']}"
-        response["generation_info"] = {
-            "model": job.result.get("model"),
-            "seed": job.result.get("seed"),
-            "enhanced_prompt": job.result.get("enhanced_prompt"),
-            "generation_time": job.result.get("generation_time"),
-            "emotion": job.result.get("emotion"),
-            "optimization_applied": job.result.get("optimization_applied")
-        }
+    if not job_queue:
+        raise HTTPException(500, "Kuyruk başlatılmadı")
 
-    return response
+    if job_queue.blocking:
+        timeline = await executors.run("db", job_queue.get_timeline, job_id)
+    else:
+        timeline = job_queue.get_timeline(job_id)
+    if not timeline:
+        raise HTTPException(404, "İş bulunamadı")
+
+    return FastJSONResponse(
+        tracing.to_chrome_trace(timeline, name=job_id),
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.trace.json"'}
+    )
 
 @app.post("/api/job/{job_id}/cancel")
 async def cancel_job(job_id: str):
@@ -1213,7 +1963,7 @@ async def cancel_job(job_id: str):
     if not job_queue:
         raise HTTPException(500, "Kuyruk başlatılmadı")
 
-    success = job_queue.cancel_job(job_id)
+    success = await executors.run("db", job_queue.cancel_job, job_id)
 
     if success:
         return {
@@ -1225,40 +1975,63 @@ async def cancel_job(job_id: str):
         raise HTTPException(400, "İş iptal edilemedi (zaten tamamlanmış olabilir)")
 
 @app.get("/api/image/{filename}")
-async def get_image(filename: str):
-    # Güvenlik: path sanitization
-    safe_filename = PathSecurity.sanitize_filename(filename)
-    filepath = Path(CONFIG.output_dir) / safe_filename
-
-    # Path traversal kontrolü
-    is_valid, error = PathSecurity.validate_path(str(filepath), CONFIG.output_dir)
-    if not is_valid:
-        raise HTTPException(400, error)
-
-    if not filepath.exists():
+async def get_image(filename: str, request: Request):
+    # Güvenlik: path sanitization + traversal kontrolü (dosya adı başına bir kez, önbellekli)
+    entry = image_catalog.cached(filename)
+    if entry is None:
+        # Kaçırma: doğrulama + içerik ETag'i dosyayı baştan sona okur, event loop'ta yapılmaz
+        try:
+            entry = await executors.run("io", image_catalog.resolve, filename)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    if entry is None:
         raise HTTPException(404, "Görsel bulunamadı")
 
-    return FileResponse(filepath, media_type="image/png")
+    # Görseller değişmez: içerik ETag'i, immutable Cache-Control, 304 ve Range
+    plan = image_serving.plan(entry, request.headers)
+    if CONFIG.image_offload and plan.status in (200, 206):
+        # Gövde ve Range vekilde: event loop'tan bayt akmaz
+        plan = image_serving.offload(entry, plan, CONFIG.image_offload, CONFIG.image_offload_location)
+        return Response(status_code=plan.status, headers=plan.headers)
+    if plan.status in (200, 206):
+        cached = image_bytes.get(entry.path.name, entry.etag) if image_bytes.max_bytes else None
+        if cached is not None:
+            body = cached if plan.status == 200 else cached[plan.start:plan.end + 1]
+            return Response(content=body, status_code=plan.status, media_type=entry.media_type,
+                            headers=plan.headers)
+    if plan.status == 200:
+        return FullFileResponse(entry.path, media_type=entry.media_type, headers=plan.headers)
+    if plan.status == 206:
+        try:
+            body = await executors.run("io", image_serving.read_range, entry.path, plan.start, plan.end)
+        except OSError:
+            image_catalog.forget(filename)
+            raise HTTPException(404, "Görsel bulunamadı")
+        return Response(content=body, status_code=206, media_type=entry.media_type, headers=plan.headers)
+    return Response(status_code=plan.status, headers=plan.headers)
+
+def _record_feedback(request: FeedbackRequest) -> int:
+    """Üretimi bul, feedback'i kaydet ve öğrenmeyi güncelle (bloklayan; "db" havuzunda)"""
+    gen = db.get_generation(request.job_id)
+    if not gen:
+        raise HTTPException(404, "Üretim bulunamadı")
+
+    return learning_manager.record_feedback(
+        generation_id=gen.id,
+        overall_score=request.overall_score,
+        prompt_accuracy=request.prompt_accuracy,
+        emotion_accuracy=request.emotion_accuracy,
+        composition_score=request.composition_score,
+        issues=request.issues,
+        notes=request.notes
+    )
 
 @app.post("/api/feedback")
 async def submit_feedback(request: FeedbackRequest):
     """Feedback kaydet ve öğrenmeyi tetikle"""
     try:
-        # Generation'ı bul
-        gen = db.get_generation(request.job_id)
-        if not gen:
-            raise HTTPException(404, "Üretim bulunamadı")
-
-        # Feedback kaydet
-        feedback_id = learning_manager.record_feedback(
-            generation_id=gen.id,
-            overall_score=request.overall_score,
-            prompt_accuracy=request.prompt_accuracy,
-            emotion_accuracy=request.emotion_accuracy,
-            composition_score=request.composition_score,
-            issues=request.issues,
-            notes=request.notes
-        )
+        feedback_id = await executors.run("db", _record_feedback, request)
+        learning_stats_snapshot.invalidate()
 
         return {
             "status": "success",
@@ -1266,7 +2039,7 @@ async def submit_feedback(request: FeedbackRequest):
             "message": "Feedback kaydedildi, öğrenme güncellendi"
         }
 
-    except HTTPException:
+    except (HTTPException, ExecutorSaturated):
         raise
     except Exception as e:
         logger.error(f"Feedback hatası: {e}")
@@ -1276,8 +2049,9 @@ async def submit_feedback(request: FeedbackRequest):
 async def get_learning_stats():
     """Öğrenme istatistiklerini getir"""
     try:
-        stats = learning_manager.get_learning_stats()
-        return stats
+        return await learning_stats_snapshot.get()
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Öğrenme istatistikleri hatası: {e}")
         return {}
@@ -1301,54 +2075,146 @@ async def get_low_score_reasons():
         "note": "3 veya altı puan verirseniz neden seçmeniz gerekir"
     }
 
+def _emotion_response(result) -> Dict[str, Any]:
+    """Duygu sonucunu API yanıtına çevir (tekil ve toplu uç nokta ortak)"""
+    return {
+        "primary_emotion": result.primary_emotion.value,
+        "intensity": result.intensity,
+        "secondary_emotions": [
+            {"emotion": e.value, "intensity": i}
+            for e, i in result.secondary_emotions
+        ],
+        "confidence": result.confidence,
+        "context_notes": result.context_notes,
+        "visual_prompt": emotion_analyzer.get_visual_prompt(result),
+        "mood_string": emotion_analyzer.get_mood_string(result)
+    }
+
 @app.post("/api/analyze-emotion")
 async def analyze_emotion(text: str):
     """Metin duygu analizi"""
     try:
-        result = emotion_analyzer.analyze(text)
+        return await executors.run("analysis", lambda: _emotion_response(emotion_analyzer.analyze(text)))
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Duygu analizi hatası: {e}")
+        return {"error": str(e)}
+
+@app.post("/api/analyze-emotion/batch", dependencies=[Depends(check_rate_limit)])
+async def analyze_emotion_batch(request: EmotionBatchRequest):
+    """Toplu metin duygu analizi (ör. hikayenin tüm paragrafları); sonuçlar giriş sırasıyla"""
+    texts = request.texts
+    if not texts:
+        raise HTTPException(status_code=400, detail="En az bir metin gerekli")
+    if len(texts) > CONFIG.emotion_batch_max_texts:
+        raise HTTPException(status_code=400,
+                            detail=f"En fazla {CONFIG.emotion_batch_max_texts} metin gönderilebilir")
+    if sum(len(t) for t in texts) > CONFIG.emotion_batch_max_chars:
+        raise HTTPException(status_code=400,
+                            detail=f"Toplam metin çok uzun (max {CONFIG.emotion_batch_max_chars} karakter)")
+
+    try:
+        results = await executors.run("analysis", emotion_analyzer.analyze_batch, texts)
         return {
-            "primary_emotion": result.primary_emotion.value,
-            "intensity": result.intensity,
-            "secondary_emotions": [
-                {"emotion": e.value, "intensity": i}
-                for e, i in result.secondary_emotions
-            ],
-            "confidence": result.confidence,
-            "context_notes": result.context_notes,
-            "visual_prompt": emotion_analyzer.get_visual_prompt(result),
-            "mood_string": emotion_analyzer.get_mood_string(result)
+            "count": len(results),
+            "results": [_emotion_response(result) for result in results]
         }
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        logger.error(f"Duygu analizi hatası: {e}")
+        logger.error(f"Toplu duygu analizi hatası: {e}")
         return {"error": str(e)}
 
+@app.post("/api/analyze-themes/batch", dependencies=[Depends(check_rate_limit)])
+async def analyze_themes_batch(request: ThemeBatchRequest):
+    """Toplu tema/mood analizi (ör. hikayenin tüm sahneleri); sonuçlar giriş sırasıyla"""
+    texts = request.texts
+    if not texts:
+        raise HTTPException(status_code=400, detail="En az bir metin gerekli")
+    if len(texts) > CONFIG.theme_batch_max_texts:
+        raise HTTPException(status_code=400,
+                            detail=f"En fazla {CONFIG.theme_batch_max_texts} metin gönderilebilir")
+    if sum(len(t) for t in texts) > CONFIG.theme_batch_max_chars:
+        raise HTTPException(status_code=400,
+                            detail=f"Toplam metin çok uzun (max {CONFIG.theme_batch_max_chars} karakter)")
+
+    try:
+        results = await executors.run("analysis", ThemeAnalyzer.analyze_batch, texts)
+        return {
+            "count": len(results),
+            "results": [
+                {
+                    "themes": [{"theme": theme, "score": score} for theme, score in themes],
+                    "mood": mood,
+                    "mood_intensity": intensity,
+                    "visual": details['visual'],
+                    "color_palette": details['color_palette'],
+                }
+                for themes, (mood, intensity, details) in results
+            ]
+        }
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Toplu tema analizi hatası: {e}")
+        return {"error": str(e)}
+
+def _parse_date(value: Optional[str], name: str) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(400, f"Geçersiz tarih ({name}): {value}")
+
 @app.get("/api/images")
-async def list_images(limit: int = 50):
-    output_dir = Path(CONFIG.output_dir)
-    if not output_dir.exists():
-        return {"images": []}
-
-    images = []
-    for f in sorted(output_dir.glob("*.png"), key=lambda x: x.stat().st_mtime, reverse=True)[:limit]:
-        images.append({
-            "filename": f.name,
-            "url": f"/api/image/{f.name}",
-            "size": f.stat().st_size,
-            "created": datetime.fromtimestamp(f.stat().st_mtime).isoformat()
-        })
-
-    return {"images": images}
+async def list_images(limit: int = 50, cursor: Optional[str] = None, model: Optional[str] = None,
+                      scene_type: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None):
+    """En yeniden eskiye görseller; sonraki sayfa için dönen next_cursor gönderilir"""
+    if not output_retention:
+        return {"images": [], "next_cursor": None}
+    if not 1 <= limit <= CONFIG.images_page_max:
+        raise HTTPException(400, f"limit 1-{CONFIG.images_page_max} arasında olmalı")
+
+    try:
+        rows, next_cursor = await executors.run(
+            "db", output_retention.page,
+            limit=limit, cursor=cursor, model=model, scene_type=scene_type,
+            since=_parse_date(since, "since"), until=_parse_date(until, "until"))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    images = [{
+        "filename": row["filename"],
+        "url": f"/api/image/{row['filename']}",
+        "size": row["size"],
+        "created": datetime.fromtimestamp(row["mtime"]).isoformat(),
+        "job_id": row["job_id"],
+        "model": row["model"],
+        "scene_type": row["scene_type"],
+    } for row in rows]
+
+    return {"images": images, "next_cursor": next_cursor}
 
 @app.post("/api/cleanup")
 async def cleanup():
-    """Eski dosyaları temizle"""
+    """Kotaları hemen uygula (normalde arka planda dilimler halinde çalışır)"""
     removed = 0
-    if output_cleaner:
-        removed = output_cleaner.cleanup()
+    if output_retention:
+        removed = await executors.run("db", output_retention.enforce_all)
     if job_queue:
-        job_queue.cleanup_old_jobs()
+        await executors.run("db", job_queue.cleanup_old_jobs)
     return {"removed_files": removed}
 
+@app.get("/api/retention")
+async def retention_stats():
+    """Çıktı saklama istatistikleri: indeksli dosya/bayt, kotalar, silinenler"""
+    if not output_retention:
+        return {"enabled": False}
+    return {"enabled": True, **(await executors.run("db", output_retention.stats))}
+
 # ============== Main ==============
 
 if __name__ == "__main__":
@@ -1374,5 +2240,6 @@ if __name__ == "__main__":
         app,
         host=CONFIG.host,
         port=CONFIG.port,
-        log_level="info"
+        log_level="info",
+        log_config=None  # uvicorn logları da kök logger'ın kuyruk hattından geçsin
     )
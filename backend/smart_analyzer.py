@@ -16,6 +16,7 @@ from context_analyzer import ContextTracker, SceneContext, StoryContext, Context
 from prompt_weighting import DynamicPromptBuilder, SceneCompositionAnalyzer, CompositionSuggestion
 from emotion_analyzer import EmotionAnalyzer, EmotionResult
 from learning_manager import LearningManager
+from document import Document
 from database import DatabaseManager
 
 
@@ -110,15 +111,18 @@ class SmartAnalyzer:
             text=text
         )
 
+        # Metin bir kez işlenir; tüm analizörler aynı Document'ı kullanır
+        doc = Document(text)
+
         # 1. Türkçe NLP Analizi
-        nlp_analysis = TurkishTextAnalyzer.analyze(text)
+        nlp_analysis = TurkishTextAnalyzer.analyze(doc)
         result.nlp_analysis = nlp_analysis
         result.detected_themes = nlp_analysis.themes
         result.detected_mood = nlp_analysis.mood
         result.mood_intensity = nlp_analysis.mood_intensity
 
         # 2. Duygu Analizi (detaylı)
-        emotion_result = EmotionAnalyzer.analyze(text)
+        emotion_result = EmotionAnalyzer.analyze(doc)
         result.emotion = emotion_result
 
         # Duygu sonuçlarını entegre et
@@ -127,7 +131,7 @@ class SmartAnalyzer:
             result.detected_mood = emotion_result.primary_emotion.value
 
         # 3. Bağlam Analizi
-        scene_context = self.context_tracker.process_scene(text)
+        scene_context = self.context_tracker.process_scene(doc)
         result.scene_context = scene_context
         result.character_count = len(scene_context.characters_present)
 
@@ -0,0 +1,43 @@
+"""
+Suffix Trie - Ters Çevrilmiş Ek Ağacı
+=====================================
+Ek tabloları kelime sonundan başlayan tek bir trie'ye derlenir. Kelime
+sondan başa bir kez yürünür ve kelimenin bittiği tüm ekler (kısadan uzuna)
+etiketleriyle döner; `word.endswith(suffix)` döngüsünün tek geçişlik karşılığı.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+_END = ''  # Düğümde biten eklerin etiket listesi anahtarı
+
+
+class SuffixTrie:
+    """Ek -> etiket eşlemesi; bir ek birden çok etiket taşıyabilir"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]]):
+        self._root: Dict[str, Any] = {}
+        self._size = 0
+        for suffix, tag in entries:
+            if not suffix:
+                continue
+            node = self._root
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node.setdefault(_END, []).append(tag)
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def matches(self, word: str) -> List[Any]:
+        """Kelimenin bittiği eklerin etiketleri; kısa ekten uzuna, aynı ekte ekleme sırasıyla"""
+        node = self._root
+        found: List[Any] = []
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                break
+            tags = node.get(_END)
+            if tags:
+                found.extend(tags)
+        return found
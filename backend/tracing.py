@@ -0,0 +1,185 @@
+"""
+Tracing - İş Bazlı Aşama Zaman Çizelgesi
+========================================
+Hafif span kaydedici: her iş için aşamaların başlangıç/bitiş zamanları.
+Çıktılar: API için sözlük, Server-Timing başlığı, Chrome trace (chrome://tracing, Perfetto).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SpanSink = Callable[[str, float], None]
+
+
+@dataclass
+class Span:
+    name: str
+    start: float  # perf_counter
+    end: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Timeline:
+    """Tek bir işin span listesi (thread-safe)"""
+
+    def __init__(self, on_span: Optional[SpanSink] = None, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        # perf_counter orijininin duvar saati karşılığı
+        self.wall_origin = time.time() - (time.perf_counter() - self.origin)
+        self.spans: List[Span] = []
+        self._open: Dict[str, float] = {}
+        self._on_span = on_span
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float, **attrs) -> Span:
+        """Başlangıç/bitişi bilinen span ekle (perf_counter değerleri)"""
+        span = Span(name, start, end, attrs)
+        with self._lock:
+            self.spans.append(span)
+        if self._on_span:
+            try:
+                self._on_span(name, span.duration)
+            except Exception:
+                pass
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Bloğu span olarak kaydet"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), **attrs)
+
+    def begin(self, name: str):
+        """Açık span başlat (zaten açıksa yok say)"""
+        with self._lock:
+            self._open.setdefault(name, time.perf_counter())
+
+    def end(self, name: str, **attrs):
+        """Açık span'i kapat"""
+        with self._lock:
+            start = self._open.pop(name, None)
+        if start is not None:
+            self.add(name, start, time.perf_counter(), **attrs)
+
+    def last(self, name: str) -> Optional[Span]:
+        with self._lock:
+            for span in reversed(self.spans):
+                if span.name == name:
+                    return span
+        return None
+
+    def totals(self) -> Dict[str, float]:
+        """Aşama adı -> toplam süre (saniye), ilk görülme sırasıyla"""
+        result: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                result[span.name] = result.get(span.name, 0.0) + span.duration
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API/DB için serileştir (ms, orijine göre)"""
+        with self._lock:
+            spans = list(self.spans)
+        end = max((s.end for s in spans), default=self.origin)
+        return {
+            'started_at': datetime.fromtimestamp(self.wall_origin).isoformat(),
+            'total_ms': round((end - self.origin) * 1000, 2),
+            'spans': [
+                {
+                    'name': s.name,
+                    'start_ms': round((s.start - self.origin) * 1000, 2),
+                    'duration_ms': round(s.duration * 1000, 2),
+                    **({'attrs': s.attrs} if s.attrs else {}),
+                }
+                for s in spans
+            ],
+        }
+
+    def server_timing(self) -> str:
+        return server_timing_header(self.to_dict())
+
+
+def server_timing_header(timeline: Dict[str, Any]) -> str:
+    """Serileştirilmiş timeline'dan Server-Timing başlık değeri"""
+    totals: Dict[str, float] = {}
+    for span in timeline.get('spans', []):
+        totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+    return ', '.join(f"{name};dur={duration:.2f}" for name, duration in totals.items())
+
+
+def to_chrome_trace(timeline: Dict[str, Any], name: str = "job") -> Dict[str, Any]:
+    """Serileştirilmiş timeline'ı Chrome trace event formatına çevir"""
+    events: List[Dict[str, Any]] = [
+        {'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': name}},
+    ]
+    for span in timeline.get('spans', []):
+        events.append({
+            'name': span['name'],
+            'cat': 'stage',
+            'ph': 'X',
+            'pid': 1,
+            'tid': 1,
+            'ts': round(span['start_ms'] * 1000, 1),
+            'dur': round(span['duration_ms'] * 1000, 1),
+            'args': span.get('attrs', {}),
+        })
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {'started_at': timeline.get('started_at'), 'total_ms': timeline.get('total_ms')},
+    }
+
+
+# ============== Aktif timeline (thread-local) ==============
+
+_local = threading.local()
+
+
+def current() -> Optional[Timeline]:
+    """Bu thread'de aktif timeline (pipeline hook'ları için)"""
+    return getattr(_local, 'timeline', None)
+
+
+@contextmanager
+def activate(timeline: Timeline):
+    """Timeline'ı bu thread için aktif yap"""
+    previous = current()
+    _local.timeline = timeline
+    try:
+        yield timeline
+    finally:
+        _local.timeline = previous
+
+
+def begin(name: str):
+    timeline = current()
+    if timeline is not None:
+        timeline.begin(name)
+
+
+def end(name: str, **attrs):
+    timeline = current()
+    if timeline is not None:
+        timeline.end(name, **attrs)
+
+
+@contextmanager
+def stage(name: str, **attrs):
+    """Aktif timeline varsa bloğu span olarak kaydet"""
+    timeline = current()
+    if timeline is None:
+        yield
+        return
+    with timeline.span(name, **attrs):
+        yield
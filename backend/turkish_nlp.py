@@ -7,11 +7,24 @@ Gelişmiş Türkçe NLP Analiz Modülü
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional, Set
+from typing import Any, Callable, List, Dict, Tuple, Optional, Sequence, Set, Union
 from enum import Enum
 import re
+import threading
 from collections import defaultdict
 
+try:
+    import numpy as np
+except ImportError:  # opsiyonel: yoksa toplu tema analizi metin başına yapılır
+    np = None
+
+import analysis_cache
+from analysis_cache import cached_analysis, identity, lowercase, lowercase_strip
+from suffix_trie import SuffixTrie
+from keyword_automaton import KeywordAutomaton
+from gazetteer import Gazetteer, normalize_token
+from document import Document, as_document, register_lexicon
+
 # ============== ENUM VE DATACLASS TANIMLARI ==============
 
 class WordType(str, Enum):
@@ -148,7 +161,70 @@ class TurkishMorphology:
     # Zarf yapan ekler
     ADVERB_SUFFIXES = ['-ca', '-ce', '-ça', '-çe', '-casına', '-cesine']
 
+    # Kelime sonu eşleşmesiyle zaman belirleyen gruplar (sıra önemli: sonraki eşleşme öncekini ezer)
+    TENSE_GROUPS = {
+        'past': TenseType.PAST,
+        'present': TenseType.PRESENT,
+        'future': TenseType.FUTURE,
+        'past_perfect': TenseType.PAST_PERFECT,
+        'aorist': TenseType.AORIST,
+    }
+
+    # Yaygın fiil kökleri (zaman eki bulunamazsa)
+    COMMON_VERB_ROOTS = ['gel', 'git', 'bak', 'gör', 'al', 'ver', 'yap', 'et', 'ol', 'kal',
+                         'bil', 'iste', 'sev', 'düşün', 'anla', 'konuş', 'yürü', 'koş', 'otur', 'kalk']
+
+    # Derlenmiş ek tabloları, ilk kullanımda kurulur
+    _suffix_trie: Optional[SuffixTrie] = None
+    _negative_infixes: Tuple[Tuple[str, str], ...] = ()
+    _passive_infixes: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def _compiled_suffixes(cls) -> SuffixTrie:
+        """Kelime sonu eklerini tek ters trie'ye derle.
+
+        Etiket: (yuva, sıra, grup, ek). Aynı yuvada birden çok ek eşleşirse
+        tablodaki ilk ek (en küçük sıra) kazanır; endswith döngüsüyle aynı.
+        """
+        if cls._suffix_trie is None:
+            entries = []
+            for tense in cls.TENSE_GROUPS:
+                for order, suffix in enumerate(cls.VERB_SUFFIXES[tense]):
+                    entries.append((suffix.replace('-', ''), (('tense', tense), order, tense, suffix)))
+            for order, suffix in enumerate(cls.PLURAL_SUFFIXES):
+                entries.append((suffix.replace('-', ''), ('plural', order, None, suffix)))
+            order = 0
+            for case, suffixes in cls.NOUN_CASES.items():
+                for suffix in suffixes:
+                    entries.append((suffix.replace('-', ''), ('case', order, case, suffix)))
+                    order += 1
+            for order, suffix in enumerate(cls.ADJECTIVE_SUFFIXES):
+                entries.append((suffix.replace('-', ''), ('adjective', order, None, suffix)))
+
+            # Kelime içinde aranan ekler (endswith değil, alt dize)
+            cls._negative_infixes = tuple((s, s.replace('-', '')) for s in cls.VERB_SUFFIXES['negative'])
+            cls._passive_infixes = tuple((s, s.replace('-', '')) for s in cls.VERB_SUFFIXES['passive'])
+            cls._suffix_trie = SuffixTrie(entries)
+        return cls._suffix_trie
+
+    @classmethod
+    def rebuild_suffixes(cls):
+        """Ek tabloları değiştiğinde derlenmiş trie'yi ve kelime önbelleğini yenile"""
+        cls._suffix_trie = None
+        analysis_cache.invalidate('morphology.word')
+
+    @classmethod
+    def _endings(cls, word: str) -> Dict[object, Tuple[str, str]]:
+        """Yuva -> (grup, ek): kelimenin bittiği, tabloda ilk sıradaki ek"""
+        best: Dict[object, Tuple[int, Optional[str], str]] = {}
+        for slot, order, group, suffix in cls._compiled_suffixes().matches(word):
+            current = best.get(slot)
+            if current is None or order < current[0]:
+                best[slot] = (order, group, suffix)
+        return {slot: (group, suffix) for slot, (_, group, suffix) in best.items()}
+
     @classmethod
+    @cached_analysis('morphology.word', maxsize=4096, normalizer=lowercase_strip, key_digest=False)
     def analyze_word(cls, word: str) -> Word:
         """Kelimeyi morfolojik olarak analiz et"""
         text = word.lower().strip()
@@ -162,8 +238,11 @@ class TurkishMorphology:
             confidence=0.5
         )
 
+        # Kelime sonu ekleri tek yürüyüşte; fiil, isim ve sıfat kontrolleri paylaşır
+        endings = cls._endings(text)
+
         # Fiil mi kontrol et
-        verb_info = cls._analyze_verb(text)
+        verb_info = cls._analyze_verb(text, endings)
         if verb_info:
             result.word_type = WordType.VERB
             result.lemma = verb_info['lemma']
@@ -177,7 +256,7 @@ class TurkishMorphology:
             return result
 
         # İsim mi kontrol et
-        noun_info = cls._analyze_noun(text)
+        noun_info = cls._analyze_noun(text, endings)
         if noun_info:
             result.word_type = WordType.NOUN
             result.lemma = noun_info['lemma']
@@ -188,33 +267,32 @@ class TurkishMorphology:
             return result
 
         # Sıfat mı
-        if cls._is_adjective(text):
+        if cls._is_adjective(text, endings):
             result.word_type = WordType.ADJECTIVE
             result.confidence = 0.6
 
         return result
 
     @classmethod
-    def _analyze_verb(cls, word: str) -> Optional[Dict]:
+    def _analyze_verb(cls, word: str, endings: Optional[Dict] = None) -> Optional[Dict]:
         """Fiil analizi"""
+        if endings is None:
+            endings = cls._endings(word)
         result = {'lemma': word, 'suffixes': []}
 
-        # Zaman eki kontrolü
-        for tense, suffixes in cls.VERB_SUFFIXES.items():
-            if tense in ['past', 'present', 'future', 'past_perfect', 'aorist']:
-                for suffix in suffixes:
-                    if word.endswith(suffix.replace('-', '')):
-                        result['tense'] = TenseType(tense)
-                        result['lemma'] = word[:-len(suffix.replace('-', ''))]
-                        result['suffixes'].append(suffix)
-                        break
+        # Zaman eki kontrolü (her grupta ilk eşleşen ek; sonraki grup öncekini ezer)
+        for tense, tense_type in cls.TENSE_GROUPS.items():
+            match = endings.get(('tense', tense))
+            if match:
+                suffix = match[1]
+                result['tense'] = tense_type
+                result['lemma'] = word[:-(len(suffix) - 1)]
+                result['suffixes'].append(suffix)
 
         # Tense bulunamadıysa fiil değil
         if 'tense' not in result:
             # Yaygın fiil kökleri kontrolü
-            common_verb_roots = ['gel', 'git', 'bak', 'gör', 'al', 'ver', 'yap', 'et', 'ol', 'kal',
-                                'bil', 'iste', 'sev', 'düşün', 'anla', 'konuş', 'yürü', 'koş', 'otur', 'kalk']
-            for root in common_verb_roots:
+            for root in cls.COMMON_VERB_ROOTS:
                 if word.startswith(root):
                     result['lemma'] = root
                     result['tense'] = TenseType.UNKNOWN
@@ -223,16 +301,14 @@ class TurkishMorphology:
                 return None
 
         # Olumsuzluk kontrolü
-        for neg in cls.VERB_SUFFIXES['negative']:
-            neg_clean = neg.replace('-', '')
+        for neg, neg_clean in cls._negative_infixes:
             if neg_clean in word:
                 result['negated'] = True
                 result['suffixes'].append(neg)
                 break
 
         # Edilgenlik kontrolü
-        for passive in cls.VERB_SUFFIXES['passive']:
-            passive_clean = passive.replace('-', '')
+        for passive, passive_clean in cls._passive_infixes:
             if passive_clean in word and word.index(passive_clean) < len(word) - 3:
                 result['voice'] = VoiceType.PASSIVE
                 result['suffixes'].append(passive)
@@ -252,43 +328,43 @@ class TurkishMorphology:
         return result
 
     @classmethod
-    def _analyze_noun(cls, word: str) -> Optional[Dict]:
+    def _analyze_noun(cls, word: str, endings: Optional[Dict] = None) -> Optional[Dict]:
         """İsim analizi"""
+        if endings is None:
+            endings = cls._endings(word)
         result = {'lemma': word, 'suffixes': []}
 
         # Çoğul kontrolü
-        for plural in cls.PLURAL_SUFFIXES:
-            plural_clean = plural.replace('-', '')
-            if word.endswith(plural_clean):
-                result['plural'] = True
-                result['lemma'] = word[:-len(plural_clean)]
-                result['suffixes'].append(plural)
-                break
+        plural = endings.get('plural')
+        if plural:
+            suffix = plural[1]
+            result['plural'] = True
+            result['lemma'] = word[:-(len(suffix) - 1)]
+            result['suffixes'].append(suffix)
+            # Hal eki çoğul ekinden önce aranır
+            endings = cls._endings(result['lemma'])
 
         # Hal eki kontrolü
-        lemma = result['lemma']
-        for case, suffixes in cls.NOUN_CASES.items():
-            for suffix in suffixes:
-                suffix_clean = suffix.replace('-', '')
-                if lemma.endswith(suffix_clean):
-                    result['case'] = case
-                    result['lemma'] = lemma[:-len(suffix_clean)]
-                    result['suffixes'].append(suffix)
-                    return result
+        case = endings.get('case')
+        if case:
+            lemma = result['lemma']
+            result['case'], suffix = case
+            result['lemma'] = lemma[:-(len(suffix) - 1)]
+            result['suffixes'].append(suffix)
+            return result
 
         # En az bir özellik varsa isim kabul et
-        if result['plural'] or len(word) > 2:
+        if result.get('plural') or len(word) > 2:
             return result
 
         return None
 
     @classmethod
-    def _is_adjective(cls, word: str) -> bool:
+    def _is_adjective(cls, word: str, endings: Optional[Dict] = None) -> bool:
         """Sıfat kontrolü"""
-        for suffix in cls.ADJECTIVE_SUFFIXES:
-            if word.endswith(suffix.replace('-', '')):
-                return True
-        return False
+        if endings is None:
+            endings = cls._endings(word)
+        return 'adjective' in endings
 
 
 # ============== CÜMLE ANALİZİ ==============
@@ -320,8 +396,8 @@ class SentenceAnalyzer:
                      'aşağıda', 'ileride', 'geride', 'yakında', 'uzakta', 'evde', 'sokakta']
 
     @classmethod
-    def analyze(cls, text: str) -> Sentence:
-        """Cümleyi analiz et"""
+    def analyze(cls, text: str, tokens: Optional[List[str]] = None) -> Sentence:
+        """Cümleyi analiz et (tokens: Document'ın önceden ayırdığı token'lar)"""
         text = text.strip()
 
         result = Sentence(
@@ -333,7 +409,7 @@ class SentenceAnalyzer:
         )
 
         # Kelimeleri analiz et
-        words = cls._tokenize(text)
+        words = tokens if tokens is not None else cls._tokenize(text)
         for word in words:
             result.words.append(TurkishMorphology.analyze_word(word))
 
@@ -540,9 +616,41 @@ class EntityRecognizer:
                       'gaziantep', 'mersin', 'diyarbakır', 'kayseri', 'eskişehir', 'samsun',
                       'denizli', 'şanlıurfa', 'malatya', 'trabzon', 'erzurum', 'van', 'batman'}
 
+    _gazetteer: Optional[Gazetteer] = None
+    _gazetteer_lock = threading.Lock()
+    _location_regex: Optional[re.Pattern] = None
+
     @classmethod
-    def extract_entities(cls, text: str) -> Dict[str, List[str]]:
+    def gazetteer(cls) -> Gazetteer:
+        """Yerleşik isim/şehir listeleriyle başlatılan paylaşılan gazetteer"""
+        if cls._gazetteer is None:
+            with cls._gazetteer_lock:
+                if cls._gazetteer is None:
+                    gazetteer = Gazetteer()
+                    gazetteer.add_all(cls.TURKISH_NAMES, 'PERSON')
+                    gazetteer.add_all(cls.TURKISH_CITIES, 'LOCATION')
+                    cls._gazetteer = gazetteer
+        return cls._gazetteer
+
+    @classmethod
+    def load_gazetteer(cls, path: str, default_label: Optional[str] = None) -> int:
+        """Gazetteer dosyası yükle (bkz. gazetteer.py); eklenen girdi sayısını döndür"""
+        added = cls.gazetteer().load(path, default_label=default_label)
+        # Varlıklar TurkishTextAnalyzer sonucunun parçası
+        analysis_cache.invalidate('turkish_nlp')
+        return added
+
+    @classmethod
+    def _location_indicator(cls) -> re.Pattern:
+        """LOCATION_INDICATORS alt dize testlerinin tek regex karşılığı"""
+        if cls._location_regex is None:
+            cls._location_regex = re.compile('|'.join(re.escape(w) for w in cls.LOCATION_INDICATORS))
+        return cls._location_regex
+
+    @classmethod
+    def extract_entities(cls, text: Union[str, Document]) -> Dict[str, List[str]]:
         """Metinden varlıkları çıkar"""
+        doc = as_document(text)
         entities = {
             'PERSON': [],
             'LOCATION': [],
@@ -551,14 +659,18 @@ class EntityRecognizer:
             'OBJECT': []
         }
 
-        words = text.split()
-        text_lower = text.lower()
+        words = doc.words
+        text_lower = doc.lower
+        tokens = [normalize_token(word) for word in words]
+        gazetteer = cls.gazetteer()
+        has_location_indicator = cls._location_indicator().search
 
         for i, word in enumerate(words):
-            word_lower = word.lower().strip('.,!?;:')
+            word_lower = tokens[i]
+            labels = gazetteer.labels(word_lower)
 
             # Kişi isimleri
-            if word_lower in cls.TURKISH_NAMES:
+            if 'PERSON' in labels:
                 entities['PERSON'].append(word)
             elif word[0].isupper() and i > 0:  # Cümle başı değil ve büyük harfle başlıyor
                 # Kişi belirteci kontrolü
@@ -567,19 +679,25 @@ class EntityRecognizer:
                 elif i > 0 and words[i - 1].lower() in cls.PERSON_INDICATORS:
                     entities['PERSON'].append(word)
 
-            # Şehirler
-            if word_lower in cls.TURKISH_CITIES:
-                entities['LOCATION'].append(word)
+            # Şehirler ve gazetteer'daki diğer tek kelimelik varlıklar (etiket = entities anahtarı)
+            for label in labels:
+                if label != 'PERSON':
+                    entities.setdefault(label, []).append(word)
 
             # Yer belirteçleri
-            for loc_ind in cls.LOCATION_INDICATORS:
-                if loc_ind in word_lower:
-                    # Önceki kelimeyi de al
-                    if i > 0:
-                        entities['LOCATION'].append(f"{words[i-1]} {word}")
-                    else:
-                        entities['LOCATION'].append(word)
-                    break
+            if has_location_indicator(word_lower):
+                # Önceki kelimeyi de al
+                if i > 0:
+                    entities['LOCATION'].append(f"{words[i-1]} {word}")
+                else:
+                    entities['LOCATION'].append(word)
+
+        # Çok kelimeli gazetteer girdileri (ör. "bağdat caddesi")
+        if gazetteer.max_tokens > 1:
+            for match in gazetteer.find(tokens, min_tokens=2):
+                phrase = ' '.join(words[match.start:match.end]).strip('.,!?;:')
+                for label in match.labels:
+                    entities.setdefault(label, []).append(phrase)
 
         # Zaman ifadeleri
         time_patterns = [
@@ -603,6 +721,18 @@ class EntityRecognizer:
 
 # ============== THEME VE MOOD ANALİZİ ==============
 
+@dataclass
+class _ThemeMatrix:
+    """Toplu tema/mood skorlaması için derlenmiş kelime dağarcığı ve ağırlıklar"""
+    vocabulary: KeywordAutomaton
+    columns: Dict[str, int]  # kelime -> sütun
+    themes: List[str]
+    theme_counts: Any  # (kelime, tema) kelimenin tema listesinde kaç kez geçtiği
+    theme_weights: Any  # (tema,)
+    moods: List[str]
+    mood_counts: Any  # (kelime, mood)
+
+
 class ThemeAnalyzer:
     """Tema ve mood analizi"""
 
@@ -722,42 +852,58 @@ class ThemeAnalyzer:
         }
     }
 
+    _score_matrix: Optional[_ThemeMatrix] = None
+
     @classmethod
-    def analyze_themes(cls, text: str) -> List[Tuple[str, float]]:
+    @cached_analysis('theme.themes', normalizer=lowercase)
+    def analyze_themes(cls, text: Union[str, Document]) -> List[Tuple[str, float]]:
         """Temaları analiz et ve skorla"""
-        text_lower = text.lower()
+        count = cls._counter(text)
         theme_scores = {}
 
         for theme, data in cls.THEMES.items():
-            score = 0.0
+            # Önce tam sayı toplam, sonra ağırlık: toplu matris skorlamasıyla birebir aynı
+            total = 0
             for keyword in data['keywords']:
-                count = text_lower.count(keyword)
-                if count > 0:
-                    score += count * data['weight']
+                total += count(keyword)
+            if total > 0:
+                theme_scores[theme] = cls._theme_score(total, data['weight'])
 
-            if score > 0:
-                theme_scores[theme] = min(score / 3.0, 1.0)  # Normalize
+        return cls._top_themes(theme_scores)
+
+    @staticmethod
+    def _counter(text: Union[str, Document]) -> Callable[[str], int]:
+        """Küçük harfli metinde `count`: Document'ın ortak indeksi ya da doğrudan str.count"""
+        return text.count if isinstance(text, Document) else text.lower().count
 
+    @staticmethod
+    def _theme_score(total: int, weight: float) -> float:
+        return min(total * weight / 3.0, 1.0)  # Normalize
+
+    @staticmethod
+    def _top_themes(theme_scores: Dict[str, float]) -> List[Tuple[str, float]]:
         # Sırala ve döndür
         sorted_themes = sorted(theme_scores.items(), key=lambda x: x[1], reverse=True)
         return sorted_themes[:5]  # Top 5 tema
 
     @classmethod
-    def analyze_mood(cls, text: str) -> Tuple[str, float, Dict]:
+    @cached_analysis('theme.mood', normalizer=lowercase)
+    def analyze_mood(cls, text: Union[str, Document]) -> Tuple[str, float, Dict]:
         """Mood analizi yap"""
-        text_lower = text.lower()
+        count = cls._counter(text)
         mood_scores = {}
 
         for mood, data in cls.MOODS.items():
-            score = 0.0
+            score = 0
             for keyword in data['keywords']:
-                count = text_lower.count(keyword)
-                if count > 0:
-                    score += count
-
+                score += count(keyword)
             if score > 0:
                 mood_scores[mood] = score
 
+        return cls._mood_result(mood_scores)
+
+    @classmethod
+    def _mood_result(cls, mood_scores: Dict[str, int]) -> Tuple[str, float, Dict]:
         if not mood_scores:
             return 'neutral', 0.5, {'visual': 'balanced natural lighting, normal colors', 'color_palette': []}
 
@@ -770,49 +916,199 @@ class ThemeAnalyzer:
             'color_palette': cls.MOODS[best_mood]['color_palette']
         }
 
+    # ---------- Toplu skorlama ----------
+
+    @classmethod
+    def rebuild_vocabulary(cls):
+        """THEMES/MOODS değiştiğinde derlenmiş matrisleri ve önbellekleri yenile"""
+        cls._score_matrix = None
+        analysis_cache.invalidate('theme.themes')
+        analysis_cache.invalidate('theme.mood')
+
+    @classmethod
+    def _scoring_matrix(cls) -> _ThemeMatrix:
+        """Tema/mood kelimelerinin ortak dağarcığı ve kelime×tema, kelime×mood matrisleri"""
+        if cls._score_matrix is None:
+            words = set()
+            for table in (cls.THEMES, cls.MOODS):
+                for data in table.values():
+                    words.update(data['keywords'])
+            vocabulary = KeywordAutomaton(words)
+            columns = {word: i for i, word in enumerate(vocabulary.patterns)}
+
+            themes = list(cls.THEMES)
+            theme_counts = np.zeros((len(columns), len(themes)), dtype=np.int64)
+            for t_idx, data in enumerate(cls.THEMES.values()):
+                for keyword in data['keywords']:
+                    theme_counts[columns[keyword], t_idx] += 1
+
+            moods = list(cls.MOODS)
+            mood_counts = np.zeros((len(columns), len(moods)), dtype=np.int64)
+            for m_idx, data in enumerate(cls.MOODS.values()):
+                for keyword in data['keywords']:
+                    mood_counts[columns[keyword], m_idx] += 1
+
+            cls._score_matrix = _ThemeMatrix(
+                vocabulary=vocabulary,
+                columns=columns,
+                themes=themes,
+                theme_counts=theme_counts,
+                theme_weights=np.array([data['weight'] for data in cls.THEMES.values()], dtype=np.float64),
+                moods=moods,
+                mood_counts=mood_counts,
+            )
+        return cls._score_matrix
+
+    @classmethod
+    def score_matrices(cls, texts: Sequence[str]) -> Tuple[Any, Any]:
+        """(tema skorları (metin, tema), mood skorları (metin, mood)); NumPy gerektirir.
+
+        Sütun sırası THEMES/MOODS sırasıdır. Tema skorları analyze_themes ile
+        aynı normalize değerlerdir (0 = tema yok), mood skorları ham kelime
+        sayılarıdır; hikaye düzeyinde toplama için satırlar doğrudan toplanabilir.
+        """
+        if np is None:
+            raise RuntimeError("Toplu tema skorlaması için numpy gerekli")
+        matrix = cls._scoring_matrix()
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[int] = []
+
+        # Seyrek doldurma: metin başına tek otomat geçişi, yalnızca geçen kelimeler
+        columns = matrix.columns
+        for row, text in enumerate(texts):
+            for word, count in matrix.vocabulary.count_all(text.lower()).items():
+                rows.append(row)
+                cols.append(columns[word])
+                values.append(count)
+
+        counts = np.zeros((len(texts), len(columns)), dtype=np.int64)
+        counts[rows, cols] = values
+
+        theme_totals = counts @ matrix.theme_counts
+        theme_scores = np.minimum(theme_totals * matrix.theme_weights / 3.0, 1.0)
+        return theme_scores, counts @ matrix.mood_counts
+
+    @classmethod
+    def analyze_batch(cls, texts: Sequence[str]) -> List[Tuple[List[Tuple[str, float]], Tuple[str, float, Dict]]]:
+        """Metin başına (analyze_themes, analyze_mood) sonuçları; tekil çağrılarla birebir aynı"""
+        if np is None:
+            return [(cls.analyze_themes(text), cls.analyze_mood(text)) for text in texts]
+
+        theme_cache = analysis_cache.get_cache('theme.themes')
+        mood_cache = analysis_cache.get_cache('theme.mood')
+        results: List[Optional[Tuple]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # küçük harfli metin -> sonuç sıraları (tekrarlar bir kez)
+        for i, text in enumerate(texts):
+            found_themes, themes = theme_cache.lookup(text, scope=cls)
+            found_mood, mood = mood_cache.lookup(text, scope=cls)
+            if found_themes and found_mood:
+                results[i] = (themes, mood)
+            else:
+                pending.setdefault(text.lower(), []).append(i)
+
+        if pending:
+            lower_texts = list(pending)
+            matrix = cls._scoring_matrix()
+            theme_scores, mood_scores = cls.score_matrices(lower_texts)
+            for lower_text, theme_row, mood_row in zip(lower_texts, theme_scores.tolist(), mood_scores.tolist()):
+                themes = cls._top_themes({theme: score for theme, score in zip(matrix.themes, theme_row) if score > 0})
+                mood = cls._mood_result({name: score for name, score in zip(matrix.moods, mood_row) if score > 0})
+                order = pending[lower_text]
+                theme_cache.store(texts[order[0]], themes, scope=cls)
+                mood_cache.store(texts[order[0]], mood, scope=cls)
+                for i in order:
+                    results[i] = (themes, mood)
+
+        return results
+
 
 # ============== ANA ANALİZ SINIFI ==============
 
 class TurkishTextAnalyzer:
     """Ana Türkçe metin analiz sınıfı"""
 
+    # Zaman ayarı belirteçleri
+    TIME_SETTINGS = {
+        'morning': ['sabah', 'sabahleyin', 'tan ağar', 'güneş doğ'],
+        'afternoon': ['öğle', 'öğleden sonra', 'ikindi'],
+        'evening': ['akşam', 'akşamüstü', 'günbatımı', 'güneş bat'],
+        'night': ['gece', 'geceleyin', 'karanlık', 'ay ışığı', 'yıldız'],
+        'dawn': ['şafak', 'fecir', 'tan vakti'],
+        'dusk': ['alacakaranlık', 'akşam karanlığı']
+    }
+
+    # Mekan türü belirteçleri
+    LOCATION_TYPES = {
+        'indoor': ['ev', 'oda', 'salon', 'mutfak', 'yatak odası', 'ofis', 'bina', 'içeride'],
+        'outdoor_urban': ['sokak', 'cadde', 'şehir', 'park', 'meydan', 'köprü'],
+        'outdoor_nature': ['orman', 'dağ', 'deniz', 'göl', 'nehir', 'çöl', 'tarla', 'bahçe'],
+        'fantasy': ['saray', 'kale', 'zindan', 'büyülü', 'mistik', 'portal'],
+        'historical': ['antik', 'harabe', 'tapınak', 'medeniyet']
+    }
+
+    # Anonim karakter kalıpları
+    ANON_CHARACTER_PATTERNS = {
+        'protagonist': ['ben', 'bana', 'beni', 'benimle'],
+        'female': ['kadın', 'kız', 'hanım', 'anne', 'abla', 'teyze', 'nine'],
+        'male': ['adam', 'erkek', 'bey', 'baba', 'abi', 'amca', 'dede'],
+        'child': ['çocuk', 'bebek', 'oğlan', 'kız çocuk'],
+        'group': ['onlar', 'herkes', 'insanlar', 'kalabalık', 'grup']
+    }
+
+    # Görsel öğeler: renk, hava durumu, ışık
+    VISUAL_COLORS = {
+        'kırmızı': 'red', 'mavi': 'blue', 'yeşil': 'green', 'sarı': 'yellow',
+        'siyah': 'black', 'beyaz': 'white', 'mor': 'purple', 'turuncu': 'orange',
+        'pembe': 'pink', 'gri': 'gray', 'kahverengi': 'brown', 'altın': 'golden',
+        'gümüş': 'silver', 'bronz': 'bronze'
+    }
+    VISUAL_WEATHER = {
+        'yağmur': 'rain', 'kar': 'snow', 'güneş': 'sun', 'bulut': 'clouds',
+        'fırtına': 'storm', 'sis': 'fog', 'rüzgar': 'wind', 'şimşek': 'lightning'
+    }
+    VISUAL_LIGHTING = {
+        'karanlık': 'dark', 'aydınlık': 'bright', 'loş': 'dim', 'parlak': 'bright',
+        'gölge': 'shadows', 'ışık': 'light', 'alev': 'fire', 'mum': 'candlelight'
+    }
+
     @classmethod
-    def analyze(cls, text: str) -> AnalysisResult:
-        """Tam metin analizi yap"""
-        result = AnalysisResult(text=text)
+    @cached_analysis('turkish_nlp', normalizer=identity)
+    def analyze(cls, text: Union[str, Document]) -> AnalysisResult:
+        """Tam metin analizi yap (metin veya paylaşılan Document)"""
+        doc = as_document(text)
+        result = AnalysisResult(text=doc.text)
 
         # Cümlelere ayır
-        sentences = cls._split_sentences(text)
-
-        for sent in sentences:
-            sentence_analysis = SentenceAnalyzer.analyze(sent)
+        for sent, tokens in zip(doc.sentence_texts, doc.sentence_tokens):
+            sentence_analysis = SentenceAnalyzer.analyze(sent, tokens)
             result.sentences.append(sentence_analysis)
 
         # Varlıkları çıkar
-        result.entities = EntityRecognizer.extract_entities(text)
+        result.entities = EntityRecognizer.extract_entities(doc)
 
         # Temaları analiz et
-        themes = ThemeAnalyzer.analyze_themes(text)
+        themes = ThemeAnalyzer.analyze_themes(doc)
         result.themes = [t[0] for t in themes]
 
         # Mood analizi
-        mood, intensity, mood_details = ThemeAnalyzer.analyze_mood(text)
+        mood, intensity, mood_details = ThemeAnalyzer.analyze_mood(doc)
         result.mood = mood
         result.mood_intensity = intensity
         result.atmosphere = mood_details
 
         # Zaman ve mekan
-        result.time_setting = cls._detect_time_setting(text)
-        result.location_setting = cls._detect_location_setting(text, result.entities)
+        result.time_setting = cls._detect_time_setting(doc)
+        result.location_setting = cls._detect_location_setting(doc, result.entities)
 
         # Karakterleri çıkar
-        result.characters = cls._extract_characters(text, result.entities)
+        result.characters = cls._extract_characters(doc, result.entities)
 
         # Aksiyonları çıkar
         result.actions = cls._extract_actions(result.sentences)
 
         # Görsel öğeleri çıkar
-        result.visual_elements = cls._extract_visual_elements(text)
+        result.visual_elements = cls._extract_visual_elements(doc)
 
         # Güven skoru
         result.confidence = cls._calculate_confidence(result)
@@ -827,52 +1123,31 @@ class TurkishTextAnalyzer:
         return [s.strip() for s in sentences if s.strip()]
 
     @classmethod
-    def _detect_time_setting(cls, text: str) -> Optional[str]:
+    def _detect_time_setting(cls, doc: Document) -> Optional[str]:
         """Zaman ayarını tespit et"""
-        text_lower = text.lower()
-
-        time_indicators = {
-            'morning': ['sabah', 'sabahleyin', 'tan ağar', 'güneş doğ'],
-            'afternoon': ['öğle', 'öğleden sonra', 'ikindi'],
-            'evening': ['akşam', 'akşamüstü', 'günbatımı', 'güneş bat'],
-            'night': ['gece', 'geceleyin', 'karanlık', 'ay ışığı', 'yıldız'],
-            'dawn': ['şafak', 'fecir', 'tan vakti'],
-            'dusk': ['alacakaranlık', 'akşam karanlığı']
-        }
-
-        for time_period, indicators in time_indicators.items():
+        for time_period, indicators in cls.TIME_SETTINGS.items():
             for ind in indicators:
-                if ind in text_lower:
+                if doc.contains(ind):
                     return time_period
 
         return None
 
     @classmethod
-    def _detect_location_setting(cls, text: str, entities: Dict) -> Optional[str]:
+    def _detect_location_setting(cls, doc: Document, entities: Dict) -> Optional[str]:
         """Mekan ayarını tespit et"""
         # Entity'lerden yer
         if entities.get('LOCATION'):
             return entities['LOCATION'][0]
 
-        text_lower = text.lower()
-
-        location_types = {
-            'indoor': ['ev', 'oda', 'salon', 'mutfak', 'yatak odası', 'ofis', 'bina', 'içeride'],
-            'outdoor_urban': ['sokak', 'cadde', 'şehir', 'park', 'meydan', 'köprü'],
-            'outdoor_nature': ['orman', 'dağ', 'deniz', 'göl', 'nehir', 'çöl', 'tarla', 'bahçe'],
-            'fantasy': ['saray', 'kale', 'zindan', 'büyülü', 'mistik', 'portal'],
-            'historical': ['antik', 'harabe', 'tapınak', 'medeniyet']
-        }
-
-        for loc_type, indicators in location_types.items():
+        for loc_type, indicators in cls.LOCATION_TYPES.items():
             for ind in indicators:
-                if ind in text_lower:
+                if doc.contains(ind):
                     return loc_type
 
         return None
 
     @classmethod
-    def _extract_characters(cls, text: str, entities: Dict) -> List[Dict]:
+    def _extract_characters(cls, doc: Document, entities: Dict) -> List[Dict]:
         """Karakterleri çıkar"""
         characters = []
 
@@ -881,27 +1156,18 @@ class TurkishTextAnalyzer:
             characters.append({
                 'name': person,
                 'type': 'named',
-                'mentions': text.lower().count(person.lower())
+                'mentions': doc.count(person.lower())
             })
 
         # Anonim karakterler
-        anon_patterns = {
-            'protagonist': ['ben', 'bana', 'beni', 'benimle'],
-            'female': ['kadın', 'kız', 'hanım', 'anne', 'abla', 'teyze', 'nine'],
-            'male': ['adam', 'erkek', 'bey', 'baba', 'abi', 'amca', 'dede'],
-            'child': ['çocuk', 'bebek', 'oğlan', 'kız çocuk'],
-            'group': ['onlar', 'herkes', 'insanlar', 'kalabalık', 'grup']
-        }
-
-        text_lower = text.lower()
-        for char_type, patterns in anon_patterns.items():
+        for char_type, patterns in cls.ANON_CHARACTER_PATTERNS.items():
             for pattern in patterns:
-                if pattern in text_lower:
+                if doc.contains(pattern):
                     characters.append({
                         'name': None,
                         'type': char_type,
                         'pattern': pattern,
-                        'mentions': text_lower.count(pattern)
+                        'mentions': doc.count(pattern)
                     })
                     break
 
@@ -927,41 +1193,23 @@ class TurkishTextAnalyzer:
         return actions
 
     @classmethod
-    def _extract_visual_elements(cls, text: str) -> List[str]:
+    def _extract_visual_elements(cls, doc: Document) -> List[str]:
         """Görsel öğeleri çıkar"""
         elements = []
-        text_lower = text.lower()
 
         # Renkler
-        colors = {
-            'kırmızı': 'red', 'mavi': 'blue', 'yeşil': 'green', 'sarı': 'yellow',
-            'siyah': 'black', 'beyaz': 'white', 'mor': 'purple', 'turuncu': 'orange',
-            'pembe': 'pink', 'gri': 'gray', 'kahverengi': 'brown', 'altın': 'golden',
-            'gümüş': 'silver', 'bronz': 'bronze'
-        }
-
-        for tr, en in colors.items():
-            if tr in text_lower:
+        for tr, en in cls.VISUAL_COLORS.items():
+            if doc.contains(tr):
                 elements.append(f"color:{en}")
 
         # Hava durumu
-        weather = {
-            'yağmur': 'rain', 'kar': 'snow', 'güneş': 'sun', 'bulut': 'clouds',
-            'fırtına': 'storm', 'sis': 'fog', 'rüzgar': 'wind', 'şimşek': 'lightning'
-        }
-
-        for tr, en in weather.items():
-            if tr in text_lower:
+        for tr, en in cls.VISUAL_WEATHER.items():
+            if doc.contains(tr):
                 elements.append(f"weather:{en}")
 
         # Işık
-        lighting = {
-            'karanlık': 'dark', 'aydınlık': 'bright', 'loş': 'dim', 'parlak': 'bright',
-            'gölge': 'shadows', 'ışık': 'light', 'alev': 'fire', 'mum': 'candlelight'
-        }
-
-        for tr, en in lighting.items():
-            if tr in text_lower:
+        for tr, en in cls.VISUAL_LIGHTING.items():
+            if doc.contains(tr):
                 elements.append(f"lighting:{en}")
 
         return elements
@@ -998,6 +1246,19 @@ class TurkishTextAnalyzer:
         return min(score, 1.0)
 
 
+# Sahne Document'larının ortak indeksine alt dize olarak aranan kelimeleri ekle
+register_lexicon(
+    *(data['keywords'] for data in ThemeAnalyzer.THEMES.values()),
+    *(data['keywords'] for data in ThemeAnalyzer.MOODS.values()),
+    *TurkishTextAnalyzer.TIME_SETTINGS.values(),
+    *TurkishTextAnalyzer.LOCATION_TYPES.values(),
+    *TurkishTextAnalyzer.ANON_CHARACTER_PATTERNS.values(),
+    TurkishTextAnalyzer.VISUAL_COLORS,
+    TurkishTextAnalyzer.VISUAL_WEATHER,
+    TurkishTextAnalyzer.VISUAL_LIGHTING,
+)
+
+
 # ============== PROMPT GENERATOR ==============
 
 class SmartPromptGenerator:
@@ -0,0 +1,313 @@
+"""
+Ağırlık Deposu - Bellek Eşlemeli Model Yükleme
+==============================================
+from_pretrained her başlatmada hub önbelleğindeki checkpoint'leri okur, dtype
+dönüştürür, LoRA'yı birleştirir ve tensörleri sürecin özel belleğine kopyalar.
+Depo bu işlenmiş hali (dtype uygulanmış, LoRA birleştirilmiş) model başına bir
+dizinde safetensors olarak tutar; sonraki yüklemeler dosyaları mmap'ler ve
+tensörleri doğrudan eşlenmiş sayfalar üzerinde kurar:
+
+- Kopya yok: yükleme, başlık ayrıştırma ve boş modüle `assign` ile parametre
+  bağlamaktan ibarettir; sayfalar ilk erişimde (ör. .to("cuda")) gelir.
+- Paylaşım: aynı makinedeki süreçler aynı dosyaları eşler; CPU modunda
+  ağırlıklar page cache'te bir kez bulunur (PSS süreçlere bölünür).
+- Tutarlılık: giriş anahtarı + parmak izi (kaynak model, LoRA, dtype); parmak
+  izi değişen giriş yeniden dışa aktarılır. Yazma geçici dizine yapılıp atomik
+  rename ile yayımlanır, aynı anda dışa aktaran işçiler birbirini bozmaz.
+
+safetensors biçimi: 8 bayt (LE) başlık uzunluğu, JSON başlık
+({ad: {dtype, shape, data_offsets}}, "__metadata__"), ardından ham veri.
+Okuyucu bu modüldedir; torch yoksa numpy dizileri döndürür.
+"""
+
+import importlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # opsiyonel: yalnızca numpy görünümleri ve save_file için
+    np = None
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = 1
+MANIFEST = 'weight_store.json'
+WEIGHT_PATTERN = '*.safetensors'
+
+# safetensors dtype -> numpy / torch adı (numpy'da bfloat16 yok)
+NUMPY_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool',
+}
+TORCH_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'bfloat16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool',
+}
+
+
+class WeightStoreError(RuntimeError):
+    """Depo girişi okunamadı veya modüle uymuyor"""
+
+
+def read_header(path: Union[str, Path]) -> Tuple[Dict[str, Any], int]:
+    """safetensors başlığı ve verinin dosyadaki başlangıç konumu"""
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise WeightStoreError(f"safetensors başlığı eksik: {path}")
+        (size,) = struct.unpack('<Q', prefix)
+        try:
+            header = json.loads(f.read(size))
+        except ValueError as e:
+            raise WeightStoreError(f"safetensors başlığı bozuk: {path}") from e
+    return header, 8 + size
+
+
+def save_file(tensors: Dict[str, Any], path: Union[str, Path], metadata: Optional[Dict[str, str]] = None) -> None:
+    """numpy dizilerini safetensors olarak yaz (torch tensörleri için safetensors.torch.save_file)"""
+    dtype_names = {name: code for code, name in NUMPY_DTYPES.items()}
+    header: Dict[str, Any] = {'__metadata__': metadata} if metadata else {}
+    arrays = []
+    offset = 0
+    for name in sorted(tensors):
+        array = np.ascontiguousarray(tensors[name])
+        code = dtype_names.get(array.dtype.name)
+        if code is None:
+            raise WeightStoreError(f"Desteklenmeyen dtype: {name} ({array.dtype})")
+        header[name] = {'dtype': code, 'shape': list(array.shape),
+                        'data_offsets': [offset, offset + array.nbytes]}
+        arrays.append(array)
+        offset += array.nbytes
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    encoded += b' ' * (-len(encoded) % 8)  # Veri 8 bayt hizalı başlasın
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(encoded)))
+        f.write(encoded)
+        for array in arrays:
+            f.write(array.data)
+
+
+class MappedSafetensors:
+    """Bellek eşlemeli safetensors dosyası; tensörler kopyasız görünümlerdir
+
+    Eşleme MAP_PRIVATE (ACCESS_COPY): okunan sayfalar page cache'ten
+    paylaşılır, yazılan sayfa yalnızca bu süreçte kopyalanır (dosya değişmez).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.header, self.data_start = read_header(self.path)
+        self.metadata: Dict[str, str] = self.header.pop('__metadata__', None) or {}
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.nbytes = len(self._mmap) - self.data_start
+
+    def keys(self) -> List[str]:
+        return list(self.header)
+
+    def _span(self, name: str) -> Tuple[Dict[str, Any], int, int]:
+        info = self.header[name]
+        start, end = info['data_offsets']
+        return info, self.data_start + start, end - start
+
+    def array(self, name: str):
+        """Salt-okunur numpy görünümü"""
+        info, offset, size = self._span(name)
+        dtype = NUMPY_DTYPES.get(info['dtype'])
+        if dtype is None:
+            raise WeightStoreError(f"numpy bu dtype'ı desteklemiyor: {name} ({info['dtype']})")
+        count = size // np.dtype(dtype).itemsize
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset).reshape(info['shape'])
+        array.flags.writeable = False
+        return array
+
+    def tensor(self, name: str):
+        """Eşlenmiş sayfalar üzerinde torch tensörü"""
+        import torch
+        info, offset, size = self._span(name)
+        dtype = getattr(torch, TORCH_DTYPES[info['dtype']])
+        if size == 0:
+            return torch.empty(info['shape'], dtype=dtype)
+        count = size // torch.empty((), dtype=dtype).element_size()
+        return torch.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset).view(info['shape'])
+
+    def state_dict(self, framework: str = 'pt') -> Dict[str, Any]:
+        get = self.tensor if framework == 'pt' else self.array
+        return {name: get(name) for name in self.header}
+
+
+# ============== Pipeline Bileşenleri ==============
+
+def _load_module(cls, path: Path, weight_files: List[Path]):
+    """Boş (meta) modül kur, ağırlıkları eşlenmiş tensörlere bağla"""
+    from accelerate import init_empty_weights
+
+    with init_empty_weights():
+        if hasattr(cls, 'load_config'):  # diffusers ModelMixin
+            module = cls.from_config(cls.load_config(path))
+        else:  # transformers PreTrainedModel
+            module = cls(cls.config_class.from_pretrained(path))
+
+    state: Dict[str, Any] = {}
+    for weight_file in weight_files:
+        state.update(MappedSafetensors(weight_file).state_dict('pt'))
+    # assign=True: parametre, kopyalanmak yerine eşlenmiş tensörün kendisi olur
+    module.load_state_dict(state, strict=False, assign=True)
+    if hasattr(module, 'tie_weights'):
+        module.tie_weights()
+    missing = [name for name, param in module.state_dict().items() if param.device.type == 'meta']
+    if missing:
+        raise WeightStoreError(f"{path.name}: eksik ağırlıklar {missing[:5]}")
+    return module.eval()
+
+
+def load_pipeline(path: Union[str, Path]):
+    """save_pretrained dizininden pipeline; ağırlıklı bileşenler mmap üzerinde"""
+    path = Path(path)
+    index = json.loads((path / 'model_index.json').read_text(encoding='utf-8'))
+    pipeline_cls = getattr(importlib.import_module('diffusers'), index['_class_name'])
+
+    kwargs: Dict[str, Any] = {}
+    for name, spec in index.items():
+        if name.startswith('_'):
+            continue
+        if not isinstance(spec, list):
+            kwargs[name] = spec  # requires_safety_checker gibi yapılandırma değerleri
+            continue
+        library, class_name = spec
+        if library is None:
+            kwargs[name] = None
+            continue
+        cls = getattr(importlib.import_module(library), class_name)
+        component_dir = path / name
+        weight_files = sorted(component_dir.glob(WEIGHT_PATTERN))
+        if weight_files:
+            kwargs[name] = _load_module(cls, component_dir, weight_files)
+        else:
+            kwargs[name] = cls.from_pretrained(component_dir)  # Zamanlayıcı, tokenizer
+    return pipeline_cls(**kwargs)
+
+
+# ============== Depo ==============
+
+class WeightStore:
+    """Anahtar başına bir işlenmiş pipeline dizini (manifest + safetensors)"""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.exports = 0
+        self.misses = 0
+        self.failures = 0
+
+    def entry_path(self, key: str) -> Path:
+        return self.root / key
+
+    def manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.entry_path(key) / MANIFEST).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def has(self, key: str, fingerprint: Dict[str, Any]) -> bool:
+        manifest = self.manifest(key)
+        return manifest is not None and manifest.get('fingerprint') == fingerprint
+
+    def files(self, key: str) -> List[Path]:
+        return sorted(self.entry_path(key).rglob(WEIGHT_PATTERN))
+
+    def load_pipeline(self, key: str, fingerprint: Dict[str, Any]):
+        """Girişten pipeline; yoksa, eskiyse veya okunamazsa None (çağıran hub'dan yükler)"""
+        if not self.has(key, fingerprint):
+            self.misses += 1
+            return None
+        started = time.perf_counter()
+        try:
+            pipe = load_pipeline(self.entry_path(key))
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Ağırlık deposundan yüklenemedi ({key}): {e}")
+            return None
+        self.loads += 1
+        logger.info(f"Ağırlıklar depodan eşlendi: {key} ({time.perf_counter() - started:.2f}s)")
+        return pipe
+
+    def save_pipeline(self, key: str, fingerprint: Dict[str, Any], pipe) -> Path:
+        """İşlenmiş pipeline'ı dışa aktar; geçici dizine yazılır, rename ile yayımlanır"""
+        target = self.entry_path(key)
+        staging = self.root / f".{key}.{uuid.uuid4().hex[:8]}"
+        started = time.perf_counter()
+        try:
+            pipe.save_pretrained(str(staging), safe_serialization=True)
+            self._write_manifest(staging, fingerprint)
+            self._publish(staging, target, fingerprint)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.exports += 1
+        logger.info(f"Ağırlıklar depoya aktarıldı: {key} ({time.perf_counter() - started:.1f}s)")
+        return target
+
+    def save_tensors(self, key: str, fingerprint: Dict[str, Any],
+                     components: Dict[str, Dict[str, Any]]) -> Path:
+        """Bileşen -> {ad: numpy dizisi} girişini yaz (pipeline'sız kullanım, ölçümler)"""
+        target = self.entry_path(key)
+        staging = self.root / f".{key}.{uuid.uuid4().hex[:8]}"
+        try:
+            for component, tensors in components.items():
+                (staging / component).mkdir(parents=True)
+                save_file(tensors, staging / component / 'weights.safetensors')
+            self._write_manifest(staging, fingerprint)
+            self._publish(staging, target, fingerprint)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.exports += 1
+        return target
+
+    def open_tensors(self, key: str) -> Dict[str, MappedSafetensors]:
+        """Girişteki her safetensors dosyası (bileşen/dosya adıyla) eşlenmiş olarak"""
+        entry = self.entry_path(key)
+        return {str(path.relative_to(entry)): MappedSafetensors(path) for path in self.files(key)}
+
+    def _write_manifest(self, staging: Path, fingerprint: Dict[str, Any]) -> None:
+        files = {str(path.relative_to(staging)): path.stat().st_size for path in sorted(staging.rglob(WEIGHT_PATTERN))}
+        manifest = {'format': STORE_FORMAT, 'fingerprint': fingerprint, 'files': files,
+                    'bytes': sum(files.values()), 'created_at': time.time()}
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+    def _publish(self, staging: Path, target: Path, fingerprint: Dict[str, Any]) -> None:
+        with self._lock:
+            if self.has(target.name, fingerprint):
+                return  # Başka bir işçi aynı girişi az önce yayımladı
+            retired = None
+            if target.exists():
+                # Eski giriş: onu eşlemiş süreçler silinen dosyayı okumaya devam edebilir (Linux)
+                retired = self.root / f".{target.name}.old.{uuid.uuid4().hex[:8]}"
+                os.rename(target, retired)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                if not self.has(target.name, fingerprint):
+                    raise
+            if retired is not None:
+                shutil.rmtree(retired, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = {}
+        for path in sorted(self.root.iterdir()):
+            if path.is_dir() and not path.name.startswith('.'):
+                manifest = self.manifest(path.name) or {}
+                entries[path.name] = {'bytes': manifest.get('bytes', 0), 'fingerprint': manifest.get('fingerprint')}
+        return {'root': str(self.root), 'entries': entries, 'loads': self.loads, 'exports': self.exports,
+                'misses': self.misses, 'failures': self.failures}
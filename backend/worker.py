@@ -0,0 +1,87 @@
+"""
+Görsel Üretim İşçisi
+====================
+API'den ayrı süreçte (aynı veya başka makinede) iş çalıştırır. API ile aynı
+broker'a (VSG_JOB_BROKER) bağlanır, işleri kiralayarak alır, model
+pipeline'larını bu süreçte tutar ve sonucu broker'a yazar. API süreçleri
+model yüklemez ve iş durumu tutmaz; yatay ölçekleme işçi sayısıyla yapılır.
+
+Çıktılar CONFIG.output_dir'e yazılır ve paylaşılan saklama indeksine
+(CONFIG.output_index_db) kaydedilir; görselleri sunan API aynı diske
+erişmelidir. Kota uygulaması API sürecindeki saklama servisinde kalır.
+Aynı makinede birden çok işçi varsa VSG_WEIGHT_STORE ile ağırlıklar tek
+kopya olarak eşlenir ve yeniden başlatmalar dönüştürme adımını atlar.
+
+Kullanım:
+    VSG_JOB_BROKER=sqlite:///data/jobs.db VSG_API_WORKER=0 python server.py
+    VSG_JOB_BROKER=sqlite:///data/jobs.db python worker.py [--worker-id gpu-0]
+
+SIGTERM/SIGINT: yeni iş almayı bırakır, çalışan iş bitince çıkar.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+
+import server
+from job_broker import BrokerWorker, open_broker
+from log_setup import setup_logging, shutdown_logging
+from retention import OutputRetention
+from image_serving import ImageByteCache
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Görsel üretim işçisi (paylaşılan iş kuyruğu)")
+    parser.add_argument('--broker', default=server.CONFIG.job_broker,
+                        help='Broker adresi (varsayılan: VSG_JOB_BROKER), ör. sqlite:///data/jobs.db')
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument('--lease', type=float, default=server.CONFIG.job_lease_seconds,
+                        help='Kira süresi (sn); heartbeat bunun üçte birinde bir gönderilir')
+    parser.add_argument('--poll', type=float, default=1.0, help='Kuyruk boşken yoklama aralığı (sn)')
+    parser.add_argument('--log-file', default=None, help='Varsayılan: worker_<worker-id>.log')
+    args = parser.parse_args(argv)
+
+    if not args.broker:
+        parser.error("Broker adresi gerekli (--broker veya VSG_JOB_BROKER)")
+
+    # Aynı makinedeki süreçler tek log dosyasını birlikte döndürmesin
+    setup_logging(level=logging.INFO, log_file=args.log_file or f"worker_{args.worker_id}.log",
+                  max_bytes=server.CONFIG.log_max_mb * 1024 * 1024,
+                  backup_count=server.CONFIG.log_backup_count)
+
+    config = server.CONFIG
+    # Görseller bu süreçten sunulmaz: bayt önbelleği gereksiz; çıktılar ortak indekse yazılır
+    server.image_bytes = ImageByteCache(max_bytes=0)
+    server.output_retention = OutputRetention(config.output_dir, config.output_index_db,
+                                              max_files=0, max_age_hours=0)
+    os.makedirs(config.output_dir, exist_ok=True)
+
+    broker = open_broker(args.broker, lease_seconds=args.lease, max_attempts=config.job_max_attempts)
+    server.device_manager = server.DeviceManager()
+    server.generator = server.ImageGenerator(server.device_manager)
+    worker = BrokerWorker(broker, server.broker_job_handler(server.generator), worker_id=args.worker_id,
+                          lease_seconds=args.lease, poll_interval=args.poll, on_finish=server.observe_job)
+
+    def stop(signum, frame):
+        logger.info(f"Sinyal {signum}: çalışan iş bitince çıkılacak")
+        worker.stop(timeout=0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(f"Broker: {args.broker} | işçi: {args.worker_id} | mod: {server.device_manager.mode.value}")
+    try:
+        worker.run_forever()
+    finally:
+        broker.close()
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())